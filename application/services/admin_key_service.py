@@ -5,15 +5,34 @@ Author: uSipipo Team
 Version: 1.0.0
 """
 
-from typing import Any, Dict, List
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 
+from config import settings
 from domain.entities.admin import AdminKeyInfo
+from domain.entities.key_query import KeyCursor, KeyQuery
+from domain.entities.vpn_key import KeyType
 from domain.entities.vpn_key import VpnKey as Key
 from domain.interfaces.iadmin_service import IAdminKeyService
 from infrastructure.api_clients.client_outline import OutlineClient
 from infrastructure.api_clients.client_wireguard import WireGuardClient
 from utils.logger import logger
 
+from .bulk_key_executor import BulkKeyExecutor, KeyOperation
+from .metrics_snapshot_service import MetricsSnapshotService
+
+# Filtros del listado admin (callback keys_filter_<nombre>) → campos de KeyQuery
+KEY_LIST_FILTERS: Dict[str, Dict[str, Any]] = {
+    "all": {},
+    "wireguard": {"key_type": KeyType.WIREGUARD},
+    "outline": {"key_type": KeyType.OUTLINE},
+    "active": {"is_active": True},
+    "inactive": {"is_active": False},
+    "expiring": {"is_active": True, "expiring_within": timedelta(days=7)},
+    "overquota": {"over_quota": True},
+}
+
 
 class AdminKeyService(IAdminKeyService):
     """Servicio dedicado a la gestión de claves VPN desde el panel admin."""
@@ -22,11 +41,16 @@ class AdminKeyService(IAdminKeyService):
         self,
         key_repository,
         user_repository,
+        metrics_snapshot: Optional[MetricsSnapshotService] = None,
     ):
         self.key_repository = key_repository
         self.user_repository = user_repository
         self.wireguard_client = WireGuardClient()
         self.outline_client = OutlineClient()
+        self.metrics_snapshot = metrics_snapshot or MetricsSnapshotService(
+            self.outline_client, self.wireguard_client
+        )
+        self.bulk_executor = BulkKeyExecutor(self.outline_client, self.wireguard_client)
 
     async def get_user_keys(self, user_id: int) -> List[Key]:
         """Obtener todas las claves de un usuario específico."""
@@ -72,6 +96,65 @@ class AdminKeyService(IAdminKeyService):
             logger.error(f"Error obteniendo todas las claves: {e}")
             return []
 
+    async def get_keys_page(
+        self,
+        current_user_id: int,
+        key_filter: str = "all",
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Página del listado admin de llaves resuelta en SQL (filtro, orden y
+        cursor keyset), más el total para la cabecera.
+
+        Los datos de uso vienen de la BD (sincronizada por el job de consumo);
+        no se consulta a los servidores VPN por cada llave.
+        """
+        query = KeyQuery(limit=limit, **KEY_LIST_FILTERS.get(key_filter, {}))
+        if cursor:
+            query.cursor = KeyCursor.decode(cursor, query.sort)
+
+        page = await self.key_repository.query_keys(query, current_user_id)
+        total_keys = await self.key_repository.count_keys(query, current_user_id)
+
+        return {
+            "keys": [self._key_to_dict(key) for key in page.items],
+            "total_keys": total_keys,
+            "next_cursor": page.next_cursor.encode() if page.next_cursor else None,
+        }
+
+    async def get_key_info(self, key_id: str, current_user_id: int) -> Optional[Dict]:
+        """Obtener la información de una sola clave (sin recorrer todas)."""
+        try:
+            key = await self.key_repository.get_key(key_id)
+            if not key:
+                return None
+
+            info = self._key_to_dict(key)
+            user = await self.user_repository.get_by_id(key.user_id, current_user_id)
+            info["user_name"] = user.full_name or "Unknown" if user else "Unknown"
+            return info
+        except Exception as e:
+            logger.error(f"Error obteniendo clave {key_id}: {e}")
+            return None
+
+    @staticmethod
+    def _key_to_dict(key: Key) -> Dict[str, Any]:
+        return {
+            "key_id": str(key.id),
+            "user_id": key.user_id,
+            "key_type": (
+                key.key_type.value if hasattr(key.key_type, "value") else str(key.key_type)
+            ),
+            "key_name": key.name,
+            "is_active": key.is_active,
+            "data_used": key.used_bytes,
+            "data_limit": key.data_limit_bytes,
+            "created_at": key.created_at,
+            "last_used": key.last_seen_at,
+            "expires_at": key.expires_at,
+        }
+
     async def delete_key_from_servers(self, key_id: str, key_type: str) -> bool:
         """Eliminar una clave de los servidores VPN (WireGuard y Outline)."""
         try:
@@ -158,6 +241,35 @@ class AdminKeyService(IAdminKeyService):
                 "error": str(e),
             }
 
+    async def delete_keys_complete(self, keys: List[Key]) -> Dict[str, Any]:
+        """
+        Eliminar completamente varias claves en bloque (servidores + BD).
+
+        Los servidores se actualizan con concurrencia acotada y las claves
+        eliminadas se desactivan en BD con un solo UPDATE.
+        """
+        try:
+            result = await self.bulk_executor.run(KeyOperation.DELETE, keys)
+            if result.succeeded:
+                await self.key_repository.set_active_bulk(
+                    [uuid.UUID(str(key.id)) for key in result.succeeded],
+                    False,
+                    settings.ADMIN_ID,
+                )
+            for error in result.errors:
+                logger.error(error)
+
+            return {
+                "success": result.success,
+                "deleted": len(result.succeeded),
+                "failed": len(result.failed),
+                "errors": result.errors,
+            }
+
+        except Exception as e:
+            logger.error(f"Error en eliminación masiva de {len(keys)} claves: {e}")
+            return {"success": False, "deleted": 0, "failed": len(keys), "errors": [str(e)]}
+
     async def toggle_key_status(self, key_id: str, active: bool = True) -> Dict[str, Any]:
         """Activa o desactiva una llave VPN sin eliminarla."""
         try:
@@ -235,26 +347,18 @@ class AdminKeyService(IAdminKeyService):
             if not key:
                 return {"data_used": 0, "server_status": "not_found"}
 
-            data_used = 0
-            server_status = "unknown"
-
-            if key.key_type.lower() == "wireguard":
-                try:
-                    metrics = await self.wireguard_client.get_peer_metrics(key.external_id)
-                    data_used = metrics.get("transfer_total", 0)
-                    server_status = "active" if data_used > 0 else "inactive"
-                except Exception as e:
-                    logger.error(f"Error obteniendo métricas WireGuard para {key_id}: {e}")
-                    server_status = "error"
-
-            elif key.key_type.lower() == "outline":
-                try:
-                    metrics = await self.outline_client.get_key_usage(key_id)
-                    data_used = metrics.get("bytes", 0)
-                    server_status = "active" if data_used > 0 else "inactive"
-                except Exception as e:
-                    logger.error(f"Error obteniendo métricas Outline para {key_id}: {e}")
-                    server_status = "error"
+            key_type = key.key_type.lower()
+            if key_type not in ("wireguard", "outline"):
+                return {"data_used": 0, "server_status": "unknown"}
+
+            try:
+                snapshot = await self.metrics_snapshot.get_snapshot()
+                data_used = snapshot.key_usage(key_type, key.external_id)
+                server_status = "active" if data_used > 0 else "inactive"
+            except Exception as e:
+                logger.error(f"Error obteniendo métricas {key_type} para {key_id}: {e}")
+                data_used = 0
+                server_status = "error"
 
             return {
                 "data_used": data_used,
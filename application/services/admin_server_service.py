@@ -5,7 +5,7 @@ Author: uSipipo Team
 Version: 1.0.0
 """
 
-from typing import Dict
+from typing import Dict, Optional
 
 from domain.entities.admin import ServerStatus
 from domain.interfaces.iadmin_service import IAdminServerService
@@ -13,6 +13,8 @@ from infrastructure.api_clients.client_outline import OutlineClient
 from infrastructure.api_clients.client_wireguard import WireGuardClient
 from utils.logger import logger
 
+from .metrics_snapshot_service import MetricsSnapshotService
+
 
 class AdminServerService(IAdminServerService):
     """Servicio dedicado a la gestión de servidores VPN desde el panel admin."""
@@ -21,19 +23,28 @@ class AdminServerService(IAdminServerService):
         self,
         user_repository,
         key_repository,
+        metrics_snapshot: Optional[MetricsSnapshotService] = None,
     ):
         self.user_repository = user_repository
         self.key_repository = key_repository
         self.wireguard_client = WireGuardClient()
         self.outline_client = OutlineClient()
+        self.metrics_snapshot = metrics_snapshot or MetricsSnapshotService(
+            self.outline_client, self.wireguard_client
+        )
 
     async def get_server_status(self) -> Dict[str, Dict]:
         """Obtener estado de los servidores VPN."""
         try:
             status = {}
 
+            # Cada backend obtiene la instantánea en su propio try: si falla,
+            # solo ese backend aparece con error (la segunda lectura usa la caché)
             try:
-                wg_usage = await self.wireguard_client.get_usage()
+                snapshot = await self.metrics_snapshot.get_snapshot()
+                wg_usage = snapshot.wireguard_peers
+                if wg_usage is None:
+                    raise RuntimeError("Sin métricas de WireGuard")
                 wg_status = ServerStatus(
                     server_type="wireguard",
                     is_healthy=True,
@@ -58,7 +69,10 @@ class AdminServerService(IAdminServerService):
                 logger.error(f"Error obteniendo estado de WireGuard: {e}")
 
             try:
-                outline_info = await self.outline_client.get_server_info()
+                snapshot = await self.metrics_snapshot.get_snapshot()
+                outline_info = snapshot.outline_server
+                if outline_info is None:
+                    raise RuntimeError("Sin métricas de Outline")
                 outline_status = ServerStatus(
                     server_type="outline",
                     is_healthy=outline_info.get("is_healthy", False),
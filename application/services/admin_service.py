@@ -23,6 +23,7 @@ from .admin_key_service import AdminKeyService
 from .admin_server_service import AdminServerService
 from .admin_stats_service import AdminStatsService
 from .admin_user_service import AdminUserService
+from .metrics_snapshot_service import MetricsSnapshotService
 
 
 class AdminService(IAdminService):
@@ -39,11 +40,12 @@ class AdminService(IAdminService):
         user_repository,
         payment_repository,
         ticket_repo: ITicketRepository | None = None,
+        metrics_snapshot: MetricsSnapshotService | None = None,
     ):
         self._stats_service = AdminStatsService(user_repository, key_repository, payment_repository)
         self._user_service = AdminUserService(user_repository, key_repository, payment_repository)
-        self._key_service = AdminKeyService(key_repository, user_repository)
-        self._server_service = AdminServerService(user_repository, key_repository)
+        self._key_service = AdminKeyService(key_repository, user_repository, metrics_snapshot)
+        self._server_service = AdminServerService(user_repository, key_repository, metrics_snapshot)
         self.ticket_repo = ticket_repo
 
     # ============================================
@@ -63,10 +65,16 @@ class AdminService(IAdminService):
         return await self._user_service.get_all_users(current_user_id)
 
     async def get_users_paginated(
-        self, page: int = 1, per_page: int = 10, current_user_id: int | None = None
+        self,
+        page: int = 1,
+        per_page: int = 10,
+        current_user_id: int | None = None,
+        cursor: Optional[str] = None,
     ) -> Dict:
-        """Obtener usuarios paginados."""
-        return await self._user_service.get_users_paginated(page, per_page, current_user_id)
+        """Obtener usuarios paginados (keyset; ``cursor`` = next_cursor anterior)."""
+        return await self._user_service.get_users_paginated(
+            page, per_page, current_user_id, cursor=cursor
+        )
 
     async def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """Obtener información detallada de un usuario."""
@@ -92,7 +100,7 @@ class AdminService(IAdminService):
 
     async def delete_user(self, user_id: int) -> AdminOperationResult:
         """Eliminar un usuario y sus claves asociadas."""
-        return await self._user_service.delete_user(user_id, self._key_service)
+        return await self._user_service.delete_user(user_id, key_service=self._key_service)
 
     # ============================================
     # DELEGACIÓN A AdminKeyService
@@ -106,6 +114,20 @@ class AdminService(IAdminService):
         """Obtener todas las claves de todos los usuarios."""
         return await self._key_service.get_all_keys(current_user_id)
 
+    async def get_keys_page(
+        self,
+        current_user_id: int,
+        key_filter: str = "all",
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Obtener una página filtrada de claves (keyset; ``cursor`` = next_cursor)."""
+        return await self._key_service.get_keys_page(current_user_id, key_filter, limit, cursor)
+
+    async def get_key_info(self, key_id: str, current_user_id: int) -> Optional[Dict]:
+        """Obtener la información de una clave."""
+        return await self._key_service.get_key_info(key_id, current_user_id)
+
     async def delete_key_from_servers(self, key_id: str, key_type: str) -> bool:
         """Eliminar una clave de los servidores VPN (WireGuard y Outline)."""
         return await self._key_service.delete_key_from_servers(key_id, key_type)
@@ -118,6 +140,10 @@ class AdminService(IAdminService):
         """Eliminar completamente una clave (servidores + BD)."""
         return await self._key_service.delete_user_key_complete(key_id)
 
+    async def delete_keys_complete(self, keys: List[Key]) -> Dict[str, Any]:
+        """Eliminar completamente varias claves en bloque (servidores + BD)."""
+        return await self._key_service.delete_keys_complete(keys)
+
     async def toggle_key_status(self, key_id: str, active: bool = True) -> Dict[str, Any]:
         """Activa o desactiva una llave VPN sin eliminarla."""
         return await self._key_service.toggle_key_status(key_id, active)
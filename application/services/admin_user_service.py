@@ -7,11 +7,14 @@ Version: 1.0.0
 
 from typing import Dict, List, Optional
 
-from domain.entities.admin import AdminOperationResult, AdminUserInfo
+from domain.entities.admin import AdminOperationResult, AdminUserInfo, UserListCursor, UserListItem
 from domain.entities.user import UserRole, UserStatus
 from domain.interfaces.iadmin_service import IAdminUserService
 from utils.logger import logger
 
+# Tamaño de bloque al recorrer todos los usuarios con paginación keyset
+USER_SCAN_BATCH_SIZE = 500
+
 
 class AdminUserService(IAdminUserService):
     """Servicio dedicado a la gestión de usuarios desde el panel admin."""
@@ -29,33 +32,33 @@ class AdminUserService(IAdminUserService):
     async def get_all_users(self, current_user_id: int) -> List[Dict]:
         """Obtener lista de todos los usuarios registrados."""
         try:
-            users = await self.user_repository.get_all_users(current_user_id)
-
             user_list = []
-            for user in users:
-                user_keys = await self.key_repository.get_by_user(user.telegram_id, current_user_id)
-                active_keys = [k for k in user_keys if k.is_active]
-
-                balance = await self.payment_repository.get_balance(user.telegram_id)
-
-                name_parts = (user.full_name or "").split(" ", 1)
-                first_name = name_parts[0] if name_parts and name_parts[0] else "Unknown"
-                last_name = name_parts[1] if len(name_parts) > 1 else None
-
-                user_info = AdminUserInfo(
-                    user_id=user.telegram_id,
-                    username=user.username,
-                    first_name=first_name,
-                    last_name=last_name,
-                    total_keys=len(user_keys),
-                    active_keys=len(active_keys),
-                    stars_balance=balance.stars if balance else 0,
-                    total_deposited=getattr(user, "referral_credits", 0) or 0,
-                    referral_credits=getattr(user, "referral_credits", 0) or 0,
-                    registration_date=user.created_at,
-                    last_activity=getattr(user, "last_activity", None),
+            async for batch in self._iter_user_pages(current_user_id):
+                balances = await self.payment_repository.get_balances(
+                    item.user.telegram_id for item in batch.items
                 )
-                user_list.append(user_info.__dict__)
+                for item in batch.items:
+                    user = item.user
+                    balance = balances.get(user.telegram_id)
+
+                    name_parts = (user.full_name or "").split(" ", 1)
+                    first_name = name_parts[0] if name_parts and name_parts[0] else "Unknown"
+                    last_name = name_parts[1] if len(name_parts) > 1 else None
+
+                    user_info = AdminUserInfo(
+                        user_id=user.telegram_id,
+                        username=user.username,
+                        first_name=first_name,
+                        last_name=last_name,
+                        total_keys=item.total_keys,
+                        active_keys=item.active_keys,
+                        stars_balance=balance.stars if balance else 0,
+                        total_deposited=getattr(user, "referral_credits", 0) or 0,
+                        referral_credits=getattr(user, "referral_credits", 0) or 0,
+                        registration_date=user.created_at,
+                        last_activity=getattr(user, "last_activity", None),
+                    )
+                    user_list.append(user_info.__dict__)
 
             return user_list
 
@@ -113,6 +116,7 @@ class AdminUserService(IAdminUserService):
 
             user.status = UserStatus(status)
             await self.user_repository.update_user(user)
+            _invalidate_identity(user_id)
 
             logger.info(f"Usuario {user_id} actualizado a estado: {status}")
             return AdminOperationResult(
@@ -156,6 +160,7 @@ class AdminUserService(IAdminUserService):
 
             user.role = UserRole(role)
             await self.user_repository.update_user(user)
+            _invalidate_identity(user_id)
 
             message = f'Rol "{role}" asignado a usuario {user_id}'
             logger.info(message)
@@ -206,18 +211,8 @@ class AdminUserService(IAdminUserService):
                     message="Key service no proporcionado",
                 )
 
-            from typing import Any
-
-            key_svc: Any = key_service
-
-            deleted_keys_count = 0
-            for key in user_keys:
-                try:
-                    result = await key_svc.delete_user_key_complete(key.key_id)
-                    if result["success"]:
-                        deleted_keys_count += 1
-                except Exception as e:
-                    logger.error(f"Error eliminando clave {key.key_id}: {e}")
+            delete_result = await key_service.delete_keys_complete(user_keys)
+            deleted_keys_count = delete_result["deleted"]
 
             await self.user_repository.delete_user(user_id)
 
@@ -240,45 +235,42 @@ class AdminUserService(IAdminUserService):
             )
 
     async def get_users_paginated(
-        self, page: int = 1, per_page: int = 10, current_user_id: int | None = None
+        self,
+        page: int = 1,
+        per_page: int = 10,
+        current_user_id: int | None = None,
+        cursor: Optional[str] = None,
     ) -> Dict:
-        """Obtener usuarios paginados."""
+        """
+        Obtener usuarios paginados (más recientes primero).
+
+        Usa paginación keyset: ``cursor`` es el ``next_cursor`` de la página
+        anterior. Sin cursor y con ``page > 1`` se avanza página a página
+        desde el inicio (solo para saltos sin cursor conocido).
+        """
         try:
             if current_user_id is None:
                 current_user_id = 1
-            all_users = await self.user_repository.get_all_users(current_user_id)
-            total_users = len(all_users)
+            page = max(page, 1)
 
-            offset = (page - 1) * per_page
-            paginated_users = all_users[offset : offset + per_page]
+            total_users = await self.user_repository.count_users(current_user_id)
+            total_pages = (total_users + per_page - 1) // per_page
 
-            user_list = []
-            for user in paginated_users:
-                user_keys = await self.key_repository.get_user_keys(user.telegram_id)
-                active_keys = [k for k in user_keys if k.is_active]
-
-                user_list.append(
-                    {
-                        "user_id": user.telegram_id,
-                        "username": user.username,
-                        "full_name": user.full_name,
-                        "status": user.status.value,
-                        "role": user.role.value,
-                        "total_keys": len(user_keys),
-                        "active_keys": len(active_keys),
-                        "balance_stars": getattr(user, "referral_credits", 0) or 0,
-                        "created_at": user.created_at.isoformat(),
-                    }
-                )
+            start = UserListCursor.decode(cursor) if cursor else None
+            if start is None and page > 1:
+                start = await self._cursor_for_page(page, per_page, current_user_id)
 
-            total_pages = (total_users + per_page - 1) // per_page
+            user_page = await self.user_repository.get_users_page(
+                current_user_id, limit=per_page, cursor=start
+            )
 
             return {
-                "users": user_list,
+                "users": [self._list_item_to_dict(item) for item in user_page.items],
                 "total_users": total_users,
                 "page": page,
                 "per_page": per_page,
                 "total_pages": total_pages,
+                "next_cursor": user_page.next_cursor.encode() if user_page.next_cursor else None,
             }
         except Exception as e:
             logger.error(f"Error obteniendo usuarios paginados: {e}")
@@ -288,4 +280,54 @@ class AdminUserService(IAdminUserService):
                 "page": page,
                 "per_page": per_page,
                 "total_pages": 0,
+                "next_cursor": None,
             }
+
+    async def _cursor_for_page(
+        self, page: int, per_page: int, current_user_id: int
+    ) -> Optional[UserListCursor]:
+        """Recorre las páginas previas para obtener el cursor de inicio de ``page``."""
+        cursor: Optional[UserListCursor] = None
+        for _ in range(page - 1):
+            previous = await self.user_repository.get_users_page(
+                current_user_id, limit=per_page, cursor=cursor
+            )
+            if previous.next_cursor is None:
+                break
+            cursor = previous.next_cursor
+        return cursor
+
+    async def _iter_user_pages(self, current_user_id: int):
+        """Itera todas las páginas keyset de usuarios (con conteos de llaves)."""
+        cursor: Optional[UserListCursor] = None
+        while True:
+            batch = await self.user_repository.get_users_page(
+                current_user_id, limit=USER_SCAN_BATCH_SIZE, cursor=cursor
+            )
+            yield batch
+            if batch.next_cursor is None:
+                return
+            cursor = batch.next_cursor
+
+    @staticmethod
+    def _list_item_to_dict(item: UserListItem) -> Dict:
+        user = item.user
+        return {
+            "user_id": user.telegram_id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "status": user.status.value,
+            "role": user.role.value,
+            "total_keys": item.total_keys,
+            "active_keys": item.active_keys,
+            "balance_stars": getattr(user, "referral_credits", 0) or 0,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+        }
+
+
+def _invalidate_identity(user_id: int) -> None:
+    """Descarta la identidad cacheada de la Mini App tras cambiar estado o rol."""
+    # Import local: miniapp importa este servicio (routes_admin)
+    from miniapp.routes_common import identity_cache
+
+    identity_cache.invalidate_user(user_id)
@@ -0,0 +1,217 @@
+"""
+Ejecución concurrente y acotada de operaciones masivas sobre llaves VPN.
+
+Bloquear a un usuario, borrar una cuenta o limpiar llaves fantasma aplica la
+misma operación a muchas llaves. En lugar de recorrerlas una a una:
+
+- Outline: peticiones HTTP en paralelo, como mucho
+  ``BULK_KEY_OUTLINE_CONCURRENCY`` a la vez.
+- WireGuard: un solo ``wg set`` por cada ``BULK_KEY_WG_BATCH_SIZE`` peers.
+
+Los resultados se agregan por llave; las que fallan se reintentan hasta
+``BULK_KEY_RETRIES`` veces y quedan en ``failed_keys`` para un reintento
+posterior.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from domain.entities.vpn_key import KeyType, VpnKey
+from infrastructure.api_clients.client_outline import OutlineClient
+from infrastructure.api_clients.client_wireguard import WireGuardClient
+from utils.logger import logger
+
+
+class KeyOperation(str, Enum):
+    """Operaciones aplicables en bloque sobre llaves."""
+
+    ENABLE = "enable"
+    DISABLE = "disable"
+    DELETE = "delete"
+
+
+@dataclass
+class BulkKeyResult:
+    """Resultado agregado de una operación masiva."""
+
+    operation: KeyOperation
+    succeeded: List[VpnKey] = field(default_factory=list)
+    failed: List[Tuple[VpnKey, str]] = field(default_factory=list)
+    attempts: int = 0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    @property
+    def failed_keys(self) -> List[VpnKey]:
+        return [key for key, _ in self.failed]
+
+    @property
+    def errors(self) -> List[str]:
+        return [
+            f"Failed to {self.operation.value} key {key.id}: {error}" for key, error in self.failed
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation.value,
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "attempts": self.attempts,
+            "errors": self.errors,
+        }
+
+
+class BulkKeyExecutor:
+    """Aplica una operación a muchas llaves con concurrencia acotada por backend."""
+
+    def __init__(
+        self,
+        outline_client: Optional[OutlineClient] = None,
+        wireguard_client: Optional[WireGuardClient] = None,
+        outline_concurrency: Optional[int] = None,
+        wireguard_batch_size: Optional[int] = None,
+    ):
+        self.outline_client = outline_client
+        self.wireguard_client = wireguard_client
+        self.outline_concurrency = outline_concurrency or settings.BULK_KEY_OUTLINE_CONCURRENCY
+        self.wireguard_batch_size = wireguard_batch_size or settings.BULK_KEY_WG_BATCH_SIZE
+
+    async def run(
+        self,
+        operation: KeyOperation,
+        keys: Sequence[VpnKey],
+        retries: Optional[int] = None,
+    ) -> BulkKeyResult:
+        """
+        Aplica ``operation`` en los servidores a todas las llaves.
+
+        Args:
+            operation: Operación a aplicar
+            keys: Llaves afectadas
+            retries: Reintentos de las llaves fallidas (por defecto
+                ``BULK_KEY_RETRIES``)
+
+        Returns:
+            BulkKeyResult con las llaves aplicadas y las fallidas
+        """
+        retries = settings.BULK_KEY_RETRIES if retries is None else retries
+        result = BulkKeyResult(operation)
+
+        pending: List[VpnKey] = []
+        for key in keys:
+            if not self.supports(key):
+                result.failed.append((key, f"Unsupported key type: {key.key_type}"))
+            else:
+                pending.append(key)
+
+        last_errors: List[Tuple[VpnKey, str]] = []
+        for _ in range(retries + 1):
+            if not pending:
+                break
+            result.attempts += 1
+            errors = await self._run_once(operation, pending)
+            last_errors = []
+            for key, error in zip(pending, errors):
+                if error is None:
+                    result.succeeded.append(key)
+                else:
+                    last_errors.append((key, error))
+            pending = [key for key, _ in last_errors]
+
+        result.failed.extend(last_errors)
+
+        logger.info(
+            f"🔁 Operación masiva {operation.value}: {len(result.succeeded)} ok, "
+            f"{len(result.failed)} fallidas en {result.attempts} intento(s)"
+        )
+        return result
+
+    async def retry(self, result: BulkKeyResult, retries: Optional[int] = None) -> BulkKeyResult:
+        """Reintenta solo las llaves fallidas de ``result`` y combina el resultado."""
+        again = await self.run(result.operation, result.failed_keys, retries)
+        return BulkKeyResult(
+            operation=result.operation,
+            succeeded=result.succeeded + again.succeeded,
+            failed=again.failed,
+            attempts=result.attempts + again.attempts,
+        )
+
+    def supports(self, key: VpnKey) -> bool:
+        """True si hay cliente configurado para el servidor de la llave."""
+        if key.key_type == KeyType.OUTLINE:
+            return self.outline_client is not None
+        if key.key_type == KeyType.WIREGUARD:
+            return self.wireguard_client is not None
+        return False
+
+    async def _run_once(self, operation: KeyOperation, keys: List[VpnKey]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = [None] * len(keys)
+        outline = [i for i, key in enumerate(keys) if key.key_type == KeyType.OUTLINE]
+        wireguard = [i for i, key in enumerate(keys) if key.key_type == KeyType.WIREGUARD]
+        await asyncio.gather(
+            self._run_outline(operation, keys, outline, errors),
+            self._run_wireguard(operation, keys, wireguard, errors),
+        )
+        return errors
+
+    async def _run_outline(
+        self,
+        operation: KeyOperation,
+        keys: List[VpnKey],
+        indexes: List[int],
+        errors: List[Optional[str]],
+    ) -> None:
+        if not indexes:
+            return
+        client = self.outline_client
+        method = {
+            KeyOperation.ENABLE: client.enable_key,
+            KeyOperation.DISABLE: client.disable_key,
+            KeyOperation.DELETE: client.delete_key,
+        }[operation]
+        semaphore = asyncio.Semaphore(self.outline_concurrency)
+
+        async def apply(i: int) -> None:
+            async with semaphore:
+                try:
+                    ok = await method(keys[i].external_id)
+                except Exception as e:
+                    errors[i] = str(e) or type(e).__name__
+                    return
+            if not ok:
+                errors[i] = "Outline rejected the operation"
+
+        await asyncio.gather(*(apply(i) for i in indexes))
+
+    async def _run_wireguard(
+        self,
+        operation: KeyOperation,
+        keys: List[VpnKey],
+        indexes: List[int],
+        errors: List[Optional[str]],
+    ) -> None:
+        client = self.wireguard_client
+        for start in range(0, len(indexes), self.wireguard_batch_size):
+            chunk = indexes[start : start + self.wireguard_batch_size]
+            names = [keys[i].external_id for i in chunk]
+            try:
+                if operation == KeyOperation.DELETE:
+                    outcome = await client.delete_clients(names)
+                else:
+                    outcome = await client.set_peers_disabled(
+                        names, operation == KeyOperation.DISABLE
+                    )
+            except Exception as e:
+                for i in chunk:
+                    errors[i] = str(e) or type(e).__name__
+                continue
+            for i in chunk:
+                if not outcome.get(keys[i].external_id):
+                    errors[i] = "WireGuard rejected the operation"
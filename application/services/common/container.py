@@ -22,6 +22,7 @@ from application.services.consumption_vpn_integration_service import (
 )
 from application.services.crypto_payment_service import CryptoPaymentService
 from application.services.data_package_service import DataPackageService
+from application.services.metrics_snapshot_service import MetricsSnapshotService
 from application.services.referral_service import ReferralService
 from application.services.subscription_payment_service import SubscriptionPaymentService
 from application.services.subscription_service import SubscriptionService
@@ -138,6 +139,18 @@ def _configure_infrastructure_clients(container: punq.Container) -> None:
     container.register(OutlineClient, scope=punq.Scope.singleton)
     container.register(WireGuardClient, scope=punq.Scope.singleton)
 
+    def create_metrics_snapshot_service() -> MetricsSnapshotService:
+        return MetricsSnapshotService(
+            outline_client=cast(OutlineClient, container.resolve(OutlineClient)),
+            wireguard_client=cast(WireGuardClient, container.resolve(WireGuardClient)),
+        )
+
+    container.register(
+        MetricsSnapshotService,
+        factory=create_metrics_snapshot_service,
+        scope=punq.Scope.singleton,
+    )
+
     def create_tron_dealer_client() -> TronDealerClient:
         return TronDealerClient()
 
@@ -239,6 +252,10 @@ def _configure_application_services(container: punq.Container) -> None:
             package_repo=create_data_package_repo(),
             outline_client=cast(OutlineClient, container.resolve(OutlineClient)),
             wireguard_client=cast(WireGuardClient, container.resolve(WireGuardClient)),
+            metrics_snapshot=cast(
+                MetricsSnapshotService,
+                container.resolve(MetricsSnapshotService),
+            ),
             vpn_integration_service=cast(
                 ConsumptionVpnIntegrationService,
                 container.resolve(ConsumptionVpnIntegrationService),
@@ -247,6 +264,10 @@ def _configure_application_services(container: punq.Container) -> None:
                 SubscriptionService,
                 container.resolve(SubscriptionService),
             ),
+            data_package_service=cast(
+                DataPackageService,
+                container.resolve(DataPackageService),
+            ),
         )
 
     def create_admin_service() -> AdminService:
@@ -258,6 +279,10 @@ def _configure_application_services(container: punq.Container) -> None:
                 ITicketRepository,
                 container.resolve(ITicketRepository),
             ),
+            metrics_snapshot=cast(
+                MetricsSnapshotService,
+                container.resolve(MetricsSnapshotService),
+            ),
         )
 
     def create_data_package_service() -> DataPackageService:
@@ -324,6 +349,10 @@ def _configure_application_services(container: punq.Container) -> None:
                 OutlineClient,
                 container.resolve(OutlineClient),
             ),
+            metrics_snapshot=cast(
+                MetricsSnapshotService,
+                container.resolve(MetricsSnapshotService),
+            ),
         )
 
     def create_consumption_billing_service() -> ConsumptionBillingService:
@@ -355,13 +384,11 @@ def _configure_application_services(container: punq.Container) -> None:
         )
 
     def create_ticket_notification_service() -> TicketNotificationService:
-        # Importación lazy de Bot para evitar dependencia circular
-        from telegram import Bot
-
         from config import settings
+        from infrastructure.notifications import get_notification_dispatcher
 
         return TicketNotificationService(
-            bot=Bot(token=settings.TELEGRAM_TOKEN),
+            dispatcher=get_notification_dispatcher(),
             admin_id=settings.ADMIN_ID,
         )
 
@@ -7,13 +7,16 @@ de los usuarios, incluyendo validaciones y bloqueo de claves VPN.
 Author: uSipipo Team
 """
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Optional, Tuple
 
+from config import settings
 from domain.entities.consumption_billing import BillingStatus, ConsumptionBilling
+from domain.entities.expiry_deadline import ExpiryKind
 from domain.interfaces.iconsumption_billing_repository import IConsumptionBillingRepository
 from domain.interfaces.iuser_repository import IUserRepository
+from infrastructure.scheduling import get_expiry_scheduler
 from utils.logger import logger
 
 from .consumption_billing_dtos import ActivationResult, CancellationResult
@@ -107,6 +110,11 @@ class ConsumptionActivationService:
                 )
 
             billing_id = saved_billing.id  # type: ignore  # ya verificamos que no es None
+            get_expiry_scheduler().track(
+                ExpiryKind.BILLING_CYCLE,
+                billing_id,
+                saved_billing.started_at + timedelta(days=settings.CONSUMPTION_CYCLE_DAYS),
+            )
 
             # Actualizar usuario
             user = await self.user_repo.get_by_id(user_id, current_user_id)
@@ -212,6 +220,7 @@ class ConsumptionActivationService:
                     success=False,
                     error_message="Error al cerrar el ciclo de facturación",
                 )
+            get_expiry_scheduler().untrack(ExpiryKind.BILLING_CYCLE, billing_id)
 
             # Solo bloquear claves y marcar deuda si realmente hay algo que cobrar
             if has_debt:
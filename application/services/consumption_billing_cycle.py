@@ -9,7 +9,7 @@ Author: uSipipo Team
 
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from domain.entities.consumption_billing import BillingStatus, ConsumptionBilling
 from domain.interfaces.iconsumption_billing_repository import IConsumptionBillingRepository
@@ -54,27 +54,47 @@ class ConsumptionCycleService:
             True si se registró exitosamente
         """
         try:
-            # Obtener ciclo activo
-            billing = await self.billing_repo.get_active_by_user(user_id, current_user_id)
+            # Un solo UPDATE ... RETURNING sobre el ciclo activo
+            billing = await self.billing_repo.add_consumption_by_user(
+                user_id, mb_used, current_user_id
+            )
 
-            if not billing or billing.id is None:
+            if not billing:
                 logger.debug(f"Usuario {user_id} no tiene ciclo de consumo activo")
                 return False
 
-            # Agregar consumo
-            success = await self.billing_repo.add_consumption(billing.id, mb_used, current_user_id)
-
-            if success:
-                logger.debug(
-                    f"📊 Consumo registrado - user_id={user_id}, " f"mb_used={mb_used:.2f}"
-                )
-
-            return success
+            logger.debug(f"📊 Consumo registrado - user_id={user_id}, " f"mb_used={mb_used:.2f}")
+            return True
 
         except Exception as e:
             logger.error(f"❌ Error registrando consumo: {e}")
             return False
 
+    async def record_data_usage_batch(
+        self, usage_by_user: Dict[int, float], current_user_id: int
+    ) -> Dict[int, ConsumptionBilling]:
+        """
+        Registra el consumo de una sincronización completa en una sola operación.
+
+        Args:
+            usage_by_user: MB consumidos por usuario
+            current_user_id: ID del usuario actual (para auditoría)
+
+        Returns:
+            Ciclos actualizados por usuario (los usuarios sin ciclo activo se omiten)
+        """
+        if not usage_by_user:
+            return {}
+        try:
+            updated = await self.billing_repo.add_consumption_batch(usage_by_user, current_user_id)
+            logger.debug(
+                f"📊 Consumo por lotes registrado - {len(updated)}/{len(usage_by_user)} usuarios"
+            )
+            return updated
+        except Exception as e:
+            logger.error(f"❌ Error registrando consumo por lotes: {e}")
+            return {}
+
     async def get_current_consumption(
         self, user_id: int, current_user_id: int
     ) -> Optional[ConsumptionSummary]:
@@ -123,13 +143,17 @@ class ConsumptionCycleService:
             logger.error(f"❌ Error obteniendo consumo: {e}")
             return None
 
-    async def close_billing_cycle(self, billing_id: uuid.UUID, current_user_id: int) -> bool:
+    async def close_billing_cycle(
+        self, billing_id: uuid.UUID, current_user_id: int, block_keys: bool = True
+    ) -> bool:
         """
         Cierra un ciclo de facturación.
 
         Args:
             billing_id: ID del ciclo a cerrar
             current_user_id: ID del usuario actual (para auditoría)
+            block_keys: Bloquear las claves del usuario al cerrar; en cierres
+                masivos se pasa False y se bloquean todas juntas al final
 
         Returns:
             True si se cerró exitosamente
@@ -159,30 +183,16 @@ class ConsumptionCycleService:
                     user.mark_as_has_debt()
                     await self.user_repo.save(user, current_user_id)
 
-                    # Block all user keys
-                    from application.services.common.container import get_container
-                    from application.services.consumption_vpn_integration_service import (
-                        ConsumptionVpnIntegrationService,
-                    )
-
-                    container = get_container()
-                    if container:
-                        vpn_integration = container.resolve(ConsumptionVpnIntegrationService)
-                        if vpn_integration:
-                            block_result = await vpn_integration.block_user_keys(  # type: ignore
-                                billing.user_id, current_user_id
+                    if block_keys:
+                        block_result = await self.block_keys_for_users(
+                            [billing.user_id], current_user_id
+                        )
+                        if not block_result["success"]:
+                            logger.error(
+                                f"Failed to block keys for user {billing.user_id}: "
+                                f"{block_result['errors']}"
                             )
 
-                            if not block_result["success"]:
-                                logger.error(
-                                    f"Failed to block keys for user {billing.user_id}: "
-                                    f"{block_result['errors']}"
-                                )
-                        else:
-                            logger.error("VPN integration service not available")
-                    else:
-                        logger.error("Container not available for blocking keys")
-
                 logger.info(
                     f"🔒 Ciclo cerrado - billing_id={billing_id}, "
                     f"user_id={billing.user_id}, "
@@ -238,6 +248,48 @@ class ConsumptionCycleService:
         """
         return await self.billing_repo.get_expired_active_cycles(self.cycle_days, current_user_id)
 
+    async def close_expired_cycles(self, current_user_id: int) -> int:
+        """
+        Cierra todos los ciclos que excedieron el tiempo límite.
+
+        Returns:
+            Cantidad de ciclos cerrados
+        """
+        closed_users = []
+        for cycle in await self.get_expired_cycles(current_user_id):
+            if cycle.id and await self.close_billing_cycle(
+                cycle.id, current_user_id, block_keys=False
+            ):
+                closed_users.append(cycle.user_id)
+        if closed_users:
+            logger.info(f"🔒 {len(closed_users)} ciclos de consumo expirados cerrados")
+            await self.block_keys_for_users(closed_users, current_user_id)
+        return len(closed_users)
+
+    async def block_keys_for_users(self, user_ids: List[int], current_user_id: int) -> Dict:
+        """
+        Bloquea las claves VPN de los usuarios indicados en una sola tanda.
+
+        Returns:
+            Resultado de ConsumptionVpnIntegrationService.block_keys_for_users
+        """
+        from application.services.common.container import get_container
+        from application.services.consumption_vpn_integration_service import (
+            ConsumptionVpnIntegrationService,
+        )
+
+        container = get_container()
+        if not container:
+            logger.error("Container not available for blocking keys")
+            return {"success": False, "keys_blocked": 0, "keys_failed": 0, "errors": []}
+
+        vpn_integration = container.resolve(ConsumptionVpnIntegrationService)
+        if not vpn_integration:
+            logger.error("VPN integration service not available")
+            return {"success": False, "keys_blocked": 0, "keys_failed": 0, "errors": []}
+
+        return await vpn_integration.block_keys_for_users(user_ids, current_user_id)  # type: ignore
+
     async def get_user_billing_history(
         self, user_id: int, current_user_id: int
     ) -> List[ConsumptionBilling]:
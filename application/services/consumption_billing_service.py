@@ -15,7 +15,7 @@ Version: 2.0.0 - Refactored into sub-services
 
 import uuid
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from config import settings
 from domain.entities.consumption_billing import ConsumptionBilling
@@ -99,15 +99,36 @@ class ConsumptionBillingService:
 
         return await self._cycle.record_data_usage(user_id, mb_used, current_user_id)
 
+    async def record_data_usage_batch(
+        self, usage_by_user: Dict[int, float], current_user_id: int
+    ) -> Dict[int, ConsumptionBilling]:
+        """Registra el consumo de varios usuarios en modo consumo en un solo UPDATE."""
+        if self.subscription_service and usage_by_user:
+            premium = await self.subscription_service.get_premium_user_ids(
+                usage_by_user.keys(), current_user_id
+            )
+            usage_by_user = {
+                user_id: mb_used
+                for user_id, mb_used in usage_by_user.items()
+                if user_id not in premium
+            }
+        return await self._cycle.record_data_usage_batch(usage_by_user, current_user_id)
+
     async def get_current_consumption(
         self, user_id: int, current_user_id: int
     ) -> Optional[ConsumptionSummary]:
         """Obtiene el resumen de consumo actual de un usuario."""
         return await self._cycle.get_current_consumption(user_id, current_user_id)
 
-    async def close_billing_cycle(self, billing_id: uuid.UUID, current_user_id: int) -> bool:
+    async def close_billing_cycle(
+        self, billing_id: uuid.UUID, current_user_id: int, block_keys: bool = True
+    ) -> bool:
         """Cierra un ciclo de facturación."""
-        return await self._cycle.close_billing_cycle(billing_id, current_user_id)
+        return await self._cycle.close_billing_cycle(billing_id, current_user_id, block_keys)
+
+    async def block_keys_for_users(self, user_ids: List[int], current_user_id: int) -> Dict:
+        """Bloquea en una sola tanda las claves de los usuarios con ciclo cerrado."""
+        return await self._cycle.block_keys_for_users(user_ids, current_user_id)
 
     async def mark_cycle_as_paid(self, billing_id: uuid.UUID, current_user_id: int) -> bool:
         """Marca un ciclo como pagado."""
@@ -117,6 +138,10 @@ class ConsumptionBillingService:
         """Obtiene ciclos que han excedido el tiempo límite."""
         return await self._cycle.get_expired_cycles(current_user_id)
 
+    async def close_expired_cycles(self, current_user_id: int) -> int:
+        """Cierra los ciclos que excedieron el tiempo límite."""
+        return await self._cycle.close_expired_cycles(current_user_id)
+
     async def get_user_billing_history(
         self, user_id: int, current_user_id: int
     ) -> List[ConsumptionBilling]:
@@ -6,9 +6,11 @@ from typing import Optional
 from config import settings
 from domain.entities.consumption_billing import BillingStatus
 from domain.entities.consumption_invoice import ConsumptionInvoice, InvoiceStatus, PaymentMethod
+from domain.entities.expiry_deadline import ExpiryKind
 from domain.interfaces.iconsumption_billing_repository import IConsumptionBillingRepository
 from domain.interfaces.iconsumption_invoice_repository import IConsumptionInvoiceRepository
 from domain.interfaces.iuser_repository import IUserRepository
+from infrastructure.scheduling import get_expiry_scheduler
 from utils.logger import logger
 
 
@@ -163,6 +165,10 @@ class ConsumptionInvoiceService:
             )
 
             saved_invoice = await self.invoice_repo.save(invoice, current_user_id)
+            if saved_invoice.id is not None:
+                get_expiry_scheduler().track(
+                    ExpiryKind.INVOICE, saved_invoice.id, saved_invoice.expires_at
+                )
 
             logger.info(
                 f"✅ Factura generada - invoice_id={saved_invoice.id}, "
@@ -221,6 +227,8 @@ class ConsumptionInvoiceService:
             )
 
             if success:
+                get_expiry_scheduler().untrack(ExpiryKind.INVOICE, invoice_id)
+
                 # Actualizar ciclo de facturación
                 await self.billing_repo.update_status(
                     invoice.billing_id, BillingStatus.PAID, current_user_id
@@ -306,6 +314,8 @@ class ConsumptionInvoiceService:
             success = await self.invoice_repo.save(invoice, current_user_id)
 
             if success:
+                get_expiry_scheduler().untrack(ExpiryKind.INVOICE, invoice_id)
+
                 # Actualizar ciclo de facturación
                 await self.billing_repo.update_status(
                     invoice.billing_id, BillingStatus.PAID, current_user_id
@@ -378,14 +388,8 @@ class ConsumptionInvoiceService:
             Cantidad de facturas canceladas
         """
         try:
-            expired_invoices = await self.invoice_repo.get_expired_pending(current_user_id)
-
-            count = 0
-            for invoice in expired_invoices:
-                if invoice.id and await self.invoice_repo.mark_as_expired(
-                    invoice.id, current_user_id
-                ):
-                    count += 1
+            expired_invoices = await self.invoice_repo.expire_pending(current_user_id)
+            count = len(expired_invoices)
 
             if count > 0:
                 logger.info(f"🗑️ {count} facturas expiradas canceladas")
@@ -1,6 +1,7 @@
 from decimal import Decimal
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Tuple
 
+from application.services.bulk_key_executor import KeyOperation
 from application.services.consumption_billing_service import ConsumptionBillingService
 from application.services.vpn_infrastructure_service import VpnInfrastructureService
 from domain.interfaces.ikey_repository import IKeyRepository
@@ -54,39 +55,20 @@ class ConsumptionVpnIntegrationService:
                     "errors": [],
                 }
 
-            keys_blocked = 0
-            keys_failed = 0
-            errors = []
-
-            for key in keys:
-                try:
-                    key_type = key.key_type.value
-                    result = await self.vpn_infra_service.disable_key(str(key.id), key_type)
-
-                    if result.get("success"):
-                        keys_blocked += 1
-                        logger.info(f"Key {key.id} blocked for user {user_id}")
-                    else:
-                        keys_failed += 1
-                        err = result.get("error", "Unknown error")
-                        error_msg = f"Failed to block key {key.id}: {err}"
-                        errors.append(error_msg)
-                        logger.warning(error_msg)
-                except Exception as e:
-                    keys_failed += 1
-                    error_msg = f"Exception blocking key {key.id}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+            result = await self.vpn_infra_service.apply_bulk(KeyOperation.DISABLE, keys)
+            for error in result.errors:
+                logger.warning(error)
+            logger.info(f"{len(result.succeeded)} keys blocked for user {user_id}")
 
             # Mark user as having debt
             user.mark_as_has_debt()
             await self.user_repo.save(user, current_user_id)
 
             return {
-                "success": keys_failed == 0,
-                "keys_blocked": keys_blocked,
-                "keys_failed": keys_failed,
-                "errors": errors,
+                "success": result.success,
+                "keys_blocked": len(result.succeeded),
+                "keys_failed": len(result.failed),
+                "errors": result.errors,
             }
 
         except Exception as e:
@@ -98,6 +80,51 @@ class ConsumptionVpnIntegrationService:
                 "errors": [f"Error al bloquear claves: {str(e)}"],
             }
 
+    async def block_keys_for_users(
+        self, user_ids: Iterable[int], current_user_id: int
+    ) -> Dict[str, Any]:
+        """
+        Bloquea en una sola tanda las claves VPN de varios usuarios.
+
+        Lo usa el cierre masivo de ciclos: la deuda ya quedó marcada al
+        cerrar cada ciclo, aquí solo se deshabilitan las claves de todos los
+        usuarios juntas (ver BulkKeyExecutor).
+
+        Returns:
+            Dict con {"success": bool, "users": int, "keys_blocked": int,
+                      "keys_failed": int, "errors": list}
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        try:
+            keys = []
+            for user_id in user_ids:
+                keys.extend(await self.key_repo.get_by_user_id(user_id, current_user_id))
+
+            result = await self.vpn_infra_service.apply_bulk(KeyOperation.DISABLE, keys)
+            for error in result.errors:
+                logger.warning(error)
+            logger.info(
+                f"{len(result.succeeded)} keys blocked for {len(user_ids)} users "
+                f"({len(result.failed)} failed)"
+            )
+            return {
+                "success": result.success,
+                "users": len(user_ids),
+                "keys_blocked": len(result.succeeded),
+                "keys_failed": len(result.failed),
+                "errors": result.errors,
+            }
+
+        except Exception as e:
+            logger.error(f"Error blocking keys for {len(user_ids)} users: {e}")
+            return {
+                "success": False,
+                "users": len(user_ids),
+                "keys_blocked": 0,
+                "keys_failed": 0,
+                "errors": [f"Error al bloquear claves: {str(e)}"],
+            }
+
     async def unblock_user_keys(self, user_id: int, current_user_id: int) -> Dict[str, Any]:
         """
         Desbloquea todas las claves VPN de un usuario y limpia su deuda.
@@ -129,39 +156,20 @@ class ConsumptionVpnIntegrationService:
                     "errors": [],
                 }
 
-            keys_unblocked = 0
-            keys_failed = 0
-            errors = []
-
-            for key in keys:
-                try:
-                    key_type = key.key_type.value
-                    result = await self.vpn_infra_service.enable_key(str(key.id), key_type)
-
-                    if result.get("success"):
-                        keys_unblocked += 1
-                        logger.info(f"Key {key.id} unblocked for user {user_id}")
-                    else:
-                        keys_failed += 1
-                        err = result.get("error", "Unknown error")
-                        error_msg = f"Failed to unblock key {key.id}: {err}"
-                        errors.append(error_msg)
-                        logger.warning(error_msg)
-                except Exception as e:
-                    keys_failed += 1
-                    error_msg = f"Exception unblocking key {key.id}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+            result = await self.vpn_infra_service.apply_bulk(KeyOperation.ENABLE, keys)
+            for error in result.errors:
+                logger.warning(error)
+            logger.info(f"{len(result.succeeded)} keys unblocked for user {user_id}")
 
             # Clear user's debt flag
             user.mark_debt_as_paid()
             await self.user_repo.save(user, current_user_id)
 
             return {
-                "success": keys_failed == 0,
-                "keys_unblocked": keys_unblocked,
-                "keys_failed": keys_failed,
-                "errors": errors,
+                "success": result.success,
+                "keys_unblocked": len(result.succeeded),
+                "keys_failed": len(result.failed),
+                "errors": result.errors,
             }
 
         except Exception as e:
@@ -213,3 +221,23 @@ class ConsumptionVpnIntegrationService:
         except Exception as e:
             logger.error(f"Error routing usage to billing for user {user_id}: {e}")
             return False
+
+    async def route_usage_batch_to_billing(
+        self, usage_by_user: Mapping[int, Decimal], current_user_id: int
+    ) -> Set[int]:
+        """
+        Routes a whole sync run's per-user usage to billing in one batched update.
+
+        Only users with an active consumption cycle are billed (the cycle only
+        exists while consumption mode is enabled). Returns the ids of billed users.
+        Errors are re-raised so callers never treat a failed batch as "nobody billed".
+        """
+        try:
+            updated = await self.billing_service.record_data_usage_batch(
+                {user_id: float(mb) for user_id, mb in usage_by_user.items()}, current_user_id
+            )
+            return set(updated)
+
+        except Exception as e:
+            logger.error(f"Error routing batch usage to billing: {e}")
+            raise
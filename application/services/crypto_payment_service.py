@@ -3,9 +3,11 @@ from typing import Optional
 
 from domain.entities.crypto_order import CryptoOrder, CryptoOrderStatus
 from domain.entities.crypto_transaction import CryptoTransaction, CryptoTransactionStatus
+from domain.entities.expiry_deadline import ExpiryKind
 from domain.interfaces.icrypto_order_repository import ICryptoOrderRepository
 from domain.interfaces.icrypto_transaction_repository import ICryptoTransactionRepository
 from domain.interfaces.iuser_repository import IUserRepository
+from infrastructure.scheduling import get_expiry_scheduler
 from utils.logger import logger
 
 GB_PER_USDT = 10
@@ -40,6 +42,7 @@ class CryptoPaymentService:
 
         if self.crypto_order_repo:
             order = await self.crypto_order_repo.save(order, current_user_id=user_id)
+            get_expiry_scheduler().track(ExpiryKind.CRYPTO_ORDER, order.id, order.expires_at)
 
         logger.info(
             f"Created crypto order {order.id} for user {user_id}: "
@@ -90,6 +93,7 @@ class CryptoPaymentService:
             logger.warning(f"No user found for wallet: {wallet_address}")
             if order and self.crypto_order_repo:
                 await self.crypto_order_repo.mark_failed(order.id)
+                get_expiry_scheduler().untrack(ExpiryKind.CRYPTO_ORDER, order.id)
             transaction = CryptoTransaction(
                 wallet_address=wallet_address,
                 amount=amount,
@@ -114,6 +118,7 @@ class CryptoPaymentService:
 
         if order and self.crypto_order_repo:
             await self.crypto_order_repo.mark_completed(order.id, tx_hash)
+            get_expiry_scheduler().untrack(ExpiryKind.CRYPTO_ORDER, order.id)
 
         await self._credit_user(
             user_id, amount, token_symbol, order.package_type if order else "basic"
@@ -317,15 +322,14 @@ class CryptoPaymentService:
             product_name: Name of purchased product
             amount_usdt: Amount paid in USDT
 
+        The message is queued on the shared notification dispatcher, so the
+        payment webhook does not wait for Telegram.
+
         Returns:
-            True if notification was sent successfully
+            True if notification was queued successfully
         """
         try:
-            from telegram import Bot
-
-            from config import settings
-
-            bot = Bot(token=settings.TELEGRAM_TOKEN)
+            from infrastructure.notifications import get_notification_dispatcher
 
             message = (
                 f"✅ *¡Pago Crypto Confirmado!*\n\n"
@@ -336,15 +340,13 @@ class CryptoPaymentService:
                 f"Revisa tu sección de claves VPN para ver los cambios."
             )
 
-            await bot.send_message(
-                chat_id=user_id,
-                text=message,
+            get_notification_dispatcher().enqueue_message(
+                user_id,
+                message,
                 parse_mode="Markdown",
             )
 
-            await bot.close()
-
-            logger.info(f"📬 Crypto confirmation sent to user {user_id}: {product_name}")
+            logger.info(f"📬 Crypto confirmation queued for user {user_id}: {product_name}")
             return True
 
         except Exception as e:
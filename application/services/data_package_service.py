@@ -4,8 +4,10 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from domain.entities.data_package import DataPackage, PackageType
+from domain.entities.expiry_deadline import ExpiryKind
 from domain.interfaces.idata_package_repository import IDataPackageRepository
 from domain.interfaces.iuser_repository import IUserRepository
+from infrastructure.scheduling import get_expiry_scheduler
 from utils.logger import logger
 
 from .user_bonus_service import UserBonusService
@@ -166,6 +168,10 @@ class DataPackageService:
             )
 
             saved_package = await self.package_repo.save(new_package, current_user_id)
+            if saved_package.id is not None:
+                get_expiry_scheduler().track(
+                    ExpiryKind.DATA_PACKAGE, saved_package.id, saved_package.expires_at
+                )
 
             # Update user stats
             user.purchase_count += 1
@@ -315,53 +321,55 @@ class DataPackageService:
         }
 
     async def consume_data(self, user_id: int, bytes_used: int, current_user_id: int) -> bool:
-        packages = await self.package_repo.get_valid_by_user(user_id, current_user_id)
+        """
+        Descuenta ``bytes_used`` de los paquetes válidos del usuario, en orden
+        de expiración, con una sola sentencia SQL.
 
-        if not packages:
+        Returns:
+            True si algún paquete cubrió consumo.
+        """
+        outcome = await self.package_repo.consume_bytes({user_id: bytes_used}, current_user_id)
+
+        if not outcome:
             logger.warning(f"Sin paquetes válidos para consumir datos del usuario {user_id}")
             return False
 
-        remaining_to_consume = bytes_used
-        for package in packages:
-            if remaining_to_consume <= 0:
-                break
-            if package.id is None:
-                continue
-
-            available = package.remaining_bytes
-            if available > 0:
-                to_use = min(remaining_to_consume, available)
-                await self.package_repo.update_usage(package.id, to_use, current_user_id)
-                remaining_to_consume -= to_use
-
-        if remaining_to_consume > 0:
-            logger.warning(
-                f"Usuario {user_id} sin datos suficientes. Faltaron {remaining_to_consume} bytes"
-            )
+        missing = bytes_used - sum(item.bytes_consumed for item in outcome)
+        if missing > 0:
+            logger.warning(f"Usuario {user_id} sin datos suficientes. Faltaron {missing} bytes")
 
         return True
 
+    async def consume_data_batch(
+        self, usage_by_user: Dict[int, int], current_user_id: int
+    ) -> Dict[int, int]:
+        """
+        Descuenta de los paquetes el consumo de varios usuarios (una sincronización)
+        en unas pocas sentencias y un solo commit.
+
+        Los usuarios sin paquetes válidos se omiten sin aviso (es el caso normal
+        del plan gratuito). Retorna los bytes descontados por usuario.
+        """
+        outcome = await self.package_repo.consume_bytes(usage_by_user, current_user_id)
+
+        consumed: Dict[int, int] = {}
+        for item in outcome:
+            consumed[item.user_id] = consumed.get(item.user_id, 0) + item.bytes_consumed
+        return consumed
+
     async def expire_old_packages(self, admin_user_id: int) -> int:
         try:
-            expired_packages = await self.package_repo.get_expired_packages(admin_user_id)
+            expired_packages = await self.package_repo.deactivate_expired(admin_user_id)
 
-            count = 0
             for pkg in expired_packages:
-                if pkg.id is None:
-                    continue
-
                 logger.warning(
                     f"⚠️ Paquete expirado - package_id={pkg.id}, "
                     f"user_id={pkg.user_id}, package_type={pkg.package_type.value}, "
                     f"expired_at={pkg.expires_at.isoformat()}"
                 )
 
-                success = await self.package_repo.deactivate(pkg.id, admin_user_id)
-                if success:
-                    count += 1
-
-            logger.info(f"📦 {count} paquetes expirados desactivados")
-            return count
+            logger.info(f"📦 {len(expired_packages)} paquetes expirados desactivados")
+            return len(expired_packages)
         except Exception as e:
             logger.error(f"Error al expirar paquetes: {e}")
             return 0
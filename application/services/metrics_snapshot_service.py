@@ -0,0 +1,255 @@
+"""
+Instantánea compartida de métricas de los servidores VPN.
+
+Un solo servicio por proceso refresca en segundo plano, cada
+``METRICS_SNAPSHOT_INTERVAL_SECONDS``, el estado de Outline (``/server`` y
+``/metrics/transfer``) y el dump de WireGuard. Handlers, mini app, monitoreo
+admin y la sincronización de uso leen de la última instantánea:
+
+- Fresca → se retorna tal cual.
+- Vencida pero dentro de ``METRICS_SNAPSHOT_MAX_STALE_SECONDS`` → se retorna
+  y se dispara un refresco en segundo plano (stale-while-revalidate).
+- Inexistente o demasiado vieja → se espera al refresco en curso.
+
+Los refrescos se coalescen: por muchas lecturas simultáneas que haya (desde
+el loop del bot o el de la API) hay como mucho una consulta a los backends
+en vuelo.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from domain.entities.vpn_key import KeyType
+from infrastructure.api_clients.client_outline import OutlineClient
+from infrastructure.api_clients.client_wireguard import WireGuardClient
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class VpnMetricsSnapshot:
+    """Métricas de ambos backends tomadas en un mismo refresco."""
+
+    outline_server: Optional[Dict[str, Any]] = None
+    # Bytes por access key de Outline; None si Outline no respondió
+    outline_usage: Optional[Dict[str, int]] = None
+    # Filas de `wg show dump` (public_key, rx, tx, total)
+    wireguard_peers: Optional[List[Dict[str, Any]]] = None
+    # Métricas por client_name; None si no hay cliente WireGuard
+    wireguard_usage: Optional[Dict[str, Dict[str, int]]] = None
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    taken_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    @property
+    def outline_healthy(self) -> bool:
+        return bool(self.outline_server and self.outline_server.get("is_healthy"))
+
+    def key_usage(self, key_type: Any, external_id: Optional[str]) -> int:
+        """Bytes totales de una llave según la instantánea (0 si no aparece)."""
+        key_type = key_type.value if hasattr(key_type, "value") else str(key_type)
+        if key_type == KeyType.OUTLINE.value:
+            return (self.outline_usage or {}).get(str(external_id), 0)
+        if key_type == KeyType.WIREGUARD.value:
+            peer = (self.wireguard_usage or {}).get(str(external_id))
+            return peer.get("transfer_total", 0) if peer else 0
+        return 0
+
+
+@dataclass
+class SnapshotStats:
+    refreshes: int = 0
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    waits: int = 0
+    errors: int = 0
+
+
+class MetricsSnapshotService:
+    """Caché stale-while-revalidate de las métricas de Outline y WireGuard."""
+
+    def __init__(
+        self,
+        outline_client: Optional[OutlineClient] = None,
+        wireguard_client: Optional[WireGuardClient] = None,
+    ):
+        self.outline_client = outline_client
+        self.wireguard_client = wireguard_client
+        self._snapshot: Optional[VpnMetricsSnapshot] = None
+        self._lock = threading.Lock()
+        self._inflight: Optional[concurrent.futures.Future] = None
+        self._refresh_tasks: set = set()
+        self._runner: Optional[asyncio.Task] = None
+        self.stats = SnapshotStats()
+
+    @property
+    def snapshot(self) -> Optional[VpnMetricsSnapshot]:
+        """Última instantánea disponible, sin refrescar."""
+        return self._snapshot
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        snapshot = self._snapshot
+        return snapshot.age_seconds if snapshot else None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Antigüedad de la instantánea y contadores de refresco (``/health``)."""
+        snapshot = self._snapshot
+        return {
+            "running": self._runner is not None and not self._runner.done(),
+            "age_seconds": round(snapshot.age_seconds, 1) if snapshot else None,
+            "captured_at": snapshot.captured_at.isoformat() if snapshot else None,
+            **asdict(self.stats),
+        }
+
+    async def get_snapshot(self, max_age: Optional[float] = None) -> VpnMetricsSnapshot:
+        """
+        Retorna la instantánea más reciente.
+
+        Args:
+            max_age: Antigüedad máxima aceptada en segundos (por defecto
+                ``METRICS_SNAPSHOT_MAX_STALE_SECONDS``); si se supera se espera
+                a un refresco.
+        """
+        interval = settings.METRICS_SNAPSHOT_INTERVAL_SECONDS
+        max_stale = settings.METRICS_SNAPSHOT_MAX_STALE_SECONDS if max_age is None else max_age
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            age = snapshot.age_seconds
+            if age <= min(interval, max_stale):
+                self.stats.fresh_hits += 1
+                return snapshot
+            if age <= max_stale:
+                self.stats.stale_hits += 1
+                self._start_refresh()
+                return snapshot
+
+        self.stats.waits += 1
+        return await _wait_shared(self._start_refresh())
+
+    async def refresh(self) -> VpnMetricsSnapshot:
+        """Fuerza un refresco (o se une al que ya está en curso)."""
+        return await _wait_shared(self._start_refresh())
+
+    async def start(self) -> None:
+        """Refresca en segundo plano en el loop actual (idempotente)."""
+        if self._runner is not None and not self._runner.done():
+            return
+        self._runner = asyncio.create_task(self._run(), name="metrics-snapshot")
+        logger.info(
+            f"📈 Instantánea de métricas VPN cada " f"{settings.METRICS_SNAPSHOT_INTERVAL_SECONDS}s"
+        )
+
+    async def close(self) -> None:
+        runner, self._runner = self._runner, None
+        if runner is None:
+            return
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Error refrescando métricas VPN: {e}")
+            await asyncio.sleep(settings.METRICS_SNAPSHOT_INTERVAL_SECONDS)
+
+    def _start_refresh(self) -> concurrent.futures.Future:
+        with self._lock:
+            if self._inflight is not None:
+                return self._inflight
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            self._inflight = future
+        task = asyncio.get_running_loop().create_task(self._refresh(future))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+        return future
+
+    async def _refresh(self, future: concurrent.futures.Future) -> None:
+        try:
+            snapshot = await self._collect()
+        except asyncio.CancelledError:
+            # Cancelado (p. ej. al cerrar el loop): los lectores no deben quedar colgados
+            self._finish(future, error=RuntimeError("Metrics snapshot refresh cancelled"))
+            raise
+        except Exception as e:
+            self.stats.errors += 1
+            self._finish(future, error=e)
+            return
+
+        self.stats.refreshes += 1
+        self._finish(future, snapshot=snapshot)
+
+    def _finish(
+        self,
+        future: concurrent.futures.Future,
+        snapshot: Optional[VpnMetricsSnapshot] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Publica el resultado del refresco y libera ``_inflight`` siempre."""
+        with self._lock:
+            if snapshot is not None:
+                self._snapshot = snapshot
+            if self._inflight is future:
+                self._inflight = None
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(snapshot)
+
+    async def _collect(self) -> VpnMetricsSnapshot:
+        async def outline():
+            if self.outline_client is None:
+                return None, None
+            server, usage = await asyncio.gather(
+                self.outline_client.get_server_info(),
+                self.outline_client.get_metrics(),
+                return_exceptions=True,
+            )
+            if isinstance(server, BaseException):
+                server = {"is_healthy": False, "error": str(server)}
+            # get_metrics retorna {} ante errores: solo es fiable si el servidor responde
+            if isinstance(usage, BaseException) or not server.get("is_healthy"):
+                usage = None
+            return server, usage
+
+        async def wireguard():
+            if self.wireguard_client is None:
+                return None, None
+            try:
+                # get_usage queda en caché del cliente; el snapshot lo reutiliza
+                peers = await self.wireguard_client.get_usage()
+                usage = await self.wireguard_client.get_usage_snapshot()
+                return peers, usage
+            except Exception as e:
+                logger.error(f"❌ Error obteniendo métricas de WireGuard: {e}")
+                return None, None
+
+        (outline_server, outline_usage), (wg_peers, wg_usage) = await asyncio.gather(
+            outline(), wireguard()
+        )
+        return VpnMetricsSnapshot(
+            outline_server=outline_server,
+            outline_usage=outline_usage,
+            wireguard_peers=wg_peers,
+            wireguard_usage=wg_usage,
+        )
+
+
+async def _wait_shared(future: concurrent.futures.Future) -> VpnMetricsSnapshot:
+    """Espera el refresco compartido; cancelar a un lector no lo cancela para los demás."""
+    return await asyncio.shield(asyncio.wrap_future(future))
@@ -3,9 +3,8 @@
 import uuid
 from typing import TYPE_CHECKING, Optional
 
-from telegram import Bot
-
 from config import settings
+from infrastructure.notifications import get_notification_dispatcher
 from utils.logger import logger
 
 if TYPE_CHECKING:
@@ -93,10 +92,9 @@ class SubscriptionPaymentService:
         try:
             from telegram import LabeledPrice
 
-            bot = Bot(token=settings.TELEGRAM_TOKEN)
-
-            await bot.send_invoice(
-                chat_id=user_id,
+            await get_notification_dispatcher().send(
+                "send_invoice",
+                user_id,
                 title=title,
                 description=description,
                 payload=payload,
@@ -105,8 +103,6 @@ class SubscriptionPaymentService:
                 prices=[LabeledPrice(title, amount)],
             )
 
-            await bot.close()
-
             logger.info(f"⭐ Stars invoice sent to user {user_id}: {title} ({amount} XTR)")
             return True
 
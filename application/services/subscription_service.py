@@ -3,11 +3,13 @@
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
+from domain.entities.expiry_deadline import ExpiryKind
 from domain.entities.subscription_plan import PlanType, SubscriptionPlan
 from domain.interfaces.isubscription_repository import ISubscriptionRepository
 from domain.interfaces.iuser_repository import IUserRepository
+from infrastructure.scheduling import get_expiry_scheduler
 from utils.logger import logger
 
 
@@ -82,6 +84,10 @@ class SubscriptionService:
         active_plan = await self.subscription_repo.get_active_by_user(user_id, current_user_id)
         return active_plan is not None and not active_plan.is_expired
 
+    async def get_premium_user_ids(self, user_ids: Iterable[int], current_user_id: int) -> Set[int]:
+        """Users (of user_ids) with an active subscription, in a single query."""
+        return await self.subscription_repo.get_premium_user_ids(user_ids, current_user_id)
+
     async def get_user_subscription(
         self, user_id: int, current_user_id: int
     ) -> Optional[SubscriptionPlan]:
@@ -130,6 +136,10 @@ class SubscriptionService:
         )
 
         saved_plan = await self.subscription_repo.save(plan, current_user_id)
+        if saved_plan.id is not None:
+            get_expiry_scheduler().track(
+                ExpiryKind.SUBSCRIPTION, saved_plan.id, saved_plan.expires_at
+            )
         logger.info(
             f"📦 Subscription activated for user {user_id}: "
             f"{plan_option.name} ({stars_paid} stars)"
@@ -143,6 +153,7 @@ class SubscriptionService:
             return False
 
         await self.subscription_repo.deactivate(active_plan.id, current_user_id)
+        get_expiry_scheduler().untrack(ExpiryKind.SUBSCRIPTION, active_plan.id)
         logger.info(f"📦 Subscription cancelled for user {user_id}")
         return True
 
@@ -156,6 +167,13 @@ class SubscriptionService:
         """Get all expired subscriptions."""
         return await self.subscription_repo.get_expired_plans(current_user_id)
 
+    async def expire_subscriptions(self, current_user_id: int = 0) -> int:
+        """Deactivate expired subscriptions; returns how many were deactivated."""
+        expired = await self.subscription_repo.deactivate_expired(current_user_id)
+        for plan in expired:
+            logger.info(f"📦 Subscription expired for user {plan.user_id} ({plan.plan_type.value})")
+        return len(expired)
+
     async def get_user_data_limit(self, user_id: int, current_user_id: int) -> int:
         """
         Get user's data limit based on subscription status.
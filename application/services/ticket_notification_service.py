@@ -1,14 +1,18 @@
-from telegram import Bot
-
 from domain.entities.ticket import Ticket, TicketStatus
+from infrastructure.notifications import NotificationDispatcher
 from utils.logger import logger
 
 
 class TicketNotificationService:
-    """Servicio para notificaciones de tickets."""
+    """
+    Servicio para notificaciones de tickets.
+
+    Los mensajes se encolan en el despachador compartido; los métodos
+    retornan True cuando la notificación quedó encolada.
+    """
 
-    def __init__(self, bot: Bot, admin_id: int):
-        self.bot = bot
+    def __init__(self, dispatcher: NotificationDispatcher, admin_id: int):
+        self.dispatcher = dispatcher
         self.admin_id = admin_id
 
     async def notify_admin_new_ticket(self, ticket: Ticket, username: str = None) -> bool:
@@ -39,7 +43,7 @@ class TicketNotificationService:
                 f"Usa `/admin` → Gestionar Tickets para responder."
             )
 
-            await self.bot.send_message(chat_id=self.admin_id, text=message, parse_mode="Markdown")
+            self.dispatcher.enqueue_message(self.admin_id, message, parse_mode="Markdown")
             logger.info(f"Admin notified of new ticket: {ticket.ticket_number}")
             return True
 
@@ -60,7 +64,7 @@ class TicketNotificationService:
                 f"Usa el menú de Soporte para ver la conversación completa."
             )
 
-            await self.bot.send_message(chat_id=user_id, text=message, parse_mode="Markdown")
+            self.dispatcher.enqueue_message(user_id, message, parse_mode="Markdown")
             logger.info(f"User {user_id} notified of response to {ticket.ticket_number}")
             return True
 
@@ -79,7 +83,7 @@ class TicketNotificationService:
                 f"puedes crear un nuevo ticket desde el menú de Soporte."
             )
 
-            await self.bot.send_message(chat_id=user_id, text=message, parse_mode="Markdown")
+            self.dispatcher.enqueue_message(user_id, message, parse_mode="Markdown")
             return True
 
         except Exception as e:
@@ -0,0 +1,119 @@
+"""
+Medición de consumo por deltas para la sincronización de uso VPN.
+
+Convierte las lecturas brutas de los servidores en deltas por llave: el
+contador de WireGuard se reinicia cuando se reinicia la interfaz, y el de
+Outline (``/metrics/transfer``) es un total móvil de 30 días que baja cuando
+el tráfico antiguo sale de la ventana. Los deltas por llave se agregan por
+usuario y se reparten en bloque entre la facturación por consumo y los
+paquetes de datos.
+
+Author: uSipipo Team
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+from utils.logger import logger
+
+if TYPE_CHECKING:
+    from application.services.consumption_vpn_integration_service import (
+        ConsumptionVpnIntegrationService,
+    )
+    from application.services.data_package_service import DataPackageService
+
+BYTES_PER_MB = Decimal(1024**2)
+
+
+def meter_counter(
+    previous: Optional[int], current: int, rolling_window: bool = False
+) -> Tuple[int, bool]:
+    """
+    Calcula el consumo entre dos lecturas del contador de una llave.
+
+    Args:
+        previous: Último contador visto (None si la llave aún no tiene línea base)
+        current: Contador actual del servidor
+        rolling_window: La lectura es un total de ventana móvil (Outline): si
+            baja es tráfico antiguo que salió de la ventana, no un reinicio
+
+    Returns:
+        (delta en bytes, True si el contador se reinició)
+    """
+    if previous is None:
+        return 0, False
+    if current < previous and rolling_window:
+        # Nueva línea base sin consumo: facturar ``current`` cobraría de nuevo
+        # casi toda la ventana
+        return 0, False
+    if current < previous:
+        # El contador volvió a empezar: todo lo leído es consumo nuevo
+        return current, True
+    return current - previous, False
+
+
+@dataclass
+class MeteringResult:
+    """Resultado del reparto de deltas de una sincronización."""
+
+    users: int = 0
+    metered_bytes: int = 0
+    billed_users: Set[int] = field(default_factory=set)
+    package_bytes: Dict[int, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "users": self.users,
+            "metered_bytes": self.metered_bytes,
+            "billed_users": len(self.billed_users),
+            "package_users": len(self.package_bytes),
+            "package_bytes": sum(self.package_bytes.values()),
+        }
+
+
+class UsageMeteringService:
+    """
+    Reparte el consumo por usuario de una sincronización:
+
+    - Usuarios con ciclo de consumo activo → facturación (un solo UPDATE).
+    - Resto de usuarios → descuento de sus paquetes de datos.
+    """
+
+    def __init__(
+        self,
+        vpn_integration_service: Optional["ConsumptionVpnIntegrationService"] = None,
+        data_package_service: Optional["DataPackageService"] = None,
+    ):
+        self.vpn_integration_service = vpn_integration_service
+        self.data_package_service = data_package_service
+
+    async def route(self, bytes_by_user: Dict[int, int], current_user_id: int) -> MeteringResult:
+        """Envía los deltas agregados por usuario a facturación y paquetes."""
+        usage = {user_id: used for user_id, used in bytes_by_user.items() if used > 0}
+        result = MeteringResult(users=len(usage), metered_bytes=sum(usage.values()))
+        if not usage:
+            return result
+
+        # Un fallo de facturación se propaga: sin saber qué usuarios están en
+        # modo consumo, descontar de paquetes cobraría también a esos usuarios
+        if self.vpn_integration_service is not None:
+            result.billed_users = await self.vpn_integration_service.route_usage_batch_to_billing(
+                {user_id: Decimal(used) / BYTES_PER_MB for user_id, used in usage.items()},
+                current_user_id,
+            )
+
+        if self.data_package_service is not None:
+            package_usage = {
+                user_id: used
+                for user_id, used in usage.items()
+                if user_id not in result.billed_users
+            }
+            try:
+                result.package_bytes = await self.data_package_service.consume_data_batch(
+                    package_usage, current_user_id
+                )
+            except Exception as e:
+                logger.error(f"❌ Error descontando consumo de paquetes: {e}")
+
+        return result
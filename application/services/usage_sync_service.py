@@ -0,0 +1,284 @@
+"""
+Motor de sincronización de consumo de datos VPN.
+
+Toma una única instantánea de métricas por backend (Outline y WireGuard),
+la cruza en memoria con las llaves activas, convierte los contadores en
+deltas de consumo, persiste solo las llaves que cambiaron mediante
+actualizaciones masivas y reparte los deltas por usuario (facturación por
+consumo y paquetes).
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import settings
+from domain.entities.vpn_key import KeyType, VpnKey
+from domain.interfaces.ikey_repository import IKeyRepository
+from infrastructure.api_clients.client_outline import OutlineClient
+from infrastructure.api_clients.client_wireguard import WireGuardClient
+from utils.logger import logger
+
+from .metrics_snapshot_service import MetricsSnapshotService
+from .usage_metering_service import UsageMeteringService, meter_counter
+
+
+@dataclass
+class UsageSyncReport:
+    """DTO con el resultado de una ejecución de sincronización."""
+
+    total_keys: int = 0
+    synced: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    errors: int = 0
+    total_bytes_synced: int = 0
+    counter_resets: int = 0
+    baselined: int = 0
+    stale: int = 0
+    metered_bytes: int = 0
+    metering: Dict[str, int] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "total_keys": self.total_keys,
+            "synced": self.synced,
+            "unchanged": self.unchanged,
+            "missing": self.missing,
+            "errors": self.errors,
+            "total_bytes_synced": self.total_bytes_synced,
+            "counter_resets": self.counter_resets,
+            "baselined": self.baselined,
+            "stale": self.stale,
+            "metered_bytes": self.metered_bytes,
+            "metering": dict(self.metering),
+            "timings_ms": dict(self.timings_ms),
+        }
+
+
+class UsageSyncService:
+    """
+    Sincroniza el consumo de todas las llaves activas en cinco fases:
+
+    1. load: lee las llaves activas en una sola consulta.
+    2. snapshot: una llamada a Outline (/metrics/transfer) y un solo
+       `wg show dump` + lectura de wg0.conf para WireGuard.
+    3. join: cruza la instantánea con las llaves por external_id, calcula el
+       delta contra el último contador visto (detectando reinicios de
+       WireGuard; en Outline una bajada solo mueve la línea base) y descarta
+       las que no cambiaron.
+    4. write: UPDATE ... FROM (VALUES ...) por bloques, un commit por ejecución.
+       El delta se suma en SQL y solo si el contador guardado no cambió desde
+       la lectura (``stale`` cuenta las llaves omitidas).
+    5. meter: reparte los deltas agregados por usuario (ver UsageMeteringService).
+
+    ``used_bytes`` acumula deltas, por lo que un reinicio del contador en el
+    servidor ya no reduce el consumo registrado de la llave.
+    """
+
+    def __init__(
+        self,
+        key_repo: IKeyRepository,
+        outline_client: Optional[OutlineClient] = None,
+        wireguard_client: Optional[WireGuardClient] = None,
+        metering: Optional[UsageMeteringService] = None,
+        metrics_snapshot: Optional[MetricsSnapshotService] = None,
+    ):
+        self.key_repo = key_repo
+        self.outline_client = outline_client
+        self.wireguard_client = wireguard_client
+        self.metering = metering
+        self.metrics_snapshot = metrics_snapshot
+
+    async def run(self, current_user_id: int) -> UsageSyncReport:
+        """Ejecuta una sincronización completa y retorna el reporte."""
+        report = UsageSyncReport()
+
+        started = time.perf_counter()
+        keys = await self.key_repo.get_all_active(current_user_id)
+        report.timings_ms["load"] = _elapsed_ms(started)
+        report.total_keys = len(keys)
+
+        if not keys:
+            return report
+
+        started = time.perf_counter()
+        outline_usage, wireguard_usage = await self._take_snapshots(keys)
+        report.timings_ms["snapshot"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        owners: Dict[uuid.UUID, Optional[int]] = {}
+        changes = self._join(keys, outline_usage, wireguard_usage, report, owners)
+        report.timings_ms["join"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        usage_by_user: Dict[int, int] = {}
+        if changes:
+            try:
+                applied = set(await self.key_repo.bulk_update_usage(changes, current_user_id))
+            except Exception as e:
+                applied = set()
+                report.errors += len(changes)
+                logger.error(f"❌ Error persistiendo consumo de {len(changes)} llaves: {e}")
+            else:
+                report.stale = len(changes) - len(applied)
+                if report.stale:
+                    logger.info(
+                        f"🔁 {report.stale} llaves omitidas: su contador cambió durante la sync"
+                    )
+            self._tally(changes, applied, owners, report, usage_by_user)
+        report.timings_ms["write"] = _elapsed_ms(started)
+
+        # Solo se reparte lo que quedó persistido: si el write falla, los
+        # contadores no avanzan y el delta se vuelve a medir en la próxima
+        # ejecución; si la fila se omitió, otra sincronización ya lo midió
+        if self.metering is not None and usage_by_user:
+            started = time.perf_counter()
+            try:
+                metering = await self.metering.route(usage_by_user, current_user_id)
+                report.metering = metering.to_dict()
+            except Exception as e:
+                logger.error(f"❌ Error repartiendo consumo medido: {e}")
+            report.timings_ms["meter"] = _elapsed_ms(started)
+
+        return report
+
+    async def _take_snapshots(
+        self, keys: List[VpnKey]
+    ) -> Tuple[Optional[Dict[str, int]], Optional[Dict[str, Dict[str, int]]]]:
+        """Obtiene una instantánea por backend, solo si hay llaves de ese tipo."""
+        has_outline = any(k.key_type == KeyType.OUTLINE for k in keys)
+        has_wireguard = any(k.key_type == KeyType.WIREGUARD for k in keys)
+
+        if self.metrics_snapshot is not None:
+            # Instantánea compartida de como mucho un intervalo de antigüedad;
+            # los contadores son acumulados, así que leerla un poco tarde solo
+            # mueve consumo a la siguiente sincronización
+            try:
+                snapshot = await self.metrics_snapshot.get_snapshot(
+                    max_age=settings.METRICS_SNAPSHOT_INTERVAL_SECONDS
+                )
+            except Exception as e:
+                logger.error(f"Error obteniendo instantánea de métricas: {e}")
+                return None, None
+            return (
+                snapshot.outline_usage if has_outline else None,
+                snapshot.wireguard_usage if has_wireguard else None,
+            )
+
+        async def outline_snapshot() -> Optional[Dict[str, int]]:
+            if not has_outline or self.outline_client is None:
+                return None
+            try:
+                return await self.outline_client.get_metrics()
+            except Exception as e:
+                logger.error(f"Error obteniendo instantánea de Outline: {e}")
+                return None
+
+        async def wireguard_snapshot() -> Optional[Dict[str, Dict[str, int]]]:
+            if not has_wireguard or self.wireguard_client is None:
+                return None
+            try:
+                return await self.wireguard_client.get_usage_snapshot()
+            except Exception as e:
+                logger.error(f"Error obteniendo instantánea de WireGuard: {e}")
+                return None
+
+        outline_usage, wireguard_usage = await asyncio.gather(
+            outline_snapshot(), wireguard_snapshot()
+        )
+        return outline_usage, wireguard_usage
+
+    @staticmethod
+    def _join(
+        keys: List[VpnKey],
+        outline_usage: Optional[Dict[str, int]],
+        wireguard_usage: Optional[Dict[str, Dict[str, int]]],
+        report: UsageSyncReport,
+        owners: Dict[uuid.UUID, Optional[int]],
+    ) -> List[Tuple[uuid.UUID, int, int, Optional[int]]]:
+        """
+        Cruza las llaves con las instantáneas y retorna solo las que cambiaron
+        como (key_id, delta_bytes, usage_counter_bytes, previous_counter),
+        registrando en ``owners`` el usuario de cada llave.
+
+        Las llaves ausentes de la instantánea (o de un backend que falló) se
+        omiten en lugar de ponerse a cero. Las llaves sin contador previo
+        (anteriores al medidor por deltas) solo fijan su línea base.
+        """
+        changes: List[Tuple[uuid.UUID, int, int, Optional[int]]] = []
+
+        for key in keys:
+            if key.id is None:
+                report.errors += 1
+                logger.warning(f"⚠️ Llave sin ID, omitiendo: {key.name}")
+                continue
+
+            current_usage: Optional[int] = None
+            if key.key_type == KeyType.OUTLINE and outline_usage is not None:
+                value = outline_usage.get(str(key.external_id))
+                current_usage = int(value) if value is not None else None
+            elif key.key_type == KeyType.WIREGUARD and wireguard_usage is not None:
+                peer = wireguard_usage.get(key.external_id)
+                current_usage = peer.get("transfer_total") if peer is not None else None
+
+            if current_usage is None:
+                report.missing += 1
+                continue
+
+            previous = key.usage_counter_bytes
+            if current_usage == previous:
+                report.unchanged += 1
+                continue
+
+            key_id = uuid.UUID(str(key.id))
+            owners[key_id] = key.user_id
+            if previous is None:
+                # Línea base: conservar la semántica previa (uso = contador)
+                report.baselined += 1
+                changes.append((key_id, current_usage - key.used_bytes, current_usage, None))
+                continue
+
+            delta, reset = meter_counter(
+                previous, current_usage, rolling_window=key.key_type == KeyType.OUTLINE
+            )
+            if reset:
+                report.counter_resets += 1
+                logger.info(
+                    f"🔁 Contador reiniciado en llave {key.id} ({previous} → {current_usage} bytes)"
+                )
+
+            changes.append((key_id, delta, current_usage, previous))
+
+        return changes
+
+    @staticmethod
+    def _tally(
+        changes: List[Tuple[uuid.UUID, int, int, Optional[int]]],
+        applied: Set[uuid.UUID],
+        owners: Dict[uuid.UUID, Optional[int]],
+        report: UsageSyncReport,
+        usage_by_user: Dict[int, int],
+    ) -> None:
+        """Suma al reporte y a ``usage_by_user`` solo los deltas persistidos."""
+        for key_id, delta, _, previous in changes:
+            if key_id not in applied:
+                continue
+            report.synced += 1
+            report.total_bytes_synced += delta
+            if previous is None or delta <= 0:
+                # Las líneas base no se facturan
+                continue
+            report.metered_bytes += delta
+            user_id = owners.get(key_id)
+            if user_id is not None:
+                usage_by_user[user_id] = usage_by_user.get(user_id, 0) + delta
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
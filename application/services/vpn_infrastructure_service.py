@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 from config import settings
+from domain.entities.key_query import KeyQuery
 from domain.entities.vpn_key import KeyType, VpnKey
 from domain.interfaces.ikey_repository import IKeyRepository
 from domain.interfaces.iuser_repository import IUserRepository
@@ -12,6 +13,9 @@ from infrastructure.api_clients.client_outline import OutlineClient
 from infrastructure.api_clients.client_wireguard import WireGuardClient
 from utils.logger import logger
 
+from .bulk_key_executor import BulkKeyExecutor, BulkKeyResult, KeyOperation
+from .metrics_snapshot_service import MetricsSnapshotService
+
 
 class VpnInfrastructureService:
     """
@@ -25,11 +29,16 @@ class VpnInfrastructureService:
         user_repository: IUserRepository,
         wireguard_client: Optional[WireGuardClient] = None,
         outline_client: Optional[OutlineClient] = None,
+        metrics_snapshot: Optional[MetricsSnapshotService] = None,
     ):
         self.key_repository = key_repository
         self.user_repository = user_repository
         self.wireguard_client = wireguard_client
         self.outline_client = outline_client
+        self.metrics_snapshot = metrics_snapshot or MetricsSnapshotService(
+            outline_client, wireguard_client
+        )
+        self.bulk_executor = BulkKeyExecutor(outline_client, wireguard_client)
 
     async def enable_key(self, key_id: str, key_type: str) -> Dict[str, Any]:
         """
@@ -180,6 +189,32 @@ class VpnInfrastructureService:
                 "error": str(e),
             }
 
+    async def apply_bulk(self, operation: KeyOperation, keys: List[VpnKey]) -> BulkKeyResult:
+        """
+        Aplica una operación a muchas claves y refleja el resultado en la BD.
+
+        Los servidores se actualizan con concurrencia acotada (ver
+        BulkKeyExecutor) y las claves aplicadas se guardan con un solo UPDATE.
+
+        Args:
+            operation: enable, disable o delete (borrado lógico en BD)
+            keys: Claves afectadas
+
+        Returns:
+            BulkKeyResult con las claves aplicadas y las fallidas
+        """
+        result = await self.bulk_executor.run(operation, keys)
+        if result.succeeded:
+            is_active = operation == KeyOperation.ENABLE
+            await self.key_repository.set_active_bulk(
+                [uuid.UUID(str(key.id)) for key in result.succeeded],
+                is_active,
+                settings.ADMIN_ID,
+            )
+            for key in result.succeeded:
+                key.is_active = is_active
+        return result
+
     async def get_server_metrics(self, server_type: str) -> Dict[str, Any]:
         """
         Obtiene métricas de salud del servidor VPN.
@@ -199,7 +234,8 @@ class VpnInfrastructureService:
             }
 
             if server_type.lower() == "outline" and self.outline_client:
-                server_info = await self.outline_client.get_server_info()
+                snapshot = await self.metrics_snapshot.get_snapshot()
+                server_info = snapshot.outline_server or {}
                 metrics["is_healthy"] = server_info.get("is_healthy", False)
                 metrics["server_name"] = server_info.get("name", "Unknown")
 
@@ -240,32 +276,16 @@ class VpnInfrastructureService:
             all_active_keys = await self.key_repository.get_all_active(settings.ADMIN_ID)
 
             total_checked = len(all_active_keys)
-            ghosts_found = 0
-            disabled_count = 0
-            errors = []
-
-            for key in all_active_keys:
-                if self._is_ghost_key(key, cutoff_date):
-                    ghosts_found += 1
-
-                    try:
-                        if key.key_type == KeyType.OUTLINE and self.outline_client:
-                            success = await self.outline_client.disable_key(key.external_id)
-                        elif key.key_type == KeyType.WIREGUARD and self.wireguard_client:
-                            success = await self.wireguard_client.disable_peer(key.external_id)
-                        else:
-                            continue
-
-                        if success:
-                            key.is_active = False
-                            await self.key_repository.save(key, settings.ADMIN_ID)
-                            disabled_count += 1
-                            logger.info(f"Ghost key {key.id} disabled")
-                        else:
-                            errors.append(f"Failed to disable key {key.id}")
-
-                    except Exception as e:
-                        errors.append(f"Error disabling key {key.id}: {str(e)}")
+            ghosts = [key for key in all_active_keys if self._is_ghost_key(key, cutoff_date)]
+            ghosts_found = len(ghosts)
+
+            # Solo se deshabilitan las de servidores con cliente configurado
+            result = await self.apply_bulk(
+                KeyOperation.DISABLE,
+                [key for key in ghosts if self.bulk_executor.supports(key)],
+            )
+            disabled_count = len(result.succeeded)
+            errors = result.errors
 
             logger.info(
                 f"Ghost key cleanup completed: "
@@ -327,29 +347,14 @@ class VpnInfrastructureService:
             Lista de dicts con {"id": str, "name": str, "is_active": bool, ...}
         """
         try:
-            all_keys = await self.key_repository.get_all_keys(settings.ADMIN_ID)
             server_type_lower = server_type.lower()
-
-            logger.debug(
-                f"list_server_keys: Total keys in DB: {len(all_keys)}, "
-                f"looking for type: {server_type_lower}"
+            query = KeyQuery(
+                key_type=KeyType(server_type_lower),
+                is_active=None if include_inactive else True,
+                limit=None,
             )
-
-            # Log sample keys for debugging
-            if all_keys:
-                sample = all_keys[0]
-                logger.debug(
-                    f"Sample key - type: {sample.key_type.value}, " f"is_active: {sample.is_active}"
-                )
-
-            type_keys = []
-            for k in all_keys:
-                key_type_value = (
-                    k.key_type.value if hasattr(k.key_type, "value") else str(k.key_type)
-                )
-                if key_type_value.lower() == server_type_lower:
-                    if include_inactive or k.is_active:
-                        type_keys.append(k)
+            page = await self.key_repository.query_keys(query, settings.ADMIN_ID)
+            type_keys = page.items
 
             logger.debug(
                 f"list_server_keys: Found {len(type_keys)} keys for {server_type_lower} "
@@ -14,7 +14,11 @@ from infrastructure.api_clients.client_outline import OutlineClient
 from infrastructure.api_clients.client_wireguard import WireGuardClient
 from utils.logger import logger
 
+from .data_package_service import DataPackageService
+from .metrics_snapshot_service import MetricsSnapshotService
 from .subscription_service import SubscriptionService
+from .usage_metering_service import UsageMeteringService
+from .usage_sync_service import UsageSyncService
 
 
 class VpnService:
@@ -29,6 +33,8 @@ class VpnService:
         wireguard_client: WireGuardClient,
         vpn_integration_service=None,
         subscription_service: Optional[SubscriptionService] = None,
+        metrics_snapshot: Optional[MetricsSnapshotService] = None,
+        data_package_service: Optional[DataPackageService] = None,
     ):
         self.user_repo = user_repo
         self.key_repo = key_repo
@@ -37,6 +43,10 @@ class VpnService:
         self.wireguard_client = wireguard_client
         self.vpn_integration_service = vpn_integration_service
         self.subscription_service = subscription_service
+        self.data_package_service = data_package_service
+        self.metrics_snapshot = metrics_snapshot or MetricsSnapshotService(
+            outline_client, wireguard_client
+        )
 
     async def create_key(
         self, telegram_id: int, key_type: str, key_name: str, current_user_id: int
@@ -107,17 +117,10 @@ class VpnService:
         return await self.key_repo.get_all_active(settings.ADMIN_ID)
 
     async def fetch_real_usage(self, key: VpnKey) -> int:
-        """Abstrae la consulta de consumo según el tipo de llave."""
+        """Consumo de una llave según la instantánea compartida de métricas."""
         try:
-            if key.key_type == "outline":
-                metrics = await self.outline_client.get_metrics()
-                return metrics.get(str(key.external_id), 0)
-
-            if key.key_type == "wireguard":
-                peer_data = await self.wireguard_client.get_peer_metrics(key.external_id)
-                return peer_data.get("transfer_total", 0)
-
-            return 0
+            snapshot = await self.metrics_snapshot.get_snapshot()
+            return snapshot.key_usage(key.key_type, key.external_id)
         except Exception as e:
             logger.error(f"Error consultando métricas reales para llave {key.id}: {e}")
             return 0
@@ -303,28 +306,24 @@ class VpnService:
             ping = 45
             load = 0
 
-            if server_type.lower() == "outline":
-                # Intentar obtener carga real de Outline
-                try:
-                    info = await self.outline_client.get_server_info()
-                    # Usamos el conteo de llaves como proxy de carga si no hay métrica de CPU
-                    # Normalizamos a un porcentaje (ej: 100 llaves = 100% carga es un ejemplo simple)
-                    key_count = info.get("total_keys", 0)
-                    load = min(key_count, 100)
-                    if info.get("is_healthy"):
-                        ping = 35  # Si está healthy asumimos buen ping
-                except Exception as e:
-                    logger.warning(f"No se pudo obtener estado real de Outline: {e}")
-
-            elif server_type.lower() == "wireguard":
-                # Intentar obtener carga real de WireGuard
-                try:
-                    usage = await self.wireguard_client.get_usage()
-                    # Proxy de carga: número de peers activos
-                    active_peers = len(usage)
-                    load = min(active_peers * 2, 100)  # Asumimos 50 usuarios = 100% carga
-                except Exception as e:
-                    logger.warning(f"No se pudo obtener estado real de WireGuard: {e}")
+            try:
+                snapshot = await self.metrics_snapshot.get_snapshot()
+            except Exception as e:
+                logger.warning(f"No se pudo obtener estado real de {server_type}: {e}")
+                snapshot = None
+
+            if snapshot is not None and server_type.lower() == "outline":
+                # Usamos el conteo de llaves como proxy de carga si no hay métrica de CPU
+                # Normalizamos a un porcentaje (ej: 100 llaves = 100% carga es un ejemplo simple)
+                info = snapshot.outline_server or {}
+                load = min(info.get("total_keys", 0), 100)
+                if info.get("is_healthy"):
+                    ping = 35  # Si está healthy asumimos buen ping
+
+            elif snapshot is not None and server_type.lower() == "wireguard":
+                # Proxy de carga: número de peers activos
+                active_peers = len(snapshot.wireguard_peers or [])
+                load = min(active_peers * 2, 100)  # Asumimos 50 usuarios = 100% carga
 
             return {"location": location, "ping": ping, "load": load}
         except Exception as e:
@@ -381,37 +380,32 @@ class VpnService:
             return False
 
     async def sync_usage(self, current_user_id: int) -> dict:
-        """Sincroniza el consumo de datos de todas las llaves activas."""
-        logger.info("🔄 Iniciando sincronización de consumo de datos VPN")
+        """
+        Sincroniza el consumo de datos de todas las llaves activas.
 
-        keys = await self.get_all_active_keys()
-        synced_count = 0
-        error_count = 0
-        total_bytes_synced = 0
+        Usa una instantánea por backend y escrituras masivas (ver UsageSyncService).
+        """
+        logger.info("🔄 Iniciando sincronización de consumo de datos VPN")
 
-        for key in keys:
-            try:
-                current_usage = await self.fetch_real_usage(key)
-                if key.id is not None:
-                    await self.update_key_usage(uuid.UUID(key.id), current_usage)
-                    synced_count += 1
-                    total_bytes_synced += current_usage
-                else:
-                    logger.warning(f"⚠️ Llave sin ID, omitiendo: {key.name}")
-                    error_count += 1
-            except Exception as e:
-                error_count += 1
-                logger.error(f"❌ Error sincronizando llave {key.id}: {e}")
-
-        summary = {
-            "total_keys": len(keys),
-            "synced": synced_count,
-            "errors": error_count,
-            "total_bytes_synced": total_bytes_synced,
-        }
+        report = await UsageSyncService(
+            key_repo=self.key_repo,
+            outline_client=self.outline_client,
+            wireguard_client=self.wireguard_client,
+            metrics_snapshot=self.metrics_snapshot,
+            metering=UsageMeteringService(
+                vpn_integration_service=self.vpn_integration_service,
+                data_package_service=self.data_package_service,
+            ),
+        ).run(current_user_id)
+
+        summary = report.to_dict()
         logger.info(
             f"✅ Sincronización completada - Total: {summary['total_keys']}, "
-            f"Exitosas: {summary['synced']}, Errores: {summary['errors']}, "
-            f"Bytes sincronizados: {summary['total_bytes_synced']}"
+            f"Actualizadas: {summary['synced']}, Sin cambios: {summary['unchanged']}, "
+            f"Sin métricas: {summary['missing']}, Errores: {summary['errors']}, "
+            f"Bytes sincronizados: {summary['total_bytes_synced']}, "
+            f"Bytes medidos: {summary['metered_bytes']} "
+            f"(reinicios: {summary['counter_resets']}), "
+            f"Tiempos (ms): {summary['timings_ms']}"
         )
         return summary
@@ -65,8 +65,7 @@ class WalletManagementService:
                     return reused_wallet
 
             # Crear nueva wallet si no hay reutilizables
-            async with self.tron_dealer_client as client:
-                wallet = await client.assign_wallet(label=label)
+            wallet = await self.tron_dealer_client.assign_wallet(label=label)
 
             logger.info(f"Nueva wallet {wallet.address[:10]}... creada para user {user_id}")
 
@@ -153,8 +152,7 @@ class WalletManagementService:
             return None
 
         try:
-            async with self.tron_dealer_client as client:
-                balance = await client.get_balance(user.wallet_address)
+            balance = await self.tron_dealer_client.get_balance(user.wallet_address)
 
             logger.debug(
                 f"Wallet {user.wallet_address} balance: "
@@ -194,10 +192,9 @@ class WalletManagementService:
             return None
 
         try:
-            async with self.tron_dealer_client as client:
-                transactions = await client.get_transactions(
-                    user.wallet_address, limit=limit, offset=offset, status=status
-                )
+            transactions = await self.tron_dealer_client.get_transactions(
+                user.wallet_address, limit=limit, offset=offset, status=status
+            )
 
             logger.debug(
                 f"Found {transactions.total} transactions for wallet {user.wallet_address}"
@@ -95,8 +95,7 @@ class WalletPoolService:
     ) -> Optional[BscWallet]:
         """Crea una nueva wallet para el usuario."""
         try:
-            async with self.tron_dealer_client as client:
-                wallet = await client.assign_wallet(label=label)
+            wallet = await self.tron_dealer_client.assign_wallet(label=label)
 
             logger.info(f"Nueva wallet {wallet.address[:10]}... " f"creada para user {user_id}")
 
@@ -55,11 +55,6 @@ class WebhookSecurityService:
     async def check_and_register_nonce(self, nonce: str) -> Tuple[bool, Optional[str]]:
         nonce_hash = hashlib.sha256(nonce.encode()).hexdigest()
 
-        existing = await self.token_repo.get_by_hash(nonce_hash)
-        if existing and not existing.is_expired:
-            logger.warning("Replay attack detected: nonce already used")
-            return False, "Nonce already used (potential replay attack)"
-
         token = WebhookToken(
             token_hash=nonce_hash,
             purpose="replay_protection",
@@ -67,7 +62,10 @@ class WebhookSecurityService:
             extra_data={"nonce": nonce},
         )
 
-        await self.token_repo.save(token)
+        # Atómico en la BD: compartido por todos los workers de la API
+        if not await self.token_repo.register_if_absent(token):
+            logger.warning("Replay attack detected: nonce already used")
+            return False, "Nonce already used (potential replay attack)"
         return True, None
 
     async def cleanup_expired_nonces(self) -> int:
@@ -56,6 +56,28 @@ class Settings(BaseSettings):
 
     API_PORT: int = Field(default=8000, ge=1024, le=65535, description="Puerto de la API")
 
+    API_MODE: str = Field(
+        default="embedded",
+        description=(
+            "Ejecución de la API: embedded (hilo dentro del proceso del bot) | "
+            "standalone (proceso propio con `python -m infrastructure.api`)"
+        ),
+    )
+    API_WORKERS: int = Field(
+        default=1,
+        ge=1,
+        le=64,
+        description="Workers de uvicorn en modo standalone",
+    )
+    API_LOOP: str = Field(
+        default="auto",
+        description="Event loop de uvicorn: auto (uvloop si está instalado) | asyncio | uvloop",
+    )
+    API_HTTP: str = Field(
+        default="auto",
+        description="Parser HTTP de uvicorn: auto (httptools si está instalado) | h11 | httptools",
+    )
+
     CORS_ORIGINS: List[str] = Field(
         default=[
             "*",  # Development only - will be rejected in production
@@ -68,6 +90,35 @@ class Settings(BaseSettings):
     API_RATE_LIMIT: int = Field(
         default=60, ge=10, description="Límite de peticiones por minuto a la API"
     )
+    RATE_LIMIT_BACKEND: str = Field(
+        default="auto",
+        description=(
+            "Almacén del rate limit: memory (por proceso) | "
+            "redis (compartido entre workers vía REDIS_URL) | "
+            "auto (redis con API standalone de varios workers, si no memory)"
+        ),
+    )
+    RATE_LIMIT_WEBHOOK_PER_MINUTE: int = Field(
+        default=120,
+        ge=0,
+        description="Peticiones por minuto e IP a los webhooks (0 = sin límite)",
+    )
+    RATE_LIMIT_MINIAPP_PER_MINUTE: int = Field(
+        default=120,
+        ge=0,
+        description="Peticiones por minuto e IP a la Mini App (0 = sin límite)",
+    )
+    RATE_LIMIT_STATIC_PER_MINUTE: int = Field(
+        default=600,
+        ge=0,
+        description="Peticiones por minuto e IP a los estáticos de la Mini App (0 = sin límite)",
+    )
+    RATE_LIMIT_EVICTION_SECONDS: int = Field(
+        default=60,
+        ge=1,
+        le=3600,
+        description="Intervalo de limpieza de contadores inactivos (backend memory)",
+    )
 
     # =========================================================================
     # TELEGRAM BOT
@@ -115,6 +166,19 @@ class Settings(BaseSettings):
         description="Habilitar Mini App Web",
     )
 
+    MINIAPP_IDENTITY_CACHE_TTL: int = Field(
+        default=30,
+        ge=0,
+        le=3600,
+        description="Segundos que se reutiliza un initData validado y su usuario (0 = sin caché)",
+    )
+
+    MINIAPP_IDENTITY_CACHE_SIZE: int = Field(
+        default=2048,
+        ge=16,
+        description="Identidades de Mini App en caché como máximo",
+    )
+
     # =========================================================================
     # BASE DE DATOS
     # =========================================================================
@@ -134,6 +198,32 @@ class Settings(BaseSettings):
         default=30, ge=10, le=120, description="Timeout de conexión en segundos"
     )
 
+    DB_POOL_MODE: str = Field(
+        default="null",
+        description=(
+            "Gestión de conexiones: null (una conexión nueva por sesión) | "
+            "per_loop (un pool AsyncAdaptedQueuePool por event loop)"
+        ),
+    )
+
+    DB_MAX_OVERFLOW: int = Field(
+        default=10,
+        ge=0,
+        le=100,
+        description="Conexiones extra permitidas sobre DB_POOL_SIZE (modo per_loop)",
+    )
+
+    DB_POOL_RECYCLE: int = Field(
+        default=1800,
+        ge=-1,
+        description="Segundos antes de reciclar una conexión del pool (-1 = nunca)",
+    )
+
+    DB_POOL_PRE_PING: bool = Field(
+        default=True,
+        description="Verificar conexiones del pool antes de usarlas (modo per_loop)",
+    )
+
     # =========================================================================
     # REDIS
     # =========================================================================
@@ -183,6 +273,49 @@ class Settings(BaseSettings):
         default="1.1.1.1", description="DNS primario para clientes WireGuard"
     )
 
+    WG_CONFIG_WRITE_MODE: str = Field(
+        default="atomic",
+        description=(
+            "Persistencia de wg0.conf: atomic (reescritura atómica agrupada) | "
+            "journal (log de operaciones con compactación periódica)"
+        ),
+    )
+
+    WG_CONFIG_COALESCE_MS: int = Field(
+        default=50,
+        ge=0,
+        le=5000,
+        description="Ventana (ms) para agrupar mutaciones de wg0.conf en una sola escritura",
+    )
+
+    WG_KEYGEN_MODE: str = Field(
+        default="native",
+        description=(
+            "Generación de claves de peers: native (X25519 en proceso) | "
+            "subprocess (wg genkey/pubkey/genpsk)"
+        ),
+    )
+
+    WG_PEER_APPLY_MODE: str = Field(
+        default="immediate",
+        description=(
+            "Aplicación de cambios de peers: immediate (un wg set por cambio) | "
+            "batched (agrupa cambios concurrentes en un solo wg set)"
+        ),
+    )
+
+    WG_JOURNAL_COMPACT_OPS: int = Field(
+        default=500,
+        ge=1,
+        description="Operaciones en el journal antes de compactar wg0.conf",
+    )
+
+    WG_JOURNAL_COMPACT_SECONDS: int = Field(
+        default=300,
+        ge=1,
+        description="Segundos máximos entre compactaciones del journal de wg0.conf",
+    )
+
     # =========================================================================
     # OUTLINE VPN
     # =========================================================================
@@ -344,6 +477,66 @@ class Settings(BaseSettings):
     LOG_FILE_PATH: str = Field(
         default="./logs/vpn_manager.log", description="Ruta del archivo de logs"
     )
+    LOG_TAIL_MAX_SCAN_MB: int = Field(
+        default=64,
+        ge=1,
+        le=4096,
+        description="Máximo de MB leídos desde el final del log al filtrar en el panel admin",
+    )
+    LOG_STREAM_POLL_SECONDS: float = Field(
+        default=1.0,
+        ge=0.1,
+        le=30,
+        description="Intervalo de sondeo del archivo de log en el modo en vivo",
+    )
+    LOG_STREAM_HEARTBEAT_SECONDS: int = Field(
+        default=15,
+        ge=1,
+        le=300,
+        description="Segundos sin logs nuevos tras los que se envía un keep-alive SSE",
+    )
+    LOG_ENQUEUE: bool = Field(
+        default=True,
+        description="Escribir los logs desde un hilo de fondo sin bloquear el event loop",
+    )
+    LOG_JSON_ENABLED: bool = Field(
+        default=True,
+        description="Escribir además un log estructurado (JSON lines) con índice de tiempo",
+    )
+    LOG_JSON_PATH: Optional[str] = Field(
+        default=None,
+        description="Ruta del log JSON (por defecto LOG_FILE_PATH con extensión .jsonl)",
+    )
+    LOG_JSON_ROTATION_MB: int = Field(
+        default=10,
+        ge=1,
+        le=1024,
+        description="Tamaño en MB a partir del cual se rota el log JSON",
+    )
+    LOG_JSON_RETENTION_FILES: int = Field(
+        default=30,
+        ge=0,
+        le=1000,
+        description="Archivos rotados del log JSON que se conservan",
+    )
+    LOG_JSON_INDEX_INTERVAL_SECONDS: int = Field(
+        default=60,
+        ge=1,
+        le=3600,
+        description="Granularidad en segundos del índice de offsets del log JSON",
+    )
+    LOG_SAMPLING_RATE_PER_SECOND: float = Field(
+        default=20.0,
+        ge=0,
+        le=10000,
+        description="Registros DEBUG/INFO por segundo y módulo escritos a disco (0 = sin límite)",
+    )
+    LOG_SAMPLING_BURST: int = Field(
+        default=200,
+        ge=1,
+        le=100000,
+        description="Ráfaga de registros por módulo permitida antes de muestrear",
+    )
 
     ENABLE_METRICS: bool = Field(
         default=False,
@@ -383,6 +576,141 @@ class Settings(BaseSettings):
         default=None, description="Wallet BSC donde recibir los fondos"
     )
 
+    # =========================================================================
+    # NOTIFICACIONES SALIENTES DE TELEGRAM
+    # =========================================================================
+    NOTIFY_WORKERS: int = Field(
+        default=4, ge=1, le=32, description="Workers que envían notificaciones en paralelo"
+    )
+
+    NOTIFY_QUEUE_SIZE: int = Field(
+        default=5000, ge=10, description="Notificaciones pendientes máximas en cola"
+    )
+
+    NOTIFY_GLOBAL_RATE: float = Field(
+        default=25.0,
+        gt=0,
+        le=30,
+        description="Mensajes por segundo en total (Telegram permite ~30)",
+    )
+
+    NOTIFY_PER_CHAT_RATE: float = Field(
+        default=1.0, gt=0, description="Mensajes por segundo sostenidos a un mismo chat"
+    )
+
+    NOTIFY_PER_CHAT_BURST: int = Field(
+        default=3, ge=1, description="Ráfaga máxima de mensajes a un mismo chat"
+    )
+
+    NOTIFY_MAX_RETRIES: int = Field(
+        default=3, ge=0, le=10, description="Reintentos ante RetryAfter o errores de red"
+    )
+
+    # =========================================================================
+    # PLANIFICADOR DE EXPIRACIONES
+    # =========================================================================
+    EXPIRY_SCHEDULER_ENABLED: bool = Field(
+        default=True,
+        description="Expirar órdenes, paquetes, facturas y planes a la hora exacta "
+        "(si es False se usan los jobs de sondeo periódico)",
+    )
+
+    EXPIRY_RECONCILE_INTERVAL_SECONDS: int = Field(
+        default=3600,
+        ge=60,
+        le=86400,
+        description="Segundos entre barridos de reconciliación del planificador de expiraciones",
+    )
+
+    # =========================================================================
+    # INSTANTÁNEA DE MÉTRICAS VPN
+    # =========================================================================
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: int = Field(
+        default=30,
+        ge=5,
+        le=3600,
+        description="Segundos entre refrescos de la instantánea de métricas de Outline y WireGuard",
+    )
+    METRICS_SNAPSHOT_MAX_STALE_SECONDS: int = Field(
+        default=300,
+        ge=10,
+        description="Antigüedad máxima de la instantánea antes de esperar un refresco",
+    )
+
+    # =========================================================================
+    # OPERACIONES MASIVAS SOBRE LLAVES
+    # =========================================================================
+    BULK_KEY_OUTLINE_CONCURRENCY: int = Field(
+        default=8,
+        ge=1,
+        le=100,
+        description="Peticiones simultáneas a Outline al bloquear/borrar llaves en bloque",
+    )
+    BULK_KEY_WG_BATCH_SIZE: int = Field(
+        default=50,
+        ge=1,
+        le=1000,
+        description="Peers de WireGuard por cada invocación de wg set en operaciones masivas",
+    )
+    BULK_KEY_RETRIES: int = Field(
+        default=1,
+        ge=0,
+        le=5,
+        description="Reintentos de las llaves que fallan en una operación masiva",
+    )
+
+    # =========================================================================
+    # CLIENTES HTTP EXTERNOS (Outline, TronDealer)
+    # =========================================================================
+    HTTP_HTTP2_ENABLED: bool = Field(
+        default=True,
+        description="Usar HTTP/2 con los proveedores que lo soportan (requiere el paquete h2)",
+    )
+
+    HTTP_MAX_CONNECTIONS: int = Field(
+        default=20, ge=1, le=200, description="Conexiones máximas por proveedor y event loop"
+    )
+
+    HTTP_MAX_KEEPALIVE: int = Field(
+        default=10, ge=0, le=200, description="Conexiones keep-alive inactivas a conservar"
+    )
+
+    HTTP_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0, ge=1.0, description="Segundos antes de cerrar una conexión inactiva"
+    )
+
+    HTTP_PER_HOST_CONCURRENCY: int = Field(
+        default=8, ge=1, le=100, description="Peticiones simultáneas máximas por host"
+    )
+
+    HTTP_TIMEOUT_CONNECT: float = Field(
+        default=5.0, gt=0, description="Timeout de conexión (segundos)"
+    )
+
+    HTTP_TIMEOUT_READ: float = Field(
+        default=10.0, gt=0, description="Timeout de operaciones de lectura (segundos)"
+    )
+
+    HTTP_TIMEOUT_WRITE: float = Field(
+        default=20.0, gt=0, description="Timeout de operaciones que modifican estado (segundos)"
+    )
+
+    HTTP_TIMEOUT_BULK: float = Field(
+        default=30.0, gt=0, description="Timeout de consultas masivas, p. ej. métricas (segundos)"
+    )
+
+    HTTP_RETRY_ATTEMPTS: int = Field(
+        default=2, ge=0, le=5, description="Reintentos ante errores transitorios"
+    )
+
+    HTTP_RETRY_BACKOFF_BASE: float = Field(
+        default=0.25, gt=0, description="Base del backoff exponencial con jitter (segundos)"
+    )
+
+    HTTP_RETRY_BACKOFF_MAX: float = Field(
+        default=4.0, gt=0, description="Espera máxima entre reintentos (segundos)"
+    )
+
     # =========================================================================
     # DYNAMIC DNS (DuckDNS)
     # =========================================================================
@@ -439,6 +767,70 @@ class Settings(BaseSettings):
             return [x.strip() for x in v.split(",") if x.strip()]
         return v if isinstance(v, list) else ["*"]
 
+    @field_validator("DB_POOL_MODE")
+    @classmethod
+    def validate_db_pool_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("null", "per_loop"):
+            return "null"
+        return v
+
+    @field_validator("WG_CONFIG_WRITE_MODE")
+    @classmethod
+    def validate_wg_config_write_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("atomic", "journal"):
+            return "atomic"
+        return v
+
+    @field_validator("WG_KEYGEN_MODE")
+    @classmethod
+    def validate_wg_keygen_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("native", "subprocess"):
+            return "native"
+        return v
+
+    @field_validator("WG_PEER_APPLY_MODE")
+    @classmethod
+    def validate_wg_peer_apply_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("immediate", "batched"):
+            return "immediate"
+        return v
+
+    @field_validator("RATE_LIMIT_BACKEND")
+    @classmethod
+    def validate_rate_limit_backend(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("auto", "memory", "redis"):
+            return "auto"
+        return v
+
+    @field_validator("API_MODE")
+    @classmethod
+    def validate_api_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("embedded", "standalone"):
+            return "embedded"
+        return v
+
+    @field_validator("API_LOOP")
+    @classmethod
+    def validate_api_loop(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("auto", "asyncio", "uvloop"):
+            return "auto"
+        return v
+
+    @field_validator("API_HTTP")
+    @classmethod
+    def validate_api_http(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ("auto", "h11", "httptools"):
+            return "auto"
+        return v
+
     @field_validator("LOG_LEVEL")
     @classmethod
     def validate_log_level(cls, v: str) -> str:
@@ -504,9 +896,12 @@ class Settings(BaseSettings):
     def database_config(self) -> dict:
         return {
             "url": self.DATABASE_URL,
+            "pool_mode": self.DB_POOL_MODE,
             "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_recycle": self.DB_POOL_RECYCLE,
             "pool_timeout": self.DB_TIMEOUT,
-            "pool_pre_ping": True,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
             "echo": self.is_development,
         }
 
@@ -5,10 +5,13 @@ Author: uSipipo Team
 Version: 2.0.0
 """
 
-from dataclasses import dataclass
+import base64
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from domain.entities.user import User
+
 
 @dataclass
 class AdminUserInfo:
@@ -27,6 +30,46 @@ class AdminUserInfo:
     last_activity: Optional[datetime] = None
 
 
+@dataclass(frozen=True)
+class UserListCursor:
+    """Posición de paginación keyset del listado de usuarios: (created_at, telegram_id)."""
+
+    created_at: datetime
+    telegram_id: int
+
+    def encode(self) -> str:
+        """Serializa el cursor como token opaco para la API."""
+        raw = f"{self.created_at.isoformat()}|{self.telegram_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "UserListCursor":
+        """Reconstruye un cursor desde ``encode()``; ValueError si es inválido."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            created_at, telegram_id = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+            return cls(datetime.fromisoformat(created_at), int(telegram_id))
+        except Exception as e:
+            raise ValueError(f"Cursor inválido: {token}") from e
+
+
+@dataclass
+class UserListItem:
+    """Usuario del listado admin con sus conteos de llaves."""
+
+    user: User
+    total_keys: int = 0
+    active_keys: int = 0
+
+
+@dataclass
+class UserListPage:
+    """Página del listado admin de usuarios (más recientes primero)."""
+
+    items: List[UserListItem] = field(default_factory=list)
+    next_cursor: Optional[UserListCursor] = None
+
+
 @dataclass
 class AdminKeyInfo:
     """Información de clave para administración."""
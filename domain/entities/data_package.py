@@ -55,3 +55,13 @@ class DataPackage:
 
     def deactivate(self) -> None:
         self.is_active = False
+
+
+@dataclass
+class PackageConsumption:
+    """Resultado de descontar consumo de un paquete concreto."""
+
+    package_id: uuid.UUID
+    user_id: int
+    bytes_consumed: int
+    remaining_bytes: int
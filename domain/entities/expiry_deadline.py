@@ -0,0 +1,34 @@
+"""
+Vencimientos que vigila el planificador de expiraciones.
+
+Author: uSipipo Team
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Tuple
+
+
+class ExpiryKind(str, Enum):
+    """Tipos de entidad con fecha de vencimiento."""
+
+    CRYPTO_ORDER = "crypto_order"
+    DATA_PACKAGE = "data_package"
+    INVOICE = "invoice"
+    SUBSCRIPTION = "subscription"
+    BILLING_CYCLE = "billing_cycle"
+
+
+@dataclass(order=True, frozen=True)
+class ExpiryDeadline:
+    """Momento en que vence una entidad (ordenable por fecha para el heap)."""
+
+    deadline: datetime
+    kind: ExpiryKind = field(compare=False)
+    entity_id: uuid.UUID = field(compare=False)
+
+    @property
+    def key(self) -> Tuple[ExpiryKind, uuid.UUID]:
+        return self.kind, self.entity_id
@@ -0,0 +1,97 @@
+"""
+Consulta filtrada y paginada de llaves VPN.
+
+Describe los filtros, el orden y la posición (cursor keyset) de un listado
+de llaves para que el repositorio los resuelva en SQL.
+
+Author: uSipipo Team
+"""
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import List, Optional, Union
+
+from domain.entities.vpn_key import KeyType, VpnKey
+
+
+class KeySortField(str, Enum):
+    """Columnas por las que se puede ordenar un listado de llaves."""
+
+    CREATED_AT = "created_at"
+    USED_BYTES = "used_bytes"
+    NAME = "name"
+
+
+@dataclass(frozen=True)
+class KeyCursor:
+    """Posición keyset: valor de la columna de orden + id de la última llave."""
+
+    value: Union[datetime, int, str]
+    key_id: uuid.UUID
+
+    def encode(self) -> str:
+        """Serializa el cursor como token opaco para la API."""
+        value = self.value.isoformat() if isinstance(self.value, datetime) else self.value
+        raw = json.dumps([value, str(self.key_id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str, sort: KeySortField) -> "KeyCursor":
+        """Reconstruye un cursor de ``encode()``; ValueError si es inválido."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            value, key_id = json.loads(base64.urlsafe_b64decode(padded))
+            if sort == KeySortField.CREATED_AT:
+                value = datetime.fromisoformat(value)
+            elif sort == KeySortField.USED_BYTES:
+                value = int(value)
+            else:
+                value = str(value)
+            return cls(value=value, key_id=uuid.UUID(key_id))
+        except Exception as e:
+            raise ValueError(f"Cursor inválido: {token}") from e
+
+
+@dataclass
+class KeyQuery:
+    """
+    Filtros, orden y paginación de un listado de llaves.
+
+    Los filtros en None no se aplican. ``limit=None`` retorna todas las
+    llaves que cumplan los filtros, sin paginar.
+    """
+
+    key_type: Optional[KeyType] = None
+    is_active: Optional[bool] = None
+    user_id: Optional[int] = None
+    expiring_within: Optional[timedelta] = None
+    over_quota: Optional[bool] = None
+    sort: KeySortField = KeySortField.CREATED_AT
+    descending: bool = True
+    limit: Optional[int] = 20
+    cursor: Optional[KeyCursor] = None
+
+    @property
+    def has_filters(self) -> bool:
+        return any(
+            value is not None
+            for value in (
+                self.key_type,
+                self.is_active,
+                self.user_id,
+                self.expiring_within,
+                self.over_quota,
+            )
+        )
+
+
+@dataclass
+class KeyPage:
+    """Página de llaves y cursor de la siguiente (None si es la última)."""
+
+    items: List[VpnKey] = field(default_factory=list)
+    next_cursor: Optional[KeyCursor] = None
@@ -35,6 +35,8 @@ class VpnKey:
     # Métricas de uso (sincronizadas desde los servidores VPN)
     used_bytes: int = 0  # Tráfico consumido en bytes
     last_seen_at: Optional[datetime] = None  # Última actividad del cliente
+    # Último contador bruto del servidor; None = llave previa al medidor por deltas
+    usage_counter_bytes: Optional[int] = 0
 
     data_limit_bytes: int = 5 * 1024**3  # 5 GB por defecto
     billing_reset_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -30,8 +30,14 @@ class IAdminUserService(ABC):
         pass
 
     @abstractmethod
-    async def get_users_paginated(self, page: int, per_page: int, current_user_id: int) -> Dict:
-        """Obtener usuarios paginados."""
+    async def get_users_paginated(
+        self,
+        page: int,
+        per_page: int,
+        current_user_id: int,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """Obtener usuarios paginados (keyset; ``cursor`` = next_cursor anterior)."""
         pass
 
     @abstractmethod
@@ -80,6 +86,22 @@ class IAdminKeyService(ABC):
         """Obtener todas las claves de todos los usuarios."""
         pass
 
+    @abstractmethod
+    async def get_keys_page(
+        self,
+        current_user_id: int,
+        key_filter: str = "all",
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Obtener una página filtrada de claves (keyset; ``cursor`` = next_cursor)."""
+        pass
+
+    @abstractmethod
+    async def get_key_info(self, key_id: str, current_user_id: int) -> Optional[Dict]:
+        """Obtener la información de una clave."""
+        pass
+
     @abstractmethod
     async def delete_key_from_servers(self, key_id: str, key_type: str) -> bool:
         """Eliminar una clave de los servidores VPN (WireGuard y Outline)."""
@@ -95,6 +117,11 @@ class IAdminKeyService(ABC):
         """Eliminar completamente una clave (servidores + BD)."""
         pass
 
+    @abstractmethod
+    async def delete_keys_complete(self, keys: List[Key]) -> Dict[str, Any]:
+        """Eliminar completamente varias claves en bloque (servidores + BD)."""
+        pass
+
     @abstractmethod
     async def toggle_key_status(self, key_id: str, active: bool) -> Dict:
         """Activar o desactivar una clave VPN."""
@@ -1,5 +1,5 @@
 import uuid
-from typing import List, Optional, Protocol
+from typing import Dict, List, Optional, Protocol
 
 from domain.entities.consumption_billing import BillingStatus, ConsumptionBilling
 
@@ -60,6 +60,21 @@ class IConsumptionBillingRepository(Protocol):
         """Agrega consumo a un ciclo activo."""
         ...
 
+    async def add_consumption_by_user(
+        self, user_id: int, mb_used: float, current_user_id: int
+    ) -> Optional[ConsumptionBilling]:
+        """
+        Agrega consumo al ciclo activo del usuario de forma atómica.
+        Retorna el ciclo actualizado o None si no tiene ciclo activo.
+        """
+        ...
+
+    async def add_consumption_batch(
+        self, usage_by_user: Dict[int, float], current_user_id: int
+    ) -> Dict[int, ConsumptionBilling]:
+        """Aplica consumo a los ciclos activos de varios usuarios en una sola operación."""
+        ...
+
     async def delete(self, billing_id: uuid.UUID, current_user_id: int) -> bool:
         """Elimina un ciclo de facturación de la base de datos."""
         ...
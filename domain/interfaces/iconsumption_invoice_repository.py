@@ -62,6 +62,10 @@ class IConsumptionInvoiceRepository(Protocol):
         """Marca una factura como expirada."""
         ...
 
+    async def expire_pending(self, current_user_id: int) -> List[ConsumptionInvoice]:
+        """Expira en bloque las facturas pendientes vencidas y las retorna."""
+        ...
+
     async def update_status(
         self, invoice_id: uuid.UUID, status: InvoiceStatus, current_user_id: int
     ) -> bool:
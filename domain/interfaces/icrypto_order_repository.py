@@ -38,6 +38,11 @@ class ICryptoOrderRepository(ABC):
     async def mark_expired(self, order_id: uuid.UUID) -> bool:
         pass
 
+    @abstractmethod
+    async def expire_pending(self) -> List[CryptoOrder]:
+        """Expira en bloque las órdenes pendientes vencidas y las retorna."""
+        pass
+
     @abstractmethod
     async def get_expired_orders_with_wallets(self, limit: int = 100) -> List[CryptoOrder]:
         """Obtiene órdenes expiradas que tienen wallets asignadas."""
@@ -32,6 +32,11 @@ class IWebhookTokenRepository(ABC):
     async def get_by_hash(self, token_hash: str) -> Optional[WebhookToken]:
         pass
 
+    @abstractmethod
+    async def register_if_absent(self, token: WebhookToken) -> bool:
+        """Registra el token de forma atómica; False si ya existe uno vigente."""
+        pass
+
     @abstractmethod
     async def mark_used(self, token_id: uuid.UUID) -> bool:
         pass
@@ -1,7 +1,7 @@
 import uuid
-from typing import List, Optional, Protocol
+from typing import Dict, List, Optional, Protocol
 
-from domain.entities.data_package import DataPackage
+from domain.entities.data_package import DataPackage, PackageConsumption
 
 
 class IDataPackageRepository(Protocol):
@@ -36,6 +36,15 @@ class IDataPackageRepository(Protocol):
         """Actualiza el uso de datos de un paquete."""
         ...
 
+    async def consume_bytes(
+        self, usage_by_user: Dict[int, int], current_user_id: int
+    ) -> List[PackageConsumption]:
+        """
+        Descuenta el consumo de cada usuario de sus paquetes válidos, en orden
+        de expiración, y retorna lo descontado por paquete.
+        """
+        ...
+
     async def deactivate(self, package_id: uuid.UUID, current_user_id: int) -> bool:
         """Desactiva un paquete."""
         ...
@@ -47,3 +56,7 @@ class IDataPackageRepository(Protocol):
     async def get_expired_packages(self, current_user_id: int) -> List[DataPackage]:
         """Recupera todos los paquetes activos que han expirado."""
         ...
+
+    async def deactivate_expired(self, current_user_id: int) -> List[DataPackage]:
+        """Desactiva en bloque los paquetes activos vencidos y los retorna."""
+        ...
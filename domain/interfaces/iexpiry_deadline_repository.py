@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import List, Protocol
+
+from domain.entities.expiry_deadline import ExpiryDeadline
+
+
+class IExpiryDeadlineRepository(Protocol):
+    """
+    Contrato para leer los próximos vencimientos de todas las entidades
+    con fecha límite (órdenes, paquetes, facturas, planes y ciclos).
+    """
+
+    async def get_upcoming(self, until: datetime, cycle_days: int) -> List[ExpiryDeadline]:
+        """Recupera, en una sola consulta, los vencimientos pendientes hasta ``until``."""
+        ...
@@ -1,6 +1,8 @@
 import uuid
-from typing import List, Optional, Protocol
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
 
+from domain.entities.key_query import KeyPage, KeyQuery
 from domain.entities.vpn_key import VpnKey
 
 
@@ -38,10 +40,43 @@ class IKeyRepository(Protocol):
         """Obtiene todas las llaves del sistema (activas e inactivas)."""
         ...
 
+    async def query_keys(self, query: KeyQuery, current_user_id: int) -> KeyPage:
+        """Listado filtrado, ordenado y paginado (keyset) de llaves."""
+        ...
+
+    async def count_keys(self, query: KeyQuery, current_user_id: int, estimate: bool = True) -> int:
+        """Cuenta llaves que cumplen los filtros; ``estimate`` permite aproximar sin filtros."""
+        ...
+
+    async def get_key_stats(self, current_user_id: int, since: datetime) -> Dict[str, Any]:
+        """
+        Agregados por tipo de llave: total, active, created (desde ``since``) y
+        used_bytes, más los totales en la clave "by_type".
+        """
+        ...
+
     async def update_usage(self, key_id: uuid.UUID, used_bytes: int, current_user_id: int) -> bool:
         """Actualiza el uso de datos de una llave."""
         ...
 
+    async def bulk_update_usage(
+        self,
+        usages: Sequence[Tuple[uuid.UUID, int, int, Optional[int]]],
+        current_user_id: int,
+    ) -> List[uuid.UUID]:
+        """
+        Aplica en bloque (key_id, delta_bytes, usage_counter_bytes,
+        previous_counter): suma el delta a used_bytes solo si el contador
+        guardado sigue siendo previous_counter. Retorna las llaves actualizadas.
+        """
+        ...
+
+    async def set_active_bulk(
+        self, key_ids: Sequence[uuid.UUID], is_active: bool, current_user_id: int
+    ) -> int:
+        """Activa o desactiva muchas llaves en bloque. Retorna filas afectadas."""
+        ...
+
     async def reset_data_usage(self, key_id: uuid.UUID, current_user_id: int) -> bool:
         """Resetea el uso de datos de una llave."""
         ...
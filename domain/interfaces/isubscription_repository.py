@@ -1,7 +1,7 @@
 """Repository interface for subscription operations."""
 
 import uuid
-from typing import List, Optional, Protocol
+from typing import Iterable, List, Optional, Protocol, Set
 
 from domain.entities.subscription_plan import SubscriptionPlan
 
@@ -31,6 +31,10 @@ class ISubscriptionRepository(Protocol):
         """Get active subscription for a user."""
         ...
 
+    async def get_premium_user_ids(self, user_ids: Iterable[int], current_user_id: int) -> Set[int]:
+        """Subset of user_ids with an active, unexpired subscription (one query)."""
+        ...
+
     async def get_expiring_plans(self, days: int, current_user_id: int) -> List[SubscriptionPlan]:
         """Get plans expiring within N days."""
         ...
@@ -39,6 +43,10 @@ class ISubscriptionRepository(Protocol):
         """Get all expired plans."""
         ...
 
+    async def deactivate_expired(self, current_user_id: int) -> List[SubscriptionPlan]:
+        """Deactivate all expired plans in bulk and return them."""
+        ...
+
     async def deactivate(self, plan_id: uuid.UUID, current_user_id: int) -> bool:
         """Deactivate a subscription plan."""
         ...
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 from domain.entities.balance import Balance
 
@@ -36,3 +36,17 @@ class ITransactionRepository(ABC):
             Retorna Balance con 0 stars si no hay transacciones.
         """
         pass
+
+    @abstractmethod
+    async def get_balances(self, user_ids: Iterable[int]) -> Dict[int, Balance]:
+        """
+        Obtiene el saldo de varios usuarios en una sola consulta.
+
+        Args:
+            user_ids: IDs de Telegram de los usuarios.
+
+        Returns:
+            Diccionario user_id -> Balance; los usuarios sin transacciones
+            tienen 0 stars.
+        """
+        pass
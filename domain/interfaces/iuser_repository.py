@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Protocol
 
+from domain.entities.admin import UserListCursor, UserListPage
 from domain.entities.user import User
 
 
@@ -52,6 +54,27 @@ class IUserRepository(Protocol):
         """Obtiene todos los usuarios registrados."""
         ...
 
+    async def get_users_page(
+        self,
+        current_user_id: int,
+        limit: int,
+        cursor: Optional[UserListCursor] = None,
+    ) -> UserListPage:
+        """
+        Página de usuarios ordenada por (created_at, telegram_id) descendente,
+        con total_keys/active_keys. ``cursor`` es el ``next_cursor`` de la
+        página anterior.
+        """
+        ...
+
+    async def count_users(self, current_user_id: int) -> int:
+        """Cuenta los usuarios registrados."""
+        ...
+
+    async def get_user_stats(self, current_user_id: int, since: datetime) -> Dict[str, int]:
+        """Conteos agregados: total_users, active_users y new_users (desde ``since``)."""
+        ...
+
     async def update_referral_credits(
         self, telegram_id: int, credits_delta: int, current_user_id: int
     ) -> bool:
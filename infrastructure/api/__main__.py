@@ -0,0 +1,21 @@
+"""
+Servidor API como proceso propio: ``python -m infrastructure.api``.
+
+Pensado para ``API_MODE=standalone`` con ``API_WORKERS`` workers; el bot
+(``main.py``) deja entonces de levantar la API en un hilo.
+
+Author: uSipipo Team
+"""
+
+from config import settings
+from infrastructure.api.server import run_api
+from utils.logger import logger
+
+if __name__ == "__main__":
+    if settings.API_MODE != "standalone":
+        logger.warning("⚠️ API_MODE no es standalone: el bot también levantará la API en su hilo")
+    logger.info(
+        f"🌐 API standalone en {settings.API_HOST}:{settings.API_PORT} "
+        f"({settings.API_WORKERS} workers)"
+    )
+    run_api()
@@ -1,4 +1,23 @@
 from infrastructure.api.middleware.rate_limit import RateLimitMiddleware
+from infrastructure.api.middleware.rate_limiter import (
+    InMemoryRateLimiter,
+    RateLimiter,
+    RateLimitRule,
+    RedisRateLimiter,
+    RouteLimits,
+    create_rate_limiter,
+    route_limits_from_settings,
+)
 from infrastructure.api.middleware.security import SecurityHeadersMiddleware
 
-__all__ = ["SecurityHeadersMiddleware", "RateLimitMiddleware"]
+__all__ = [
+    "SecurityHeadersMiddleware",
+    "RateLimitMiddleware",
+    "RateLimiter",
+    "RateLimitRule",
+    "RouteLimits",
+    "InMemoryRateLimiter",
+    "RedisRateLimiter",
+    "create_rate_limiter",
+    "route_limits_from_settings",
+]
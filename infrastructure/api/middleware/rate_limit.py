@@ -1,72 +1,92 @@
-import time
-from collections import defaultdict
-from typing import Dict, List
-
-from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
+import math
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.api.middleware.rate_limiter import (
+    InMemoryRateLimiter,
+    RateLimiter,
+    RateLimitRule,
+    RouteLimits,
+)
 from utils.logger import logger
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
-    Rate limiting middleware using in-memory storage.
-
-    LIMITATION: This implementation uses in-memory storage (defaultdict).
-    - Does NOT persist across worker restarts
-    - Does NOT share state between multiple workers
+    Per-IP rate limiting with per-route limits.
 
-    If running with multiple uvicorn workers (--workers N), the rate limit
-    is applied per-worker, not globally. For production-grade rate limiting,
-    migrate to Redis-based storage (e.g., slowapi with Redis backend).
+    The limiter is pluggable (see ``rate_limiter.py``): ``InMemoryRateLimiter``
+    limits each process on its own, ``RedisRateLimiter`` shares the counters
+    between uvicorn workers. Both use GCRA, O(1) per request.
 
-    TODO: Migrate to slowapi + Redis for multi-worker support:
-        pip install slowapi
-        from slowapi import Limiter
-        from slowapi.util import get_remote_address
-        limiter = Limiter(key_func=get_remote_address, storage_uri=settings.REDIS_URL)
-
-    For now, ensure the server runs with --workers 1 in production.
+    Rejected requests get a 429 with ``Retry-After``; allowed ones carry
+    ``X-RateLimit-Limit`` / ``X-RateLimit-Remaining``. Pure ASGI, so
+    streaming responses are passed through as they are produced.
     """
 
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 60,
+        limiter: Optional[RateLimiter] = None,
+        routes: Optional[RouteLimits] = None,
+    ):
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.requests: Dict[str, List[float]] = defaultdict(list)
-
-    def _cleanup_old_requests(self, ip: str):
-        current_time = time.time()
-        cutoff = current_time - 60
-        self.requests[ip] = [ts for ts in self.requests[ip] if ts > cutoff]
-
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path.startswith("/health"):
-            return await call_next(request)
-
-        client_ip = self._get_client_ip(request)
-
-        self._cleanup_old_requests(client_ip)
-
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            raise HTTPException(
-                status_code=429, detail="Too many requests. Please try again later."
+        self.limiter = limiter or InMemoryRateLimiter()
+        self.routes = routes or RouteLimits([], RateLimitRule("api", requests_per_minute))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/health"):
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.routes.for_path(scope["path"])
+        if rule.unlimited:
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = self._get_client_ip(scope)
+        decision = await self.limiter.hit(f"{rule.name}:{client_ip}", rule)
+
+        if not decision.allowed:
+            logger.warning(f"Rate limit exceeded for IP: {client_ip} ({rule.name})")
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests. Please try again later."},
+                headers={
+                    "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+                    "X-RateLimit-Limit": str(decision.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
             )
+            await response(scope, receive, send)
+            return
 
-        self.requests[client_ip].append(time.time())
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(decision.limit)
+                headers["X-RateLimit-Remaining"] = str(decision.remaining)
+            await send(message)
 
-        return await call_next(request)
+        await self.app(scope, receive, send_with_headers)
 
-    def _get_client_ip(self, request: Request) -> str:
-        forwarded = request.headers.get("x-forwarded-for")
+    def _get_client_ip(self, scope: Scope) -> str:
+        request_headers = Headers(scope=scope)
+        forwarded = request_headers.get("x-forwarded-for")
         if forwarded:
             return forwarded.split(",")[0].strip()
 
-        real_ip = request.headers.get("x-real-ip")
+        real_ip = request_headers.get("x-real-ip")
         if real_ip:
             return real_ip
 
-        if request.client:
-            return request.client.host
+        client = scope.get("client")
+        if client:
+            return client[0]
 
         return "unknown"
@@ -0,0 +1,198 @@
+"""
+Pluggable rate limiters for the API (GCRA).
+
+The Generic Cell Rate Algorithm keeps a single number per key: the
+theoretical arrival time (TAT) of the next request. Each request costs O(1)
+regardless of the limit, and a key whose TAT is in the past is fully
+replenished, so it can be dropped without changing behaviour.
+
+- ``InMemoryRateLimiter``: per-process dict of TATs, idle keys are evicted
+  every ``RATE_LIMIT_EVICTION_SECONDS``.
+- ``RedisRateLimiter``: the same algorithm as a Lua script on ``REDIS_URL``,
+  shared by every uvicorn worker; keys expire on their own (PX = time until
+  fully replenished).
+
+Author: uSipipo Team
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Protocol, Sequence, Tuple
+
+from config import settings
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """``limit`` requests per ``period`` seconds (bursts of up to ``limit``)."""
+
+    name: str
+    limit: int
+    period: float = 60.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.limit <= 0
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+class RateLimiter(Protocol):
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision: ...
+
+    async def close(self) -> None: ...
+
+
+def gcra(tat: Optional[float], now: float, rule: RateLimitRule) -> Tuple[RateLimitDecision, float]:
+    """Applies one request; returns the decision and the TAT to store."""
+    interval = rule.emission_interval
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + interval
+    allow_at = new_tat - rule.period
+    if now < allow_at:
+        return RateLimitDecision(False, rule.limit, 0, allow_at - now), tat
+    remaining = int(math.floor((now - allow_at) / interval + 1e-9))
+    return RateLimitDecision(True, rule.limit, remaining), new_tat
+
+
+class InMemoryRateLimiter:
+    """GCRA limiter for a single process."""
+
+    def __init__(
+        self,
+        eviction_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.eviction_interval = eviction_interval or settings.RATE_LIMIT_EVICTION_SECONDS
+        self._clock = clock
+        self._tats: Dict[str, float] = {}
+        self._next_eviction = clock() + self.eviction_interval
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        now = self._clock()
+        if now >= self._next_eviction:
+            self.evict(now)
+        decision, self._tats[key] = gcra(self._tats.get(key), now, rule)
+        return decision
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drops keys that are fully replenished (TAT in the past)."""
+        now = self._clock() if now is None else now
+        idle = [key for key, tat in self._tats.items() if tat <= now]
+        for key in idle:
+            del self._tats[key]
+        self._next_eviction = now + self.eviction_interval
+        return len(idle)
+
+    async def close(self) -> None:
+        self._tats.clear()
+
+
+# Same algorithm as gcra(), in milliseconds and with the Redis server clock
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat == nil or tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, allow_at - now, 0}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, 0, math.floor((now - allow_at) / interval)}
+"""
+
+
+class RedisRateLimiter:
+    """GCRA limiter shared between workers through Redis."""
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "usipipo:ratelimit:", client=None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url or settings.REDIS_URL)
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(_GCRA_SCRIPT)
+        self._failing = False
+
+    async def hit(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        try:
+            allowed, retry_after_ms, remaining = await self._script(
+                keys=[self._prefix + key],
+                args=[rule.emission_interval * 1000, rule.period * 1000],
+            )
+        except Exception as e:
+            # Fail open: an unavailable Redis must not take the API down
+            if not self._failing:
+                logger.warning(f"⚠️ Redis rate limiter unavailable, allowing requests: {e}")
+                self._failing = True
+            return RateLimitDecision(True, rule.limit, rule.limit)
+        if self._failing:
+            logger.info("✅ Redis rate limiter recovered")
+            self._failing = False
+        return RateLimitDecision(
+            bool(allowed), rule.limit, int(remaining), float(retry_after_ms) / 1000
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class RouteLimits:
+    """Resolves the rule for a path by longest matching prefix."""
+
+    def __init__(self, routes: Sequence[Tuple[str, RateLimitRule]], default: RateLimitRule):
+        self._routes = sorted(routes, key=lambda route: len(route[0]), reverse=True)
+        self.default = default
+
+    def for_path(self, path: str) -> RateLimitRule:
+        for prefix, rule in self._routes:
+            if path.startswith(prefix):
+                return rule
+        return self.default
+
+
+def route_limits_from_settings() -> RouteLimits:
+    return RouteLimits(
+        [
+            ("/api/v1/webhooks", RateLimitRule("webhook", settings.RATE_LIMIT_WEBHOOK_PER_MINUTE)),
+            ("/miniapp/static", RateLimitRule("static", settings.RATE_LIMIT_STATIC_PER_MINUTE)),
+            ("/favicon.ico", RateLimitRule("static", settings.RATE_LIMIT_STATIC_PER_MINUTE)),
+            ("/miniapp", RateLimitRule("miniapp", settings.RATE_LIMIT_MINIAPP_PER_MINUTE)),
+        ],
+        default=RateLimitRule("api", settings.API_RATE_LIMIT),
+    )
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Limiter for ``RATE_LIMIT_BACKEND``."""
+    backend = settings.RATE_LIMIT_BACKEND
+    if backend == "auto":
+        # Several API worker processes need one shared counter per client
+        multi_worker = settings.API_MODE == "standalone" and settings.API_WORKERS > 1
+        backend = "redis" if multi_worker else "memory"
+    if backend == "redis":
+        logger.info("🚦 Rate limiting shared through Redis")
+        return RedisRateLimiter()
+    return InMemoryRateLimiter()
@@ -1,4 +1,5 @@
 import asyncio
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
@@ -9,62 +10,66 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from application.services.common.container import get_service
+from application.services.metrics_snapshot_service import MetricsSnapshotService
 from config import settings
-from infrastructure.api.middleware import RateLimitMiddleware, SecurityHeadersMiddleware
+from infrastructure.api.middleware import (
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+    create_rate_limiter,
+    route_limits_from_settings,
+)
 from infrastructure.api.webhooks import tron_dealer_router
-from infrastructure.api.webhooks.tron_dealer import set_services
-from infrastructure.persistence.database import close_database, get_session_context, init_database
+from infrastructure.api_clients.http_pool import close_http_clients, get_http_metrics
+from infrastructure.notifications import (
+    RemoteNotificationDispatcher,
+    get_bot_channel,
+    get_notification_dispatcher,
+    set_notification_dispatcher,
+)
+from infrastructure.persistence.database import (
+    close_database,
+    dispose_loop_engine,
+    get_pool_metrics,
+    init_database,
+)
+from infrastructure.persistence.postgresql.base_repository import get_audit_context_stats
+from infrastructure.scheduling import get_expiry_scheduler
 from miniapp import router as miniapp_router
-from utils.logger import logger
+from utils.logger import PROCESS_ROLE_ENV, logger
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🔌 Initializing API server...")
 
-    from telegram import Bot
-
-    from application.services.crypto_payment_service import CryptoPaymentService
-    from application.services.webhook_security_service import WebhookSecurityService
-    from infrastructure.persistence.postgresql.crypto_order_repository import (
-        PostgresCryptoOrderRepository,
-    )
-    from infrastructure.persistence.postgresql.crypto_transaction_repository import (
-        PostgresCryptoTransactionRepository,
-        PostgresWebhookTokenRepository,
-    )
-    from infrastructure.persistence.postgresql.user_repository import PostgresUserRepository
     from miniapp.services.miniapp_notification_service import init_notification_service
 
-    # Initialize Telegram Bot for Mini App notifications
-    bot = Bot(token=settings.TELEGRAM_TOKEN)
-    init_notification_service(bot)
-    logger.info("✅ MiniApp Notification Service initialized with Telegram Bot")
-
-    async with get_session_context() as session:
-        token_repo = PostgresWebhookTokenRepository(session)
-        crypto_repo = PostgresCryptoTransactionRepository(session)
-        user_repo = PostgresUserRepository(session)
-        crypto_order_repo = PostgresCryptoOrderRepository(session)
-
-        security_service = WebhookSecurityService(
-            webhook_secret=settings.TRON_DEALER_WEBHOOK_SECRET, token_repo=token_repo
-        )
-
-        payment_service = CryptoPaymentService(
-            crypto_repo=crypto_repo,
-            user_repo=user_repo,
-            crypto_order_repo=crypto_order_repo,
-        )
+    channel = None
+    if settings.API_MODE == "standalone":
+        # Own process group: each worker reaches the bot through the Redis channel
+        await init_database()
+        channel = get_bot_channel()
+        set_notification_dispatcher(RemoteNotificationDispatcher(channel))
+        get_expiry_scheduler().forward_to(channel.post)
+        logger.info("📨 Notifications and expiry deadlines forwarded to the bot process")
 
-        set_services(security_service, payment_service)
+    # Mini App notifications go through the shared outbound dispatcher
+    init_notification_service(get_notification_dispatcher())
+    logger.info("✅ MiniApp Notification Service initialized")
 
     logger.info("✅ API server started")
 
     yield
 
     logger.info("🔌 Shutting down API server...")
-    await bot.close()
+    # Only stops the dispatcher if it was started on this loop (standalone API)
+    await get_notification_dispatcher().close()
+    if channel is not None:
+        await channel.close()
+    await close_http_clients()
+    await app.state.rate_limiter.close()
+    await dispose_loop_engine()
     logger.info("✅ API server stopped")
 
 
@@ -87,7 +92,13 @@ def create_app() -> FastAPI:
     )
 
     app.add_middleware(SecurityHeadersMiddleware)
-    app.add_middleware(RateLimitMiddleware, requests_per_minute=settings.API_RATE_LIMIT)
+    app.state.rate_limiter = create_rate_limiter()
+    app.add_middleware(
+        RateLimitMiddleware,
+        requests_per_minute=settings.API_RATE_LIMIT,
+        limiter=app.state.rate_limiter,
+        routes=route_limits_from_settings(),
+    )
 
     app.include_router(tron_dealer_router, prefix="/api/v1/webhooks")
     app.include_router(miniapp_router)
@@ -107,7 +118,14 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health_check():
-        return {"status": "healthy", "service": "usipipo-api"}
+        return {
+            "status": "healthy",
+            "service": "usipipo-api",
+            "db_pools": get_pool_metrics(),
+            "audit_context": get_audit_context_stats(),
+            "http_clients": get_http_metrics(),
+            "metrics_snapshot": get_service(MetricsSnapshotService).metrics(),
+        }
 
     @app.get("/favicon.ico")
     async def favicon():
@@ -119,6 +137,28 @@ def create_app() -> FastAPI:
     return app
 
 
-def run_api(host: str = "0.0.0.0", port: int = 8000):
-    app = create_app()
-    uvicorn.run(app, host=host, port=port, log_level="info", access_log=True)
+def run_api(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None):
+    """
+    Runs the API with uvicorn.
+
+    With more than one worker uvicorn needs an import string: every worker
+    process builds its own app through the ``create_app`` factory.
+    """
+    workers = workers or settings.API_WORKERS
+    if settings.API_MODE == "standalone":
+        # Los workers heredan el rol y no escriben los logs compartidos del bot
+        os.environ.setdefault(PROCESS_ROLE_ENV, "api")
+    options = dict(
+        host=host or settings.API_HOST,
+        port=port or settings.API_PORT,
+        loop=settings.API_LOOP,
+        http=settings.API_HTTP,
+        log_level="info",
+        access_log=True,
+    )
+    if workers > 1:
+        uvicorn.run(
+            "infrastructure.api.server:create_app", factory=True, workers=workers, **options
+        )
+    else:
+        uvicorn.run(create_app(), **options)
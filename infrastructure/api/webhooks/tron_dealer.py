@@ -1,13 +1,16 @@
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncGenerator, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from application.services.crypto_payment_service import CryptoPaymentService
 from application.services.webhook_security_service import WebhookSecurityService
+from config import settings
+from infrastructure.persistence.database import get_session_context
 from utils.logger import logger
 
 router = APIRouter(tags=["webhooks"])
@@ -33,16 +36,45 @@ def set_services(security_service: WebhookSecurityService, payment_service: Cryp
     _payment_service_instance = payment_service
 
 
-async def get_security_service() -> WebhookSecurityService:
-    if _security_service_instance is None:
-        raise RuntimeError("Security service not initialized")
-    return _security_service_instance
+async def get_webhook_session() -> AsyncGenerator[AsyncSession, None]:
+    # One session per request: requests (and API workers) never share a session
+    async with get_session_context() as session:
+        yield session
 
 
-async def get_payment_service() -> CryptoPaymentService:
-    if _payment_service_instance is None:
-        raise RuntimeError("Payment service not initialized")
-    return _payment_service_instance
+async def get_security_service(
+    session: AsyncSession = Depends(get_webhook_session),
+) -> WebhookSecurityService:
+    if _security_service_instance is not None:
+        return _security_service_instance
+    from infrastructure.persistence.postgresql.crypto_transaction_repository import (
+        PostgresWebhookTokenRepository,
+    )
+
+    return WebhookSecurityService(
+        webhook_secret=settings.TRON_DEALER_WEBHOOK_SECRET,
+        token_repo=PostgresWebhookTokenRepository(session),
+    )
+
+
+async def get_payment_service(
+    session: AsyncSession = Depends(get_webhook_session),
+) -> CryptoPaymentService:
+    if _payment_service_instance is not None:
+        return _payment_service_instance
+    from infrastructure.persistence.postgresql.crypto_order_repository import (
+        PostgresCryptoOrderRepository,
+    )
+    from infrastructure.persistence.postgresql.crypto_transaction_repository import (
+        PostgresCryptoTransactionRepository,
+    )
+    from infrastructure.persistence.postgresql.user_repository import PostgresUserRepository
+
+    return CryptoPaymentService(
+        crypto_repo=PostgresCryptoTransactionRepository(session),
+        user_repo=PostgresUserRepository(session),
+        crypto_order_repo=PostgresCryptoOrderRepository(session),
+    )
 
 
 @router.post("/tron-dealer")
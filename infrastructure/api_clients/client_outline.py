@@ -1,10 +1,33 @@
+import asyncio
 from urllib.parse import quote
 
-import httpx
-
 from config import settings
+from infrastructure.api_clients.http_pool import (
+    OP_BULK,
+    OP_WRITE,
+    HttpClientProfile,
+    HttpRoute,
+    get_http_client,
+)
 from utils.logger import logger
 
+# Shadowbox sirve HTTP/1.1 con certificado autofirmado
+OUTLINE_HTTP_PROFILE = HttpClientProfile(
+    name="outline",
+    verify=False,
+    http2=False,
+    routes=(
+        HttpRoute.build("GET", "/server"),
+        HttpRoute.build("GET", "/access-keys"),
+        HttpRoute.build("POST", "/access-keys", OP_WRITE),
+        HttpRoute.build("PUT", "/access-keys/{id}/name", OP_WRITE),
+        HttpRoute.build("PUT", "/access-keys/{id}/data-limit", OP_WRITE),
+        HttpRoute.build("DELETE", "/access-keys/{id}/data-limit", OP_WRITE),
+        HttpRoute.build("DELETE", "/access-keys/{id}", OP_WRITE),
+        HttpRoute.build("GET", "/metrics/transfer", OP_BULK),
+    ),
+)
+
 
 class OutlineClient:
     """
@@ -14,8 +37,8 @@ class OutlineClient:
 
     def __init__(self):
         self.api_url = settings.OUTLINE_API_URL
-        # Outline utiliza certificados autofirmados por defecto
-        self.client = httpx.AsyncClient(verify=False, timeout=15.0)
+        # Pool compartido por todas las instancias (ver http_pool)
+        self.client = get_http_client(OUTLINE_HTTP_PROFILE)
         self.brand = "uSipipo VPN"
 
     @staticmethod
@@ -27,8 +50,10 @@ class OutlineClient:
     async def get_server_info(self) -> dict:
         """Obtiene estado de salud y estadísticas básicas del servidor."""
         try:
-            server_res = await self.client.get(f"{self.api_url}/server")
-            keys_res = await self.client.get(f"{self.api_url}/access-keys")
+            server_res, keys_res = await asyncio.gather(
+                self.client.get(f"{self.api_url}/server"),
+                self.client.get(f"{self.api_url}/access-keys"),
+            )
 
             server_res.raise_for_status()
 
@@ -149,5 +174,5 @@ class OutlineClient:
             return False
 
     async def close(self):
-        """Cierra la sesión del cliente HTTP."""
+        """Cierra el pool HTTP compartido del event loop actual."""
         await self.client.aclose()
@@ -6,8 +6,26 @@ from typing import Any, Dict, List, Optional
 import httpx
 
 from config import settings
+from infrastructure.api_clients.http_pool import (
+    OP_WRITE,
+    HttpClientProfile,
+    HttpRoute,
+    get_http_client,
+)
 from utils.logger import logger
 
+# All endpoints are POST; read-only ones are marked idempotent so they can be retried
+TRON_DEALER_HTTP_PROFILE = HttpClientProfile(
+    name="trondealer",
+    routes=(
+        HttpRoute.build("POST", "/wallets/assign", OP_WRITE),
+        HttpRoute.build("POST", "/wallets/balance", idempotent=True),
+        HttpRoute.build("POST", "/wallets/transactions", idempotent=True),
+        HttpRoute.build("POST", "/payment/create", OP_WRITE),
+        HttpRoute.build("POST", "/payment/qrcode", idempotent=True),
+    ),
+)
+
 
 class WalletStatus(str, Enum):
     ACTIVE = "active"
@@ -95,23 +113,20 @@ class TronDealerClient:
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.TRON_DEALER_API_KEY
-        self._client = httpx.AsyncClient()
+        # Shared keep-alive pool, owned by the application lifespan (see http_pool)
+        self._client = get_http_client(TRON_DEALER_HTTP_PROFILE)
 
     async def __aenter__(self):
-        if self._client is None:
-            self._client = httpx.AsyncClient()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        # The pooled connections outlive the call; closing them here would
+        # force a new TLS handshake on the next request.
+        return None
 
     async def close(self):
-        """Close the HTTP client connection."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Close the shared HTTP pool for the current event loop."""
+        await self._client.aclose()
 
     @property
     def headers(self):
@@ -140,13 +155,8 @@ class TronDealerClient:
         try:
             logger.debug(f"TronDealer API request: POST {endpoint}")
 
-            # Ensure client is initialized
-            if self._client is None:
-                self._client = httpx.AsyncClient(timeout=30.0)
-                logger.debug("Created new httpx.AsyncClient for TronDealer")
-
-            # Make the async request
-            response = await self._client.post(url, headers=self.headers, json=data, timeout=30.0)
+            # Timeout and retries come from the route's operation class
+            response = await self._client.post(url, headers=self.headers, json=data)
 
             logger.debug(f"TronDealer API response status: {response.status_code}")
 
@@ -3,14 +3,218 @@ import ipaddress
 import os
 import re
 import subprocess
+import threading
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from config import settings
+from infrastructure.api_clients.wireguard_config_writer import WireGuardConfigWriter
+from infrastructure.api_clients.wireguard_keys import generate_keypair, generate_preshared_key
+from infrastructure.api_clients.wireguard_peer_applier import (
+    APPLY_MODE_BATCHED,
+    PeerChange,
+    WireGuardPeerApplier,
+)
 from utils.logger import logger
 
+CLIENT_MARKER = "### CLIENT "
+DISABLED_MARKER = "[DISABLED]"
+
+
+@dataclass
+class WireGuardPeer:
+    """Peer gestionado por el bot dentro de wg0.conf (bloque ### CLIENT)."""
+
+    client_name: str
+    block: str
+    public_key: str = ""
+    preshared_key: Optional[str] = None
+    allowed_ips: str = ""
+    disabled: bool = False
+
+    @property
+    def ip(self) -> Optional[str]:
+        """Primera IP de AllowedIPs sin prefijo (ej: 10.0.0.2)."""
+        if not self.allowed_ips:
+            return None
+        return self.allowed_ips.split(",")[0].strip().split("/")[0]
+
+    @classmethod
+    def from_block(cls, block: str) -> "WireGuardPeer":
+        lines = block.lstrip("\n").splitlines()
+        name = lines[0][len(CLIENT_MARKER) :].strip()
+        disabled = name.endswith(DISABLED_MARKER)
+        if disabled:
+            name = name[: -len(DISABLED_MARKER)].strip()
+
+        peer = cls(client_name=name, block=block, disabled=disabled)
+        for line in lines[1:]:
+            field_name, sep, value = line.partition("=")
+            if not sep:
+                continue
+            field_name = field_name.strip()
+            if field_name == "PublicKey" and not peer.public_key:
+                peer.public_key = value.strip()
+            elif field_name == "PresharedKey" and peer.preshared_key is None:
+                peer.preshared_key = value.strip()
+            elif field_name == "AllowedIPs" and not peer.allowed_ips:
+                peer.allowed_ips = value.strip()
+        return peer
+
+
+class WireGuardPeerRegistry:
+    """
+    Índice en memoria de wg0.conf.
+
+    Mantiene los bloques ### CLIENT indexados por client_name, public key e IP,
+    y un bitmap de IPs libres de la red del servidor para que asignar la
+    siguiente IP no requiera recorrer network.hosts().
+    """
+
+    def __init__(self, header: str, peers: List[WireGuardPeer]):
+        self.header = header
+        self.peers: Dict[str, WireGuardPeer] = {}
+        self._by_public_key: Dict[str, WireGuardPeer] = {}
+        self._by_ip: Dict[str, WireGuardPeer] = {}
+
+        self.network: Optional[ipaddress.IPv4Network] = None
+        self._free_mask = 0
+
+        addr_match = re.search(r"Address\s*=\s*([\d.]+)", header)
+        if addr_match:
+            self.network = ipaddress.IPv4Interface(f"{addr_match.group(1)}/24").network
+            # Bits 1..n-2: hosts de la red; el .1 queda reservado al servidor
+            self._free_mask = ((1 << (self.network.num_addresses - 1)) - 1) & ~0b11
+
+        # Peers no gestionados por el bot (sin marcador) también ocupan IP
+        for ip in re.findall(r"AllowedIPs\s*=\s*([\d.]+)", header):
+            self._mark_used(ip)
+
+        for peer in peers:
+            self._index(peer)
+
+    @classmethod
+    def parse(cls, content: str) -> "WireGuardPeerRegistry":
+        """Construye el registro a partir del contenido completo de wg0.conf."""
+        header_lines: List[str] = []
+        blocks: List[List[str]] = []
+
+        for line in content.splitlines(keepends=True):
+            if line.startswith(CLIENT_MARKER):
+                blocks.append([line])
+            elif blocks:
+                blocks[-1].append(line)
+            else:
+                header_lines.append(line)
+
+        peers = [WireGuardPeer.from_block("".join(block)) for block in blocks]
+        return cls("".join(header_lines), peers)
+
+    def __len__(self) -> int:
+        return len(self.peers)
+
+    def get(self, client_name: str) -> Optional[WireGuardPeer]:
+        return self.peers.get(client_name)
+
+    def get_by_public_key(self, public_key: str) -> Optional[WireGuardPeer]:
+        return self._by_public_key.get(public_key)
+
+    def get_by_ip(self, ip: str) -> Optional[WireGuardPeer]:
+        return self._by_ip.get(ip)
+
+    def next_available_ip(self) -> str:
+        """Retorna la IP libre más baja de la red (sin reservarla)."""
+        if self.network is None:
+            raise Exception("No se encontró la dirección base en wg0.conf")
+        if not self._free_mask:
+            raise Exception("No hay IPs disponibles en el rango de WireGuard")
+        offset = (self._free_mask & -self._free_mask).bit_length() - 1
+        return str(self.network.network_address + offset)
+
+    def add(self, peer: WireGuardPeer) -> None:
+        self._index(peer)
+
+    def remove(self, client_name: str) -> Optional[WireGuardPeer]:
+        peer = self.peers.pop(client_name, None)
+        if peer is None:
+            return None
+        if self._by_public_key.get(peer.public_key) is peer:
+            del self._by_public_key[peer.public_key]
+        if peer.ip and self._by_ip.get(peer.ip) is peer:
+            del self._by_ip[peer.ip]
+            self._mark_free(peer.ip)
+        return peer
+
+    def set_disabled(self, client_name: str, disabled: bool) -> bool:
+        """Marca o desmarca el bloque con [DISABLED]. Retorna True si cambió."""
+        peer = self.peers.get(client_name)
+        if peer is None or peer.disabled == disabled:
+            return False
+
+        old_marker = f"{CLIENT_MARKER}{client_name}" + (
+            f" {DISABLED_MARKER}" if peer.disabled else ""
+        )
+        new_marker = f"{CLIENT_MARKER}{client_name}" + (f" {DISABLED_MARKER}" if disabled else "")
+        peer.block = peer.block.replace(old_marker, new_marker, 1)
+        peer.disabled = disabled
+        return True
+
+    def apply(self, op: Dict[str, Any]) -> None:
+        """
+        Aplica una operación del journal. Es idempotente para poder
+        reaplicar entradas ya incluidas en una compactación.
+        """
+        action = op.get("op")
+        client_name = op.get("client_name", "")
+        if action == "add":
+            peer = WireGuardPeer.from_block(op["block"])
+            if peer.client_name not in self.peers:
+                self.add(peer)
+        elif action == "remove":
+            self.remove(client_name)
+        elif action == "disable":
+            self.set_disabled(client_name, True)
+        elif action == "enable":
+            self.set_disabled(client_name, False)
+
+    def render(self) -> str:
+        """Serializa el registro al formato de wg0.conf."""
+        content = self.header + "".join(peer.block for peer in self.peers.values())
+        return content.strip() + "\n"
+
+    def _index(self, peer: WireGuardPeer) -> None:
+        self.peers[peer.client_name] = peer
+        if peer.public_key:
+            self._by_public_key[peer.public_key] = peer
+        if peer.ip:
+            self._by_ip[peer.ip] = peer
+            self._mark_used(peer.ip)
+
+    def _offset(self, ip: str) -> Optional[int]:
+        if self.network is None:
+            return None
+        try:
+            address = ipaddress.IPv4Address(ip)
+        except ValueError:
+            return None
+        if address not in self.network:
+            return None
+        return int(address) - int(self.network.network_address)
+
+    def _mark_used(self, ip: str) -> None:
+        offset = self._offset(ip)
+        if offset is not None:
+            self._free_mask &= ~(1 << offset)
+
+    def _mark_free(self, ip: str) -> None:
+        offset = self._offset(ip)
+        if offset is not None and 1 < offset < self.network.num_addresses - 1:
+            self._free_mask |= 1 << offset
+
 
 class WireGuardClient:
     """
@@ -30,6 +234,34 @@ class WireGuardClient:
         self._cache_ttl = timedelta(seconds=10)  # Cache for 10 seconds
         self._cache_lock = asyncio.Lock()
 
+        # Índice de wg0.conf; se recarga solo si cambia el mtime del archivo
+        self._registry: Optional[WireGuardPeerRegistry] = None
+        self._registry_mtime: Optional[int] = None
+
+        # Las mutaciones se serializan con este lock (el cliente se comparte entre
+        # el loop del bot y el del API) y se persisten a través de un único
+        # escritor que agrupa ráfagas en una sola escritura
+        self._mutation_lock = threading.Lock()
+        self._config_writer = WireGuardConfigWriter(
+            conf_path=lambda: self.conf_path,
+            render=self._render_config,
+            mode=settings.WG_CONFIG_WRITE_MODE,
+            coalesce_delay=settings.WG_CONFIG_COALESCE_MS / 1000,
+            compact_every=settings.WG_JOURNAL_COMPACT_OPS,
+            compact_interval=settings.WG_JOURNAL_COMPACT_SECONDS,
+            on_flushed=self._refresh_registry_mtime,
+        )
+
+        # Claves generadas en proceso (native) o con `wg genkey` (subprocess);
+        # los cambios de peers pueden agruparse en un solo `wg set` (batched)
+        self.keygen_mode = settings.WG_KEYGEN_MODE
+        self.apply_mode = settings.WG_PEER_APPLY_MODE
+        self._peer_applier = WireGuardPeerApplier(
+            interface=lambda: self.interface,
+            run_cmd=lambda cmd: self._run_cmd(cmd),
+            coalesce_delay=settings.WG_CONFIG_COALESCE_MS / 1000,
+        )
+
         os.makedirs(self.clients_dir, exist_ok=True)
 
     async def _run_cmd(self, cmd: str, require_admin: bool = False, retries: int = 2) -> str:
@@ -98,23 +330,68 @@ class WireGuardClient:
                 )
             self._permissions_checked = True
 
+    def _get_registry(self) -> WireGuardPeerRegistry:
+        """
+        Retorna el registro de peers, recargando wg0.conf solo si su mtime
+        cambió desde la última lectura (ej: edición manual o wg-quick).
+        En modo journal se reaplican las operaciones aún no compactadas.
+        """
+        if self._registry is not None and self._config_writer.has_pending:
+            # Hay cambios en memoria aún no persistidos: no recargar del disco
+            return self._registry
+
+        mtime = self.conf_path.stat().st_mtime_ns
+        if self._registry is None or mtime != self._registry_mtime:
+            registry = WireGuardPeerRegistry.parse(self.conf_path.read_text())
+            for op in self._config_writer.read_journal():
+                registry.apply(op)
+            self._registry = registry
+            self._registry_mtime = mtime
+            logger.debug(f"WireGuard: registro cargado con {len(registry)} peers")
+        return self._registry
+
+    def _render_config(self) -> str:
+        with self._mutation_lock:
+            return self._registry.render() if self._registry is not None else ""
+
+    def _refresh_registry_mtime(self) -> None:
+        self._registry_mtime = self.conf_path.stat().st_mtime_ns
+
+    async def _persist(self, op: Dict[str, Any]) -> None:
+        """Espera a que una mutación ya aplicada al registro quede en disco."""
+        await self._config_writer.submit(op)
+
+    async def _persist_many(self, ops: List[Dict[str, Any]]) -> None:
+        """Como ``_persist`` para un lote: un solo volcado para todas las mutaciones."""
+        await self._config_writer.submit_many(ops)
+
+    async def close(self) -> None:
+        """Persiste cambios pendientes (y compacta el journal) antes de cerrar."""
+        await self._peer_applier.close()
+        await self._config_writer.close()
+
+    async def _generate_keys(self) -> Tuple[str, str, str]:
+        """Retorna (privada, pública, precompartida) para un peer nuevo."""
+        if self.keygen_mode == "subprocess":
+            priv_key = await self._run_cmd("wg genkey")
+            pub_key = await self._run_cmd(f"echo '{priv_key}' | wg pubkey")
+            psk = await self._run_cmd("wg genpsk")
+            return priv_key, pub_key, psk
+
+        priv_key, pub_key = generate_keypair()
+        return priv_key, pub_key, generate_preshared_key()
+
+    async def _set_peer(self, public_key: str, args: str, preshared_key: Optional[str] = None):
+        """Aplica `wg set <iface> peer <public_key> <args>` (agrupado en modo batched)."""
+        change = PeerChange(public_key=public_key, args=args, preshared_key=preshared_key)
+        if self.apply_mode == APPLY_MODE_BATCHED:
+            await self._peer_applier.apply(change)
+        else:
+            await self._peer_applier.run_single(change)
+
     async def get_next_available_ip(self) -> str:
         try:
-            content = self.conf_path.read_text()
-            addr_match = re.search(r"Address\s*=\s*([\d.]+)", content)
-            if not addr_match:
-                raise Exception("No se encontró la dirección base en wg0.conf")
-
-            network = ipaddress.IPv4Interface(f"{addr_match.group(1)}/24").network
-            used_ips = set(re.findall(r"AllowedIPs\s*=\s*([\d.]+)", content))
-            server_ip = network.network_address + 1
-
-            for ip in network.hosts():
-                str_ip = str(ip)
-                if str_ip not in used_ips and str_ip != str(server_ip):
-                    return str_ip
-
-            raise Exception("No hay IPs disponibles en el rango de WireGuard")
+            return self._get_registry().next_available_ip()
         except Exception as e:
             logger.error(f"Error calculando IP: {e}")
             raise
@@ -124,39 +401,28 @@ class WireGuardClient:
 
         client_name = f"tg_{user_id}_{uuid.uuid4().hex[:4]}"
 
-        priv_key = await self._run_cmd("wg genkey")
-        pub_key = await self._run_cmd(f"echo '{priv_key}' | wg pubkey")
-        psk = await self._run_cmd("wg genpsk")
+        priv_key, pub_key, psk = await self._generate_keys()
 
-        client_ip = await self.get_next_available_ip()
         server_pub_key = settings.WG_SERVER_PUBKEY or await self._run_cmd(
             f"wg show {self.interface} public-key"
         )
 
-        peer_block = (
-            f"\n### CLIENT {client_name}\n"
-            f"[Peer]\n"
-            f"PublicKey = {pub_key}\n"
-            f"PresharedKey = {psk}\n"
-            f"AllowedIPs = {client_ip}/32\n"
-        )
-
-        with open(self.conf_path, "a") as f:
-            f.write(peer_block)
+        # Asignar IP y registrar el peer de forma atómica respecto a otras
+        # creaciones concurrentes; la escritura a disco se agrupa después
+        with self._mutation_lock:
+            client_ip = self._get_registry().next_available_ip()
+            peer_block = (
+                f"\n### CLIENT {client_name}\n"
+                f"[Peer]\n"
+                f"PublicKey = {pub_key}\n"
+                f"PresharedKey = {psk}\n"
+                f"AllowedIPs = {client_ip}/32\n"
+            )
+            self._get_registry().add(WireGuardPeer.from_block(peer_block))
 
-        psk_file_path = f"/tmp/{client_name}.psk"
-        try:
-            with open(psk_file_path, "w") as f:
-                f.write(psk)
+        await self._persist({"op": "add", "block": peer_block})
 
-            cmd = (
-                f"wg set {self.interface} peer {pub_key} "
-                f"allowed-ips {client_ip}/32 preshared-key {psk_file_path}"
-            )
-            await self._run_cmd(cmd)
-        finally:
-            if os.path.exists(psk_file_path):
-                os.remove(psk_file_path)
+        await self._set_peer(pub_key, f"allowed-ips {client_ip}/32", preshared_key=psk)
 
         client_conf = self._build_client_config(priv_key, client_ip, server_pub_key, psk)
         client_file = self.clients_dir / f"{self.interface}-{client_name}.conf"
@@ -194,20 +460,17 @@ PersistentKeepalive = 15
 
     async def delete_peer(self, pub_key: str, client_name: str) -> bool:
         try:
-            content = self.conf_path.read_text()
+            peer = self._get_registry().get(client_name)
 
-            pk_pattern = rf"### CLIENT {re.escape(client_name)}.*?PublicKey\s*=\s*([^\n]+)"
-            match = re.search(pk_pattern, content, flags=re.DOTALL)
-
-            if match:
-                found_pub_key = match.group(1).strip()
-                await self._run_cmd(f"wg set {self.interface} peer {found_pub_key} remove")
+            if peer and peer.public_key:
+                await self._set_peer(peer.public_key, "remove")
             elif pub_key:
-                await self._run_cmd(f"wg set {self.interface} peer {pub_key} remove")
+                await self._set_peer(pub_key, "remove")
 
-            pattern = rf"### CLIENT {re.escape(client_name)}.*?(?=\n### CLIENT|\Z)"
-            new_content = re.sub(pattern, "", content, flags=re.DOTALL)
-            self.conf_path.write_text(new_content.strip() + "\n")
+            with self._mutation_lock:
+                removed = self._get_registry().remove(client_name)
+            if removed is not None:
+                await self._persist({"op": "remove", "client_name": client_name})
 
             client_file = self.clients_dir / f"{self.interface}-{client_name}.conf"
             if client_file.exists():
@@ -231,19 +494,16 @@ PersistentKeepalive = 15
                 logger.warning(f"Archivo de configuración no encontrado: {self.conf_path}")
                 return {"transfer_total": 0}
 
-            content = self.conf_path.read_text()
-
-            pk_pattern = rf"### CLIENT {re.escape(client_name)}.*?PublicKey\s*=\s*([^\n]+)"
-            match = re.search(pk_pattern, content, flags=re.DOTALL)
+            peer = self._get_registry().get(client_name)
 
-            if not match:
+            if peer is None or not peer.public_key:
                 logger.warning(
                     f"WireGuard: Cliente '{client_name}' no encontrado en configuración "
                     f"({self.conf_path})"
                 )
                 return {"transfer_total": 0}
 
-            target_pub_key = match.group(1).strip()
+            target_pub_key = peer.public_key
             logger.debug(
                 f"WireGuard: Cliente '{client_name}' encontrado con PK {target_pub_key[:16]}..."
             )
@@ -252,11 +512,14 @@ PersistentKeepalive = 15
 
             for peer in all_usage:
                 if peer["public_key"] == target_pub_key:
-                    logger.info(
-                        f"WireGuard: Métricas para '{client_name}' - "
-                        f"RX: {peer['rx']/(1024**2):.2f}MB, "
-                        f"TX: {peer['tx']/(1024**2):.2f}MB, "
-                        f"Total: {peer['total']/(1024**2):.2f}MB"
+                    # Se llama por llave en cada sincronización: DEBUG y formato diferido
+                    logger.bind(key_id=client_name, bytes_total=peer["total"]).debug(
+                        "WireGuard: Métricas para '{}' - RX: {:.2f}MB, TX: {:.2f}MB, "
+                        "Total: {:.2f}MB",
+                        client_name,
+                        peer["rx"] / 1024**2,
+                        peer["tx"] / 1024**2,
+                        peer["total"] / 1024**2,
                     )
                     return {
                         "transfer_rx": peer["rx"],
@@ -277,6 +540,36 @@ PersistentKeepalive = 15
             )
             return {"transfer_total": 0}
 
+    async def get_usage_snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Obtiene las métricas de todos los peers en una sola pasada,
+        indexadas por client_name.
+
+        Usa el registro de peers en memoria y un único `wg show dump`, en lugar
+        de repetir ambas operaciones por cada llave como get_peer_metrics.
+        """
+        if not self.conf_path.exists():
+            logger.warning(f"Archivo de configuración no encontrado: {self.conf_path}")
+            return {}
+
+        registry = self._get_registry()
+        client_pub_keys = {
+            name: peer.public_key for name, peer in registry.peers.items() if peer.public_key
+        }
+
+        usage_by_pub_key = {peer["public_key"]: peer for peer in await self.get_usage()}
+
+        snapshot: Dict[str, Dict[str, int]] = {}
+        for client_name, pub_key in client_pub_keys.items():
+            peer = usage_by_pub_key.get(pub_key)
+            if peer is not None:
+                snapshot[client_name] = {
+                    "transfer_rx": peer["rx"],
+                    "transfer_tx": peer["tx"],
+                    "transfer_total": peer["total"],
+                }
+        return snapshot
+
     async def get_usage(self) -> List[Dict]:
         """Get WireGuard usage metrics with caching to prevent race conditions."""
         async with self._cache_lock:
@@ -287,6 +580,7 @@ PersistentKeepalive = 15
                     return cached_data
 
             try:
+                started = time.perf_counter()
                 output = await self._run_cmd(f"wg show {self.interface} dump")
                 lines = output.split("\n")[1:]
 
@@ -304,6 +598,9 @@ PersistentKeepalive = 15
                         )
 
                 self._usage_cache = (usage, datetime.now())
+                logger.bind(latency_ms=round((time.perf_counter() - started) * 1000, 2)).debug(
+                    "WireGuard: dump de {} peers", len(usage)
+                )
                 return usage
             except Exception as e:
                 error_msg = str(e) if str(e) else repr(e) or "Unknown error (empty exception)"
@@ -320,23 +617,18 @@ PersistentKeepalive = 15
                 logger.error(f"Config file not found: {self.conf_path}")
                 return False
 
-            content = self.conf_path.read_text()
+            peer = self._get_registry().get(client_name)
 
-            pk_pattern = rf"### CLIENT {re.escape(client_name)}.*?PublicKey\s*=\s*([^\n]+)"
-            match = re.search(pk_pattern, content, flags=re.DOTALL)
-
-            if not match:
+            if peer is None or not peer.public_key:
                 logger.error(f"Peer not found: {client_name}")
                 return False
 
-            pub_key = match.group(1).strip()
+            await self._set_peer(peer.public_key, "allowed-ips 0.0.0.0/32")
 
-            await self._run_cmd(f"wg set {self.interface} peer {pub_key} allowed-ips 0.0.0.0/32")
-
-            new_content = content.replace(
-                f"### CLIENT {client_name}", f"### CLIENT {client_name} [DISABLED]"
-            )
-            self.conf_path.write_text(new_content)
+            with self._mutation_lock:
+                changed = self._get_registry().set_disabled(client_name, True)
+            if changed:
+                await self._persist({"op": "disable", "client_name": client_name})
 
             logger.info(f"Peer {client_name} disabled successfully")
             return True
@@ -355,34 +647,24 @@ PersistentKeepalive = 15
                 logger.error(f"Config file not found: {self.conf_path}")
                 return False
 
-            content = self.conf_path.read_text()
-
-            pk_pattern = rf"### CLIENT {re.escape(client_name)}.*?PublicKey\s*=\s*([^\n]+)"
-            match = re.search(pk_pattern, content, flags=re.DOTALL)
+            peer = self._get_registry().get(client_name)
 
-            if not match:
+            if peer is None or not peer.public_key:
                 logger.error(f"Peer not found: {client_name}")
                 return False
 
-            pub_key = match.group(1).strip()
-
-            allowed_ips_pattern = (
-                rf"### CLIENT {re.escape(client_name)}.*?AllowedIPs\s*=\s*([\d./]+)"
-            )
-            ip_match = re.search(allowed_ips_pattern, content, flags=re.DOTALL)
-
-            if not ip_match:
+            if not peer.allowed_ips:
                 logger.error(f"AllowedIPs not found for peer: {client_name}")
                 return False
 
-            original_ip = ip_match.group(1)
+            original_ip = peer.allowed_ips.split(",")[0].strip()
 
-            await self._run_cmd(f"wg set {self.interface} peer {pub_key} allowed-ips {original_ip}")
+            await self._set_peer(peer.public_key, f"allowed-ips {original_ip}")
 
-            new_content = content.replace(
-                f"### CLIENT {client_name} [DISABLED]", f"### CLIENT {client_name}"
-            )
-            self.conf_path.write_text(new_content)
+            with self._mutation_lock:
+                changed = self._get_registry().set_disabled(client_name, False)
+            if changed:
+                await self._persist({"op": "enable", "client_name": client_name})
 
             logger.info(f"Peer {client_name} enabled successfully")
             return True
@@ -390,3 +672,106 @@ PersistentKeepalive = 15
         except Exception as e:
             logger.error(f"Error enabling peer {client_name}: {e}")
             return False
+
+    async def set_peers_disabled(self, client_names: List[str], disabled: bool) -> Dict[str, bool]:
+        """
+        Deshabilita (o reactiva) varios peers con un único `wg set`.
+
+        Returns:
+            Resultado por client_name (True si se aplicó).
+        """
+        results = {name: False for name in client_names}
+        try:
+            if not self.conf_path.exists():
+                logger.error(f"Config file not found: {self.conf_path}")
+                return results
+
+            registry = self._get_registry()
+            targets: List[str] = []
+            changes: List[PeerChange] = []
+            for name in client_names:
+                peer = registry.get(name)
+                if peer is None or not peer.public_key:
+                    logger.error(f"Peer not found: {name}")
+                    continue
+                if disabled:
+                    args = "allowed-ips 0.0.0.0/32"
+                elif peer.allowed_ips:
+                    args = f"allowed-ips {peer.allowed_ips.split(',')[0].strip()}"
+                else:
+                    logger.error(f"AllowedIPs not found for peer: {name}")
+                    continue
+                targets.append(name)
+                changes.append(PeerChange(public_key=peer.public_key, args=args))
+
+            errors = await self._peer_applier.apply_many(changes)
+            op = "disable" if disabled else "enable"
+            applied: List[str] = []
+            ops: List[Dict[str, Any]] = []
+            with self._mutation_lock:
+                registry = self._get_registry()
+                for name, error in zip(targets, errors):
+                    if error is not None:
+                        logger.error(f"Error applying {op} to peer {name}: {error}")
+                        continue
+                    applied.append(name)
+                    if registry.set_disabled(name, disabled):
+                        ops.append({"op": op, "client_name": name})
+            await self._persist_many(ops)
+            results.update(dict.fromkeys(applied, True))
+
+            logger.info(
+                f"{sum(results.values())}/{len(client_names)} peers "
+                f"{'disabled' if disabled else 'enabled'} in one wg set"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"Error updating {len(client_names)} peers: {e}")
+            return results
+
+    async def delete_clients(self, client_names: List[str]) -> Dict[str, bool]:
+        """
+        Elimina varios peers de la interfaz con un único `wg set`.
+
+        Returns:
+            Resultado por client_name (True si se eliminó).
+        """
+        results = {name: False for name in client_names}
+        try:
+            registry = self._get_registry()
+            targets: List[str] = []
+            changes: List[PeerChange] = []
+            for name in client_names:
+                peer = registry.get(name)
+                if peer and peer.public_key:
+                    targets.append(name)
+                    changes.append(PeerChange(public_key=peer.public_key, args="remove"))
+
+            errors = await self._peer_applier.apply_many(changes)
+            failed = {name for name, error in zip(targets, errors) if error is not None}
+
+            removed_names: List[str] = []
+            ops: List[Dict[str, Any]] = []
+            with self._mutation_lock:
+                registry = self._get_registry()
+                for name in client_names:
+                    if name in failed:
+                        logger.error(f"Error eliminando peer {name} de la interfaz")
+                        continue
+                    removed_names.append(name)
+                    if registry.remove(name) is not None:
+                        ops.append({"op": "remove", "client_name": name})
+            await self._persist_many(ops)
+
+            for name in removed_names:
+                client_file = self.clients_dir / f"{self.interface}-{name}.conf"
+                if client_file.exists():
+                    client_file.unlink()
+                results[name] = True
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error eliminando {len(client_names)} peers: {e}")
+            return results
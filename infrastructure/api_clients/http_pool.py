@@ -0,0 +1,374 @@
+"""
+Subsistema compartido de clientes HTTP para APIs externas (Outline, TronDealer).
+
+Cada proveedor declara un ``HttpClientProfile`` y obtiene con
+``get_http_client`` un ``ManagedHttpClient`` único por proceso. El cliente:
+
+- Mantiene un ``httpx.AsyncClient`` persistente por event loop (el bot y la
+  API corren en loops distintos y las conexiones httpx no se pueden compartir
+  entre loops), con keep-alive, límites de pool y HTTP/2 si ``h2`` está
+  instalado y el perfil lo permite.
+- Limita las peticiones concurrentes por host con un semáforo.
+- Aplica el timeout de la clase de operación (read/write/bulk) de cada ruta.
+- Reintenta errores transitorios con backoff exponencial y jitter completo;
+  las operaciones no idempotentes solo se reintentan si la conexión falló
+  antes de enviar la petición.
+- Registra histogramas de latencia por endpoint (``get_http_metrics``).
+
+El ciclo de vida es de la aplicación: ``close_http_clients`` se llama en el
+shutdown del bot y en el lifespan de la API (cada uno cierra los clientes de
+su loop), no después de cada petición.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import importlib.util
+import random
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import settings
+from utils.logger import logger
+
+OP_READ = "read"
+OP_WRITE = "write"
+OP_BULK = "bulk"
+
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Límites superiores (ms) de los buckets del histograma; el último es +inf
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    float("inf"),
+)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class HttpRoute:
+    """Ruta conocida de un proveedor: etiqueta de métricas y clase de operación."""
+
+    method: str
+    pattern: Pattern[str]
+    endpoint: str
+    op: str = OP_READ
+    idempotent: Optional[bool] = None
+
+    @classmethod
+    def build(
+        cls,
+        method: str,
+        path: str,
+        op: str = OP_READ,
+        idempotent: Optional[bool] = None,
+    ) -> "HttpRoute":
+        """Crea una ruta desde un path con parámetros ``{nombre}``."""
+        regex = re.sub(r"\\\{[^}]+\\\}", r"[^/]+", re.escape(path))
+        return cls(method.upper(), re.compile(regex + "$"), path, op, idempotent)
+
+
+@dataclass(frozen=True)
+class HttpClientProfile:
+    """Configuración de un proveedor HTTP externo."""
+
+    name: str
+    verify: bool = True
+    http2: bool = True
+    routes: Tuple[HttpRoute, ...] = ()
+
+
+@dataclass
+class LatencyHistogram:
+    """Histograma de latencias de un endpoint (buckets en ms)."""
+
+    counts: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_MS))
+    total: int = 0
+    errors: int = 0
+    retries: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, elapsed: float, error: bool = False) -> None:
+        elapsed_ms = elapsed * 1000
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.counts[index] += 1
+                break
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Cota superior (ms) del bucket donde cae el percentil pedido."""
+        if not self.total:
+            return 0.0
+        target = fraction * self.total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return self.max_ms if bound == float("inf") else bound
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else f"{bound:g}"): count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)
+            },
+        }
+
+
+class _LoopState:
+    """Cliente httpx y semáforos por host de un event loop."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def host_limit(self, host: str) -> asyncio.Semaphore:
+        semaphore = self.host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.HTTP_PER_HOST_CONCURRENCY)
+            self.host_limits[host] = semaphore
+        return semaphore
+
+
+def operation_timeout(op: str) -> httpx.Timeout:
+    """Timeout de httpx para una clase de operación."""
+    seconds = {
+        OP_READ: settings.HTTP_TIMEOUT_READ,
+        OP_WRITE: settings.HTTP_TIMEOUT_WRITE,
+        OP_BULK: settings.HTTP_TIMEOUT_BULK,
+    }.get(op, settings.HTTP_TIMEOUT_READ)
+    return httpx.Timeout(seconds, connect=min(settings.HTTP_TIMEOUT_CONNECT, seconds))
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Backoff exponencial con jitter completo; respeta Retry-After si viene."""
+    if retry_after is not None:
+        return min(retry_after, settings.HTTP_RETRY_BACKOFF_MAX)
+    ceiling = min(
+        settings.HTTP_RETRY_BACKOFF_MAX,
+        settings.HTTP_RETRY_BACKOFF_BASE * (2**attempt),
+    )
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ManagedHttpClient:
+    """
+    Cliente HTTP compartido de un proveedor.
+
+    Expone ``get/post/put/delete/request`` con la misma firma que
+    ``httpx.AsyncClient``; la clase de operación y la etiqueta de métricas
+    salen de las rutas del perfil.
+    """
+
+    def __init__(
+        self,
+        profile: HttpClientProfile,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.profile = profile
+        self._transport = transport
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http2(self) -> bool:
+        return self.profile.http2 and settings.HTTP_HTTP2_ENABLED and HTTP2_AVAILABLE
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None or state.client.is_closed:
+                client = httpx.AsyncClient(
+                    verify=self.profile.verify,
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=settings.HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=operation_timeout(OP_READ),
+                    transport=self._transport,
+                )
+                state = _LoopState(client)
+                self._loops[loop] = state
+                logger.debug(
+                    f"🌐 Cliente HTTP '{self.profile.name}' creado "
+                    f"(http2={self.http2}, loops={len(self._loops)})"
+                )
+            return state
+
+    def _resolve(self, method: str, url: str) -> Tuple[str, str, bool]:
+        """Endpoint, clase de operación e idempotencia de una petición."""
+        path = urlsplit(url).path
+        for route in self.profile.routes:
+            if route.method == method and route.pattern.search(path):
+                idempotent = (
+                    route.idempotent
+                    if route.idempotent is not None
+                    else method in IDEMPOTENT_METHODS
+                )
+                return route.endpoint, route.op, idempotent
+        return "other", OP_READ, method in IDEMPOTENT_METHODS
+
+    def _histogram(self, key: str) -> LatencyHistogram:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        method = method.upper()
+        endpoint, op, idempotent = self._resolve(method, url)
+        kwargs.setdefault("timeout", operation_timeout(op))
+        state = self._state()
+        key = f"{method} {endpoint}"
+        max_retries = settings.HTTP_RETRY_ATTEMPTS
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with state.host_limit(urlsplit(url).netloc):
+                    response = await state.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                with self._lock:
+                    self._histogram(key).observe(time.perf_counter() - started, error=True)
+                # Sin conexión la petición no llegó al servidor: se puede repetir
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if attempt >= max_retries or (sent and not idempotent):
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(
+                    f"⚠️ {self.profile.name} {key}: {type(e).__name__}, "
+                    f"reintento {attempt + 1}/{max_retries} en {delay:.2f}s"
+                )
+            else:
+                retryable = response.status_code in RETRYABLE_STATUS
+                with self._lock:
+                    self._histogram(key).observe(
+                        time.perf_counter() - started, error=response.status_code >= 500
+                    )
+                if not retryable or not idempotent or attempt >= max_retries:
+                    return response
+                delay = backoff_delay(attempt, _retry_after(response))
+                logger.warning(
+                    f"⚠️ {self.profile.name} {key}: HTTP {response.status_code}, "
+                    f"reintento {attempt + 1}/{max_retries} en {delay:.2f}s"
+                )
+                await response.aclose()
+
+            with self._lock:
+                self._histogram(key).retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """
+        Cierra el cliente del loop actual. Las conexiones de otro loop solo se
+        pueden cerrar desde ese loop, así que cada lifespan cierra el suyo.
+        """
+        with self._lock:
+            state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "provider": self.profile.name,
+                "http2": self.http2,
+                "loops": len(self._loops),
+                "endpoints": {
+                    key: histogram.snapshot() for key, histogram in self._histograms.items()
+                },
+            }
+
+
+_clients: Dict[str, ManagedHttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(profile: HttpClientProfile) -> ManagedHttpClient:
+    """Cliente compartido del proveedor (uno por proceso y nombre de perfil)."""
+    with _clients_lock:
+        client = _clients.get(profile.name)
+        if client is None:
+            client = ManagedHttpClient(profile)
+            _clients[profile.name] = client
+        return client
+
+
+async def close_http_clients() -> None:
+    """Cierra los pools HTTP del loop actual (shutdown del bot / lifespan de la API)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"❌ Error cerrando cliente HTTP '{client.profile.name}': {e}")
+
+
+def get_http_metrics() -> List[Dict[str, Any]]:
+    """Histogramas de latencia por proveedor y endpoint."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return [client.metrics() for client in clients]
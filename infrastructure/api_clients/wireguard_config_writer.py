@@ -0,0 +1,275 @@
+"""
+Persistencia de wg0.conf para WireGuardClient.
+
+Todas las mutaciones del registro de peers pasan por un único escritor
+asíncrono que agrupa ráfagas de cambios en una sola escritura:
+
+- atomic: reescribe wg0.conf completo (archivo temporal + fsync + rename).
+- journal: añade las operaciones a wg0.conf.journal y compacta wg0.conf
+  periódicamente (por número de operaciones o por tiempo).
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+WRITE_MODE_ATOMIC = "atomic"
+WRITE_MODE_JOURNAL = "journal"
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """
+    Escribe ``content`` en ``path`` de forma atómica.
+
+    Usa un temporal en el mismo directorio, fsync y os.replace, de modo que un
+    lector (o wg-quick) nunca ve un archivo a medio escribir. Conserva los
+    permisos del archivo original (0600 si no existía).
+    """
+    directory = path.parent
+    mode = stat.S_IMODE(os.stat(path).st_mode) if path.exists() else 0o600
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+class WireGuardConfigWriter:
+    """
+    Escritor único y agrupador de wg0.conf.
+
+    Los llamadores mutan el registro en memoria y luego esperan ``submit(op)``
+    (o ``submit_many(ops)`` para un lote); el escritor espera
+    ``coalesce_delay`` segundos, toma todas las operaciones pendientes y las
+    persiste de una sola vez. ``submit`` retorna cuando la operación está en
+    disco.
+
+    El cliente WireGuard es un singleton compartido entre el loop del bot y el
+    del servidor API (otro hilo), por eso el estado se protege con locks de
+    threading y solo hay un volcado activo a la vez, sin importar el loop.
+    """
+
+    def __init__(
+        self,
+        conf_path: Callable[[], Path],
+        render: Callable[[], str],
+        mode: str = WRITE_MODE_ATOMIC,
+        coalesce_delay: float = 0.05,
+        compact_every: int = 500,
+        compact_interval: float = 300.0,
+        on_flushed: Optional[Callable[[], None]] = None,
+    ):
+        self._conf_path = conf_path
+        self._render = render
+        self.mode = mode
+        self.coalesce_delay = coalesce_delay
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self._on_flushed = on_flushed
+
+        self._state_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]] = []
+        self._flushing = False
+        # Referencia fuerte: el loop solo guarda las tareas con referencias débiles
+        self._flusher: Optional[asyncio.Task] = None
+
+        self._journal_ops = 0
+        self._last_compaction = time.monotonic()
+
+        self.flush_count = 0
+        self.ops_written = 0
+
+    @property
+    def conf_path(self) -> Path:
+        return self._conf_path()
+
+    @property
+    def journal_path(self) -> Path:
+        path = self.conf_path
+        return path.with_name(f"{path.name}.journal")
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    async def submit(self, op: Dict[str, Any]) -> None:
+        """Encola una operación ya aplicada en memoria y espera a que se persista."""
+        await self.submit_many([op])
+
+    async def submit_many(self, ops: List[Dict[str, Any]]) -> None:
+        """Encola varias operaciones juntas: siempre caen en el mismo volcado."""
+        if not ops:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        with self._state_lock:
+            self._pending.append((list(ops), waiter))
+            start_flusher = not self._flushing
+            self._flushing = True
+
+        if start_flusher:
+            self._flusher = asyncio.create_task(self._flush_loop())
+            self._flusher.add_done_callback(self._on_flusher_done)
+
+        await waiter
+
+    async def flush(self) -> None:
+        """Persiste lo pendiente y, en modo journal, compacta wg0.conf."""
+        if self.has_pending or self._flushing:
+            await self.submit({"op": "sync"})
+
+        if self.mode == WRITE_MODE_JOURNAL and self._journal_ops:
+            await asyncio.to_thread(self._compact)
+
+    async def close(self) -> None:
+        """Persiste lo pendiente y espera a que termine el volcado en curso."""
+        await self.flush()
+        await self._wait_flusher()
+
+    async def _wait_flusher(self) -> None:
+        flusher = self._flusher
+        if flusher is None or flusher.done():
+            return
+        if flusher.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(flusher, return_exceptions=True)
+        # Si corre en el loop del otro hilo, sus operaciones ya se esperaron arriba
+
+    def _on_flusher_done(self, task: asyncio.Task) -> None:
+        if self._flusher is task:
+            self._flusher = None
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            f"WireGuard: el volcado en segundo plano terminó con error: {task.exception()}"
+        )
+        # Sin esto ningún submit posterior volvería a arrancar el volcado
+        with self._state_lock:
+            self._flushing = False
+
+    def read_journal(self) -> List[Dict[str, Any]]:
+        """Lee las operaciones del journal (modo journal) para reaplicarlas al cargar."""
+        if self.mode != WRITE_MODE_JOURNAL or not self.journal_path.exists():
+            return []
+
+        ops: List[Dict[str, Any]] = []
+        for line in self.journal_path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                ops.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Línea truncada por un corte a mitad de escritura: se descarta
+                logger.warning(f"WireGuard: entrada de journal inválida descartada: {line[:80]}")
+        self._journal_ops = len(ops)
+        return ops
+
+    async def _flush_loop(self) -> None:
+        while True:
+            if self.coalesce_delay:
+                await asyncio.sleep(self.coalesce_delay)
+
+            with self._state_lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._flushing = False
+                    return
+
+            error: Optional[BaseException] = None
+            try:
+                ops = [op for group, _ in batch for op in group if op.get("op") != "sync"]
+                if self.mode == WRITE_MODE_JOURNAL:
+                    if ops:
+                        await asyncio.to_thread(self._append_journal, ops)
+                else:
+                    content = self._render()
+                    await asyncio.to_thread(self._rewrite, content)
+                self.flush_count += 1
+                self.ops_written += len(ops)
+                if self._on_flushed is not None:
+                    self._on_flushed()
+            except Exception as e:
+                logger.error(f"WireGuard: error persistiendo {len(batch)} cambios: {e}")
+                error = e
+
+            for _, waiter in batch:
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter, error)
+
+    def _rewrite(self, content: str) -> None:
+        with self._io_lock:
+            self._write_file(self.conf_path, content)
+
+    def _append_journal(self, ops: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in ops)
+        with self._io_lock:
+            self._append_file(self.journal_path, lines)
+            self._journal_ops += len(ops)
+
+        if (
+            self._journal_ops >= self.compact_every
+            or time.monotonic() - self._last_compaction >= self.compact_interval
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Vuelca el registro completo a wg0.conf y vacía el journal."""
+        with self._io_lock:
+            self._write_file(self.conf_path, self._render())
+            self._write_file(self.journal_path, "")
+            logger.debug(f"WireGuard: journal compactado ({self._journal_ops} operaciones)")
+            self._journal_ops = 0
+            self._last_compaction = time.monotonic()
+
+    def _write_file(self, path: Path, content: str) -> None:
+        try:
+            atomic_write_text(path, content)
+        except PermissionError:
+            # Sin permiso de escritura en el directorio: no es posible el rename,
+            # se degrada a escritura en sitio con fsync.
+            logger.warning(f"WireGuard: sin permisos para reemplazo atómico de {path}")
+            with open(path, "w") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _append_file(path: Path, content: str) -> None:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, content.encode())
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _resolve(waiter: asyncio.Future, error: Optional[BaseException]) -> None:
+    if waiter.done():
+        return
+    if error is not None:
+        waiter.set_exception(error)
+    else:
+        waiter.set_result(None)
@@ -0,0 +1,55 @@
+"""
+Generación de claves WireGuard en proceso.
+
+Equivalente a `wg genkey`, `wg pubkey` y `wg genpsk` usando la librería
+cryptography (X25519), sin lanzar subprocesos por cada peer.
+
+Author: uSipipo Team
+"""
+
+import base64
+import os
+from typing import Tuple
+
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+KEY_LENGTH = 32
+
+
+def _encode(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _clamp(raw: bytes) -> bytes:
+    """Aplica el clamping de Curve25519, igual que `wg genkey`."""
+    key = bytearray(raw)
+    key[0] &= 248
+    key[31] = (key[31] & 127) | 64
+    return bytes(key)
+
+
+def generate_private_key() -> str:
+    """Genera una clave privada en base64 (equivalente a `wg genkey`)."""
+    return _encode(_clamp(os.urandom(KEY_LENGTH)))
+
+
+def public_key_from_private(private_key: str) -> str:
+    """Deriva la clave pública en base64 (equivalente a `wg pubkey`)."""
+    raw = base64.b64decode(private_key, validate=True)
+    if len(raw) != KEY_LENGTH:
+        raise ValueError("La clave privada WireGuard debe tener 32 bytes")
+
+    public = X25519PrivateKey.from_private_bytes(raw).public_key()
+    return _encode(public.public_bytes(Encoding.Raw, PublicFormat.Raw))
+
+
+def generate_preshared_key() -> str:
+    """Genera una clave precompartida en base64 (equivalente a `wg genpsk`)."""
+    return _encode(os.urandom(KEY_LENGTH))
+
+
+def generate_keypair() -> Tuple[str, str]:
+    """Retorna (privada, pública) en base64."""
+    private_key = generate_private_key()
+    return private_key, public_key_from_private(private_key)
@@ -0,0 +1,183 @@
+"""
+Aplicación agrupada de cambios de peers en la interfaz WireGuard.
+
+En modo batched, los cambios (`peer <pubkey> ...`) que llegan dentro de la
+misma ventana se aplican con una sola invocación de `wg set`, que acepta
+varias secciones `peer` en un mismo comando.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from utils.logger import logger
+
+APPLY_MODE_IMMEDIATE = "immediate"
+APPLY_MODE_BATCHED = "batched"
+
+
+@dataclass
+class PeerChange:
+    """Cambio sobre un peer: argumentos de `wg set ... peer <public_key>`."""
+
+    public_key: str
+    args: str
+    preshared_key: Optional[str] = None
+
+    def render(self, psk_path: Optional[str] = None) -> str:
+        clause = f"peer {self.public_key} {self.args}"
+        if psk_path is not None:
+            clause += f" preshared-key {psk_path}"
+        return clause
+
+
+class WireGuardPeerApplier:
+    """
+    Agrupa cambios de peers y los aplica en un único `wg set`.
+
+    Igual que el escritor de wg0.conf, se comparte entre el loop del bot y el
+    del API, así que el estado se protege con un lock de threading y los
+    futures se resuelven en su propio loop.
+    """
+
+    def __init__(
+        self,
+        interface: Callable[[], str],
+        run_cmd: Callable[[str], Awaitable[str]],
+        coalesce_delay: float = 0.05,
+    ):
+        self._interface = interface
+        self._run_cmd = run_cmd
+        self.coalesce_delay = coalesce_delay
+
+        self._state_lock = threading.Lock()
+        self._pending: List[Tuple[PeerChange, asyncio.Future]] = []
+        self._flushing = False
+        # Referencia fuerte: el loop solo guarda las tareas con referencias débiles
+        self._flusher: Optional[asyncio.Task] = None
+
+        self.commands_run = 0
+        self.changes_applied = 0
+
+    async def apply(self, change: PeerChange) -> None:
+        """Encola un cambio y espera a que se aplique en la interfaz."""
+        waiter = asyncio.get_running_loop().create_future()
+        with self._state_lock:
+            self._pending.append((change, waiter))
+            start_flusher = not self._flushing
+            self._flushing = True
+
+        if start_flusher:
+            self._flusher = asyncio.create_task(self._flush_loop())
+            self._flusher.add_done_callback(self._on_flusher_done)
+
+        await waiter
+
+    async def close(self) -> None:
+        """Espera a que se apliquen los cambios encolados."""
+        with self._state_lock:
+            loop = asyncio.get_running_loop()
+            pending = [waiter for _, waiter in self._pending if waiter.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._wait_flusher()
+
+    async def _wait_flusher(self) -> None:
+        flusher = self._flusher
+        if flusher is None or flusher.done():
+            return
+        if flusher.get_loop() is asyncio.get_running_loop():
+            await asyncio.gather(flusher, return_exceptions=True)
+        # Si corre en el loop del otro hilo, sus operaciones ya se esperaron arriba
+
+    def _on_flusher_done(self, task: asyncio.Task) -> None:
+        if self._flusher is task:
+            self._flusher = None
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            f"WireGuard: la aplicación de peers en segundo plano terminó con error: {task.exception()}"
+        )
+        # Sin esto ningún apply posterior volvería a arrancar el flusher
+        with self._state_lock:
+            self._flushing = False
+
+    async def run_single(self, change: PeerChange) -> None:
+        """Aplica un cambio con su propio `wg set`."""
+        await self._run_batch([change])
+
+    async def apply_many(self, changes: List[PeerChange]) -> List[Optional[BaseException]]:
+        """
+        Aplica varios cambios con un solo `wg set`.
+
+        Si el comando agrupado falla se reintenta uno a uno, de modo que cada
+        cambio recibe su propio resultado (None si se aplicó).
+        """
+        errors: List[Optional[BaseException]] = [None] * len(changes)
+        if not changes:
+            return errors
+        try:
+            await self._run_batch(changes)
+        except PermissionError as e:
+            errors = [e] * len(changes)
+        except Exception as e:
+            if len(changes) == 1:
+                errors = [e]
+            else:
+                logger.warning(
+                    f"WireGuard: wg set agrupado ({len(changes)} cambios) falló, "
+                    f"aplicando individualmente: {e}"
+                )
+                for i, change in enumerate(changes):
+                    try:
+                        await self.run_single(change)
+                    except Exception as single_error:
+                        errors[i] = single_error
+        return errors
+
+    async def _flush_loop(self) -> None:
+        while True:
+            if self.coalesce_delay:
+                await asyncio.sleep(self.coalesce_delay)
+
+            with self._state_lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._flushing = False
+                    return
+
+            errors = await self.apply_many([change for change, _ in batch])
+
+            for (_, waiter), error in zip(batch, errors):
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter, error)
+
+    async def _run_batch(self, changes: List[PeerChange]) -> None:
+        with tempfile.TemporaryDirectory(prefix="wg-psk-") as psk_dir:
+            clauses = []
+            for i, change in enumerate(changes):
+                psk_path = None
+                if change.preshared_key:
+                    psk_path = os.path.join(psk_dir, f"{i}.psk")
+                    fd = os.open(psk_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                    with os.fdopen(fd, "w") as f:
+                        f.write(change.preshared_key)
+                clauses.append(change.render(psk_path))
+
+            await self._run_cmd(f"wg set {self._interface()} " + " ".join(clauses))
+
+        self.commands_run += 1
+        self.changes_applied += len(changes)
+
+
+def _resolve(waiter: asyncio.Future, error: Optional[BaseException]) -> None:
+    if waiter.done():
+        return
+    if error is not None:
+        waiter.set_exception(error)
+    else:
+        waiter.set_result(None)
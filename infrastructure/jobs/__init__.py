@@ -2,7 +2,10 @@
 Jobs de mantenimiento y monitoreo del sistema.
 """
 
-from infrastructure.jobs.crypto_order_expiration_job import expire_crypto_orders_job
+from infrastructure.jobs.crypto_order_expiration_job import (
+    expire_crypto_orders,
+    expire_crypto_orders_job,
+)
 from infrastructure.jobs.ghost_key_cleanup_job import (
     GhostKeyCleanupJob,
     get_cleanup_job,
@@ -18,6 +21,7 @@ from infrastructure.jobs.package_expiration_job import expire_packages_job
 from infrastructure.jobs.usage_sync import sync_vpn_usage_job
 
 __all__ = [
+    "expire_crypto_orders",
     "expire_crypto_orders_job",
     "expire_packages_job",
     "key_cleanup_job",
@@ -1,9 +1,9 @@
-import uuid
 from typing import Any, Dict, cast
 
 from telegram.ext import ContextTypes
 
 from application.services.vpn_service import VpnService
+from config import settings
 from utils.logger import logger
 
 
@@ -11,6 +11,10 @@ async def sync_vpn_usage_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Consulta el consumo de datos en los servidores VPN
     y actualiza la base de datos local cada 30 minutos.
+
+    Toma una sola instantánea por backend, persiste en bloque
+    únicamente las llaves cuyo contador cambió y reparte el consumo
+    medido entre facturación por consumo y paquetes de datos.
     """
     if context.job is None or context.job.data is None:
         logger.error("❌ Job data no disponible")
@@ -20,33 +24,10 @@ async def sync_vpn_usage_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     vpn_service: VpnService = data["vpn_service"]
 
     try:
-        logger.info("📊 Iniciando sincronización de consumo de datos...")
-
-        keys = await vpn_service.get_all_active_keys()
+        summary = await vpn_service.sync_usage(settings.ADMIN_ID)
 
-        if not keys:
+        if not summary["total_keys"]:
             logger.info("ℹ️ No hay llaves activas para sincronizar.")
-            return
-
-        synced_count = 0
-        error_count = 0
-
-        for key in keys:
-            try:
-                current_usage = await vpn_service.fetch_real_usage(key)
-                if key.id is not None:
-                    await vpn_service.update_key_usage(uuid.UUID(key.id), current_usage)
-                    synced_count += 1
-                else:
-                    logger.warning(f"⚠️ Llave sin ID, omitiendo: {key.name}")
-
-            except Exception as e:
-                error_count += 1
-                logger.error(f"❌ Error sincronizando llave {key.id}: {e}")
-
-        logger.info(
-            f"✅ Sincronización completada. " f"Exitosas: {synced_count}, Errores: {error_count}"
-        )
 
     except Exception as e:
         logger.error(f"❌ Error crítico en sync_vpn_usage_job: {e}")
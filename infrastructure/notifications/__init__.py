@@ -0,0 +1,21 @@
+from infrastructure.notifications.bot_channel import (
+    BotChannel,
+    RemoteNotificationDispatcher,
+    bot_channel_handlers,
+    get_bot_channel,
+)
+from infrastructure.notifications.telegram_dispatcher import (
+    NotificationDispatcher,
+    get_notification_dispatcher,
+    set_notification_dispatcher,
+)
+
+__all__ = [
+    "BotChannel",
+    "NotificationDispatcher",
+    "RemoteNotificationDispatcher",
+    "bot_channel_handlers",
+    "get_bot_channel",
+    "get_notification_dispatcher",
+    "set_notification_dispatcher",
+]
@@ -0,0 +1,216 @@
+"""
+Canal de eventos de los workers de la API hacia el proceso del bot.
+
+Con ``API_MODE=standalone`` la API corre en su propio grupo de procesos y ya
+no comparte memoria con el bot. Lo que antes se resolvía en el mismo proceso
+viaja por una lista de Redis (``REDIS_URL``): los workers publican con
+``LPUSH`` y el bot consume con ``BRPOP``, así cada evento lo procesa un solo
+consumidor y los eventos esperan en Redis si el bot se reinicia.
+
+- ``notify``: notificación de Telegram encolada con ``enqueue``; la envía el
+  despachador del bot, el único que conoce los límites de tasa del token.
+- ``expiry.track`` / ``expiry.untrack``: vencimientos para el planificador
+  de expiraciones, que solo corre en el bot.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import telegram
+from telegram import TelegramObject
+
+from config import settings
+from infrastructure.notifications.telegram_dispatcher import NotificationDispatcher
+from utils.logger import logger
+
+CHANNEL_KEY = "usipipo:bot-channel"
+
+# Segundos que BRPOP espera antes de volver a comprobar la cancelación
+POLL_TIMEOUT = 1
+
+ChannelHandler = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+def encode_value(value: Any) -> Any:
+    """Hace serializable un argumento de envío (teclados, precios...)."""
+    if isinstance(value, TelegramObject):
+        return {"__telegram__": type(value).__name__, "data": value.to_dict()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    return value
+
+
+def decode_value(value: Any, bot: Any = None) -> Any:
+    """Inverso de ``encode_value``: reconstruye los objetos de Telegram."""
+    if isinstance(value, list):
+        return [decode_value(item, bot) for item in value]
+    if isinstance(value, dict):
+        type_name = value.get("__telegram__")
+        if type_name is not None:
+            return getattr(telegram, type_name).de_json(value["data"], bot)
+        return {key: decode_value(item, bot) for key, item in value.items()}
+    return value
+
+
+@dataclass
+class ChannelStats:
+    published: int = 0
+    consumed: int = 0
+    failed: int = 0
+
+
+class BotChannel:
+    """Cola Redis de eventos API → bot."""
+
+    def __init__(self, url: Optional[str] = None, key: str = CHANNEL_KEY, client: Any = None):
+        self._url = url
+        self.key = key
+        self._client = client
+        self._consumer: Optional[asyncio.Task] = None
+        self._pending: set = set()
+        self.stats = ChannelStats()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self._url or settings.REDIS_URL)
+        return self._client
+
+    async def publish(self, event: str, **payload: Any) -> None:
+        message = {"event": event, "payload": encode_value(payload)}
+        await self.client.lpush(self.key, json.dumps(message, ensure_ascii=False, default=str))
+        self.stats.published += 1
+
+    def post(self, event: str, **payload: Any) -> concurrent.futures.Future:
+        """Publica sin esperar; retorna un Future que se resuelve al publicar."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        task = asyncio.get_running_loop().create_task(self._post(future, event, payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return future
+
+    async def _post(
+        self, future: concurrent.futures.Future, event: str, payload: Dict[str, Any]
+    ) -> None:
+        try:
+            await self.publish(event, **payload)
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"❌ Error publicando {event} en el canal del bot: {e}")
+            future.set_exception(e)
+            return
+        future.set_result(None)
+
+    async def start(self, handlers: Dict[str, ChannelHandler]) -> None:
+        """Consume eventos en segundo plano en el loop actual (idempotente)."""
+        if self._consumer is not None and not self._consumer.done():
+            return
+        self._consumer = asyncio.create_task(self._consume(handlers), name="bot-channel")
+        logger.info(f"📨 Canal API → bot escuchando en {self.key}")
+
+    async def close(self) -> None:
+        consumer, self._consumer = self._consumer, None
+        if consumer is not None:
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _consume(self, handlers: Dict[str, ChannelHandler]) -> None:
+        while True:
+            try:
+                item = await self.client.brpop([self.key], timeout=POLL_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error leyendo el canal del bot: {e}")
+                await asyncio.sleep(POLL_TIMEOUT)
+                continue
+            if item is not None:
+                await self.dispatch(item[1], handlers)
+
+    async def dispatch(self, raw: Union[str, bytes], handlers: Dict[str, ChannelHandler]) -> None:
+        """Ejecuta el handler de un evento; los errores se registran y se descartan."""
+        try:
+            message = json.loads(raw)
+            handler = handlers.get(message["event"])
+            if handler is None:
+                logger.warning(f"⚠️ Evento desconocido en el canal del bot: {message['event']}")
+                return
+            result = handler(message.get("payload") or {})
+            if inspect.isawaitable(result):
+                await result
+            self.stats.consumed += 1
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"❌ Error procesando evento del canal del bot: {e}")
+
+
+class RemoteNotificationDispatcher(NotificationDispatcher):
+    """
+    Despachador de los workers de la API en modo standalone.
+
+    ``enqueue`` (sin esperar resultado) se publica en el canal y lo envía el
+    bot. ``send`` necesita la respuesta de Telegram (p. ej. el enlace de una
+    factura), así que se envía desde este proceso.
+    """
+
+    def __init__(self, channel: BotChannel, bot: Optional[telegram.Bot] = None):
+        super().__init__(bot)
+        self.channel = channel
+
+    def enqueue(self, method: str, chat_id: int, **kwargs: Any) -> concurrent.futures.Future:
+        return self.channel.post("notify", method=method, chat_id=chat_id, kwargs=kwargs)
+
+    async def send(self, method: str, chat_id: int, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(super().enqueue(method, chat_id, **kwargs))
+
+
+def bot_channel_handlers(dispatcher: NotificationDispatcher, scheduler: Any) -> Dict[str, Any]:
+    """Handlers del lado del bot: despachador local y planificador de expiraciones."""
+    from domain.entities.expiry_deadline import ExpiryKind
+
+    def notify(payload: Dict[str, Any]) -> None:
+        kwargs = decode_value(payload.get("kwargs") or {}, dispatcher.bot)
+        dispatcher.enqueue(payload["method"], payload["chat_id"], **kwargs)
+
+    def track(payload: Dict[str, Any]) -> None:
+        scheduler.track(
+            ExpiryKind(payload["kind"]),
+            uuid.UUID(payload["entity_id"]),
+            datetime.fromisoformat(payload["deadline"]),
+        )
+
+    def untrack(payload: Dict[str, Any]) -> None:
+        scheduler.untrack(ExpiryKind(payload["kind"]), uuid.UUID(payload["entity_id"]))
+
+    return {"notify": notify, "expiry.track": track, "expiry.untrack": untrack}
+
+
+_channel: Optional[BotChannel] = None
+_channel_lock = threading.Lock()
+
+
+def get_bot_channel() -> BotChannel:
+    """Canal compartido del proceso."""
+    global _channel
+    with _channel_lock:
+        if _channel is None:
+            _channel = BotChannel()
+        return _channel
@@ -0,0 +1,312 @@
+"""
+Despachador compartido de notificaciones salientes de Telegram.
+
+Un único ``Bot`` de larga vida (un pool HTTP y un solo ``getMe``) atiende las
+notificaciones de pagos, tickets y mini app. Los mensajes se encolan y unos
+pocos workers los envían respetando los límites de Telegram con token
+buckets (global y por chat). Ante ``RetryAfter`` se pausa todo el envío el
+tiempo indicado y se reintenta; los errores de red se reintentan con backoff.
+
+``enqueue`` retorna inmediatamente (los webhooks no esperan a Telegram);
+``send`` espera el resultado para los flujos que lo necesitan (p. ej. facturas).
+Ambos se pueden llamar desde cualquier event loop: los workers viven en el
+loop que arrancó el despachador y el resto encola con ``call_soon_threadsafe``.
+Ese loop es el del bot (``main.py`` lo arranca antes que el hilo de la API):
+mientras siga abierto, el despachador no se vuelve a arrancar en otro loop.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+from telegram.request import HTTPXRequest
+
+from config import settings
+from utils.logger import logger
+
+# Buckets de chats inactivos que se conservan (LRU)
+MAX_CHAT_BUCKETS = 10_000
+
+
+class TokenBucket:
+    """Token bucket con relleno continuo; ``reserve`` retorna la espera necesaria."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """Consume un token (pudiendo quedar en deuda) y retorna los segundos a esperar."""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+@dataclass
+class NotificationJob:
+    """Llamada pendiente a un método de envío del Bot."""
+
+    method: str
+    chat_id: int
+    kwargs: Dict[str, Any]
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    attempts: int = 0
+
+
+@dataclass
+class DispatcherStats:
+    queued: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    rate_limited: int = 0
+
+
+class NotificationDispatcher:
+    """Cola de notificaciones con un Bot compartido y control de tasa."""
+
+    def __init__(self, bot: Optional[Bot] = None):
+        self._bot = bot
+        self._owns_bot = bot is None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Loop en el que arrancó por primera vez: no se re-arranca en otro mientras viva
+        self._home_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_tasks: set = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._global_bucket = TokenBucket(
+            settings.NOTIFY_GLOBAL_RATE, max(1.0, settings.NOTIFY_GLOBAL_RATE)
+        )
+        self._chat_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = DispatcherStats()
+
+    @property
+    def bot(self) -> Bot:
+        if self._bot is None:
+            self._bot = Bot(
+                token=settings.TELEGRAM_TOKEN,
+                request=HTTPXRequest(connection_pool_size=settings.NOTIFY_WORKERS + 2),
+            )
+        return self._bot
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    async def start(self) -> None:
+        """Arranca los workers en el event loop actual (idempotente)."""
+        with self._lock:
+            if self.running:
+                return
+            current = asyncio.get_running_loop()
+            home = self._home_loop
+            if home is not None and home is not current and not home.is_closed():
+                raise RuntimeError("Notification dispatcher is bound to another event loop")
+            self._home_loop = self._loop = current
+            self._queue = asyncio.Queue(maxsize=settings.NOTIFY_QUEUE_SIZE)
+        if self._owns_bot:
+            try:
+                await self.bot.initialize()
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo inicializar el bot de notificaciones: {e}")
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"notify-worker-{i}")
+            for i in range(settings.NOTIFY_WORKERS)
+        ]
+        logger.info(f"📬 Notification dispatcher iniciado ({settings.NOTIFY_WORKERS} workers)")
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Vacía la cola (con límite de tiempo) y detiene los workers."""
+        if not self.running or asyncio.get_running_loop() is not self._loop:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ {self._queue.qsize()} notificaciones descartadas al cerrar")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        # Lo que quedó en cola no se enviará: resolver los futures para que send() no cuelgue
+        while not self._queue.empty():
+            self._abandon(self._queue.get_nowait())
+            self._queue.task_done()
+        with self._lock:
+            self._workers = []
+            self._loop = None
+        if self._owns_bot and self._bot is not None:
+            await self._bot.shutdown()
+        logger.info("📬 Notification dispatcher detenido")
+
+    def enqueue(self, method: str, chat_id: int, **kwargs: Any) -> concurrent.futures.Future:
+        """
+        Encola una llamada ``bot.<method>(chat_id=..., **kwargs)`` sin esperar
+        el envío. Retorna un Future con el mensaje enviado (o la excepción).
+        """
+        job = NotificationJob(method=method, chat_id=chat_id, kwargs=kwargs)
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Sin despachador arrancado: arrancar en el loop actual
+            task = asyncio.get_running_loop().create_task(self._start_and_put(job))
+            self._start_tasks.add(task)
+            task.add_done_callback(self._start_tasks.discard)
+        elif loop is _current_loop():
+            self._put(job)
+        else:
+            loop.call_soon_threadsafe(self._put, job)
+        return job.future
+
+    async def send(self, method: str, chat_id: int, **kwargs: Any) -> Any:
+        """Encola y espera el resultado del envío."""
+        return await asyncio.wrap_future(self.enqueue(method, chat_id, **kwargs))
+
+    def enqueue_message(self, chat_id: int, text: str, **kwargs: Any) -> concurrent.futures.Future:
+        return self.enqueue("send_message", chat_id, text=text, **kwargs)
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> Any:
+        return await self.send("send_message", chat_id, text=text, **kwargs)
+
+    async def _start_and_put(self, job: NotificationJob) -> None:
+        try:
+            await self.start()
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"❌ No se pudo arrancar el despachador para {job.chat_id}: {e}")
+            job.future.set_exception(e)
+            return
+        if self._loop is asyncio.get_running_loop():
+            self._put(job)
+        else:
+            self._loop.call_soon_threadsafe(self._put, job)
+
+    def _put(self, job: NotificationJob) -> None:
+        try:
+            self._queue.put_nowait(job)
+            self.stats.queued += 1
+        except asyncio.QueueFull:
+            self.stats.failed += 1
+            logger.error(f"❌ Cola de notificaciones llena, descartando envío a {job.chat_id}")
+            job.future.set_exception(RuntimeError("Notification queue full"))
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.NOTIFY_PER_CHAT_RATE, settings.NOTIFY_PER_CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+            if len(self._chat_buckets) > MAX_CHAT_BUCKETS:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def _throttle(self, chat_id: int) -> None:
+        now = time.monotonic()
+        wait = max(
+            self._paused_until - now,
+            self._global_bucket.reserve(now),
+            self._chat_bucket(chat_id).reserve(now),
+        )
+        if wait > 0:
+            self.stats.rate_limited += 1
+            await asyncio.sleep(wait)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                self._abandon(job)
+                raise
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: NotificationJob) -> None:
+        while True:
+            await self._throttle(job.chat_id)
+            try:
+                result = await getattr(self.bot, job.method)(chat_id=job.chat_id, **job.kwargs)
+            except RetryAfter as e:
+                if not self._retry(job, e):
+                    return
+                # Flood control: Telegram bloquea al bot entero, no solo a este chat
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                logger.warning(
+                    f"⏳ Telegram RetryAfter {e.retry_after}s enviando a {job.chat_id} "
+                    f"(intento {job.attempts})"
+                )
+            except (Forbidden, BadRequest) as e:
+                self._fail(job, e)
+                return
+            except NetworkError as e:
+                if not self._retry(job, e):
+                    return
+                await asyncio.sleep(min(2**job.attempts, 30))
+            except Exception as e:
+                self._fail(job, e)
+                return
+            else:
+                self.stats.sent += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+                return
+
+    def _retry(self, job: NotificationJob, error: Exception) -> bool:
+        job.attempts += 1
+        if job.attempts > settings.NOTIFY_MAX_RETRIES:
+            self._fail(job, error)
+            return False
+        self.stats.retried += 1
+        return True
+
+    def _fail(self, job: NotificationJob, error: Exception) -> None:
+        self.stats.failed += 1
+        logger.error(f"❌ Notificación {job.method} a {job.chat_id} fallida: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def _abandon(self, job: NotificationJob) -> None:
+        """Falla un job que no llegará a enviarse porque el despachador se cerró."""
+        if not job.future.done():
+            self.stats.failed += 1
+            job.future.set_exception(RuntimeError("Notification dispatcher closed"))
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Despachador compartido del proceso."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+        return _dispatcher
+
+
+def set_notification_dispatcher(dispatcher: NotificationDispatcher) -> None:
+    """Reemplaza el despachador del proceso (p. ej. en los workers de la API standalone)."""
+    global _dispatcher
+    with _dispatcher_lock:
+        _dispatcher = dispatcher
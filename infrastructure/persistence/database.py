@@ -8,26 +8,99 @@ Author: uSipipo Team
 Version: 2.1.0
 """
 
+import asyncio
 import logging
+import threading
+import time
+import weakref
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, List
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlalchemy.sql import text
 
 from config import settings
 from utils.logger import logger
 
-# Variable global para el engine
+POOL_MODE_NULL = "null"
+POOL_MODE_PER_LOOP = "per_loop"
+
+# Variable global para el engine (modo null)
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
 
+# Modo per_loop: un engine con pool por event loop (bot y servidor API corren
+# en loops distintos y las conexiones asyncpg no pueden cruzar de loop)
+_loop_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncEngine]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_engines_lock = threading.Lock()
+
+
+@dataclass
+class PoolMetrics:
+    """Métricas acumuladas del pool de un event loop."""
+
+    label: str
+    checkouts: int = 0
+    connections_created: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        self.checkouts += 1
+        self.wait_total_ms += elapsed_ms
+        if elapsed_ms > self.wait_max_ms:
+            self.wait_max_ms = elapsed_ms
+
+    def snapshot(self, pool: Any) -> Dict[str, Any]:
+        return {
+            "loop": self.label,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "connections_created": self.connections_created,
+            "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max_ms, 3),
+        }
+
+
+class _InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool que mide la espera al obtener una conexión
+    (incluye abrir una nueva si el pool aún no está lleno).
+
+    ``metrics`` se fija como atributo de una subclase por engine, de modo que
+    sobrevive a ``recreate()`` (que instancia ``self.__class__``).
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait((time.perf_counter() - started) * 1000)
+
+
+class _LoopRoutingSession(Session):
+    """Sesión que resuelve el engine del event loop en el que se ejecuta."""
+
+    def get_bind(self, mapper=None, **kw):
+        return get_engine().sync_engine
+
 
 def _build_async_database_url(url: str) -> str:
     """
@@ -124,15 +197,58 @@ def _configure_sqlalchemy_logging():
     logger.info("🔧 Configuración de logging de SQLAlchemy aplicada")
 
 
+def _create_loop_engine(loop: asyncio.AbstractEventLoop) -> AsyncEngine:
+    """Crea el engine con pool para un event loop concreto."""
+    metrics = PoolMetrics(label=threading.current_thread().name)
+    pool_class = type("LoopQueuePool", (_InstrumentedQueuePool,), {"metrics": metrics})
+
+    engine = create_async_engine(
+        _build_async_database_url(settings.DATABASE_URL),
+        echo=False,
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_timeout=settings.DB_TIMEOUT,
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connections_created += 1
+
+    logger.info(
+        f"🔌 Engine SQLAlchemy con pool creado para loop '{metrics.label}' "
+        f"(size={settings.DB_POOL_SIZE}, overflow={settings.DB_MAX_OVERFLOW})"
+    )
+    return engine
+
+
 def get_engine() -> AsyncEngine:
     """
-    Obtiene o crea el engine de SQLAlchemy (Singleton).
+    Obtiene o crea el engine de SQLAlchemy.
+
+    En modo null es un singleton sin pool. En modo per_loop retorna el engine
+    del event loop en ejecución, creándolo la primera vez.
 
     Returns:
         AsyncEngine configurado para la base de datos.
     """
     global _engine
 
+    if settings.DB_POOL_MODE == POOL_MODE_PER_LOOP:
+        loop = asyncio.get_running_loop()
+        engine = _loop_engines.get(loop)
+        if engine is None:
+            with _loop_engines_lock:
+                engine = _loop_engines.get(loop)
+                if engine is None:
+                    if not _loop_engines:
+                        _configure_sqlalchemy_logging()
+                    engine = _create_loop_engine(loop)
+                    _loop_engines[loop] = engine
+        return engine
+
     if _engine is None:
         # Configurar logging de SQLAlchemy antes de crear el engine
         _configure_sqlalchemy_logging()
@@ -160,10 +276,14 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     global _session_factory
 
     if _session_factory is None:
-        engine = get_engine()
+        if settings.DB_POOL_MODE == POOL_MODE_PER_LOOP:
+            # Sin bind fijo: cada sesión usa el engine del loop donde se ejecuta
+            bind_kwargs: Dict[str, Any] = {"sync_session_class": _LoopRoutingSession}
+        else:
+            bind_kwargs = {"bind": get_engine()}
 
         _session_factory = async_sessionmaker(
-            bind=engine,
+            **bind_kwargs,
             class_=AsyncSession,
             expire_on_commit=False,  # Evitar lazy loading después de commit
             autocommit=False,
@@ -248,6 +368,34 @@ async def init_database() -> None:
         raise
 
 
+def get_pool_metrics() -> List[Dict[str, Any]]:
+    """Retorna las métricas de los pools activos (vacío en modo null)."""
+    with _loop_engines_lock:
+        engines = list(_loop_engines.values())
+    return [engine.pool.metrics.snapshot(engine.pool) for engine in engines]
+
+
+async def dispose_loop_engine() -> None:
+    """
+    Cierra el pool del event loop actual (modo per_loop).
+
+    Debe llamarse desde el loop dueño del engine, ej: al apagar el servidor API.
+    """
+    if settings.DB_POOL_MODE != POOL_MODE_PER_LOOP:
+        return
+
+    loop = asyncio.get_running_loop()
+    with _loop_engines_lock:
+        engine = _loop_engines.pop(loop, None)
+
+    if engine is not None:
+        try:
+            await engine.dispose()
+        except Exception as e:
+            logger.warning(f"Error durante dispose del engine: {e}")
+        logger.info(f"🔌 Pool de conexiones cerrado ({engine.pool.metrics.label})")
+
+
 async def close_database() -> None:
     """
     Cierra el engine y libera todas las conexiones.
@@ -256,11 +404,16 @@ async def close_database() -> None:
     """
     global _engine, _session_factory
 
+    if settings.DB_POOL_MODE == POOL_MODE_PER_LOOP:
+        await dispose_loop_engine()
+        with _loop_engines_lock:
+            if not _loop_engines:
+                _session_factory = None
+        return
+
     if _engine is not None:
         try:
             await _engine.dispose()
-            import asyncio
-
             await asyncio.sleep(0.1)
         except Exception as e:
             logger.warning(f"Error durante dispose del engine: {e}")
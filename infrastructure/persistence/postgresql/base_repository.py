@@ -5,11 +5,53 @@ Author: uSipipo Team
 Version: 2.1.0
 """
 
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from utils.logger import logger
 
+# session.info key holding the (root transaction, user_id) already applied
+AUDIT_CONTEXT_KEY = "audit_context"
+
+
+@dataclass
+class AuditContextStats:
+    """Counters of issued vs skipped set_config calls."""
+
+    issued: int = 0
+    skipped: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def record(self, issued: bool) -> None:
+        with self._lock:
+            if issued:
+                self.issued += 1
+            else:
+                self.skipped += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"issued": self.issued, "skipped": self.skipped}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.issued = 0
+            self.skipped = 0
+
+
+audit_context_stats = AuditContextStats()
+
+
+def get_audit_context_stats() -> Dict[str, int]:
+    """Issued and skipped set_config('app.current_user_id') calls."""
+    return audit_context_stats.snapshot()
+
 
 class BasePostgresRepository:
     """
@@ -32,14 +74,39 @@ class BasePostgresRepository:
         Uses set_config() for custom session variables (app.*) instead of SET
         because PostgreSQL doesn't support SET for custom variable names.
 
+        The variable is transaction-local (like SET LOCAL) and the applied
+        (transaction, user_id) pair is remembered in ``session.info``, shared by
+        every repository on the session. Repeated calls with the same identity
+        inside one transaction skip the round-trip; a new transaction or a
+        different user issues it again.
+
         Args:
             user_id: The telegram_id of the current user.
         """
+        info = getattr(self.session, "info", None)
+        applied = info.get(AUDIT_CONTEXT_KEY) if isinstance(info, dict) else None
+        if applied is not None:
+            transaction, applied_user_id = applied
+            if applied_user_id == user_id and transaction is self._root_transaction():
+                audit_context_stats.record(issued=False)
+                return
+
         try:
             await self.session.execute(
-                text("SELECT set_config('app.current_user_id', :user_id, false)"),
+                text("SELECT set_config('app.current_user_id', :user_id, true)"),
                 {"user_id": str(user_id)},
             )
         except Exception as e:
             logger.error(f"Error setting current user {user_id}: {e}")
             raise
+
+        audit_context_stats.record(issued=True)
+        if isinstance(info, dict):
+            info[AUDIT_CONTEXT_KEY] = (self._root_transaction(), user_id)
+
+    def _root_transaction(self):
+        """Current root transaction of the session (None if there is none)."""
+        sync_session = getattr(self.session, "sync_session", None)
+        if sync_session is None:
+            return None
+        return sync_session.get_transaction()
@@ -1,15 +1,18 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import BigInteger, Numeric, column, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.consumption_billing import BillingStatus, ConsumptionBilling
 from domain.interfaces.iconsumption_billing_repository import IConsumptionBillingRepository
 from infrastructure.persistence.postgresql.models.consumption_billing import ConsumptionBillingModel
 
+# Filas por sentencia en el UPDATE por lotes (2 parámetros por fila, límite 32767)
+CONSUMPTION_BATCH_SIZE = 5000
+
 
 class PostgresConsumptionBillingRepository(IConsumptionBillingRepository):
     """Implementación PostgreSQL del repositorio de billing por consumo."""
@@ -110,22 +113,74 @@ class PostgresConsumptionBillingRepository(IConsumptionBillingRepository):
         self, billing_id: uuid.UUID, mb_used: float, current_user_id: int
     ) -> bool:
         """Agrega consumo a un ciclo activo."""
-        model = await self.session.get(ConsumptionBillingModel, billing_id)
-        if not model:
-            return False
-
-        if model.status != BillingStatus.ACTIVE.value:
-            return False
+        result = await self.session.execute(
+            _accumulate(Decimal(str(mb_used)))
+            .where(
+                ConsumptionBillingModel.id == billing_id,
+                ConsumptionBillingModel.status == BillingStatus.ACTIVE.value,
+            )
+            .returning(ConsumptionBillingModel.id)
+        )
+        updated = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return updated
 
-        # Agregar consumo y recalcular costo
-        model.mb_consumed += Decimal(str(mb_used))
-        # Usar el precio almacenado en el modelo
-        model.total_cost_usd = (model.mb_consumed * model.price_per_mb_usd).quantize(
-            Decimal("0.000001")
+    async def add_consumption_by_user(
+        self, user_id: int, mb_used: float, current_user_id: int
+    ) -> Optional[ConsumptionBilling]:
+        """
+        Agrega consumo al ciclo activo del usuario en una sola sentencia
+        (UPDATE ... RETURNING), sin leer el ciclo antes ni carreras entre
+        registros concurrentes. Retorna el ciclo actualizado o None.
+        """
+        result = await self.session.execute(
+            _accumulate(Decimal(str(mb_used)))
+            .where(
+                ConsumptionBillingModel.user_id == user_id,
+                ConsumptionBillingModel.status == BillingStatus.ACTIVE.value,
+            )
+            .returning(ConsumptionBillingModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
+        model = result.scalar_one_or_none()
+        await self.session.commit()
+        return model.to_entity() if model else None
+
+    async def add_consumption_batch(
+        self, usage_by_user: Dict[int, float], current_user_id: int
+    ) -> Dict[int, ConsumptionBilling]:
+        """
+        Aplica los deltas de consumo de varios usuarios en un solo UPDATE
+        sobre sus ciclos activos. Los usuarios sin ciclo activo se ignoran.
+        Retorna los ciclos actualizados indexados por usuario.
+        """
+        rows = [
+            (user_id, Decimal(str(mb_used)))
+            for user_id, mb_used in usage_by_user.items()
+            if mb_used > 0
+        ]
+        updated: Dict[int, ConsumptionBilling] = {}
+        if not rows:
+            return updated
+
+        for start in range(0, len(rows), CONSUMPTION_BATCH_SIZE):
+            deltas = values(
+                column("user_id", BigInteger), column("mb_used", Numeric(20, 6)), name="deltas"
+            ).data(rows[start : start + CONSUMPTION_BATCH_SIZE])
+            result = await self.session.execute(
+                _accumulate(deltas.c.mb_used)
+                .where(
+                    ConsumptionBillingModel.user_id == deltas.c.user_id,
+                    ConsumptionBillingModel.status == BillingStatus.ACTIVE.value,
+                )
+                .returning(ConsumptionBillingModel)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            for model in result.scalars().all():
+                updated[model.user_id] = model.to_entity()
 
         await self.session.commit()
-        return True
+        return updated
 
     async def delete(self, billing_id: uuid.UUID, current_user_id: int) -> bool:
         """Elimina un ciclo de facturación de la base de datos."""
@@ -136,3 +191,12 @@ class PostgresConsumptionBillingRepository(IConsumptionBillingRepository):
         await self.session.delete(model)
         await self.session.commit()
         return True
+
+
+def _accumulate(mb_used):
+    """UPDATE que suma ``mb_used`` y recalcula el costo con el precio del propio ciclo."""
+    mb_consumed = ConsumptionBillingModel.mb_consumed + mb_used
+    return update(ConsumptionBillingModel).values(
+        mb_consumed=mb_consumed,
+        total_cost_usd=func.round(mb_consumed * ConsumptionBillingModel.price_per_mb_usd, 6),
+    )
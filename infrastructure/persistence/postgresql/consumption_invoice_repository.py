@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.consumption_invoice import ConsumptionInvoice, InvoiceStatus
@@ -130,6 +130,25 @@ class PostgresConsumptionInvoiceRepository(IConsumptionInvoiceRepository):
         await self.session.commit()
         return True
 
+    async def expire_pending(self, current_user_id: int) -> List[ConsumptionInvoice]:
+        """
+        Marca como expiradas, en una sola sentencia, las facturas pendientes
+        vencidas y retorna las afectadas.
+        """
+        result = await self.session.execute(
+            update(ConsumptionInvoiceModel)
+            .where(
+                ConsumptionInvoiceModel.status == InvoiceStatus.PENDING.value,
+                ConsumptionInvoiceModel.expires_at <= func.now(),
+            )
+            .values(status=InvoiceStatus.EXPIRED.value)
+            .returning(ConsumptionInvoiceModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        models = result.scalars().all()
+        await self.session.commit()
+        return [m.to_entity() for m in models]
+
     async def update_status(
         self, invoice_id: uuid.UUID, status: InvoiceStatus, current_user_id: int
     ) -> bool:
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.crypto_order import CryptoOrder, CryptoOrderStatus
@@ -85,6 +85,25 @@ class PostgresCryptoOrderRepository(ICryptoOrderRepository):
         await self.session.commit()
         return True
 
+    async def expire_pending(self) -> List[CryptoOrder]:
+        """
+        Marca como expiradas, en una sola sentencia, todas las órdenes pendientes
+        cuyo plazo venció y retorna las afectadas (para notificar a sus usuarios).
+        """
+        result = await self.session.execute(
+            update(CryptoOrderModel)
+            .where(
+                CryptoOrderModel.status == CryptoOrderStatus.PENDING.value,
+                CryptoOrderModel.expires_at < func.now(),
+            )
+            .values(status=CryptoOrderStatus.EXPIRED.value)
+            .returning(CryptoOrderModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        models = result.scalars().all()
+        await self.session.commit()
+        return [m.to_entity() for m in models]
+
     async def get_by_user_paginated(
         self, user_id: int, limit: int = 10, offset: int = 0
     ) -> List[CryptoOrder]:
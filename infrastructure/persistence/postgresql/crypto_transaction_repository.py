@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.crypto_transaction import CryptoTransaction, WebhookToken
@@ -73,6 +74,37 @@ class PostgresWebhookTokenRepository(IWebhookTokenRepository):
         model = result.scalar_one_or_none()
         return model.to_entity() if model else None
 
+    async def register_if_absent(self, token: WebhookToken) -> bool:
+        """
+        INSERT ... ON CONFLICT: una sola sentencia, así que dos workers con el
+        mismo nonce no pueden pasar ambos. Un token vencido se reemplaza.
+        """
+        table = WebhookTokenModel.__table__
+        stmt = insert(WebhookTokenModel).values(
+            id=token.id,
+            token_hash=token.token_hash,
+            purpose=token.purpose,
+            created_at=token.created_at,
+            expires_at=token.expires_at,
+            used_at=token.used_at,
+            extra_data=token.extra_data,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.token_hash],
+            set_={
+                "purpose": stmt.excluded.purpose,
+                "created_at": stmt.excluded.created_at,
+                "expires_at": stmt.excluded.expires_at,
+                "used_at": stmt.excluded.used_at,
+                "extra_data": stmt.excluded.extra_data,
+            },
+            where=table.c.expires_at < datetime.now(timezone.utc),
+        ).returning(table.c.id)
+        result = await self.session.execute(stmt)
+        registered = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return registered
+
     async def mark_used(self, token_id: uuid.UUID) -> bool:
         model = await self.session.get(WebhookTokenModel, token_id)
         if not model:
@@ -7,18 +7,21 @@ Version: 2.1.0
 
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import BigInteger, column, delete, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from domain.entities.data_package import DataPackage, PackageType
+from domain.entities.data_package import DataPackage, PackageConsumption, PackageType
 from domain.interfaces.idata_package_repository import IDataPackageRepository
 from utils.logger import logger
 
 from .base_repository import BasePostgresRepository
 from .models import DataPackageModel
 
+# Usuarios por sentencia al descontar consumo en bloque
+CONSUME_CHUNK_SIZE = 5000
+
 
 def _normalize_datetime(dt: Optional[datetime]) -> Optional[datetime]:
     if dt is None:
@@ -159,6 +162,46 @@ class PostgresDataPackageRepository(BasePostgresRepository, IDataPackageReposito
             logger.error(f"Error al actualizar uso del paquete {package_id}: {e}")
             return False
 
+    async def consume_bytes(
+        self, usage_by_user: Dict[int, int], current_user_id: int
+    ) -> List[PackageConsumption]:
+        """
+        Descuenta el consumo de varios usuarios de sus paquetes en una sentencia
+        por bloque de ``CONSUME_CHUNK_SIZE`` usuarios y un solo commit.
+
+        Un CTE calcula con una suma acumulada (ventana por usuario, en orden de
+        expiración) cuánto queda disponible antes de cada paquete; cada paquete
+        absorbe ``LEAST(disponible, demanda - anterior)`` y el UPDATE retorna lo
+        descontado. El incremento se aplica sobre la fila vigente, así que
+        escrituras concurrentes no pierden consumo.
+        """
+        rows = [(user_id, int(used)) for user_id, used in usage_by_user.items() if used > 0]
+        if not rows:
+            return []
+
+        await self._set_current_user(current_user_id)
+        try:
+            outcome: List[PackageConsumption] = []
+            for start in range(0, len(rows), CONSUME_CHUNK_SIZE):
+                result = await self.session.execute(
+                    _consume_statement(rows[start : start + CONSUME_CHUNK_SIZE])
+                )
+                outcome.extend(
+                    PackageConsumption(
+                        package_id=row.id,
+                        user_id=row.user_id,
+                        bytes_consumed=int(row.bytes_consumed),
+                        remaining_bytes=max(0, int(row.remaining_bytes)),
+                    )
+                    for row in result
+                )
+            await self.session.commit()
+            return outcome
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error al descontar consumo de paquetes ({len(rows)} usuarios): {e}")
+            raise
+
     async def deactivate(self, package_id: uuid.UUID, current_user_id: int) -> bool:
         await self._set_current_user(current_user_id)
         try:
@@ -199,3 +242,84 @@ class PostgresDataPackageRepository(BasePostgresRepository, IDataPackageReposito
         except Exception as e:
             logger.error(f"Error al obtener paquetes expirados: {e}")
             return []
+
+    async def deactivate_expired(self, current_user_id: int) -> List[DataPackage]:
+        """Desactiva en una sola sentencia los paquetes vencidos y los retorna."""
+        await self._set_current_user(current_user_id)
+        try:
+            result = await self.session.execute(
+                update(DataPackageModel)
+                .where(
+                    DataPackageModel.is_active == True,
+                    DataPackageModel.expires_at < func.now(),
+                )
+                .values(is_active=False)
+                .returning(DataPackageModel)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            models = result.scalars().all()
+            await self.session.commit()
+            return [self._model_to_entity(m) for m in models]
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error al desactivar paquetes expirados: {e}")
+            raise
+
+
+def _consume_statement(rows: List[tuple]):
+    """UPDATE ... FROM (CTE) que reparte la demanda de cada usuario entre sus paquetes."""
+    demand = values(column("user_id", BigInteger), column("bytes", BigInteger), name="demand").data(
+        rows
+    )
+    available = func.greatest(
+        DataPackageModel.data_limit_bytes - DataPackageModel.data_used_bytes, 0
+    )
+    drained_before = (
+        func.sum(available).over(
+            partition_by=DataPackageModel.user_id,
+            order_by=(
+                DataPackageModel.expires_at,
+                DataPackageModel.purchased_at,
+                DataPackageModel.id,
+            ),
+        )
+        - available
+    )
+    candidates = (
+        select(
+            DataPackageModel.id,
+            available.label("available"),
+            drained_before.label("drained_before"),
+            demand.c.bytes.label("demand"),
+        )
+        .join(demand, demand.c.user_id == DataPackageModel.user_id)
+        .where(
+            DataPackageModel.is_active.is_(True),
+            DataPackageModel.expires_at > func.now(),
+            DataPackageModel.data_used_bytes < DataPackageModel.data_limit_bytes,
+        )
+        .cte("candidates")
+    )
+    allocation = (
+        select(
+            candidates.c.id,
+            func.least(
+                candidates.c.available, candidates.c.demand - candidates.c.drained_before
+            ).label("take"),
+        )
+        .where(candidates.c.demand > candidates.c.drained_before)
+        .cte("allocation")
+    )
+    return (
+        update(DataPackageModel)
+        .where(DataPackageModel.id == allocation.c.id)
+        .values(data_used_bytes=DataPackageModel.data_used_bytes + allocation.c.take)
+        .returning(
+            DataPackageModel.id,
+            DataPackageModel.user_id,
+            allocation.c.take.label("bytes_consumed"),
+            (DataPackageModel.data_limit_bytes - DataPackageModel.data_used_bytes).label(
+                "remaining_bytes"
+            ),
+        )
+    )
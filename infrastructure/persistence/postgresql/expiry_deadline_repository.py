@@ -0,0 +1,78 @@
+"""
+Lectura de los próximos vencimientos para el planificador de expiraciones.
+
+Author: uSipipo Team
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.expiry_deadline import ExpiryDeadline, ExpiryKind
+from domain.interfaces.iexpiry_deadline_repository import IExpiryDeadlineRepository
+
+from .models import (
+    ConsumptionBillingModel,
+    ConsumptionInvoiceModel,
+    DataPackageModel,
+    SubscriptionPlanModel,
+)
+from .models.crypto_order import CryptoOrderModel
+
+
+class PostgresExpiryDeadlineRepository(IExpiryDeadlineRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_upcoming(self, until: datetime, cycle_days: int) -> List[ExpiryDeadline]:
+        result = await self.session.execute(_upcoming_statement(until, cycle_days))
+        return [
+            ExpiryDeadline(deadline=row.deadline, kind=ExpiryKind(row.kind), entity_id=row.id)
+            for row in result
+        ]
+
+
+def _upcoming_statement(until: datetime, cycle_days: int):
+    """UNION ALL de los vencimientos de cada tabla, cada rama sobre su índice."""
+    cycle_end = ConsumptionBillingModel.started_at + timedelta(days=cycle_days)
+
+    def kind(value: ExpiryKind):
+        # Constante en línea: un parámetro sin tipo en un UNION no se puede inferir
+        return literal(value.value, literal_execute=True).label("kind")
+
+    branches = [
+        select(
+            kind(ExpiryKind.CRYPTO_ORDER),
+            CryptoOrderModel.id.label("id"),
+            CryptoOrderModel.expires_at.label("deadline"),
+        ).where(CryptoOrderModel.status == "pending", CryptoOrderModel.expires_at <= until),
+        select(
+            kind(ExpiryKind.DATA_PACKAGE),
+            DataPackageModel.id,
+            DataPackageModel.expires_at,
+        ).where(DataPackageModel.is_active == True, DataPackageModel.expires_at <= until),
+        select(
+            kind(ExpiryKind.INVOICE),
+            ConsumptionInvoiceModel.id,
+            ConsumptionInvoiceModel.expires_at,
+        ).where(
+            ConsumptionInvoiceModel.status == "pending",
+            ConsumptionInvoiceModel.expires_at <= until,
+        ),
+        select(
+            kind(ExpiryKind.SUBSCRIPTION),
+            SubscriptionPlanModel.id,
+            SubscriptionPlanModel.expires_at,
+        ).where(SubscriptionPlanModel.is_active == True, SubscriptionPlanModel.expires_at <= until),
+        select(
+            kind(ExpiryKind.BILLING_CYCLE),
+            ConsumptionBillingModel.id,
+            cycle_end,
+        ).where(
+            ConsumptionBillingModel.status == "active",
+            ConsumptionBillingModel.started_at <= until - timedelta(days=cycle_days),
+        ),
+    ]
+    return union_all(*branches)
@@ -7,11 +7,13 @@ Version: 2.1.0
 
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, update
+from sqlalchemy import BigInteger, cast, column, func, select, text, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as SQLUUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from domain.entities.key_query import KeyCursor, KeyPage, KeyQuery, KeySortField
 from domain.entities.vpn_key import KeyType, VpnKey
 from domain.interfaces.ikey_repository import IKeyRepository
 from utils.logger import logger
@@ -19,6 +21,12 @@ from utils.logger import logger
 from .base_repository import BasePostgresRepository
 from .models import VpnKeyModel
 
+# Filas por sentencia en actualizaciones masivas (2 parámetros por fila)
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+# Por debajo de este tamaño estimado se cuenta exacto (COUNT(*) es barato)
+COUNT_ESTIMATE_MIN_ROWS = 10_000
+
 
 def _normalize_datetime(dt: Optional[datetime]) -> Optional[datetime]:
     if dt is None:
@@ -43,6 +51,7 @@ class PostgresKeyRepository(BasePostgresRepository, IKeyRepository):
             created_at=_normalize_datetime(model.created_at) or datetime.now(timezone.utc),
             is_active=model.is_active,
             used_bytes=model.used_bytes or 0,
+            usage_counter_bytes=model.usage_counter_bytes,
             last_seen_at=_normalize_datetime(model.last_seen_at),
             data_limit_bytes=model.data_limit_bytes or 5 * 1024**3,
             billing_reset_at=_normalize_datetime(model.billing_reset_at)
@@ -62,6 +71,7 @@ class PostgresKeyRepository(BasePostgresRepository, IKeyRepository):
             external_id=entity.external_id,
             is_active=entity.is_active,
             used_bytes=entity.used_bytes,
+            usage_counter_bytes=entity.usage_counter_bytes,
             last_seen_at=entity.last_seen_at,
             data_limit_bytes=entity.data_limit_bytes,
             billing_reset_at=entity.billing_reset_at,
@@ -140,6 +150,124 @@ class PostgresKeyRepository(BasePostgresRepository, IKeyRepository):
             logger.error(f"Error al obtener todas las llaves: {e}")
             return []
 
+    def _apply_filters(self, stmt, query: KeyQuery):
+        """Traduce los filtros de ``KeyQuery`` a condiciones WHERE."""
+        if query.key_type is not None:
+            stmt = stmt.where(VpnKeyModel.key_type == KeyType(query.key_type).value)
+        if query.is_active is not None:
+            stmt = stmt.where(VpnKeyModel.is_active == query.is_active)
+        if query.user_id is not None:
+            stmt = stmt.where(VpnKeyModel.user_id == query.user_id)
+        if query.expiring_within is not None:
+            now = datetime.now(timezone.utc)
+            stmt = stmt.where(
+                VpnKeyModel.expires_at.is_not(None),
+                VpnKeyModel.expires_at >= now,
+                VpnKeyModel.expires_at <= now + query.expiring_within,
+            )
+        if query.over_quota is True:
+            stmt = stmt.where(VpnKeyModel.used_bytes >= VpnKeyModel.data_limit_bytes)
+        elif query.over_quota is False:
+            stmt = stmt.where(VpnKeyModel.used_bytes < VpnKeyModel.data_limit_bytes)
+        return stmt
+
+    async def query_keys(self, query: KeyQuery, current_user_id: int) -> KeyPage:
+        """
+        Listado de llaves con filtros, orden y paginación keyset resueltos en
+        SQL: ORDER BY (columna, id) y ``(columna, id) < cursor`` (o ``>`` en
+        orden ascendente), así cada página cuesta O(limit) con los índices
+        compuestos correspondientes.
+        """
+        await self._set_current_user(current_user_id)
+        try:
+            sort_column = getattr(VpnKeyModel, KeySortField(query.sort).value)
+            stmt = self._apply_filters(select(VpnKeyModel), query)
+
+            if query.cursor is not None:
+                position = tuple_(sort_column, VpnKeyModel.id)
+                bound = tuple_(query.cursor.value, query.cursor.key_id)
+                stmt = stmt.where(position < bound if query.descending else position > bound)
+
+            if query.descending:
+                stmt = stmt.order_by(sort_column.desc(), VpnKeyModel.id.desc())
+            else:
+                stmt = stmt.order_by(sort_column.asc(), VpnKeyModel.id.asc())
+
+            if query.limit is not None:
+                stmt = stmt.limit(query.limit + 1)
+
+            models = (await self.session.execute(stmt)).scalars().all()
+
+            next_cursor = None
+            if query.limit is not None and len(models) > query.limit:
+                models = models[: query.limit]
+                last = models[-1]
+                next_cursor = KeyCursor(value=getattr(last, sort_column.key), key_id=last.id)
+
+            return KeyPage(
+                items=[self._model_to_entity(m) for m in models], next_cursor=next_cursor
+            )
+        except Exception as e:
+            logger.error(f"Error al consultar llaves: {e}")
+            raise
+
+    async def count_keys(self, query: KeyQuery, current_user_id: int, estimate: bool = True) -> int:
+        """
+        Cuenta las llaves que cumplen los filtros de ``query``.
+
+        Sin filtros y con ``estimate=True`` usa la estimación del planner
+        (pg_class.reltuples) cuando la tabla es grande, evitando recorrerla.
+        """
+        await self._set_current_user(current_user_id)
+        try:
+            if estimate and not query.has_filters:
+                result = await self.session.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'vpn_keys'::regclass")
+                )
+                estimated = result.scalar_one_or_none()
+                if estimated is not None and estimated >= COUNT_ESTIMATE_MIN_ROWS:
+                    return int(estimated)
+
+            stmt = self._apply_filters(select(func.count()).select_from(VpnKeyModel), query)
+            return (await self.session.execute(stmt)).scalar_one() or 0
+        except Exception as e:
+            logger.error(f"Error al contar llaves: {e}")
+            raise
+
+    async def get_key_stats(self, current_user_id: int, since: datetime) -> Dict[str, Any]:
+        """
+        Estadísticas de llaves en una sola consulta agrupada por key_type
+        (COUNT ... FILTER + SUM(used_bytes)); retorna una fila por tipo.
+        """
+        await self._set_current_user(current_user_id)
+        try:
+            query = select(
+                VpnKeyModel.key_type,
+                func.count().label("total"),
+                func.count().filter(VpnKeyModel.is_active == True).label("active"),
+                func.count().filter(VpnKeyModel.created_at >= since).label("created"),
+                func.coalesce(func.sum(VpnKeyModel.used_bytes), 0).label("used_bytes"),
+            ).group_by(VpnKeyModel.key_type)
+            rows = (await self.session.execute(query)).all()
+
+            by_type: Dict[str, Dict[str, int]] = {}
+            totals = {"total": 0, "active": 0, "created": 0, "used_bytes": 0}
+            for row in rows:
+                counts = {
+                    "total": row.total or 0,
+                    "active": row.active or 0,
+                    "created": row.created or 0,
+                    "used_bytes": int(row.used_bytes or 0),
+                }
+                by_type[str(row.key_type).lower()] = counts
+                for name, value in counts.items():
+                    totals[name] += value
+
+            return {**totals, "by_type": by_type}
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas de llaves: {e}")
+            raise
+
     async def get_by_id(self, key_id: uuid.UUID, current_user_id: int) -> Optional[VpnKey]:
         await self._set_current_user(current_user_id)
         try:
@@ -177,6 +305,113 @@ class PostgresKeyRepository(BasePostgresRepository, IKeyRepository):
             logger.error(f"Error al actualizar uso de llave {key_id}: {e}")
             return False
 
+    async def bulk_update_usage(
+        self,
+        usages: Sequence[Tuple[uuid.UUID, int, int, Optional[int]]],
+        current_user_id: int,
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+    ) -> List[uuid.UUID]:
+        """
+        Suma deltas a used_bytes y avanza usage_counter_bytes de muchas llaves en bloque.
+
+        Emite un único ``UPDATE vpn_keys ... FROM (VALUES ...)`` por cada
+        ``chunk_size`` filas y hace un solo commit al final. El delta se suma
+        en SQL (``used_bytes = vpn_keys.used_bytes + delta``), así un
+        ``reset_data_usage`` concurrente no se pierde. Solo se actualizan las
+        llaves cuyo contador sigue siendo ``previous_counter``; si otra
+        sincronización ya lo avanzó, la fila se omite.
+
+        Args:
+            usages: Tuplas (key_id, delta_bytes, usage_counter_bytes,
+                previous_counter) a persistir.
+            current_user_id: Usuario para el contexto de auditoría.
+            chunk_size: Filas por sentencia.
+
+        Returns:
+            IDs de las llaves actualizadas.
+        """
+        if not usages:
+            return []
+
+        await self._set_current_user(current_user_id)
+        try:
+            now = datetime.now(timezone.utc)
+            updated: List[uuid.UUID] = []
+            for start in range(0, len(usages), chunk_size):
+                chunk = usages[start : start + chunk_size]
+                rows = values(
+                    column("id", SQLUUID(as_uuid=True)),
+                    column("delta", BigInteger),
+                    column("counter", BigInteger),
+                    column("previous_counter", BigInteger),
+                    name="usage_rows",
+                ).data(
+                    [
+                        (
+                            uuid.UUID(str(key_id)),
+                            int(delta),
+                            int(counter),
+                            None if previous is None else int(previous),
+                        )
+                        for key_id, delta, counter, previous in chunk
+                    ]
+                )
+                query = (
+                    update(VpnKeyModel)
+                    .where(VpnKeyModel.id == rows.c.id)
+                    .where(
+                        # CAST: un bloque de solo líneas base deja la columna en NULL sin tipo
+                        VpnKeyModel.usage_counter_bytes.is_not_distinct_from(
+                            cast(rows.c.previous_counter, BigInteger)
+                        )
+                    )
+                    .values(
+                        used_bytes=VpnKeyModel.used_bytes + rows.c.delta,
+                        usage_counter_bytes=rows.c.counter,
+                        last_seen_at=now,
+                    )
+                    .returning(VpnKeyModel.id)
+                )
+                result = await self.session.execute(query)
+                updated.extend(result.scalars().all())
+            await self.session.commit()
+            return updated
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error en actualización masiva de uso ({len(usages)} llaves): {e}")
+            raise
+
+    async def set_active_bulk(
+        self,
+        key_ids: Sequence[uuid.UUID],
+        is_active: bool,
+        current_user_id: int,
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+    ) -> int:
+        """
+        Activa o desactiva muchas llaves con un ``UPDATE ... WHERE id IN (...)``
+        por cada ``chunk_size`` llaves y un solo commit.
+        """
+        if not key_ids:
+            return 0
+
+        await self._set_current_user(current_user_id)
+        try:
+            updated = 0
+            for start in range(0, len(key_ids), chunk_size):
+                chunk = [uuid.UUID(str(key_id)) for key_id in key_ids[start : start + chunk_size]]
+                query = (
+                    update(VpnKeyModel).where(VpnKeyModel.id.in_(chunk)).values(is_active=is_active)
+                )
+                result = await self.session.execute(query)
+                updated += result.rowcount or 0
+            await self.session.commit()
+            return updated
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error actualizando estado de {len(key_ids)} llaves: {e}")
+            raise
+
     async def update_data_limit(
         self, key_id: uuid.UUID, data_limit_bytes: int, current_user_id: int
     ) -> bool:
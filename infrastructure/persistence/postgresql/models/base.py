@@ -108,6 +108,8 @@ class VpnKeyModel(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, server_default="true")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     used_bytes: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    # Último contador bruto visto en el servidor VPN (base para calcular deltas)
+    usage_counter_bytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     data_limit_bytes: Mapped[int] = mapped_column(BigInteger, server_default="10737418240")
     billing_reset_at: Mapped[datetime] = mapped_column(
@@ -3,9 +3,9 @@
 import uuid
 from dataclasses import replace
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.subscription_plan import PlanType, SubscriptionPlan
@@ -150,6 +150,27 @@ class PostgresSubscriptionRepository(BasePostgresRepository, ISubscriptionReposi
             logger.error(f"❌ Error getting active subscription for user {user_id}: {e}")
             raise
 
+    async def get_premium_user_ids(self, user_ids: Iterable[int], current_user_id: int) -> Set[int]:
+        """Subset of user_ids with an active, unexpired subscription (one query)."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        await self._set_current_user(current_user_id)
+        try:
+            result = await self.session.execute(
+                select(SubscriptionPlanModel.user_id)
+                .where(
+                    SubscriptionPlanModel.user_id.in_(user_ids),
+                    SubscriptionPlanModel.is_active == True,
+                    SubscriptionPlanModel.expires_at > datetime.now(timezone.utc),
+                )
+                .distinct()
+            )
+            return set(result.scalars().all())
+        except Exception as e:
+            logger.error(f"❌ Error getting premium users for {len(user_ids)} users: {e}")
+            raise
+
     async def get_expiring_plans(self, days: int, current_user_id: int) -> List[SubscriptionPlan]:
         """Get plans expiring within N days."""
         await self._set_current_user(current_user_id)
@@ -187,6 +208,28 @@ class PostgresSubscriptionRepository(BasePostgresRepository, ISubscriptionReposi
             logger.error(f"❌ Error getting expired plans: {e}")
             raise
 
+    async def deactivate_expired(self, current_user_id: int) -> List[SubscriptionPlan]:
+        """Deactivate every expired plan in one statement and return them."""
+        await self._set_current_user(current_user_id)
+        try:
+            result = await self.session.execute(
+                update(SubscriptionPlanModel)
+                .where(
+                    SubscriptionPlanModel.is_active == True,
+                    SubscriptionPlanModel.expires_at < func.now(),
+                )
+                .values(is_active=False)
+                .returning(SubscriptionPlanModel)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            models = result.scalars().all()
+            await self.session.commit()
+            return [self._model_to_entity(m) for m in models]
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"❌ Error deactivating expired plans: {e}")
+            raise
+
     async def deactivate(self, plan_id: uuid.UUID, current_user_id: int) -> bool:
         """Deactivate a subscription plan."""
         await self._set_current_user(current_user_id)
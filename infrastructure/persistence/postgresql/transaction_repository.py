@@ -6,7 +6,7 @@ Version: 1.0.0
 """
 
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -142,3 +142,35 @@ class PostgresTransactionRepository(BasePostgresRepository, ITransactionReposito
         except Exception as e:
             logger.error(f"Error al obtener saldo del usuario {user_id}: {e}")
             return Balance(user_id=user_id, stars=0)
+
+    async def get_balances(self, user_ids: Iterable[int]) -> Dict[int, Balance]:
+        """
+        Obtiene el saldo de varios usuarios en una sola consulta.
+
+        Usa ``DISTINCT ON (user_id)`` para quedarse con la última transacción
+        de cada usuario.
+
+        Args:
+            user_ids: IDs de Telegram de los usuarios.
+
+        Returns:
+            Diccionario user_id -> Balance; los usuarios sin transacciones
+            tienen 0 stars.
+        """
+        ids = list(dict.fromkeys(user_ids))
+        balances = {user_id: Balance(user_id=user_id, stars=0) for user_id in ids}
+        if not ids:
+            return balances
+        try:
+            query = (
+                select(TransactionModel.user_id, TransactionModel.balance_after)
+                .where(TransactionModel.user_id.in_(ids))
+                .distinct(TransactionModel.user_id)
+                .order_by(TransactionModel.user_id, TransactionModel.created_at.desc())
+            )
+            result = await self.session.execute(query)
+            for user_id, balance_after in result.all():
+                balances[user_id] = Balance(user_id=user_id, stars=balance_after)
+        except Exception as e:
+            logger.error(f"Error al obtener saldos de {len(ids)} usuarios: {e}")
+        return balances
@@ -7,17 +7,18 @@ Version: 2.1.0
 
 import secrets
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import select, update
+from sqlalchemy import func, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from domain.entities.admin import UserListCursor, UserListItem, UserListPage
 from domain.entities.user import User, UserRole, UserStatus
 from domain.interfaces.iuser_repository import IUserRepository
 from utils.logger import logger
 
 from .base_repository import BasePostgresRepository
-from .models import UserModel
+from .models import UserModel, VpnKeyModel
 
 
 class PostgresUserRepository(BasePostgresRepository, IUserRepository):
@@ -201,6 +202,101 @@ class PostgresUserRepository(BasePostgresRepository, IUserRepository):
             logger.error(f"Error al obtener todos los usuarios: {e}")
             return []
 
+    async def get_users_page(
+        self,
+        current_user_id: int,
+        limit: int,
+        cursor: Optional[UserListCursor] = None,
+    ) -> UserListPage:
+        """
+        Página del listado admin con paginación keyset sobre
+        (created_at, telegram_id): primero se eligen los ``limit`` usuarios de
+        la página por índice y luego se cuentan sus llaves con un único
+        LEFT JOIN ... GROUP BY, así el costo no depende de la profundidad.
+        """
+        await self._set_current_user(current_user_id)
+        try:
+            page_query = select(UserModel.telegram_id)
+            if cursor is not None:
+                page_query = page_query.where(
+                    tuple_(UserModel.created_at, UserModel.telegram_id)
+                    < tuple_(cursor.created_at, cursor.telegram_id)
+                )
+            page = (
+                page_query.order_by(UserModel.created_at.desc(), UserModel.telegram_id.desc())
+                .limit(limit + 1)
+                .subquery("user_page")
+            )
+
+            query = (
+                select(
+                    UserModel,
+                    func.count(VpnKeyModel.id).label("total_keys"),
+                    func.count(VpnKeyModel.id)
+                    .filter(VpnKeyModel.is_active == True)
+                    .label("active_keys"),
+                )
+                .join(page, page.c.telegram_id == UserModel.telegram_id)
+                .outerjoin(VpnKeyModel, VpnKeyModel.user_id == UserModel.telegram_id)
+                .group_by(UserModel.telegram_id)
+                .order_by(UserModel.created_at.desc(), UserModel.telegram_id.desc())
+            )
+            rows = (await self.session.execute(query)).all()
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            items = [
+                UserListItem(
+                    user=self._model_to_entity(row[0]),
+                    total_keys=row.total_keys or 0,
+                    active_keys=row.active_keys or 0,
+                )
+                for row in rows
+            ]
+
+            next_cursor = None
+            if has_more and items:
+                last = items[-1].user
+                next_cursor = UserListCursor(last.created_at, last.telegram_id)
+
+            return UserListPage(items=items, next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Error al obtener página de usuarios: {e}")
+            raise
+
+    async def count_users(self, current_user_id: int) -> int:
+        await self._set_current_user(current_user_id)
+        try:
+            result = await self.session.execute(select(func.count()).select_from(UserModel))
+            return result.scalar_one() or 0
+        except Exception as e:
+            logger.error(f"Error al contar usuarios: {e}")
+            raise
+
+    async def get_user_stats(self, current_user_id: int, since: datetime) -> Dict[str, int]:
+        """
+        Conteos del panel de administración en una sola consulta
+        (COUNT ... FILTER) en lugar de cargar todos los usuarios.
+        """
+        await self._set_current_user(current_user_id)
+        try:
+            query = select(
+                func.count().label("total_users"),
+                func.count()
+                .filter(or_(func.lower(UserModel.status) == "active", UserModel.is_active == True))
+                .label("active_users"),
+                func.count().filter(UserModel.created_at >= since).label("new_users"),
+            )
+            row = (await self.session.execute(query)).one()
+            return {
+                "total_users": row.total_users or 0,
+                "active_users": row.active_users or 0,
+                "new_users": row.new_users or 0,
+            }
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas de usuarios: {e}")
+            raise
+
     async def update_free_data_usage(
         self, telegram_id: int, bytes_used: int, current_user_id: int
     ) -> bool:
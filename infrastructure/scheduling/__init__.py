@@ -0,0 +1,3 @@
+from infrastructure.scheduling.expiry_scheduler import ExpiryScheduler, get_expiry_scheduler
+
+__all__ = ["ExpiryScheduler", "get_expiry_scheduler"]
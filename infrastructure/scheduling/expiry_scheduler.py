@@ -0,0 +1,280 @@
+"""
+Planificador de expiraciones por vencimiento exacto.
+
+En lugar de sondear cada tabla a intervalo fijo, mantiene un min-heap con los
+próximos vencimientos (órdenes crypto, paquetes, facturas, planes y ciclos de
+consumo) y arma un único ``run_once`` del ``JobQueue`` para el más cercano.
+Al dispararse, ejecuta el handler en bloque de cada tipo vencido (un UPDATE
+por tipo, ver repositorios) y se vuelve a armar.
+
+- El heap se carga al arrancar con una sola consulta indexada y se recarga
+  en cada reconciliación, limitado a un horizonte de dos intervalos.
+- Los servicios registran (``track``) los vencimientos que crean y los
+  retiran (``untrack``) al completarse; retirar es borrado perezoso, la
+  entrada vieja del heap se descarta al llegar a la cima.
+- Un barrido de reconciliación periódico ejecuta todos los handlers por si
+  algún vencimiento no se registró (p. ej. filas creadas por otro proceso).
+
+``track``/``untrack`` se pueden llamar desde cualquier hilo (la API corre en
+otro event loop); el temporizador solo se toca desde el loop del bot. Si la
+API corre en otro proceso (``API_MODE=standalone``), ``forward_to`` reenvía
+los registros al bot por el canal de eventos.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import heapq
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from domain.entities.expiry_deadline import ExpiryDeadline, ExpiryKind
+from utils.logger import logger
+
+# Margen tras el vencimiento para que now() de la BD ya lo considere vencido
+FIRE_DELAY = timedelta(seconds=1)
+
+ExpiryHandler = Callable[[], Awaitable[int]]
+ExpiryForwarder = Callable[..., Any]
+DeadlineLoader = Callable[[datetime], Awaitable[List[ExpiryDeadline]]]
+
+
+async def load_deadlines_from_database(until: datetime) -> List[ExpiryDeadline]:
+    """Carga los vencimientos hasta ``until`` con una sola consulta."""
+    from infrastructure.persistence.database import get_session_context
+    from infrastructure.persistence.postgresql.expiry_deadline_repository import (
+        PostgresExpiryDeadlineRepository,
+    )
+
+    async with get_session_context() as session:
+        repo = PostgresExpiryDeadlineRepository(session)
+        return await repo.get_upcoming(until, settings.CONSUMPTION_CYCLE_DAYS)
+
+
+@dataclass
+class SchedulerStats:
+    tracked: int = 0
+    fired: int = 0
+    expired: int = 0
+    reconciliations: int = 0
+    errors: int = 0
+
+
+class ExpiryScheduler:
+    """Min-heap de vencimientos con disparo exacto sobre el JobQueue."""
+
+    def __init__(self, loader: Optional[DeadlineLoader] = None):
+        self._loader = loader or load_deadlines_from_database
+        self._handlers: Dict[ExpiryKind, ExpiryHandler] = {}
+        self._heap: List[ExpiryDeadline] = []
+        # Vencimiento vigente por entidad; el heap puede tener entradas obsoletas
+        self._deadlines: Dict[Tuple[ExpiryKind, uuid.UUID], datetime] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._job_queue: Any = None
+        self._timer: Any = None
+        self._armed_for: Optional[datetime] = None
+        self._horizon_end: Optional[datetime] = None
+        self._forwarder: Optional[ExpiryForwarder] = None
+        self.stats = SchedulerStats()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._deadlines)
+
+    def register(self, kind: ExpiryKind, handler: ExpiryHandler) -> None:
+        """Asocia el handler en bloque que expira las entidades de ``kind``."""
+        self._handlers[kind] = handler
+
+    def forward_to(self, forwarder: Optional[ExpiryForwarder]) -> None:
+        """Reenvía ``track``/``untrack`` (p. ej. al bot) mientras no corra aquí."""
+        self._forwarder = forwarder
+
+    async def start(self, job_queue: Any) -> None:
+        """Carga el heap, expira lo atrasado y programa la reconciliación."""
+        self._loop = asyncio.get_running_loop()
+        self._job_queue = job_queue
+        interval = settings.EXPIRY_RECONCILE_INTERVAL_SECONDS
+        await self.reconcile()
+        job_queue.run_repeating(
+            self._on_reconcile, interval=interval, first=interval, name="expiry-reconcile"
+        )
+        logger.info(
+            f"⏰ Planificador de expiraciones iniciado ({self.pending} vencimientos, "
+            f"reconciliación cada {interval}s)"
+        )
+
+    def stop(self) -> None:
+        with self._lock:
+            timer, self._timer = self._timer, None
+            self._armed_for = None
+            self._loop = None
+        if timer is not None:
+            timer.schedule_removal()
+
+    def track(self, kind: ExpiryKind, entity_id: uuid.UUID, deadline: datetime) -> None:
+        """Registra (o mueve) el vencimiento de una entidad."""
+        if deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=timezone.utc)
+        if not self.running and self._forwarder is not None:
+            self._forward(
+                "expiry.track",
+                kind=kind.value,
+                entity_id=str(entity_id),
+                deadline=deadline.isoformat(),
+            )
+            return
+        if not self.running or kind not in self._handlers:
+            return
+        with self._lock:
+            if self._horizon_end is not None and deadline > self._horizon_end:
+                # Lo cargará la siguiente reconciliación
+                return
+            self._deadlines[(kind, entity_id)] = deadline
+            heapq.heappush(self._heap, ExpiryDeadline(deadline, kind, entity_id))
+            self.stats.tracked += 1
+            rearm = self._armed_for is None or deadline < self._armed_for
+        if rearm:
+            self._call_in_loop(self._arm)
+
+    def untrack(self, kind: ExpiryKind, entity_id: uuid.UUID) -> None:
+        """Retira el vencimiento de una entidad completada o cancelada."""
+        if not self.running and self._forwarder is not None:
+            self._forward("expiry.untrack", kind=kind.value, entity_id=str(entity_id))
+            return
+        with self._lock:
+            self._deadlines.pop((kind, entity_id), None)
+
+    def _forward(self, event: str, **payload: Any) -> None:
+        try:
+            self._forwarder(event, **payload)
+        except Exception as e:
+            # La reconciliación periódica del bot cubre lo que no llegue
+            logger.warning(f"⚠️ No se pudo reenviar {event}: {e}")
+
+    async def fire(self, now: Optional[datetime] = None) -> Dict[ExpiryKind, int]:
+        """Ejecuta los handlers de los tipos con vencimientos cumplidos."""
+        now = now or datetime.now(timezone.utc)
+        due = set()
+        with self._lock:
+            self._timer = None
+            self._armed_for = None
+            while self._heap and self._heap[0].deadline <= now:
+                entry = heapq.heappop(self._heap)
+                if self._deadlines.get(entry.key) == entry.deadline:
+                    del self._deadlines[entry.key]
+                    due.add(entry.kind)
+
+        results = {}
+        for kind in ExpiryKind:
+            if kind in due:
+                self.stats.fired += 1
+                results[kind] = await self._run_handler(kind)
+        self._arm()
+        return results
+
+    async def reconcile(self) -> None:
+        """Ejecuta todos los handlers y recarga los vencimientos del horizonte."""
+        self.stats.reconciliations += 1
+        for kind in ExpiryKind:
+            if kind in self._handlers:
+                await self._run_handler(kind)
+        await self.reload()
+
+    async def reload(self) -> None:
+        until = datetime.now(timezone.utc) + timedelta(
+            seconds=2 * settings.EXPIRY_RECONCILE_INTERVAL_SECONDS
+        )
+        try:
+            deadlines = await self._loader(until)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"❌ Error cargando vencimientos: {e}")
+            return
+
+        heap = [d for d in deadlines if d.kind in self._handlers]
+        loaded = {entry.key: entry.deadline for entry in heap}
+        with self._lock:
+            # Conservar lo registrado mientras corría la consulta
+            for key, deadline in self._deadlines.items():
+                if key not in loaded:
+                    loaded[key] = deadline
+                    heap.append(ExpiryDeadline(deadline, *key))
+            heapq.heapify(heap)
+            self._heap = heap
+            self._deadlines = loaded
+            self._horizon_end = until
+        self._arm()
+
+    async def _run_handler(self, kind: ExpiryKind) -> int:
+        try:
+            count = await self._handlers[kind]()
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"❌ Error expirando {kind.value}: {e}")
+            return 0
+        self.stats.expired += count
+        return count
+
+    def _arm(self) -> None:
+        """(Re)programa el temporizador para el vencimiento vigente más cercano."""
+        if self._job_queue is None:
+            return
+        with self._lock:
+            while self._heap and self._deadlines.get(self._heap[0].key) != self._heap[0].deadline:
+                heapq.heappop(self._heap)
+            next_deadline = self._heap[0].deadline if self._heap else None
+            if next_deadline == self._armed_for and self._timer is not None:
+                return
+            timer, self._timer = self._timer, None
+            self._armed_for = next_deadline
+        if timer is not None:
+            timer.schedule_removal()
+        if next_deadline is None:
+            return
+        job = self._job_queue.run_once(
+            self._on_timer, when=next_deadline + FIRE_DELAY, name="expiry-scheduler"
+        )
+        with self._lock:
+            self._timer = job
+
+    def _call_in_loop(self, callback: Callable[[], None]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is loop:
+            callback()
+        else:
+            loop.call_soon_threadsafe(callback)
+
+    async def _on_timer(self, context: Any) -> None:
+        await self.fire()
+
+    async def _on_reconcile(self, context: Any) -> None:
+        await self.reconcile()
+
+
+_scheduler: Optional[ExpiryScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_expiry_scheduler() -> ExpiryScheduler:
+    """Planificador compartido del proceso."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ExpiryScheduler()
+        return _scheduler
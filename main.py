@@ -11,17 +11,33 @@ from typing import Any
 from telegram.ext import Application, ApplicationBuilder
 
 from application.services.common.container import get_service
+from application.services.consumption_billing_service import ConsumptionBillingService
+from application.services.consumption_invoice_service import ConsumptionInvoiceService
 from application.services.crypto_payment_service import CryptoPaymentService
 from application.services.data_package_service import DataPackageService
+from application.services.metrics_snapshot_service import MetricsSnapshotService
 from application.services.referral_service import ReferralService
+from application.services.subscription_service import SubscriptionService
 from application.services.vpn_service import VpnService
 from config import settings
-from infrastructure.jobs.crypto_order_expiration_job import expire_crypto_orders_job
+from domain.entities.expiry_deadline import ExpiryKind
+from infrastructure.api_clients.client_wireguard import WireGuardClient
+from infrastructure.api_clients.http_pool import close_http_clients
+from infrastructure.jobs.crypto_order_expiration_job import (
+    expire_crypto_orders,
+    expire_crypto_orders_job,
+)
 from infrastructure.jobs.key_cleanup_job import key_cleanup_job
 from infrastructure.jobs.memory_cleanup_job import memory_cleanup_job
 from infrastructure.jobs.package_expiration_job import expire_packages_job
 from infrastructure.jobs.usage_sync import sync_vpn_usage_job
+from infrastructure.notifications import (
+    bot_channel_handlers,
+    get_bot_channel,
+    get_notification_dispatcher,
+)
 from infrastructure.persistence.database import close_database, init_database
+from infrastructure.scheduling import ExpiryScheduler, get_expiry_scheduler
 from telegram_bot.handlers.handler_initializer import initialize_handlers
 from utils.logger import logger
 from version import __version__
@@ -32,30 +48,67 @@ async def startup():
     logger.info("🔌 Inicializando conexión a base de datos...")
     await init_database()
     logger.info("✅ Base de datos inicializada.")
+    await get_notification_dispatcher().start()
+    await get_service(MetricsSnapshotService).start()
 
 
 async def shutdown():
     """Limpieza al cerrar la aplicación."""
+    get_expiry_scheduler().stop()
+    if settings.API_MODE == "standalone":
+        await get_bot_channel().close()
+    await get_service(MetricsSnapshotService).close()
+
+    logger.info("💾 Persistiendo cambios pendientes de WireGuard...")
+    try:
+        await get_service(WireGuardClient).close()
+    except Exception as e:
+        logger.error(f"❌ Error persistiendo configuración de WireGuard: {e}")
+
+    logger.info("📬 Enviando notificaciones pendientes...")
+    await get_notification_dispatcher().close()
+
+    logger.info("🌐 Cerrando clientes HTTP externos...")
+    await close_http_clients()
+
     logger.info("🔌 Cerrando conexión a base de datos...")
     await close_database()
 
 
-def run_api_server():
-    """Ejecuta el servidor API en un hilo separado."""
-    import asyncio
+def register_expiry_handlers(
+    scheduler: ExpiryScheduler,
+    crypto_payment_service: CryptoPaymentService,
+    data_package_service: DataPackageService,
+) -> None:
+    """Asocia a cada tipo de vencimiento su expiración en bloque."""
+    admin_id = settings.ADMIN_ID
+    invoice_service = get_service(ConsumptionInvoiceService)
+    subscription_service = get_service(SubscriptionService)
+    billing_service = get_service(ConsumptionBillingService)
+
+    scheduler.register(
+        ExpiryKind.CRYPTO_ORDER, lambda: expire_crypto_orders(crypto_payment_service)
+    )
+    scheduler.register(
+        ExpiryKind.DATA_PACKAGE, lambda: data_package_service.expire_old_packages(admin_id)
+    )
+    scheduler.register(
+        ExpiryKind.INVOICE, lambda: invoice_service.cancel_expired_invoices(admin_id)
+    )
+    scheduler.register(
+        ExpiryKind.SUBSCRIPTION, lambda: subscription_service.expire_subscriptions(admin_id)
+    )
+    scheduler.register(
+        ExpiryKind.BILLING_CYCLE, lambda: billing_service.close_expired_cycles(admin_id)
+    )
 
-    import uvicorn
 
-    from infrastructure.api.server import create_app
+def run_api_server():
+    """Ejecuta el servidor API en un hilo separado."""
+    from infrastructure.api.server import run_api
 
-    app = create_app()
-    uvicorn.run(
-        app,
-        host=settings.API_HOST,
-        port=settings.API_PORT,
-        log_level="info",
-        access_log=True,
-    )
+    # Un hilo no puede lanzar procesos worker: siempre un único worker
+    run_api(workers=1)
 
 
 def main():
@@ -66,10 +119,6 @@ def main():
         logger.error("❌ No se encontró el TELEGRAM_TOKEN en el archivo .env")
         sys.exit(1)
 
-    api_thread = threading.Thread(target=run_api_server, daemon=True)
-    api_thread.start()
-    logger.info(f"🌐 API server iniciado en {settings.API_HOST}:{settings.API_PORT}")
-
     async def post_init_callback(app: Application) -> None:
         """Callback ejecutado después de inicializar la aplicación."""
         try:
@@ -84,6 +133,14 @@ def main():
 
         await startup()
 
+        # Después de startup(): el despachador de notificaciones ya corre en este loop
+        if settings.API_MODE == "embedded":
+            api_thread = threading.Thread(target=run_api_server, daemon=True)
+            api_thread.start()
+            logger.info(f"🌐 API server iniciado en {settings.API_HOST}:{settings.API_PORT}")
+        else:
+            logger.info("🌐 API en modo standalone: iniciarla con `python -m infrastructure.api`")
+
         if settings.DUCKDNS_DOMAIN and settings.DUCKDNS_TOKEN:
             try:
                 from infrastructure.dns.duckdns_service import DuckDNSService
@@ -116,24 +173,32 @@ def main():
         )
         logger.info("⏰ Job de limpieza de llaves programado.")
 
-        job_queue.run_repeating(
-            expire_packages_job,
-            interval=86400,
-            first=10,
-            data={"data_package_service": data_package_service},
-        )
-        logger.info("⏰ Job de expiración de paquetes programado.")
-
-        job_queue.run_repeating(
-            expire_crypto_orders_job,
-            interval=60,
-            first=30,
-            data={
-                "crypto_payment_service": crypto_payment_service,
-                "bot": app.bot,
-            },
-        )
-        logger.info("⏰ Job de expiración de órdenes crypto programado.")
+        if settings.EXPIRY_SCHEDULER_ENABLED:
+            scheduler = get_expiry_scheduler()
+            register_expiry_handlers(scheduler, crypto_payment_service, data_package_service)
+            await scheduler.start(job_queue)
+        else:
+            job_queue.run_repeating(
+                expire_packages_job,
+                interval=86400,
+                first=10,
+                data={"data_package_service": data_package_service},
+            )
+            logger.info("⏰ Job de expiración de paquetes programado.")
+
+            job_queue.run_repeating(
+                expire_crypto_orders_job,
+                interval=60,
+                first=30,
+                data={"crypto_payment_service": crypto_payment_service},
+            )
+            logger.info("⏰ Job de expiración de órdenes crypto programado.")
+
+        if settings.API_MODE == "standalone":
+            # Eventos de los workers de la API (notificaciones, vencimientos)
+            await get_bot_channel().start(
+                bot_channel_handlers(get_notification_dispatcher(), get_expiry_scheduler())
+            )
 
         interval_minutes = settings.MEMORY_CLEANUP_INTERVAL_MINUTES
         job_queue.run_repeating(
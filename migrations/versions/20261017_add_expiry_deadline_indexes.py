@@ -0,0 +1,57 @@
+"""Add partial indexes backing the expiry scheduler deadline query
+
+Revision ID: 20261017_add_expiry_deadline_indexes
+Revises: 20261017_add_vpn_keys_usage_counter
+Create Date: 2026-10-17
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_add_expiry_deadline_indexes"
+down_revision = "20261017_add_vpn_keys_usage_counter"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create one partial index per deadline source, limited to live rows."""
+    # crypto_orders y consumption_invoices ya indexan expires_at
+    op.create_index(
+        "ix_data_packages_active_expires_at",
+        "data_packages",
+        ["expires_at"],
+        postgresql_where=sa.text("is_active"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_subscription_plans_active_expires_at",
+        "subscription_plans",
+        ["expires_at"],
+        postgresql_where=sa.text("is_active"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_consumption_billings_active_started_at",
+        "consumption_billings",
+        ["started_at"],
+        postgresql_where=sa.text("status = 'active'"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop the expiry scheduler indexes."""
+    op.drop_index(
+        "ix_consumption_billings_active_started_at",
+        table_name="consumption_billings",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_subscription_plans_active_expires_at",
+        table_name="subscription_plans",
+        if_exists=True,
+    )
+    op.drop_index("ix_data_packages_active_expires_at", table_name="data_packages", if_exists=True)
@@ -0,0 +1,29 @@
+"""Add users (created_at, telegram_id) index for keyset pagination
+
+Revision ID: 20261017_add_users_keyset_index
+Revises: 20260302_add_tickets_tables
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_add_users_keyset_index"
+down_revision = "20260302_add_tickets_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the composite index used by the admin user listing."""
+    op.create_index(
+        "ix_users_created_at_telegram_id",
+        "users",
+        ["created_at", "telegram_id"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the admin user listing index."""
+    op.drop_index("ix_users_created_at_telegram_id", table_name="users")
@@ -0,0 +1,52 @@
+"""Add vpn_keys composite indexes for the filtered key listing
+
+Revision ID: 20261017_add_vpn_keys_query_indexes
+Revises: 20261017_add_users_keyset_index
+Create Date: 2026-10-17
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_add_vpn_keys_query_indexes"
+down_revision = "20261017_add_users_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the indexes backing KeyQuery filters and keyset ordering."""
+    # Listado sin filtros y cursor (created_at, id)
+    op.create_index("ix_vpn_keys_created_at_id", "vpn_keys", ["created_at", "id"])
+    # Filtros por tipo y/o estado ordenados por fecha
+    op.create_index(
+        "ix_vpn_keys_type_active_created_at_id",
+        "vpn_keys",
+        ["key_type", "is_active", "created_at", "id"],
+    )
+    # Llaves de un usuario ordenadas por fecha
+    op.create_index(
+        "ix_vpn_keys_user_id_created_at_id",
+        "vpn_keys",
+        ["user_id", "created_at", "id"],
+    )
+    # Orden por consumo
+    op.create_index("ix_vpn_keys_used_bytes_id", "vpn_keys", ["used_bytes", "id"])
+    # Llaves próximas a expirar
+    op.create_index(
+        "ix_vpn_keys_expires_at",
+        "vpn_keys",
+        ["expires_at"],
+        postgresql_where=sa.text("expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the key listing indexes."""
+    op.drop_index("ix_vpn_keys_expires_at", table_name="vpn_keys")
+    op.drop_index("ix_vpn_keys_used_bytes_id", table_name="vpn_keys")
+    op.drop_index("ix_vpn_keys_user_id_created_at_id", table_name="vpn_keys")
+    op.drop_index("ix_vpn_keys_type_active_created_at_id", table_name="vpn_keys")
+    op.drop_index("ix_vpn_keys_created_at_id", table_name="vpn_keys")
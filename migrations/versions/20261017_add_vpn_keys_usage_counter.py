@@ -0,0 +1,29 @@
+"""Add vpn_keys.usage_counter_bytes for delta-based usage metering
+
+Revision ID: 20261017_add_vpn_keys_usage_counter
+Revises: 20261017_add_vpn_keys_query_indexes
+Create Date: 2026-10-17
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_add_vpn_keys_usage_counter"
+down_revision = "20261017_add_vpn_keys_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store the last raw server counter seen per key (NULL until first sync)."""
+    op.add_column(
+        "vpn_keys",
+        sa.Column("usage_counter_bytes", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop the usage counter column."""
+    op.drop_column("vpn_keys", "usage_counter_bytes")
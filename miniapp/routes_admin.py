@@ -1,21 +1,33 @@
 """
 Rutas de administración para la Mini App.
 
-Incluye visualización de logs del sistema (solo administradores).
+Incluye visualización de logs del sistema y listado de usuarios
+(solo administradores).
 
 Author: uSipipo Team
 Version: 1.0.0
 """
 
+import asyncio
+import json
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
-from miniapp.routes_common import MiniAppContext, require_admin
+from application.services.admin_user_service import AdminUserService
+from config import settings
+from domain.entities.admin import UserListCursor
+from infrastructure.persistence.postgresql.transaction_repository import (
+    PostgresTransactionRepository,
+)
+from miniapp.routes_common import MiniAppContext, MiniAppUnitOfWork, get_uow, require_admin
+from utils.log_tail import LogFilter, follow, tail_records
 from utils.logger import logger
+from utils.structured_log import query_records
 
 router = APIRouter(tags=["Mini App - Admin"])
 
@@ -36,42 +48,52 @@ async def logs_page(request: Request, ctx: MiniAppContext = Depends(require_admi
     )
 
 
+def _build_log_filter(
+    level: Optional[str],
+    q: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> LogFilter:
+    # El archivo de log usa la hora local sin zona
+    def local_naive(value: Optional[datetime]) -> Optional[datetime]:
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone().replace(tzinfo=None)
+
+    return LogFilter(
+        min_level=level, contains=q, since=local_naive(since), until=local_naive(until)
+    )
+
+
 @router.get("/api/logs")
-async def api_get_logs(lines: int = 100, ctx: MiniAppContext = Depends(require_admin)):
+async def api_get_logs(
+    lines: int = Query(default=100, ge=1, le=1000),
+    level: Optional[str] = Query(default=None, description="Nivel mínimo"),
+    q: Optional[str] = Query(default=None, max_length=200, description="Texto a buscar"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    ctx: MiniAppContext = Depends(require_admin),
+):
     """API: Obtiene los últimos logs del sistema (solo administrador)."""
     try:
-        from utils.logger import logger as app_logger
-
-        log_lines = app_logger.get_last_logs(lines=lines)
-
-        # Parse log lines into structured format
-        parsed_logs = []
-        for line in log_lines.strip().split("\n"):
-            if not line.strip():
-                continue
-
-            # Try to parse log format: "YYYY-MM-DD HH:mm:ss | LEVEL | message"
-            parts = line.split(" | ", 2)
-            if len(parts) >= 3:
-                timestamp = parts[0].strip()
-                level = parts[1].strip()
-                message = parts[2].strip()
-            elif len(parts) == 2:
-                timestamp = parts[0].strip()
-                level = "INFO"
-                message = parts[1].strip()
-            else:
-                timestamp = datetime.now().isoformat()
-                level = "INFO"
-                message = line
-
-            parsed_logs.append(
-                {
-                    "timestamp": timestamp,
-                    "level": level,
-                    "message": message,
-                }
+        log_filter = _build_log_filter(level, q, since, until)
+        structured_file = logger.get_structured_log_file()
+        log_file = logger.get_log_file()
+
+        if (since or until) and structured_file is not None and structured_file.exists():
+            # Rango de tiempo: el índice del log JSON salta al inicio del rango
+            records = await asyncio.to_thread(query_records, structured_file, lines, log_filter)
+        elif log_file is None or not log_file.exists():
+            return {"logs": [], "total": 0}
+        else:
+            records = await asyncio.to_thread(
+                tail_records,
+                log_file,
+                lines,
+                log_filter,
+                settings.LOG_TAIL_MAX_SCAN_MB * 1024 * 1024,
             )
+        parsed_logs = [record.to_dict() for record in records]
 
         logger.debug(f"📋 Admin {ctx.user.id} fetched {len(parsed_logs)} log lines")
         return {
@@ -82,3 +104,84 @@ async def api_get_logs(lines: int = 100, ctx: MiniAppContext = Depends(require_a
     except Exception as e:
         logger.error(f"Error fetching logs for admin {ctx.user.id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error al obtener logs")
+
+
+@router.get("/api/logs/stream")
+async def api_stream_logs(
+    request: Request,
+    level: Optional[str] = Query(default=None, description="Nivel mínimo"),
+    q: Optional[str] = Query(default=None, max_length=200, description="Texto a buscar"),
+    ctx: MiniAppContext = Depends(require_admin),
+):
+    """API: Sigue el log en vivo como Server-Sent Events (solo administrador)."""
+    log_file = logger.get_log_file()
+    if log_file is None:
+        raise HTTPException(status_code=404, detail="El archivo de log aún no existe")
+
+    log_filter = _build_log_filter(level, q, None, None)
+    logger.info(f"📡 Admin {ctx.user.id} started live log tail")
+
+    async def events():
+        idle = 0.0
+        poll = settings.LOG_STREAM_POLL_SECONDS
+        stream = follow(log_file, log_filter, poll_interval=poll)
+        try:
+            async for record in stream:
+                if record is not None:
+                    idle = 0.0
+                    yield f"data: {json.dumps(record.to_dict(), ensure_ascii=False)}\n\n"
+                    continue
+                if await request.is_disconnected():
+                    break
+                idle += poll
+                if idle >= settings.LOG_STREAM_HEARTBEAT_SECONDS:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/admin/users")
+async def api_admin_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    ctx: MiniAppContext = Depends(require_admin),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
+):
+    """
+    API: Listado de usuarios con conteo de llaves (solo administrador).
+
+    Paginación keyset: pasar ``next_cursor`` de la respuesta como ``cursor``.
+    """
+    if cursor:
+        try:
+            UserListCursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    try:
+        admin_user_service = AdminUserService(
+            user_repository=uow.users,
+            key_repository=uow.keys,
+            payment_repository=PostgresTransactionRepository(uow.session),
+        )
+        result = await admin_user_service.get_users_paginated(
+            per_page=limit, current_user_id=ctx.user.id, cursor=cursor
+        )
+
+        return {
+            "success": True,
+            "users": result["users"],
+            "total_users": result["total_users"],
+            "next_cursor": result["next_cursor"],
+        }
+
+    except Exception as e:
+        logger.error(f"Error listing users for admin {ctx.user.id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error al obtener usuarios")
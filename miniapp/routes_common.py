@@ -7,14 +7,20 @@ Author: uSipipo Team
 Version: 1.0.0
 """
 
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional, Tuple
 
 from fastapi import Depends, Form, HTTPException, Request
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from domain.entities.user import User, UserRole
-from infrastructure.persistence.database import get_session_context
+from infrastructure.persistence.database import get_session_factory
+from infrastructure.persistence.postgresql.key_repository import PostgresKeyRepository
 from infrastructure.persistence.postgresql.user_repository import PostgresUserRepository
 from miniapp.services.miniapp_auth import MiniAppAuthService, TelegramUser, get_miniapp_auth_service
 from utils.logger import logger
@@ -57,15 +63,136 @@ class MiniAppContext:
         return self.user.id == int(settings.ADMIN_ID)
 
 
+class MiniAppUnitOfWork:
+    """
+    Unidad de trabajo por request de la Mini App.
+
+    La autenticación y el handler comparten la misma ``AsyncSession`` (y sus
+    repositorios), que se crea al primer uso y se cierra al terminar el request.
+    Las lecturas no necesitan commit; las escrituras van dentro de
+    ``transaction()``.
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[AsyncSession] = None
+        self._users: Optional[PostgresUserRepository] = None
+        self._keys: Optional[PostgresKeyRepository] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = get_session_factory()()
+        return self._session
+
+    @property
+    def users(self) -> PostgresUserRepository:
+        if self._users is None:
+            self._users = PostgresUserRepository(self.session)
+        return self._users
+
+    @property
+    def keys(self) -> PostgresKeyRepository:
+        if self._keys is None:
+            self._keys = PostgresKeyRepository(self.session)
+        return self._keys
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[AsyncSession, None]:
+        """Confirma lo escrito dentro del bloque o lo revierte si hay error."""
+        try:
+            yield self.session
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def get_uow() -> AsyncGenerator[MiniAppUnitOfWork, None]:
+    """Dependencia: unidad de trabajo compartida por todas las dependencias del request."""
+    uow = MiniAppUnitOfWork()
+    try:
+        yield uow
+    finally:
+        await uow.close()
+
+
+class IdentityCache:
+    """
+    Caché TTL de ``initData`` validado → (usuario de Telegram, query_id, usuario en BD).
+
+    Evita repetir la validación HMAC y la consulta del usuario al navegar
+    rápido por la Mini App. La clave es el ``initData`` completo (firmado),
+    así que un acierto equivale a una validación previa exitosa. Las entradas
+    nunca sobreviven a la caducidad del propio ``auth_date``.
+
+    La caché es por proceso: con la API standalone de varios workers,
+    ``invalidate_user`` solo limpia el worker actual y los demás pueden servir
+    el usuario anterior hasta ``MINIAPP_IDENTITY_CACHE_TTL`` segundos.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, Tuple[float, MiniAppContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, init_data: str) -> Optional[MiniAppContext]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(init_data)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[init_data]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(init_data)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, init_data: str, ctx: MiniAppContext, auth_date: Optional[int] = None) -> None:
+        ttl = float(settings.MINIAPP_IDENTITY_CACHE_TTL)
+        if auth_date is not None:
+            ttl = min(ttl, auth_date + MiniAppAuthService.MAX_AUTH_AGE_SECONDS - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[init_data] = (time.monotonic() + ttl, ctx)
+            self._entries.move_to_end(init_data)
+            while len(self._entries) > settings.MINIAPP_IDENTITY_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Descarta las identidades de un usuario (p. ej. tras cambiar su plan o rol)."""
+        with self._lock:
+            stale = [k for k, (_, ctx) in self._entries.items() if ctx.user.id == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
 async def get_current_user(
     request: Request,
     auth_service: MiniAppAuthService = Depends(get_miniapp_auth_service),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
 ) -> MiniAppContext:
     """
     Dependencia para obtener el usuario actual desde initData.
 
     Soporta tanto query params (GET) como form data (POST).
     Asegura que el usuario exista en la base de datos local.
+    El usuario se carga con la sesión del request (``get_uow``) y el
+    resultado se cachea unos segundos por initData.
     """
     init_data = request.query_params.get("tgWebAppData")
 
@@ -81,6 +208,10 @@ async def get_current_user(
     if not init_data:
         raise HTTPException(status_code=401, detail="No autorizado: initData requerido")
 
+    cached = identity_cache.get(init_data)
+    if cached is not None:
+        return cached
+
     result = auth_service.validate_init_data(init_data)
 
     if not result.success or not result.user:
@@ -89,19 +220,19 @@ async def get_current_user(
     # CRITICAL: Verify user is registered in bot first and load DB user
     # MiniApp only works for users who have already used /start in the bot
     try:
-        async with get_session_context() as session:
-            user_repo = PostgresUserRepository(session)
-            db_user = await user_repo.get_by_id(result.user.id, result.user.id)
-
-            if not db_user:
-                logger.warning(
-                    f"User {result.user.id} tried to access MiniApp but is not registered. "
-                    f"They must use /start in the bot first."
-                )
-                raise HTTPException(status_code=403, detail="USER_NOT_REGISTERED")
-
-            # Pass db_user to context so is_admin can check role from database
-            return MiniAppContext(user=result.user, db_user=db_user, query_id=result.query_id)
+        db_user = await uow.users.get_by_id(result.user.id, result.user.id)
+
+        if not db_user:
+            logger.warning(
+                f"User {result.user.id} tried to access MiniApp but is not registered. "
+                f"They must use /start in the bot first."
+            )
+            raise HTTPException(status_code=403, detail="USER_NOT_REGISTERED")
+
+        # Pass db_user to context so is_admin can check role from database
+        ctx = MiniAppContext(user=result.user, db_user=db_user, query_id=result.query_id)
+        identity_cache.put(init_data, ctx, result.auth_date)
+        return ctx
     except HTTPException:
         raise
     except Exception as e:
@@ -16,10 +16,7 @@ from fastapi.templating import Jinja2Templates
 from application.services.common.container import get_service
 from application.services.vpn_service import VpnService
 from config import settings
-from infrastructure.persistence.database import get_session_context
-from infrastructure.persistence.postgresql.key_repository import PostgresKeyRepository
-from infrastructure.persistence.postgresql.user_repository import PostgresUserRepository
-from miniapp.routes_common import MiniAppContext, get_current_user
+from miniapp.routes_common import MiniAppContext, MiniAppUnitOfWork, get_current_user, get_uow
 from utils.logger import logger
 
 router = APIRouter(tags=["Mini App - Keys"])
@@ -29,30 +26,30 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 
 @router.get("/keys", response_class=HTMLResponse)
-async def keys_list(request: Request, ctx: MiniAppContext = Depends(get_current_user)):
+async def keys_list(
+    request: Request,
+    ctx: MiniAppContext = Depends(get_current_user),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
+):
     """Página de gestión de claves VPN."""
     logger.info(f"🔑 MiniApp keys list accessed by user {ctx.user.id}")
     try:
-        async with get_session_context() as session:
-            key_repo = PostgresKeyRepository(session)
-            user_repo = PostgresUserRepository(session)
-
-            keys = await key_repo.get_by_user_id(ctx.user.id, ctx.user.id)
-            user = await user_repo.get_by_id(ctx.user.id, ctx.user.id)
-
-            can_create = user.can_create_more_keys() if user else True
-
-            return templates.TemplateResponse(
-                "keys.html",
-                {
-                    "request": request,
-                    "user": ctx.user,
-                    "keys": keys,
-                    "can_create": can_create,
-                    "max_keys": user.max_keys if user else 2,
-                    "bot_username": settings.BOT_USERNAME,
-                },
-            )
+        keys = await uow.keys.get_by_user_id(ctx.user.id, ctx.user.id)
+        user = ctx.db_user
+
+        can_create = user.can_create_more_keys() if user else True
+
+        return templates.TemplateResponse(
+            "keys.html",
+            {
+                "request": request,
+                "user": ctx.user,
+                "keys": keys,
+                "can_create": can_create,
+                "max_keys": user.max_keys if user else 2,
+                "bot_username": settings.BOT_USERNAME,
+            },
+        )
     except Exception as e:
         logger.error(f"Error en keys list: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -63,23 +60,21 @@ async def create_key_form(request: Request, ctx: MiniAppContext = Depends(get_cu
     """Formulario para crear nueva clave VPN."""
     logger.info(f"➕ MiniApp create key form accessed by user {ctx.user.id}")
     try:
-        async with get_session_context() as session:
-            user_repo = PostgresUserRepository(session)
-            user = await user_repo.get_by_id(ctx.user.id, ctx.user.id)
-            can_create = user.can_create_more_keys() if user else True
-
-            return templates.TemplateResponse(
-                "create_key.html",
-                {
-                    "request": request,
-                    "user": ctx.user,
-                    "can_create": can_create,
-                    "max_keys": user.max_keys if user else 2,
-                    "wireguard_enabled": settings.wireguard_enabled,
-                    "outline_enabled": settings.outline_enabled,
-                    "bot_username": settings.BOT_USERNAME,
-                },
-            )
+        user = ctx.db_user
+        can_create = user.can_create_more_keys() if user else True
+
+        return templates.TemplateResponse(
+            "create_key.html",
+            {
+                "request": request,
+                "user": ctx.user,
+                "can_create": can_create,
+                "max_keys": user.max_keys if user else 2,
+                "wireguard_enabled": settings.wireguard_enabled,
+                "outline_enabled": settings.outline_enabled,
+                "bot_username": settings.BOT_USERNAME,
+            },
+        )
     except Exception as e:
         logger.error(f"Error en create key form: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -128,32 +123,32 @@ async def create_key_submit(
 
 
 @router.get("/api/keys")
-async def api_get_keys(ctx: MiniAppContext = Depends(get_current_user)):
+async def api_get_keys(
+    ctx: MiniAppContext = Depends(get_current_user),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
+):
     """API: Obtiene lista de claves del usuario."""
     logger.debug(f"📡 API /keys called by user {ctx.user.id}")
     try:
-        async with get_session_context() as session:
-            key_repo = PostgresKeyRepository(session)
-
-            keys = await key_repo.get_by_user_id(ctx.user.id, ctx.user.id)
+        keys = await uow.keys.get_by_user_id(ctx.user.id, ctx.user.id)
 
-            return {
-                "success": True,
-                "keys": [
-                    {
-                        "id": k.id,
-                        "name": k.name,
-                        "type": k.key_type.value,
-                        "is_active": k.is_active,
-                        "used_gb": round(k.used_gb, 2),
-                        "limit_gb": round(k.data_limit_gb, 2),
-                        "remaining_gb": round(k.remaining_bytes / (1024**3), 2),
-                        "created_at": (k.created_at.isoformat() if k.created_at else None),
-                        "last_seen": (k.last_seen_at.isoformat() if k.last_seen_at else None),
-                    }
-                    for k in keys
-                ],
-            }
+        return {
+            "success": True,
+            "keys": [
+                {
+                    "id": k.id,
+                    "name": k.name,
+                    "type": k.key_type.value,
+                    "is_active": k.is_active,
+                    "used_gb": round(k.used_gb, 2),
+                    "limit_gb": round(k.data_limit_gb, 2),
+                    "remaining_gb": round(k.remaining_bytes / (1024**3), 2),
+                    "created_at": (k.created_at.isoformat() if k.created_at else None),
+                    "last_seen": (k.last_seen_at.isoformat() if k.last_seen_at else None),
+                }
+                for k in keys
+            ],
+        }
     except Exception as e:
         logger.error(f"Error en API keys: {e}")
         return {"success": False, "error": "Error interno"}
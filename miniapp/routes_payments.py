@@ -21,7 +21,6 @@ from application.services.data_package_service import (
     DataPackageService,
 )
 from config import settings
-from infrastructure.persistence.database import get_session_context
 from infrastructure.persistence.postgresql.crypto_order_repository import (
     PostgresCryptoOrderRepository,
 )
@@ -32,7 +31,14 @@ from infrastructure.persistence.postgresql.data_package_repository import (
     PostgresDataPackageRepository,
 )
 from infrastructure.persistence.postgresql.user_repository import PostgresUserRepository
-from miniapp.routes_common import MiniAppContext, PaymentRequest, get_current_user
+from miniapp.routes_common import (
+    MiniAppContext,
+    MiniAppUnitOfWork,
+    PaymentRequest,
+    get_current_user,
+    get_uow,
+    identity_cache,
+)
 from miniapp.services.miniapp_payment_service import MiniAppPaymentService
 from utils.logger import logger
 
@@ -95,6 +101,7 @@ async def purchase_page(request: Request, ctx: MiniAppContext = Depends(get_curr
 async def api_create_stars_invoice(
     payment_req: PaymentRequest,
     ctx: MiniAppContext = Depends(get_current_user),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
 ):
     """API: Crea una factura de Telegram Stars para pago en Mini App."""
     try:
@@ -103,11 +110,11 @@ async def api_create_stars_invoice(
             f"{payment_req.product_type}={payment_req.product_id}"
         )
 
-        async with get_session_context() as session:
+        async with uow.transaction() as session:
             package_repo = PostgresDataPackageRepository(session)
             user_repo = PostgresUserRepository(session)
 
-            # DEFENSE: Verify user exists before creating invoice
+            # DEFENSE: User must exist before creating invoice (fresh read, not the cached identity)
             existing_user = await user_repo.get_by_id(ctx.user.id, ctx.user.id)
             if not existing_user:
                 logger.error(f"User {ctx.user.id} not found in database - cannot create invoice")
@@ -261,6 +268,7 @@ async def api_create_stars_invoice(
 async def api_create_crypto_order(
     payment_req: PaymentRequest,
     ctx: MiniAppContext = Depends(get_current_user),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
 ):
     """API: Crea una orden de pago con crypto para Mini App."""
     try:
@@ -269,11 +277,11 @@ async def api_create_crypto_order(
             f"{payment_req.product_type}={payment_req.product_id}"
         )
 
-        async with get_session_context() as session:
+        async with uow.transaction() as session:
             package_repo = PostgresDataPackageRepository(session)
             user_repo = PostgresUserRepository(session)
 
-            # DEFENSE: Verify user exists before creating order (prevents ForeignKeyViolationError)
+            # DEFENSE: User must exist before creating order (prevents ForeignKeyViolationError)
             existing_user = await user_repo.get_by_id(ctx.user.id, ctx.user.id)
             if not existing_user:
                 logger.error(
@@ -371,6 +379,7 @@ async def api_create_crypto_order(
 async def api_confirm_payment(
     confirm_req: ConfirmPaymentRequest,
     ctx: MiniAppContext = Depends(get_current_user),
+    uow: MiniAppUnitOfWork = Depends(get_uow),
 ):
     """API: Confirma un pago exitoso y entrega el producto."""
     try:
@@ -380,11 +389,11 @@ async def api_confirm_payment(
             f"transaction_id={confirm_req.transaction_id}"
         )
 
-        async with get_session_context() as session:
+        async with uow.transaction() as session:
             package_repo = PostgresDataPackageRepository(session)
             user_repo = PostgresUserRepository(session)
 
-            # Verify user exists
+            # Verify user exists (fresh read, not the cached identity)
             existing_user = await user_repo.get_by_id(ctx.user.id, ctx.user.id)
             if not existing_user:
                 logger.error(f"User {ctx.user.id} not found in database - cannot confirm payment")
@@ -490,6 +499,8 @@ async def api_confirm_payment(
                     f"Slots purchased successfully for user {ctx.user.id}: "
                     f"+{result['slots_added']} slots, new_max={result['new_max_keys']}"
                 )
+                # max_keys cambió: no servir el usuario cacheado
+                identity_cache.invalidate_user(ctx.user.id)
 
                 # Send confirmation notification via Telegram
                 if notification_service:
@@ -11,9 +11,11 @@ Version: 1.0.0
 import hashlib
 import hmac
 import json
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import parse_qs
 
 from config import settings
@@ -50,10 +52,25 @@ class MiniAppAuthService:
 
     Telegram envía datos firmados en initData que podemos verificar
     usando el token del bot como clave secreta.
+
+    La clave derivada se calcula una sola vez y las validaciones exitosas se
+    guardan en un LRU indexado por el ``hash`` de initData hasta que el propio
+    ``auth_date`` caduca, de modo que las peticiones de una misma sesión de la
+    Mini App reutilizan una única validación.
     """
 
-    def __init__(self, bot_token: str):
+    # Vida máxima de un initData (ver _is_auth_fresh)
+    MAX_AUTH_AGE_SECONDS = 24 * 3600
+    DEFAULT_CACHE_SIZE = 4096
+
+    def __init__(self, bot_token: str, cache_size: int = DEFAULT_CACHE_SIZE):
         self.bot_token = bot_token
+        self._secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+        self._cache: "OrderedDict[str, Tuple[str, MiniAppAuthResult]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def validate_init_data(self, init_data: str) -> MiniAppAuthResult:
         """
@@ -68,6 +85,10 @@ class MiniAppAuthService:
         if not init_data:
             return MiniAppAuthResult(success=False, error="initData vacío")
 
+        cached = self._cache_get(init_data)
+        if cached is not None:
+            return cached
+
         try:
             parsed_data = parse_qs(init_data, keep_blank_values=True)
 
@@ -106,12 +127,14 @@ class MiniAppAuthService:
 
             logger.info(f"✅ Mini App auth exitosa para usuario {user.id}")
 
-            return MiniAppAuthResult(
+            result = MiniAppAuthResult(
                 success=True,
                 user=user,
                 query_id=query_id,
                 auth_date=auth_date,
             )
+            self._cache_put(hash_value, init_data, result)
+            return result
 
         except json.JSONDecodeError as e:
             logger.error(f"Error parseando JSON de usuario: {e}")
@@ -157,13 +180,67 @@ class MiniAppAuthService:
         data_check_items.sort()
         data_check_string = "\n".join(data_check_items)
 
-        secret_key = hmac.new(b"WebAppData", self.bot_token.encode(), hashlib.sha256).digest()
-
-        computed_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
-
-        return computed_hash == hash_value
+        computed_hash = hmac.new(
+            self._secret_key, data_check_string.encode(), hashlib.sha256
+        ).hexdigest()
+
+        return hmac.compare_digest(computed_hash, hash_value)
+
+    def _cache_get(self, init_data: str) -> Optional[MiniAppAuthResult]:
+        """Retorna la validación cacheada si el initData es idéntico y sigue vigente."""
+        hash_value = _extract_hash(init_data)
+        if not hash_value:
+            return None
+        with self._lock:
+            entry = self._cache.get(hash_value)
+            if entry is None:
+                self.cache_misses += 1
+                return None
+            cached_init_data, result = entry
+            # Mismo hash pero datos distintos: no confiar en la entrada
+            if not hmac.compare_digest(cached_init_data, init_data):
+                self.cache_misses += 1
+                return None
+            if not self._is_auth_fresh(result.auth_date or 0):
+                del self._cache[hash_value]
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(hash_value)
+            self.cache_hits += 1
+            return result
+
+    def _cache_put(self, hash_value: str, init_data: str, result: MiniAppAuthResult) -> None:
+        if self._cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[hash_value] = (init_data, result)
+            self._cache.move_to_end(hash_value)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def _extract_hash(init_data: str) -> Optional[str]:
+    """Extrae el campo ``hash`` sin parsear todo el query string."""
+    for part in init_data.split("&"):
+        if part.startswith("hash="):
+            return part[5:]
+    return None
+
+
+_auth_service: Optional[MiniAppAuthService] = None
+_auth_service_lock = threading.Lock()
 
 
 def get_miniapp_auth_service() -> MiniAppAuthService:
-    """Factory para crear el servicio de autenticación."""
-    return MiniAppAuthService(settings.TELEGRAM_TOKEN)
+    """Servicio de autenticación compartido del proceso (clave y caché únicas)."""
+    global _auth_service
+    if _auth_service is not None:
+        return _auth_service
+    with _auth_service_lock:
+        if _auth_service is None:
+            _auth_service = MiniAppAuthService(settings.TELEGRAM_TOKEN)
+        return _auth_service
@@ -7,9 +7,8 @@ Version: 1.0.0
 
 from typing import Optional
 
-from telegram import Bot
-
 from config import settings
+from infrastructure.notifications import NotificationDispatcher
 from utils.logger import logger
 
 
@@ -19,10 +18,12 @@ class MiniAppNotificationService:
 
     This service bridges the Mini App web interface with the Telegram Bot,
     allowing the bot to send payment invoices and notifications to users.
+    Sends go through the shared NotificationDispatcher: invoices and QR
+    codes wait for Telegram's answer, status messages are only queued.
     """
 
-    def __init__(self, bot: Bot):
-        self.bot = bot
+    def __init__(self, dispatcher: NotificationDispatcher):
+        self.dispatcher = dispatcher
 
     async def send_stars_invoice(
         self,
@@ -48,8 +49,9 @@ class MiniAppNotificationService:
         try:
             from telegram import LabeledPrice
 
-            await self.bot.send_invoice(
-                chat_id=user_id,
+            await self.dispatcher.send(
+                "send_invoice",
+                user_id,
                 title=title,
                 description=description,
                 payload=payload,
@@ -108,8 +110,9 @@ class MiniAppNotificationService:
             )
 
             # Send photo with QR code
-            await self.bot.send_photo(
-                chat_id=user_id,
+            await self.dispatcher.send(
+                "send_photo",
+                user_id,
                 photo=full_qr_url,
                 caption=message,
                 parse_mode="Markdown",
@@ -143,7 +146,7 @@ class MiniAppNotificationService:
             payment_method: Payment method used (Stars/Crypto)
 
         Returns:
-            True if notification was sent successfully, False otherwise
+            True if notification was queued successfully, False otherwise
         """
         try:
             emoji = "⭐" if payment_method == "stars" else "💰"
@@ -156,14 +159,10 @@ class MiniAppNotificationService:
                 f"Revisa tu sección de claves VPN para ver los cambios."
             )
 
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=message,
-                parse_mode="Markdown",
-            )
+            self.dispatcher.enqueue_message(user_id, message, parse_mode="Markdown")
 
             logger.info(
-                f"✅ Payment confirmation sent to user {user_id}: "
+                f"✅ Payment confirmation queued to user {user_id}: "
                 f"{product_name} via {payment_method}"
             )
             return True
@@ -192,7 +191,7 @@ class MiniAppNotificationService:
             estimated_time: Estimated confirmation time
 
         Returns:
-            True if notification was sent successfully, False otherwise
+            True if notification was queued successfully, False otherwise
         """
         try:
             message = (
@@ -204,14 +203,10 @@ class MiniAppNotificationService:
                 f"Te notificaremos cuando sea confirmado."
             )
 
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=message,
-                parse_mode="Markdown",
-            )
+            self.dispatcher.enqueue_message(user_id, message, parse_mode="Markdown")
 
             logger.info(
-                f"⏳ Payment pending notification sent to user {user_id}: "
+                f"⏳ Payment pending notification queued to user {user_id}: "
                 f"{product_name} via {payment_method}"
             )
             return True
@@ -238,17 +233,17 @@ def get_notification_service() -> Optional[MiniAppNotificationService]:
     return _notification_service
 
 
-def init_notification_service(bot: Bot) -> MiniAppNotificationService:
+def init_notification_service(dispatcher: NotificationDispatcher) -> MiniAppNotificationService:
     """
-    Initialize the notification service with a bot instance.
+    Initialize the notification service with the shared dispatcher.
 
     Args:
-        bot: Telegram Bot instance
+        dispatcher: Shared outbound notification dispatcher
 
     Returns:
         MiniAppNotificationService instance
     """
     global _notification_service
-    _notification_service = MiniAppNotificationService(bot)
+    _notification_service = MiniAppNotificationService(dispatcher)
     logger.info("📬 MiniApp Notification Service initialized")
     return _notification_service
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark del stack de middlewares de la API.
+
+Compara peticiones/segundo contra ``create_app()`` (transporte ASGI de httpx,
+sin red) entre:
+1. Los middlewares originales sobre ``BaseHTTPMiddleware`` (antes).
+2. Los middlewares ASGI puros actuales (después).
+
+Endpoints medidos: ``GET /miniapp/api/user``, ``GET /miniapp/api/keys`` y
+``POST /api/v1/webhooks/tron-dealer``. Autenticación, base de datos y
+servicios de pago se sustituyen por stubs en memoria para medir solo el
+coste del framework y los middlewares; ambos stacks usan el mismo limitador.
+
+Uso:
+    python scripts/benchmark_api_middleware.py [--requests 3000] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# flake8: noqa: E402
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from infrastructure.api.middleware import (
+    RateLimitMiddleware,
+    RateLimitRule,
+    RouteLimits,
+    SecurityHeadersMiddleware,
+)
+from infrastructure.api.middleware.security import SECURITY_HEADERS
+from infrastructure.api.server import create_app
+from infrastructure.api.webhooks.tron_dealer import get_payment_service, get_security_service
+from miniapp.routes_common import MiniAppContext, get_current_user, get_uow
+from miniapp.services.miniapp_auth import TelegramUser
+from utils.logger import logger
+
+WEBHOOK_PAYLOAD = {
+    "wallet_address": "T" + "A" * 41,
+    "amount": 10.5,
+    "tx_hash": "0x" + "f" * 64,
+    "token_symbol": "USDT",
+    "confirmations": 20,
+}
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Implementación anterior (BaseHTTPMiddleware)."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS.items():
+            response.headers[name] = value
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Implementación anterior (BaseHTTPMiddleware) con el mismo limitador."""
+
+    def __init__(self, app, requests_per_minute=60, limiter=None, routes=None):
+        super().__init__(app)
+        self.asgi = RateLimitMiddleware(app, requests_per_minute, limiter, routes)
+
+    async def dispatch(self, request: Request, call_next):
+        rule = self.asgi.routes.for_path(request.url.path)
+        client_ip = self.asgi._get_client_ip(request.scope)
+        decision = await self.asgi.limiter.hit(f"{rule.name}:{client_ip}", rule)
+        if not decision.allowed:
+            return JSONResponse(status_code=429, content={"detail": "Too many requests"})
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(decision.limit)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        return response
+
+
+class StubKeys:
+    async def get_by_user_id(self, user_id, current_user_id):
+        return []
+
+
+class StubSecurity:
+    def extract_client_ip(self, headers):
+        return "127.0.0.1"
+
+    def verify_hmac_signature(self, body, signature, timestamp):
+        return True
+
+    def validate_timestamp(self, timestamp):
+        return True, None
+
+    async def check_and_register_nonce(self, nonce):
+        return True, None
+
+    def is_suspicious_request(self, payload, headers):
+        return False, None
+
+
+class StubPayment:
+    async def process_webhook_payment(self, **kwargs):
+        return SimpleNamespace(id="tx-bench", status="confirmed")
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = create_app()
+    # Límite inalcanzable: se mide el coste del limitador, no los 429
+    routes = RouteLimits([], default=RateLimitRule("bench", 10**9))
+    replacements = {
+        SecurityHeadersMiddleware: LegacySecurityHeadersMiddleware,
+        RateLimitMiddleware: LegacyRateLimitMiddleware,
+    }
+    middleware = []
+    for item in app.user_middleware:
+        cls = replacements.get(item.cls, item.cls) if legacy else item.cls
+        kwargs = dict(item.kwargs)
+        if item.cls is RateLimitMiddleware:
+            kwargs["routes"] = routes
+        middleware.append(Middleware(cls, *item.args, **kwargs))
+    app.user_middleware = middleware
+
+    ctx = MiniAppContext(TelegramUser(id=12345, first_name="Bench"))
+    uow = SimpleNamespace(keys=StubKeys())
+    app.dependency_overrides[get_current_user] = lambda: ctx
+    app.dependency_overrides[get_uow] = lambda: uow
+    app.dependency_overrides[get_security_service] = StubSecurity
+    app.dependency_overrides[get_payment_service] = StubPayment
+    return app
+
+
+async def bench(app: FastAPI, method: str, url: str, requests: int, concurrency: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def call():
+            if method == "POST":
+                response = await client.post(url, json=WEBHOOK_PAYLOAD)
+            else:
+                response = await client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: HTTP {response.status_code} {response.text}")
+
+        # Calentamiento (construye el stack de middlewares)
+        await call()
+
+        started = time.perf_counter()
+        for _ in range(requests // concurrency):
+            await asyncio.gather(*(call() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return (requests // concurrency) * concurrency / elapsed
+
+
+async def run(requests: int, concurrency: int) -> None:
+    endpoints = [
+        ("GET", "/miniapp/api/user"),
+        ("GET", "/miniapp/api/keys"),
+        ("POST", "/api/v1/webhooks/tron-dealer"),
+    ]
+    apps = {"BaseHTTPMiddleware": build_app(legacy=True), "ASGI puro": build_app(legacy=False)}
+
+    print(f"🚦 Stack de middlewares ({requests} peticiones, concurrencia {concurrency})")
+    for method, url in endpoints:
+        results = {}
+        for name, app in apps.items():
+            results[name] = await bench(app, method, url, requests, concurrency)
+        before, after = results["BaseHTTPMiddleware"], results["ASGI puro"]
+        print(f"   {method:4} {url}")
+        print(f"      antes:   {before:10.1f} req/s")
+        print(f"      después: {after:10.1f} req/s  ({(after / before - 1) * 100:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    # El log por petición domina el tiempo medido
+    logger.info = logger.debug = lambda *args, **kwargs: None
+
+    asyncio.run(run(args.requests, max(1, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
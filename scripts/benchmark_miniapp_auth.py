@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de validación de initData de la Mini App.
+
+Compara validaciones/segundo entre:
+1. El flujo original: servicio nuevo por request, clave derivada en cada
+   llamada y sin caché.
+2. El servicio compartido con la clave precalculada (initData distintos,
+   siempre falla la caché).
+3. El servicio compartido reutilizando el mismo initData (caché caliente),
+   como ocurre con las peticiones XHR de una sesión de la Mini App.
+
+Uso:
+    python scripts/benchmark_miniapp_auth.py [--iterations 20000]
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# flake8: noqa: E402
+from miniapp.services.miniapp_auth import MiniAppAuthService
+from utils.logger import logger
+
+BOT_TOKEN = "123456:BENCHMARK_TOKEN"
+
+
+def build_init_data(user_id: int) -> str:
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"AAH{user_id}",
+        "user": json.dumps({"id": user_id, "first_name": "Bench", "username": f"u{user_id}"}),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+def bench_per_request_service(samples: list) -> float:
+    started = time.perf_counter()
+    for init_data in samples:
+        MiniAppAuthService(BOT_TOKEN, cache_size=0).validate_init_data(init_data)
+    return len(samples) / (time.perf_counter() - started)
+
+
+def bench_shared_cold(samples: list) -> float:
+    service = MiniAppAuthService(BOT_TOKEN, cache_size=0)
+    started = time.perf_counter()
+    for init_data in samples:
+        service.validate_init_data(init_data)
+    return len(samples) / (time.perf_counter() - started)
+
+
+def bench_shared_cached(samples: list) -> float:
+    service = MiniAppAuthService(BOT_TOKEN)
+    init_data = samples[0]
+    service.validate_init_data(init_data)
+    started = time.perf_counter()
+    for _ in samples:
+        service.validate_init_data(init_data)
+    return len(samples) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    # El log por validación domina el tiempo medido
+    logger.info = lambda *args, **kwargs: None
+
+    samples = [build_init_data(i + 1) for i in range(args.iterations)]
+
+    print(f"🔐 Validación de initData ({args.iterations} iteraciones)")
+    print(f"   per-request:   {bench_per_request_service(samples):12.1f} validaciones/s")
+    print(f"   shared (cold): {bench_shared_cold(samples):12.1f} validaciones/s")
+    print(f"   shared (LRU):  {bench_shared_cached(samples):12.1f} validaciones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark de generación de claves y aplicación de peers WireGuard.
+
+Compara peers/segundo entre:
+1. Claves en proceso (X25519 con cryptography) vs `wg genkey/pubkey/genpsk`.
+2. Un `wg set` por peer vs `wg set` agrupado (con latencia de comando simulada,
+   para no tocar la interfaz real).
+
+Uso:
+    python scripts/benchmark_wireguard_keygen.py [--peers 200] [--cmd-latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# flake8: noqa: E402
+from infrastructure.api_clients.wireguard_keys import generate_keypair, generate_preshared_key
+from infrastructure.api_clients.wireguard_peer_applier import PeerChange, WireGuardPeerApplier
+
+
+def _run(cmd: str) -> str:
+    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+async def bench_native(peers: int) -> float:
+    started = time.perf_counter()
+    for _ in range(peers):
+        generate_keypair()
+        generate_preshared_key()
+    return peers / (time.perf_counter() - started)
+
+
+async def bench_subprocess(peers: int) -> float:
+    started = time.perf_counter()
+    for _ in range(peers):
+        priv_key = await asyncio.to_thread(_run, "wg genkey")
+        await asyncio.to_thread(_run, f"echo '{priv_key}' | wg pubkey")
+        await asyncio.to_thread(_run, "wg genpsk")
+    return peers / (time.perf_counter() - started)
+
+
+async def bench_apply(peers: int, latency: float, batched: bool) -> tuple:
+    async def fake_run_cmd(cmd: str) -> str:
+        # Igual que _run_cmd: ocupa un hilo del pool mientras dura el comando
+        await asyncio.to_thread(time.sleep, latency)
+        return ""
+
+    applier = WireGuardPeerApplier(lambda: "wg0", fake_run_cmd, coalesce_delay=0.005)
+    changes = [
+        PeerChange(f"pk{i}", f"allowed-ips 10.0.{i // 250}.{i % 250 + 2}/32", preshared_key="psk")
+        for i in range(peers)
+    ]
+
+    started = time.perf_counter()
+    if batched:
+        await asyncio.gather(*(applier.apply(change) for change in changes))
+    else:
+        await asyncio.gather(*(applier.run_single(change) for change in changes))
+    return peers / (time.perf_counter() - started), applier.commands_run
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--peers", type=int, default=200)
+    parser.add_argument("--cmd-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"🔑 Generación de claves ({args.peers} peers)")
+    print(f"   native:     {await bench_native(args.peers):10.1f} peers/s")
+    if shutil.which("wg"):
+        print(f"   subprocess: {await bench_subprocess(args.peers):10.1f} peers/s")
+    else:
+        print("   subprocess: omitido (binario `wg` no encontrado)")
+
+    latency = args.cmd_latency_ms / 1000
+    print(f"\n⚙️ Aplicación de peers (latencia simulada {args.cmd_latency_ms} ms por comando)")
+    for label, batched in (("immediate", False), ("batched", True)):
+        rate, commands = await bench_apply(args.peers, latency, batched)
+        print(f"   {label:<10}  {rate:10.1f} peers/s  ({commands} comandos wg set)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,7 +5,7 @@ Script de cron job para cerrar ciclos de consumo expirados.
 Este script se ejecuta diariamente y:
 1. Busca ciclos de consumo activos que han excedido 30 días
 2. Cierra los ciclos y marca deuda al usuario
-3. Bloquea las claves VPN de usuarios con deuda
+3. Bloquea en una sola tanda las claves VPN de usuarios con deuda
 4. Envía notificaciones a los usuarios afectados
 
 Uso:
@@ -57,6 +57,8 @@ class ConsumptionCronJob:
             "started_at": datetime.now(timezone.utc).isoformat(),
             "cycles_closed": 0,
             "users_notified": 0,
+            "keys_blocked": 0,
+            "keys_failed": 0,
             "errors": 0,
         }
 
@@ -78,15 +80,19 @@ class ConsumptionCronJob:
 
                 logger.info(f"📊 Ciclos expirados encontrados: {len(expired_cycles)}")
 
-                # 2. Procesar cada ciclo expirado
+                # 2. Cerrar cada ciclo expirado (las claves se bloquean al final)
+                closed_users = []
                 for cycle in expired_cycles:
                     try:
                         if not cycle.id:
                             continue
 
-                        success = await billing_service.close_billing_cycle(cycle.id, self.admin_id)
+                        success = await billing_service.close_billing_cycle(
+                            cycle.id, self.admin_id, block_keys=False
+                        )
 
                         if success:
+                            closed_users.append(cycle.user_id)
                             stats["cycles_closed"] += 1
                             stats["users_notified"] += 1
 
@@ -104,7 +110,21 @@ class ConsumptionCronJob:
                         stats["errors"] += 1
                         logger.error(f"❌ Error procesando ciclo {cycle.id}: {e}")
 
-                # 3. Cancelar facturas expiradas
+                # 3. Bloquear las claves de todos los usuarios con deuda a la vez
+                if closed_users:
+                    block_result = await billing_service.block_keys_for_users(
+                        closed_users, self.admin_id
+                    )
+                    stats["keys_blocked"] = block_result["keys_blocked"]
+                    stats["keys_failed"] = block_result["keys_failed"]
+                    if not block_result["success"]:
+                        stats["errors"] += 1
+                        logger.error(
+                            f"❌ {block_result['keys_failed']} claves sin bloquear: "
+                            f"{block_result['errors'][:5]}"
+                        )
+
+                # 4. Cancelar facturas expiradas
                 expired_invoices = await invoice_service.cancel_expired_invoices(self.admin_id)
 
                 if expired_invoices > 0:
@@ -168,6 +188,7 @@ async def main():
     print(f"Inicio: {stats['started_at']}")
     print(f"Ciclos cerrados: {stats['cycles_closed']}")
     print(f"Usuarios notificados: {stats['users_notified']}")
+    print(f"Claves bloqueadas: {stats['keys_blocked']} (fallidas: {stats['keys_failed']})")
     print(f"Errores: {stats['errors']}")
     print(f"Fin: {stats['finished_at']}")
     print("=" * 50)
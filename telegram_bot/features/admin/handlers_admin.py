@@ -92,8 +92,10 @@ class AdminHandler(
         )
         if context.user_data is not None:
             context.user_data.pop("users_page", None)
+            context.user_data.pop("users_cursors", None)
             context.user_data.pop("keys_page", None)
             context.user_data.pop("keys_filter", None)
+            context.user_data.pop("keys_cursors", None)
         return ADMIN_MENU
 
     async def end_admin(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -41,6 +41,7 @@ class DashboardAdminMixin:
 
         if context.user_data is not None:
             context.user_data["users_page"] = 1
+            context.user_data.pop("users_cursors", None)
 
         try:
             stats = await self.service.get_dashboard_stats(current_user_id=admin_id)
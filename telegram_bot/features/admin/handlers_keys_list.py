@@ -19,6 +19,7 @@ from utils.spinner import SpinnerManager, admin_spinner_callback
 ADMIN_MENU = 0
 VIEWING_KEYS = 3
 KEYS_PER_PAGE = 10
+KEYS_CURSORS_KEY = "keys_cursors"
 
 
 class KeysListMixin:
@@ -45,7 +46,8 @@ class KeysListMixin:
         key_filter = context.user_data.get("keys_filter", "all") if context.user_data else "all"
 
         try:
-            result = await self._get_filtered_keys(admin_id, page, key_filter)
+            result = await self._get_filtered_keys(context, admin_id, page, key_filter)
+            page = result.get("page", page)
             keys = result.get("keys", [])
             total_pages = result.get("total_pages", 1)
             total_keys = result.get("total_keys", 0)
@@ -79,23 +81,35 @@ class KeysListMixin:
             await self._handle_error(update, context, e, "show_keys")
             return ADMIN_MENU
 
-    async def _get_filtered_keys(self, admin_id: int, page: int, key_filter: str) -> Dict:
-        """Obtiene llaves filtradas con paginación."""
-        all_keys = await self.service.get_all_keys(current_user_id=admin_id)
-
-        if key_filter != "all":
-            all_keys = [k for k in all_keys if k.get("key_type", "").lower() == key_filter.lower()]
-
-        total_keys = len(all_keys)
-        total_pages = max(1, (total_keys + KEYS_PER_PAGE - 1) // KEYS_PER_PAGE)
-        offset = (page - 1) * KEYS_PER_PAGE
-        keys = all_keys[offset : offset + KEYS_PER_PAGE]
-
-        return {
-            "keys": keys,
-            "total_pages": total_pages,
-            "total_keys": total_keys,
-        }
+    async def _get_filtered_keys(
+        self, context: ContextTypes.DEFAULT_TYPE, admin_id: int, page: int, key_filter: str
+    ) -> Dict:
+        """
+        Obtiene una página de llaves filtrada en SQL, reutilizando el cursor
+        keyset guardado para esa página y recordando el de la siguiente.
+
+        Si no hay cursor para la página pedida (p. ej. tras reiniciar el bot)
+        se vuelve a la primera.
+        """
+        cursors: Dict[int, str] = {}
+        if context.user_data is not None:
+            cursors = context.user_data.setdefault(KEYS_CURSORS_KEY, {})
+        if page > 1 and page not in cursors:
+            page = 1
+
+        result = await self.service.get_keys_page(
+            current_user_id=admin_id,
+            key_filter=key_filter,
+            limit=KEYS_PER_PAGE,
+            cursor=cursors.get(page),
+        )
+        if result.get("next_cursor"):
+            cursors[page + 1] = result["next_cursor"]
+
+        total_keys = result.get("total_keys", 0)
+        result["page"] = page
+        result["total_pages"] = max(1, (total_keys + KEYS_PER_PAGE - 1) // KEYS_PER_PAGE)
+        return result
 
     @admin_required
     async def keys_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -123,6 +137,7 @@ class KeysListMixin:
         if context.user_data is not None:
             context.user_data["keys_filter"] = key_filter
             context.user_data["keys_page"] = 1
+            context.user_data.pop(KEYS_CURSORS_KEY, None)
 
         return await self._show_keys_page(update, context, 1)
 
@@ -137,7 +152,8 @@ class KeysListMixin:
         key_filter = context.user_data.get("keys_filter", "all") if context.user_data else "all"
 
         try:
-            result = await self._get_filtered_keys(admin_id, page, key_filter)
+            result = await self._get_filtered_keys(context, admin_id, page, key_filter)
+            page = result.get("page", page)
             keys = result.get("keys", [])
             total_pages = result.get("total_pages", 1)
             total_keys = result.get("total_keys", 0)
@@ -191,8 +207,7 @@ class KeysListMixin:
         key_id = query.data.split("_")[-1]
 
         try:
-            all_keys = await self.service.get_all_keys(current_user_id=admin_id)
-            key = next((k for k in all_keys if str(k.get("key_id", "")) == str(key_id)), None)
+            key = await self.service.get_key_info(key_id, current_user_id=admin_id)
 
             if not key:
                 await SpinnerManager.replace_spinner_with_message(
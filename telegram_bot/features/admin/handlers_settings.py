@@ -198,8 +198,10 @@ class SettingsAdminMixin:
 
         if context.user_data is not None:
             context.user_data.pop("users_page", None)
+            context.user_data.pop("users_cursors", None)
             context.user_data.pop("keys_page", None)
             context.user_data.pop("keys_filter", None)
+            context.user_data.pop("keys_cursors", None)
             context.user_data.pop("viewing_user_id", None)
             context.user_data.pop("viewing_key_id", None)
 
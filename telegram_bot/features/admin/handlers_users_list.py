@@ -17,6 +17,7 @@ from utils.spinner import SpinnerManager, admin_spinner_callback
 ADMIN_MENU = 0
 VIEWING_USERS = 1
 USERS_PER_PAGE = 10
+USERS_CURSORS_KEY = "users_cursors"
 
 
 class UsersListMixin:
@@ -44,9 +45,7 @@ class UsersListMixin:
             page = context.user_data["users_page"]
 
         try:
-            result = await self.service.get_users_paginated(
-                page=page, per_page=USERS_PER_PAGE, current_user_id=admin_id
-            )
+            result = await self._fetch_users_page(context, page, admin_id)
             users = result.get("users", [])
             total_pages = result.get("total_pages", 1)
             total_users = result.get("total_users", 0)
@@ -57,9 +56,7 @@ class UsersListMixin:
                 page = total_pages
 
             if not users and page != result.get("page", page):
-                result = await self.service.get_users_paginated(
-                    page=page, per_page=USERS_PER_PAGE, current_user_id=admin_id
-                )
+                result = await self._fetch_users_page(context, page, admin_id)
                 users = result.get("users", [])
                 total_pages = result.get("total_pages", 1)
 
@@ -91,6 +88,27 @@ class UsersListMixin:
             await self._handle_error(update, context, e, "show_users")
             return ADMIN_MENU
 
+    async def _fetch_users_page(
+        self, context: ContextTypes.DEFAULT_TYPE, page: int, admin_id: int
+    ) -> dict:
+        """
+        Obtiene una página de usuarios reutilizando el cursor keyset guardado
+        para esa página y recordando el de la siguiente.
+        """
+        cursors = {}
+        if context.user_data is not None:
+            cursors = context.user_data.setdefault(USERS_CURSORS_KEY, {})
+
+        result = await self.service.get_users_paginated(
+            page=page,
+            per_page=USERS_PER_PAGE,
+            current_user_id=admin_id,
+            cursor=cursors.get(page),
+        )
+        if result.get("next_cursor"):
+            cursors[page + 1] = result["next_cursor"]
+        return result
+
     @admin_required
     async def users_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Navega entre páginas de usuarios."""
@@ -114,9 +132,7 @@ class UsersListMixin:
         admin_id = user.id
 
         try:
-            result = await self.service.get_users_paginated(
-                page=page, per_page=USERS_PER_PAGE, current_user_id=admin_id
-            )
+            result = await self._fetch_users_page(context, page, admin_id)
             users = result.get("users", [])
             total_pages = result.get("total_pages", 1)
             total_users = result.get("total_users", 0)
@@ -127,9 +143,7 @@ class UsersListMixin:
                 page = total_pages
 
             if not users and page != result.get("page", page):
-                result = await self.service.get_users_paginated(
-                    page=page, per_page=USERS_PER_PAGE, current_user_id=admin_id
-                )
+                result = await self._fetch_users_page(context, page, admin_id)
                 users = result.get("users", [])
                 total_pages = result.get("total_pages", 1)
 
@@ -153,6 +153,11 @@ class AdminKeyboards:
                 InlineKeyboardButton("⚡ WireGuard", callback_data="keys_filter_wireguard"),
                 InlineKeyboardButton("🔵 Outline", callback_data="keys_filter_outline"),
             ],
+            [
+                InlineKeyboardButton("✅ Activas", callback_data="keys_filter_active"),
+                InlineKeyboardButton("⏳ Por expirar", callback_data="keys_filter_expiring"),
+                InlineKeyboardButton("📈 Sin cuota", callback_data="keys_filter_overquota"),
+            ],
             [InlineKeyboardButton("🔙 Menú Admin", callback_data="admin")],
         ]
         return InlineKeyboardMarkup(keyboard)
@@ -185,6 +190,13 @@ class AdminKeyboards:
             InlineKeyboardButton("🔵 OL", callback_data="keys_filter_outline"),
         ]
         keyboard.append(filter_row)
+        keyboard.append(
+            [
+                InlineKeyboardButton("✅ Act", callback_data="keys_filter_active"),
+                InlineKeyboardButton("⏳ Exp", callback_data="keys_filter_expiring"),
+                InlineKeyboardButton("📈 Cuota", callback_data="keys_filter_overquota"),
+            ]
+        )
 
         nav_row = []
         if page > 1:
@@ -0,0 +1,93 @@
+"""Tests for AdminKeyService SQL-side filtered key listing."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from application.services.admin_key_service import AdminKeyService
+from domain.entities.key_query import KeyCursor, KeyPage, KeySortField
+from domain.entities.vpn_key import KeyType, VpnKey
+
+
+def _make_key(index: int) -> VpnKey:
+    return VpnKey(
+        id=str(uuid.uuid4()),
+        user_id=1000 + index,
+        key_type=KeyType.WIREGUARD,
+        name=f"key{index}",
+        used_bytes=index * 1024,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index),
+    )
+
+
+@pytest.fixture
+def admin_key_service(mock_user_repo, mock_key_repo):
+    with (
+        patch("application.services.admin_key_service.WireGuardClient"),
+        patch("application.services.admin_key_service.OutlineClient"),
+    ):
+        return AdminKeyService(mock_key_repo, mock_user_repo)
+
+
+class TestKeyCursor:
+    @pytest.mark.parametrize(
+        "sort, value",
+        [
+            (KeySortField.CREATED_AT, datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)),
+            (KeySortField.USED_BYTES, 123456789),
+            (KeySortField.NAME, "mi llave"),
+        ],
+    )
+    def test_round_trip(self, sort, value):
+        cursor = KeyCursor(value=value, key_id=uuid.uuid4())
+
+        assert KeyCursor.decode(cursor.encode(), sort) == cursor
+
+    def test_invalid_token(self):
+        with pytest.raises(ValueError):
+            KeyCursor.decode("not-a-cursor", KeySortField.CREATED_AT)
+
+
+class TestGetKeysPage:
+    @pytest.mark.asyncio
+    async def test_filter_maps_to_query(self, admin_key_service, mock_key_repo):
+        keys = [_make_key(i) for i in range(3)]
+        last = keys[-1]
+        mock_key_repo.query_keys.return_value = KeyPage(
+            items=keys, next_cursor=KeyCursor(last.created_at, uuid.UUID(last.id))
+        )
+        mock_key_repo.count_keys.return_value = 42
+
+        result = await admin_key_service.get_keys_page(
+            current_user_id=1, key_filter="expiring", limit=3
+        )
+
+        query = mock_key_repo.query_keys.call_args[0][0]
+        assert query.is_active is True
+        assert query.expiring_within == timedelta(days=7)
+        assert query.limit == 3
+        assert result["total_keys"] == 42
+        assert [k["key_name"] for k in result["keys"]] == ["key0", "key1", "key2"]
+        assert result["keys"][2]["data_used"] == 2048
+        assert KeyCursor.decode(result["next_cursor"], KeySortField.CREATED_AT).key_id == (
+            uuid.UUID(last.id)
+        )
+        mock_key_repo.get_all_keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cursor_is_decoded(self, admin_key_service, mock_key_repo):
+        cursor = KeyCursor(datetime(2026, 2, 1, tzinfo=timezone.utc), uuid.uuid4())
+        mock_key_repo.query_keys.return_value = KeyPage()
+        mock_key_repo.count_keys.return_value = 0
+
+        result = await admin_key_service.get_keys_page(
+            current_user_id=1, key_filter="wireguard", cursor=cursor.encode()
+        )
+
+        query = mock_key_repo.query_keys.call_args[0][0]
+        assert query.cursor == cursor
+        assert query.key_type == KeyType.WIREGUARD
+        assert result["keys"] == []
+        assert result["next_cursor"] is None
@@ -0,0 +1,100 @@
+"""Tests for AdminStatsService aggregate dashboard statistics."""
+
+from unittest.mock import patch
+
+import pytest
+
+from application.services import admin_stats_service
+from application.services.admin_stats_service import AdminStatsService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    AdminStatsService.invalidate_cache()
+    yield
+    AdminStatsService.invalidate_cache()
+
+
+@pytest.fixture
+def stats_service(mock_user_repo, mock_key_repo, mock_transaction_repo):
+    mock_user_repo.get_user_stats.return_value = {
+        "total_users": 4,
+        "active_users": 3,
+        "new_users": 1,
+    }
+    mock_key_repo.get_key_stats.return_value = {
+        "total": 10,
+        "active": 8,
+        "created": 2,
+        "used_bytes": 6 * 1024**3,
+        "by_type": {
+            "wireguard": {"total": 4, "active": 3, "created": 1, "used_bytes": 2 * 1024**3},
+            "outline": {"total": 6, "active": 5, "created": 1, "used_bytes": 4 * 1024**3},
+        },
+    }
+    mock_transaction_repo.get_transactions_by_type.return_value = [{"amount": 1250}]
+    return AdminStatsService(mock_user_repo, mock_key_repo, mock_transaction_repo)
+
+
+class TestDashboardStats:
+    @pytest.mark.asyncio
+    async def test_uses_aggregates_only(self, stats_service, mock_user_repo, mock_key_repo):
+        stats = await stats_service.get_dashboard_stats(current_user_id=1)
+
+        assert stats["total_users"] == 4
+        assert stats["active_users"] == 3
+        assert stats["new_users_today"] == 1
+        assert stats["total_keys"] == 10
+        assert stats["active_keys"] == 8
+        assert stats["keys_created_today"] == 2
+        assert stats["wireguard_keys"] == 4
+        assert stats["wireguard_pct"] == 40.0
+        assert stats["outline_keys"] == 6
+        assert stats["outline_pct"] == 60.0
+        assert stats["total_usage_gb"] == 6.0
+        assert stats["avg_usage_gb"] == 1.5
+        assert stats["total_revenue"] == 12.5
+
+        mock_user_repo.get_all_users.assert_not_called()
+        mock_key_repo.get_all_keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_hit_cache(self, stats_service, mock_user_repo, mock_key_repo):
+        first = await stats_service.get_dashboard_stats(current_user_id=1)
+        second = await stats_service.get_dashboard_stats(current_user_id=1)
+
+        assert first == second
+        mock_user_repo.get_user_stats.assert_awaited_once()
+        mock_key_repo.get_key_stats.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_expires_after_ttl(self, stats_service, mock_key_repo):
+        with patch.object(admin_stats_service.time, "monotonic", return_value=1000.0):
+            await stats_service.get_dashboard_stats(current_user_id=1)
+
+        expired = 1000.0 + admin_stats_service.DASHBOARD_CACHE_TTL_SECONDS + 1
+        with patch.object(admin_stats_service.time, "monotonic", return_value=expired):
+            await stats_service.get_dashboard_stats(current_user_id=1)
+
+        assert mock_key_repo.get_key_stats.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_database(self, stats_service, mock_user_repo, mock_key_repo):
+        mock_user_repo.get_user_stats.return_value = {
+            "total_users": 0,
+            "active_users": 0,
+            "new_users": 0,
+        }
+        mock_key_repo.get_key_stats.return_value = {
+            "total": 0,
+            "active": 0,
+            "created": 0,
+            "used_bytes": 0,
+            "by_type": {},
+        }
+
+        stats = await stats_service.get_dashboard_stats(current_user_id=1)
+
+        assert stats["wireguard_pct"] == 0
+        assert stats["avg_usage_gb"] == 0
+        assert stats["total_usage_gb"] == 0
@@ -0,0 +1,133 @@
+"""Tests for AdminUserService keyset-paginated user listing."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import call, patch
+
+import pytest
+
+from application.services.admin_user_service import AdminUserService
+from domain.entities.admin import UserListCursor, UserListItem, UserListPage
+from domain.entities.balance import Balance
+from domain.entities.user import User, UserRole, UserStatus
+
+
+def _make_users(count: int):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        User(telegram_id=1000 + i, username=f"user{i}", created_at=base + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def fake_user_repo(mock_user_repo):
+    """User repo whose get_users_page pages over an in-memory list (newest first)."""
+    users = sorted(_make_users(25), key=lambda u: (u.created_at, u.telegram_id), reverse=True)
+
+    async def get_users_page(current_user_id, limit, cursor=None):
+        remaining = [
+            u
+            for u in users
+            if cursor is None
+            or (u.created_at, u.telegram_id) < (cursor.created_at, cursor.telegram_id)
+        ]
+        page = remaining[:limit]
+        next_cursor = None
+        if len(remaining) > limit:
+            next_cursor = UserListCursor(page[-1].created_at, page[-1].telegram_id)
+        return UserListPage(
+            items=[UserListItem(user=u, total_keys=2, active_keys=1) for u in page],
+            next_cursor=next_cursor,
+        )
+
+    mock_user_repo.get_users_page.side_effect = get_users_page
+    mock_user_repo.count_users.return_value = len(users)
+    return mock_user_repo
+
+
+@pytest.fixture
+def admin_user_service(fake_user_repo, mock_key_repo, mock_transaction_repo):
+    return AdminUserService(fake_user_repo, mock_key_repo, mock_transaction_repo)
+
+
+class TestUserListCursor:
+    def test_round_trip(self):
+        cursor = UserListCursor(datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc), 42)
+
+        assert UserListCursor.decode(cursor.encode()) == cursor
+
+    def test_invalid_token(self):
+        with pytest.raises(ValueError):
+            UserListCursor.decode("not-a-cursor")
+
+
+class TestGetUsersPaginated:
+    @pytest.mark.asyncio
+    async def test_first_page_uses_joined_counts(
+        self, admin_user_service, fake_user_repo, mock_key_repo
+    ):
+        result = await admin_user_service.get_users_paginated(
+            page=1, per_page=10, current_user_id=1
+        )
+
+        assert result["total_users"] == 25
+        assert result["total_pages"] == 3
+        assert len(result["users"]) == 10
+        assert result["users"][0]["user_id"] == 1024
+        assert result["users"][0]["total_keys"] == 2
+        assert result["users"][0]["active_keys"] == 1
+        assert result["next_cursor"] is not None
+        mock_key_repo.get_user_keys.assert_not_called()
+        fake_user_repo.get_all_users.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_where_previous_page_ended(self, admin_user_service):
+        first = await admin_user_service.get_users_paginated(page=1, per_page=10, current_user_id=1)
+        second = await admin_user_service.get_users_paginated(
+            page=2, per_page=10, current_user_id=1, cursor=first["next_cursor"]
+        )
+
+        assert second["users"][0]["user_id"] == 1014
+        first_ids = {u["user_id"] for u in first["users"]}
+        assert not first_ids & {u["user_id"] for u in second["users"]}
+
+    @pytest.mark.asyncio
+    async def test_page_without_cursor_walks_from_start(self, admin_user_service):
+        result = await admin_user_service.get_users_paginated(
+            page=3, per_page=10, current_user_id=1
+        )
+
+        assert [u["user_id"] for u in result["users"]] == [1004, 1003, 1002, 1001, 1000]
+        assert result["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_all_users_scans_in_batches(
+        self, admin_user_service, fake_user_repo, mock_key_repo, mock_transaction_repo
+    ):
+        async def get_balances(user_ids):
+            return {user_id: Balance(user_id=user_id, stars=7) for user_id in user_ids}
+
+        mock_transaction_repo.get_balances.side_effect = get_balances
+
+        users = await admin_user_service.get_all_users(current_user_id=1)
+
+        assert len(users) == 25
+        assert users[0]["total_keys"] == 2
+        assert users[0]["stars_balance"] == 7
+        mock_key_repo.get_by_user.assert_not_called()
+        mock_transaction_repo.get_balance.assert_not_called()
+        assert mock_transaction_repo.get_balances.await_count == 1
+
+
+class TestIdentityInvalidation:
+    @pytest.mark.asyncio
+    async def test_status_and_role_changes_invalidate_miniapp_identity(
+        self, admin_user_service, fake_user_repo
+    ):
+        fake_user_repo.get_by_id.return_value = User(telegram_id=1001)
+
+        with patch("miniapp.routes_common.identity_cache") as cache:
+            await admin_user_service.update_user_status(1001, UserStatus.SUSPENDED.value)
+            await admin_user_service.assign_role_to_user(1001, UserRole.ADMIN.value)
+
+        assert cache.invalidate_user.call_args_list == [call(1001), call(1001)]
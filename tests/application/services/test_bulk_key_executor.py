@@ -0,0 +1,122 @@
+"""
+Tests para el ejecutor de operaciones masivas sobre llaves.
+
+Author: uSipipo Team
+Version: 1.0.0
+"""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from application.services.bulk_key_executor import BulkKeyExecutor, KeyOperation
+from domain.entities.vpn_key import KeyType, VpnKey
+
+
+def make_key(key_type: KeyType, external_id: str) -> VpnKey:
+    return VpnKey(
+        id=str(uuid.uuid4()),
+        user_id=1,
+        key_type=key_type,
+        name=external_id,
+        external_id=external_id,
+        is_active=True,
+    )
+
+
+@pytest.fixture
+def outline_client():
+    client = AsyncMock()
+    client.disable_key = AsyncMock(return_value=True)
+    client.delete_key = AsyncMock(return_value=True)
+    return client
+
+
+@pytest.fixture
+def wireguard_client():
+    async def set_peers_disabled(names, disabled):
+        return {name: True for name in names}
+
+    client = AsyncMock()
+    client.set_peers_disabled = AsyncMock(side_effect=set_peers_disabled)
+    return client
+
+
+class TestBulkKeyExecutor:
+    @pytest.mark.asyncio
+    async def test_outline_calls_are_bounded(self, outline_client):
+        in_flight = 0
+        peak = 0
+
+        async def disable_key(external_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return True
+
+        outline_client.disable_key.side_effect = disable_key
+        keys = [make_key(KeyType.OUTLINE, f"ol-{i}") for i in range(10)]
+        executor = BulkKeyExecutor(outline_client=outline_client, outline_concurrency=3)
+
+        result = await executor.run(KeyOperation.DISABLE, keys)
+
+        assert result.success
+        assert len(result.succeeded) == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_wireguard_peers_are_batched(self, wireguard_client):
+        keys = [make_key(KeyType.WIREGUARD, f"wg-{i}") for i in range(5)]
+        executor = BulkKeyExecutor(wireguard_client=wireguard_client, wireguard_batch_size=2)
+
+        result = await executor.run(KeyOperation.ENABLE, keys)
+
+        assert len(result.succeeded) == 5
+        batches = [call.args for call in wireguard_client.set_peers_disabled.await_args_list]
+        assert batches == [(["wg-0", "wg-1"], False), (["wg-2", "wg-3"], False), (["wg-4"], False)]
+
+    @pytest.mark.asyncio
+    async def test_failed_keys_are_retried(self, outline_client, wireguard_client):
+        outline_client.disable_key.side_effect = [Exception("timeout"), True]
+        keys = [make_key(KeyType.OUTLINE, "ol-1"), make_key(KeyType.WIREGUARD, "wg-1")]
+        executor = BulkKeyExecutor(outline_client, wireguard_client)
+
+        result = await executor.run(KeyOperation.DISABLE, keys, retries=1)
+
+        assert result.success
+        assert result.attempts == 2
+        assert outline_client.disable_key.await_count == 2
+        assert wireguard_client.set_peers_disabled.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_retry_of_failed_keys(self, outline_client):
+        outline_client.delete_key.side_effect = [True, False, True]
+        keys = [make_key(KeyType.OUTLINE, "ol-1"), make_key(KeyType.OUTLINE, "ol-2")]
+        executor = BulkKeyExecutor(outline_client=outline_client)
+
+        result = await executor.run(KeyOperation.DELETE, keys, retries=0)
+
+        assert result.failed_keys == [keys[1]]
+        assert len(result.errors) == 1
+
+        result = await executor.retry(result, retries=0)
+
+        assert result.success
+        assert result.succeeded == keys
+        outline_client.delete_key.assert_awaited_with("ol-2")
+
+    @pytest.mark.asyncio
+    async def test_key_without_client_fails_without_calls(self, outline_client):
+        executor = BulkKeyExecutor(outline_client=outline_client)
+
+        result = await executor.run(
+            KeyOperation.DISABLE, [make_key(KeyType.WIREGUARD, "wg-1")], retries=3
+        )
+
+        assert not result.success
+        assert result.attempts == 0
+        assert "Unsupported key type" in result.failed[0][1]
@@ -0,0 +1,45 @@
+"""
+Tests para el registro de consumo en bloque de ConsumptionBillingService.
+
+Author: uSipipo Team
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from application.services.consumption_billing_service import ConsumptionBillingService
+
+
+class TestRecordDataUsageBatch:
+    @pytest.fixture
+    def subscription_service(self):
+        service = AsyncMock()
+        service.get_premium_user_ids.return_value = {2}
+        return service
+
+    @pytest.fixture
+    def service(self, subscription_service):
+        service = ConsumptionBillingService(
+            billing_repo=AsyncMock(),
+            user_repo=AsyncMock(),
+            subscription_service=subscription_service,
+        )
+        service._cycle = AsyncMock()
+        service._cycle.record_data_usage_batch.return_value = {}
+        return service
+
+    @pytest.mark.asyncio
+    async def test_premium_users_resolved_in_one_query(self, service, subscription_service):
+        await service.record_data_usage_batch({1: 10.0, 2: 20.0, 3: 30.0}, 99)
+
+        subscription_service.get_premium_user_ids.assert_awaited_once()
+        assert set(subscription_service.get_premium_user_ids.await_args.args[0]) == {1, 2, 3}
+        subscription_service.is_premium_user.assert_not_called()
+        service._cycle.record_data_usage_batch.assert_awaited_once_with({1: 10.0, 3: 30.0}, 99)
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_subscription_query(self, service, subscription_service):
+        await service.record_data_usage_batch({}, 99)
+
+        subscription_service.get_premium_user_ids.assert_not_called()
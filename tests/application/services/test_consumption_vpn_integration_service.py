@@ -4,6 +4,8 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from application.services.bulk_key_executor import BulkKeyResult, KeyOperation
+
 
 class TestConsumptionVpnIntegrationService:
     @pytest.fixture
@@ -112,10 +114,15 @@ class TestBlockUserKeys:
             mock_outline_key,
             mock_wireguard_key,
         ]
-        service.vpn_infra_service.disable_key.return_value = {"success": True}
+        service.vpn_infra_service.apply_bulk.return_value = BulkKeyResult(
+            KeyOperation.DISABLE, succeeded=[mock_outline_key, mock_wireguard_key]
+        )
 
         result = await service.block_user_keys(123, 123)
 
+        service.vpn_infra_service.apply_bulk.assert_awaited_once_with(
+            KeyOperation.DISABLE, [mock_outline_key, mock_wireguard_key]
+        )
         assert result["success"] is True
         assert result["keys_blocked"] == 2
         assert result["keys_failed"] == 0
@@ -133,11 +140,11 @@ class TestBlockUserKeys:
             mock_wireguard_key,
         ]
 
-        # First call succeeds, second fails
-        service.vpn_infra_service.disable_key.side_effect = [
-            {"success": True},
-            {"success": False, "error": "Server error"},
-        ]
+        service.vpn_infra_service.apply_bulk.return_value = BulkKeyResult(
+            KeyOperation.DISABLE,
+            succeeded=[mock_outline_key],
+            failed=[(mock_wireguard_key, "Server error")],
+        )
 
         result = await service.block_user_keys(123, 123)
 
@@ -161,6 +168,35 @@ class TestBlockUserKeys:
         service.user_repo.save.assert_called_once()
 
 
+class TestBlockKeysForUsers:
+    @pytest.mark.asyncio
+    async def test_blocks_all_users_keys_in_one_bulk_call(self):
+        from application.services.consumption_vpn_integration_service import (
+            ConsumptionVpnIntegrationService,
+        )
+
+        service = ConsumptionVpnIntegrationService(
+            user_repo=AsyncMock(),
+            key_repo=AsyncMock(),
+            vpn_infra_service=AsyncMock(),
+            billing_service=AsyncMock(),
+        )
+        keys = {1: [MagicMock(), MagicMock()], 2: [MagicMock()]}
+        service.key_repo.get_by_user_id.side_effect = lambda user_id, _: keys[user_id]
+        service.vpn_infra_service.apply_bulk.return_value = BulkKeyResult(
+            KeyOperation.DISABLE, succeeded=keys[1] + keys[2]
+        )
+
+        result = await service.block_keys_for_users([1, 2, 1], 999)
+
+        service.vpn_infra_service.apply_bulk.assert_awaited_once_with(
+            KeyOperation.DISABLE, keys[1] + keys[2]
+        )
+        assert result["users"] == 2
+        assert result["keys_blocked"] == 3
+        assert result["success"] is True
+
+
 class TestUnblockUserKeys:
     @pytest.fixture
     def service(self):
@@ -202,7 +238,9 @@ class TestUnblockUserKeys:
             mock_outline_key,
             mock_wireguard_key,
         ]
-        service.vpn_infra_service.enable_key.return_value = {"success": True}
+        service.vpn_infra_service.apply_bulk.return_value = BulkKeyResult(
+            KeyOperation.ENABLE, succeeded=[mock_outline_key, mock_wireguard_key]
+        )
 
         result = await service.unblock_user_keys(123, 123)
 
@@ -225,11 +263,11 @@ class TestUnblockUserKeys:
             mock_wireguard_key,
         ]
 
-        # First call succeeds, second fails
-        service.vpn_infra_service.enable_key.side_effect = [
-            {"success": True},
-            {"success": False, "error": "Server error"},
-        ]
+        service.vpn_infra_service.apply_bulk.return_value = BulkKeyResult(
+            KeyOperation.ENABLE,
+            succeeded=[mock_outline_key],
+            failed=[(mock_wireguard_key, "Server error")],
+        )
 
         result = await service.unblock_user_keys(123, 123)
 
@@ -307,3 +345,24 @@ class TestRouteUsageToBilling:
 
         assert result is False
         service.billing_service.record_data_usage.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_routes_whole_sync_in_one_call(self, service):
+        service.billing_service.record_data_usage_batch.return_value = {1: MagicMock()}
+
+        billed = await service.route_usage_batch_to_billing(
+            {1: Decimal("10.5"), 2: Decimal("3")}, current_user_id=0
+        )
+
+        assert billed == {1}
+        service.billing_service.record_data_usage_batch.assert_awaited_once_with(
+            {1: 10.5, 2: 3.0}, 0
+        )
+        service.user_repo.get_by_id.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_billing_error_is_raised(self, service):
+        service.billing_service.record_data_usage_batch.side_effect = Exception("DB error")
+
+        with pytest.raises(Exception, match="DB error"):
+            await service.route_usage_batch_to_billing({1: Decimal("1")}, current_user_id=0)
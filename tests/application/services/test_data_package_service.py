@@ -5,7 +5,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from application.services.data_package_service import PACKAGE_OPTIONS, DataPackageService
-from domain.entities.data_package import DataPackage, PackageType
+from domain.entities.data_package import DataPackage, PackageConsumption, PackageType
 
 
 @pytest.fixture
@@ -190,48 +190,39 @@ class TestGetUserDataSummary:
 
 class TestConsumeData:
     @pytest.mark.asyncio
-    async def test_consume_updates_usage(self, service, mock_package_repo):
-        package = DataPackage(
-            id=uuid.uuid4(),
-            user_id=123,
-            package_type=PackageType.BASIC,
-            data_limit_bytes=10 * 1024**3,
-            stars_paid=250,  # Nuevo precio: $2.50 USD
-            data_used_bytes=0,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=35),
-        )
-        mock_package_repo.get_valid_by_user.return_value = [package]
-        mock_package_repo.update_usage.return_value = True
+    async def test_consume_uses_single_set_based_call(self, service, mock_package_repo):
+        package_id = uuid.uuid4()
+        mock_package_repo.consume_bytes.return_value = [
+            PackageConsumption(package_id, 123, bytes_consumed=1024, remaining_bytes=4096)
+        ]
 
-        await service.consume_data(123, 1024, current_user_id=123)
+        result = await service.consume_data(123, 1024, current_user_id=123)
 
-        mock_package_repo.update_usage.assert_called_once()
+        assert result is True
+        mock_package_repo.consume_bytes.assert_awaited_once_with({123: 1024}, 123)
+        mock_package_repo.get_valid_by_user.assert_not_called()
+        mock_package_repo.update_usage.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_consume_returns_false_when_no_packages(self, service, mock_package_repo):
-        mock_package_repo.get_valid_by_user.return_value = []
+        mock_package_repo.consume_bytes.return_value = []
 
         result = await service.consume_data(123, 1024, current_user_id=123)
 
         assert result is False
 
     @pytest.mark.asyncio
-    async def test_consume_returns_true_when_packages_exist(self, service, mock_package_repo):
-        package = DataPackage(
-            id=uuid.uuid4(),
-            user_id=123,
-            package_type=PackageType.BASIC,
-            data_limit_bytes=10 * 1024**3,
-            stars_paid=250,  # Nuevo precio: $2.50 USD
-            data_used_bytes=0,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=35),
-        )
-        mock_package_repo.get_valid_by_user.return_value = [package]
-        mock_package_repo.update_usage.return_value = True
+    async def test_consume_batch_sums_per_user(self, service, mock_package_repo):
+        mock_package_repo.consume_bytes.return_value = [
+            PackageConsumption(uuid.uuid4(), 123, bytes_consumed=100, remaining_bytes=0),
+            PackageConsumption(uuid.uuid4(), 123, bytes_consumed=150, remaining_bytes=850),
+            PackageConsumption(uuid.uuid4(), 456, bytes_consumed=10, remaining_bytes=90),
+        ]
 
-        result = await service.consume_data(123, 1024, current_user_id=123)
+        consumed = await service.consume_data_batch({123: 250, 456: 10, 789: 5}, 0)
 
-        assert result is True
+        assert consumed == {123: 250, 456: 10}
+        mock_package_repo.consume_bytes.assert_awaited_once_with({123: 250, 456: 10, 789: 5}, 0)
 
 
 class TestExpireOldPackages:
@@ -246,18 +237,18 @@ class TestExpireOldPackages:
             data_used_bytes=0,
             expires_at=datetime.now(timezone.utc) - timedelta(days=1),
         )
-        mock_package_repo.get_expired_packages.return_value = [expired_package]
-        mock_package_repo.deactivate.return_value = True
+        mock_package_repo.deactivate_expired.return_value = [expired_package]
 
         result = await service.expire_old_packages(admin_user_id=1)
 
         assert result == 1
-        mock_package_repo.get_expired_packages.assert_called_once_with(1)
-        mock_package_repo.deactivate.assert_called_once_with(expired_package.id, 1)
+        mock_package_repo.deactivate_expired.assert_called_once_with(1)
+        mock_package_repo.get_expired_packages.assert_not_called()
+        mock_package_repo.deactivate.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_expire_returns_zero_when_no_expired_packages(self, service, mock_package_repo):
-        mock_package_repo.get_expired_packages.return_value = []
+        mock_package_repo.deactivate_expired.return_value = []
 
         result = await service.expire_old_packages(admin_user_id=1)
 
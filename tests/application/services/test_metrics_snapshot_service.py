@@ -0,0 +1,222 @@
+"""
+Tests para la instantánea compartida de métricas VPN.
+
+Author: uSipipo Team
+Version: 1.0.0
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from application.services import metrics_snapshot_service
+from application.services.metrics_snapshot_service import MetricsSnapshotService
+from domain.entities.vpn_key import KeyType
+
+
+@pytest.fixture
+def outline_client():
+    client = AsyncMock()
+    client.get_server_info = AsyncMock(return_value={"is_healthy": True, "total_keys": 1})
+    client.get_metrics = AsyncMock(return_value={"ol-1": 2048})
+    return client
+
+
+@pytest.fixture
+def wireguard_client():
+    client = AsyncMock()
+    client.get_usage = AsyncMock(return_value=[{"public_key": "pk", "total": 1024}])
+    client.get_usage_snapshot = AsyncMock(return_value={"wg-1": {"transfer_total": 4096}})
+    return client
+
+
+@pytest.fixture
+def service(outline_client, wireguard_client):
+    return MetricsSnapshotService(outline_client, wireguard_client)
+
+
+def make_stale(service, seconds):
+    snapshot = service.snapshot
+    object.__setattr__(snapshot, "taken_at", snapshot.taken_at - seconds)
+
+
+class TestGetSnapshot:
+    @pytest.mark.asyncio
+    async def test_concurrent_readers_share_one_refresh(self, service, outline_client):
+        async def slow_metrics():
+            await asyncio.sleep(0.01)
+            return {"ol-1": 2048}
+
+        outline_client.get_metrics.side_effect = slow_metrics
+
+        snapshots = await asyncio.gather(*(service.get_snapshot() for _ in range(20)))
+
+        assert outline_client.get_metrics.await_count == 1
+        assert all(s is snapshots[0] for s in snapshots)
+        assert service.stats.refreshes == 1
+
+    @pytest.mark.asyncio
+    async def test_key_usage_from_snapshot(self, service):
+        snapshot = await service.get_snapshot()
+
+        assert snapshot.key_usage(KeyType.OUTLINE, "ol-1") == 2048
+        assert snapshot.key_usage("wireguard", "wg-1") == 4096
+        assert snapshot.key_usage(KeyType.OUTLINE, "missing") == 0
+        assert snapshot.wireguard_peers == [{"public_key": "pk", "total": 1024}]
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_skips_backends(self, service, outline_client):
+        first = await service.get_snapshot()
+        second = await service.get_snapshot()
+
+        assert second is first
+        assert outline_client.get_metrics.await_count == 1
+        assert service.stats.fresh_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_served_while_revalidating(self, service, outline_client):
+        first = await service.get_snapshot()
+        make_stale(service, 60)
+        outline_client.get_metrics.return_value = {"ol-1": 9999}
+
+        with patch.object(
+            metrics_snapshot_service.settings, "METRICS_SNAPSHOT_INTERVAL_SECONDS", 30
+        ):
+            served = await service.get_snapshot()
+            assert served is first
+            assert service.stats.stale_hits == 1
+
+            # refresh() se une al refresco ya disparado en segundo plano
+            refreshed = await service.refresh()
+
+        assert outline_client.get_metrics.await_count == 2
+        assert service.snapshot is refreshed is not first
+        assert service.snapshot.key_usage(KeyType.OUTLINE, "ol-1") == 9999
+        assert service.snapshot.age_seconds < 5
+
+    @pytest.mark.asyncio
+    async def test_too_old_snapshot_waits_for_refresh(self, service, outline_client):
+        first = await service.get_snapshot()
+        make_stale(service, 60)
+
+        fresh = await service.get_snapshot(max_age=10)
+
+        assert fresh is not first
+        assert outline_client.get_metrics.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_outline_has_no_usage(self, service, outline_client):
+        outline_client.get_server_info.return_value = {"is_healthy": False, "error": "down"}
+        outline_client.get_metrics.return_value = {}
+
+        snapshot = await service.get_snapshot()
+
+        assert snapshot.outline_usage is None
+        assert snapshot.outline_healthy is False
+        assert snapshot.key_usage(KeyType.WIREGUARD, "wg-1") == 4096
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_propagates_and_clears_inflight(self, service):
+        with patch.object(service, "_collect", AsyncMock(side_effect=RuntimeError("boom"))):
+            with pytest.raises(RuntimeError):
+                await service.get_snapshot()
+
+        assert service.stats.errors == 1
+        assert (await service.get_snapshot()).outline_healthy is True
+
+    @pytest.mark.asyncio
+    async def test_reader_in_other_loop_joins_inflight_refresh(self, service, outline_client):
+        release = asyncio.Event()
+
+        async def blocked_metrics():
+            await release.wait()
+            return {"ol-1": 2048}
+
+        outline_client.get_metrics.side_effect = blocked_metrics
+        pending = asyncio.ensure_future(service.get_snapshot())
+        await asyncio.sleep(0)
+
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(asyncio.run(service.get_snapshot()))
+        )
+        thread.start()
+        await asyncio.sleep(0.05)
+        release.set()
+        snapshot = await pending
+        await asyncio.to_thread(thread.join)
+
+        assert results == [snapshot]
+        assert outline_client.get_metrics.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_reader_does_not_cancel_shared_refresh(self, service, outline_client):
+        release = asyncio.Event()
+
+        async def blocked_metrics():
+            await release.wait()
+            return {"ol-1": 2048}
+
+        outline_client.get_metrics.side_effect = blocked_metrics
+        impatient = asyncio.ensure_future(service.get_snapshot())
+        patient = asyncio.ensure_future(service.get_snapshot())
+        await asyncio.sleep(0)
+
+        impatient.cancel()
+        await asyncio.gather(impatient, return_exceptions=True)
+        release.set()
+
+        snapshot = await patient
+        assert snapshot.outline_usage == {"ol-1": 2048}
+        assert service.stats.refreshes == 1
+        assert service._inflight is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_refresh_fails_waiters_and_clears_inflight(self, service):
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        with patch.object(service, "_collect", hang):
+            reader = asyncio.ensure_future(service.get_snapshot())
+            await started.wait()
+            for task in list(service._refresh_tasks):
+                task.cancel()
+
+            with pytest.raises(RuntimeError, match="cancelled"):
+                await asyncio.wait_for(reader, 1)
+
+        assert service._inflight is None
+        assert (await service.get_snapshot()).outline_healthy is True
+
+
+class TestSnapshotMetrics:
+    @pytest.mark.asyncio
+    async def test_reports_age_and_refresh_counters(self, service):
+        assert service.metrics()["age_seconds"] is None
+
+        await service.get_snapshot()
+        await service.get_snapshot()
+        metrics = service.metrics()
+
+        assert metrics["age_seconds"] >= 0
+        assert metrics["captured_at"] is not None
+        assert metrics["refreshes"] == 1
+        assert metrics["fresh_hits"] == 1
+        assert metrics["running"] is False
+
+    @pytest.mark.asyncio
+    async def test_admin_status_reports_each_backend_on_snapshot_failure(self, service):
+        from application.services.admin_server_service import AdminServerService
+
+        admin = AdminServerService(AsyncMock(), AsyncMock(), metrics_snapshot=service)
+        with patch.object(service, "_collect", AsyncMock(side_effect=RuntimeError("boom"))):
+            status = await admin.get_server_status()
+
+        assert set(status) == {"wireguard", "outline"}
+        assert status["wireguard"]["is_healthy"] is False
+        assert status["outline"]["error_message"] == "boom"
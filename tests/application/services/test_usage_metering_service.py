@@ -0,0 +1,81 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+
+from application.services.usage_metering_service import UsageMeteringService, meter_counter
+
+
+class TestMeterCounter:
+    @pytest.mark.parametrize(
+        "previous, current, expected",
+        [
+            (100, 150, (50, False)),
+            (100, 100, (0, False)),
+            (900, 40, (40, True)),
+            (None, 500, (0, False)),
+        ],
+    )
+    def test_delta(self, previous, current, expected):
+        assert meter_counter(previous, current) == expected
+
+    def test_rolling_window_drop_only_moves_baseline(self):
+        assert meter_counter(900, 40, rolling_window=True) == (0, False)
+        assert meter_counter(100, 150, rolling_window=True) == (50, False)
+
+
+class TestUsageMeteringService:
+    @pytest.fixture
+    def integration(self):
+        integration = AsyncMock()
+        integration.route_usage_batch_to_billing.return_value = {1}
+        return integration
+
+    @pytest.fixture
+    def packages(self):
+        packages = AsyncMock()
+        packages.consume_data_batch.return_value = {2: 2048}
+        return packages
+
+    @pytest.mark.asyncio
+    async def test_billed_users_skip_package_consumption(self, integration, packages):
+        service = UsageMeteringService(integration, packages)
+
+        result = await service.route({1: 1024**2, 2: 2048, 3: 0}, current_user_id=0)
+
+        integration.route_usage_batch_to_billing.assert_awaited_once_with(
+            {1: Decimal(1), 2: Decimal(2048) / Decimal(1024**2)}, 0
+        )
+        packages.consume_data_batch.assert_awaited_once_with({2: 2048}, 0)
+        assert result.to_dict() == {
+            "users": 2,
+            "metered_bytes": 1024**2 + 2048,
+            "billed_users": 1,
+            "package_users": 1,
+            "package_bytes": 2048,
+        }
+
+    @pytest.mark.asyncio
+    async def test_nothing_routed_without_usage(self, integration, packages):
+        result = await UsageMeteringService(integration, packages).route({1: 0}, 0)
+
+        integration.route_usage_batch_to_billing.assert_not_called()
+        packages.consume_data_batch.assert_not_called()
+        assert result.users == 0
+
+    @pytest.mark.asyncio
+    async def test_package_failure_does_not_raise(self, integration, packages):
+        packages.consume_data_batch.side_effect = Exception("DB error")
+
+        result = await UsageMeteringService(integration, packages).route({2: 10}, 0)
+
+        assert result.package_bytes == {}
+
+    @pytest.mark.asyncio
+    async def test_billing_failure_skips_package_consumption(self, integration, packages):
+        integration.route_usage_batch_to_billing.side_effect = Exception("DB error")
+
+        with pytest.raises(Exception, match="DB error"):
+            await UsageMeteringService(integration, packages).route({1: 10, 2: 20}, 0)
+
+        packages.consume_data_batch.assert_not_called()
@@ -0,0 +1,243 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from application.services.usage_metering_service import MeteringResult
+from application.services.usage_sync_service import UsageSyncService
+from domain.entities.vpn_key import KeyType, VpnKey
+
+
+def _key(
+    key_type: KeyType,
+    external_id: str,
+    used_bytes: int = 0,
+    counter: object = "same",
+    user_id: int = 123456789,
+) -> VpnKey:
+    return VpnKey(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        key_type=key_type,
+        name=f"Key {external_id}",
+        external_id=external_id,
+        used_bytes=used_bytes,
+        usage_counter_bytes=used_bytes if counter == "same" else counter,
+    )
+
+
+@pytest.fixture
+def sync_service(mock_key_repo, mock_outline_client, mock_wireguard_client):
+    mock_key_repo.bulk_update_usage = AsyncMock(
+        side_effect=lambda usages, _: [key_id for key_id, *_ in usages]
+    )
+    return UsageSyncService(
+        key_repo=mock_key_repo,
+        outline_client=mock_outline_client,
+        wireguard_client=mock_wireguard_client,
+    )
+
+
+class TestUsageSyncService:
+    @pytest.mark.asyncio
+    async def test_single_snapshot_per_backend(
+        self, sync_service, mock_key_repo, mock_outline_client, mock_wireguard_client
+    ):
+        keys = [_key(KeyType.OUTLINE, str(i)) for i in range(50)]
+        keys += [_key(KeyType.WIREGUARD, f"tg_{i}") for i in range(50)]
+        mock_key_repo.get_all_active.return_value = keys
+        mock_outline_client.get_metrics.return_value = {str(i): 100 + i for i in range(50)}
+        mock_wireguard_client.get_usage_snapshot = AsyncMock(
+            return_value={f"tg_{i}": {"transfer_total": 200 + i} for i in range(50)}
+        )
+
+        report = await sync_service.run(current_user_id=1)
+
+        mock_outline_client.get_metrics.assert_awaited_once()
+        mock_wireguard_client.get_usage_snapshot.assert_awaited_once()
+        mock_wireguard_client.get_peer_metrics.assert_not_called()
+        mock_key_repo.bulk_update_usage.assert_awaited_once()
+        assert report.synced == 100
+        assert set(report.timings_ms) == {"load", "snapshot", "join", "write"}
+
+    @pytest.mark.asyncio
+    async def test_skips_unchanged_and_missing_keys(
+        self, sync_service, mock_key_repo, mock_outline_client
+    ):
+        changed = _key(KeyType.OUTLINE, "a", used_bytes=10)
+        unchanged = _key(KeyType.OUTLINE, "b", used_bytes=20)
+        missing = _key(KeyType.OUTLINE, "c", used_bytes=30)
+        mock_key_repo.get_all_active.return_value = [changed, unchanged, missing]
+        mock_outline_client.get_metrics.return_value = {"a": 15, "b": 20}
+
+        report = await sync_service.run(current_user_id=1)
+
+        usages = mock_key_repo.bulk_update_usage.call_args[0][0]
+        assert usages == [(uuid.UUID(changed.id), 5, 15, 10)]
+        assert report.synced == 1
+        assert report.unchanged == 1
+        assert report.missing == 1
+        assert report.total_bytes_synced == 5
+
+    @pytest.mark.asyncio
+    async def test_no_write_when_nothing_changed(
+        self, sync_service, mock_key_repo, mock_outline_client
+    ):
+        mock_key_repo.get_all_active.return_value = [_key(KeyType.OUTLINE, "a", 5)]
+        mock_outline_client.get_metrics.return_value = {"a": 5}
+
+        report = await sync_service.run(current_user_id=1)
+
+        mock_key_repo.bulk_update_usage.assert_not_called()
+        assert report.synced == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_backend_does_not_zero_keys(
+        self, sync_service, mock_key_repo, mock_wireguard_client
+    ):
+        mock_key_repo.get_all_active.return_value = [_key(KeyType.WIREGUARD, "tg_1", 500)]
+        mock_wireguard_client.get_usage_snapshot = AsyncMock(side_effect=Exception("wg down"))
+
+        report = await sync_service.run(current_user_id=1)
+
+        mock_key_repo.bulk_update_usage.assert_not_called()
+        assert report.missing == 1
+
+    @pytest.mark.asyncio
+    async def test_write_failure_is_reported(
+        self, sync_service, mock_key_repo, mock_outline_client
+    ):
+        mock_key_repo.get_all_active.return_value = [_key(KeyType.OUTLINE, "a")]
+        mock_outline_client.get_metrics.return_value = {"a": 1}
+        mock_key_repo.bulk_update_usage.side_effect = Exception("DB error")
+
+        report = await sync_service.run(current_user_id=1)
+
+        assert report.errors == 1
+        assert report.synced == 0
+
+
+class TestUsageMetering:
+    @pytest.fixture
+    def metering(self):
+        metering = AsyncMock()
+        metering.route.return_value = MeteringResult()
+        return metering
+
+    @pytest.fixture
+    def metered_service(self, sync_service, metering):
+        sync_service.metering = metering
+        return sync_service
+
+    @pytest.mark.asyncio
+    async def test_deltas_aggregated_per_user(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        mock_key_repo.get_all_active.return_value = [
+            _key(KeyType.OUTLINE, "a", used_bytes=100, user_id=1),
+            _key(KeyType.OUTLINE, "b", used_bytes=50, user_id=1),
+            _key(KeyType.OUTLINE, "c", used_bytes=10, user_id=2),
+        ]
+        mock_outline_client.get_metrics.return_value = {"a": 130, "b": 60, "c": 15}
+
+        report = await metered_service.run(current_user_id=0)
+
+        metering.route.assert_awaited_once_with({1: 40, 2: 5}, 0)
+        assert report.metered_bytes == 45
+        assert "meter" in report.timings_ms
+
+    @pytest.mark.asyncio
+    async def test_counter_reset_counts_new_traffic(
+        self, metered_service, metering, mock_key_repo, mock_wireguard_client
+    ):
+        # La interfaz WireGuard se reinició: el contador bajó de 900 a 40
+        key = _key(KeyType.WIREGUARD, "tg_1", used_bytes=1000, counter=900, user_id=1)
+        mock_key_repo.get_all_active.return_value = [key]
+        mock_wireguard_client.get_usage_snapshot = AsyncMock(
+            return_value={"tg_1": {"transfer_total": 40}}
+        )
+
+        report = await metered_service.run(current_user_id=0)
+
+        usages = mock_key_repo.bulk_update_usage.call_args[0][0]
+        assert usages == [(uuid.UUID(key.id), 40, 40, 900)]
+        assert report.counter_resets == 1
+        metering.route.assert_awaited_once_with({1: 40}, 0)
+
+    @pytest.mark.asyncio
+    async def test_outline_window_drop_is_not_billed_again(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        # Outline reporta 30 días móviles: el tráfico antiguo salió de la ventana
+        key = _key(KeyType.OUTLINE, "a", used_bytes=5000, counter=900, user_id=1)
+        mock_key_repo.get_all_active.return_value = [key]
+        mock_outline_client.get_metrics.return_value = {"a": 400}
+
+        report = await metered_service.run(current_user_id=0)
+
+        usages = mock_key_repo.bulk_update_usage.call_args[0][0]
+        assert usages == [(uuid.UUID(key.id), 0, 400, 900)]
+        assert report.counter_resets == 0
+        assert report.metered_bytes == 0
+        metering.route.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_legacy_key_only_sets_baseline(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        key = _key(KeyType.OUTLINE, "a", used_bytes=0, counter=None)
+        mock_key_repo.get_all_active.return_value = [key]
+        mock_outline_client.get_metrics.return_value = {"a": 5000}
+
+        report = await metered_service.run(current_user_id=0)
+
+        usages = mock_key_repo.bulk_update_usage.call_args[0][0]
+        assert usages == [(uuid.UUID(key.id), 5000, 5000, None)]
+        assert report.baselined == 1
+        metering.route.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_usage_reset_keeps_counter_baseline(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        # Ciclo de facturación reseteado (used_bytes=0) con el contador en 800
+        key = _key(KeyType.OUTLINE, "a", used_bytes=0, counter=800, user_id=1)
+        mock_key_repo.get_all_active.return_value = [key]
+        mock_outline_client.get_metrics.return_value = {"a": 850}
+
+        await metered_service.run(current_user_id=0)
+
+        usages = mock_key_repo.bulk_update_usage.call_args[0][0]
+        assert usages == [(uuid.UUID(key.id), 50, 850, 800)]
+        metering.route.assert_awaited_once_with({1: 50}, 0)
+
+    @pytest.mark.asyncio
+    async def test_not_metered_when_write_fails(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        mock_key_repo.get_all_active.return_value = [_key(KeyType.OUTLINE, "a", 10)]
+        mock_outline_client.get_metrics.return_value = {"a": 20}
+        mock_key_repo.bulk_update_usage.side_effect = Exception("DB error")
+
+        await metered_service.run(current_user_id=0)
+
+        metering.route.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_rows_are_not_metered(
+        self, metered_service, metering, mock_key_repo, mock_outline_client
+    ):
+        # Otra sincronización avanzó el contador de "b" entre la lectura y el UPDATE
+        fresh = _key(KeyType.OUTLINE, "a", used_bytes=100, user_id=1)
+        stale = _key(KeyType.OUTLINE, "b", used_bytes=100, user_id=2)
+        mock_key_repo.get_all_active.return_value = [fresh, stale]
+        mock_outline_client.get_metrics.return_value = {"a": 110, "b": 120}
+        mock_key_repo.bulk_update_usage.side_effect = None
+        mock_key_repo.bulk_update_usage.return_value = [uuid.UUID(fresh.id)]
+
+        report = await metered_service.run(current_user_id=0)
+
+        assert report.synced == 1
+        assert report.stale == 1
+        assert report.metered_bytes == 10
+        metering.route.assert_awaited_once_with({1: 10}, 0)
@@ -6,8 +6,10 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from application.services.bulk_key_executor import KeyOperation
 from application.services.vpn_infrastructure_service import VpnInfrastructureService
 from config import settings
+from domain.entities.key_query import KeyPage
 from domain.entities.vpn_key import KeyType, VpnKey
 
 
@@ -248,6 +250,9 @@ class TestCleanupGhostKeys:
         assert result["disabled_count"] == 1
         assert len(result["errors"]) == 0
         mock_outline_client.disable_key.assert_called_once()
+        mock_key_repo.set_active_bulk.assert_awaited_once_with(
+            [uuid.UUID(sample_outline_key.id)], False, settings.ADMIN_ID
+        )
 
     @pytest.mark.asyncio
     async def test_cleanup_ghost_keys_no_ghosts(
@@ -266,10 +271,55 @@ class TestCleanupGhostKeys:
         assert result["disabled_count"] == 0
 
 
+class TestApplyBulk:
+    @pytest.mark.asyncio
+    async def test_disables_keys_and_persists_in_one_update(
+        self,
+        vpn_infra_service,
+        mock_key_repo,
+        mock_outline_client,
+        mock_wireguard_client,
+        sample_outline_key,
+        sample_wireguard_key,
+    ):
+        mock_outline_client.disable_key.return_value = True
+        mock_wireguard_client.set_peers_disabled.return_value = {"wg-client-123": True}
+
+        result = await vpn_infra_service.apply_bulk(
+            KeyOperation.DISABLE, [sample_outline_key, sample_wireguard_key]
+        )
+
+        assert result.success
+        mock_wireguard_client.set_peers_disabled.assert_awaited_once_with(["wg-client-123"], True)
+        mock_key_repo.set_active_bulk.assert_awaited_once_with(
+            [uuid.UUID(sample_outline_key.id), uuid.UUID(sample_wireguard_key.id)],
+            False,
+            settings.ADMIN_ID,
+        )
+        assert sample_outline_key.is_active is False
+        assert sample_wireguard_key.is_active is False
+
+
+def _stub_query_keys(mock_key_repo, keys):
+    """query_keys en memoria: aplica los filtros de tipo y estado de la consulta."""
+
+    async def query_keys(query, current_user_id):
+        return KeyPage(
+            items=[
+                k
+                for k in keys
+                if (query.key_type is None or k.key_type == query.key_type)
+                and (query.is_active is None or k.is_active == query.is_active)
+            ]
+        )
+
+    mock_key_repo.query_keys.side_effect = query_keys
+
+
 class TestListServerKeys:
     @pytest.mark.asyncio
     async def test_list_server_keys(self, vpn_infra_service, mock_key_repo, sample_outline_key):
-        mock_key_repo.get_all_keys.return_value = [sample_outline_key]
+        _stub_query_keys(mock_key_repo, [sample_outline_key])
 
         result = await vpn_infra_service.list_server_keys(server_type="outline")
 
@@ -278,6 +328,7 @@ class TestListServerKeys:
         assert result[0]["name"] == "Test Outline Key"
         assert result[0]["is_active"] is True
         assert result[0]["key_type"] == "outline"
+        mock_key_repo.get_all_keys.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_list_server_keys_filters_inactive_keys(
@@ -296,7 +347,7 @@ class TestListServerKeys:
             last_seen_at=datetime.now(timezone.utc) - timedelta(days=30),
         )
 
-        mock_key_repo.get_all_keys.return_value = [sample_outline_key, inactive_key]
+        _stub_query_keys(mock_key_repo, [sample_outline_key, inactive_key])
 
         result = await vpn_infra_service.list_server_keys(server_type="outline")
 
@@ -324,7 +375,7 @@ class TestListServerKeys:
             last_seen_at=datetime.now(timezone.utc) - timedelta(days=30),
         )
 
-        mock_key_repo.get_all_keys.return_value = [sample_outline_key, inactive_key]
+        _stub_query_keys(mock_key_repo, [sample_outline_key, inactive_key])
 
         result = await vpn_infra_service.list_server_keys(
             server_type="outline", include_inactive=True
@@ -247,7 +247,9 @@ class TestFetchRealUsage:
     async def test_fetch_wireguard_usage(self, vpn_service, mock_wireguard_client, sample_vpn_key):
         sample_vpn_key.key_type = KeyType.WIREGUARD
         sample_vpn_key.external_id = "wg-client-123"
-        mock_wireguard_client.get_peer_metrics.return_value = {"transfer_total": 4096}
+        mock_wireguard_client.get_usage_snapshot.return_value = {
+            "wg-client-123": {"transfer_total": 4096}
+        }
 
         usage = await vpn_service.fetch_real_usage(sample_vpn_key)
 
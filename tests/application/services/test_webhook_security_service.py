@@ -0,0 +1,67 @@
+"""
+Tests para el registro de nonces de WebhookSecurityService.
+
+Author: uSipipo Team
+"""
+
+import hashlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from application.services.webhook_security_service import WebhookSecurityService
+from infrastructure.persistence.postgresql.crypto_transaction_repository import (
+    PostgresWebhookTokenRepository,
+)
+
+
+class TestCheckAndRegisterNonce:
+    @pytest.fixture
+    def token_repo(self):
+        repo = AsyncMock()
+        repo.register_if_absent = AsyncMock(return_value=True)
+        return repo
+
+    @pytest.fixture
+    def service(self, token_repo):
+        return WebhookSecurityService(webhook_secret="secret", token_repo=token_repo)
+
+    @pytest.mark.asyncio
+    async def test_registers_hashed_nonce_in_one_call(self, service, token_repo):
+        ok, error = await service.check_and_register_nonce("abc")
+
+        assert (ok, error) == (True, None)
+        token = token_repo.register_if_absent.await_args.args[0]
+        assert token.token_hash == hashlib.sha256(b"abc").hexdigest()
+        token_repo.get_by_hash.assert_not_called()
+        token_repo.save.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_replayed_nonce(self, service, token_repo):
+        token_repo.register_if_absent.return_value = False
+
+        ok, error = await service.check_and_register_nonce("abc")
+
+        assert ok is False
+        assert "replay" in error
+
+
+class TestRegisterIfAbsent:
+    @pytest.mark.asyncio
+    async def test_single_upsert_only_over_expired_tokens(self):
+        session = AsyncMock()
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        session.execute.return_value = result
+        service = WebhookSecurityService("secret", PostgresWebhookTokenRepository(session))
+
+        ok, _ = await service.check_and_register_nonce("abc")
+
+        assert ok is False
+        assert session.execute.await_count == 1
+        sql = str(session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (token_hash) DO UPDATE" in sql
+        assert "WHERE webhook_tokens.expires_at <" in sql
+        assert "RETURNING webhook_tokens.id" in sql
+        session.commit.assert_awaited_once()
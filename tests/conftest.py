@@ -79,6 +79,7 @@ def mock_wireguard_client():
     client.delete_client = AsyncMock(return_value=True)
     client.get_peer_metrics = AsyncMock(return_value={"transfer_total": 2048})
     client.get_usage = AsyncMock(return_value=[{"total": 1024}])
+    client.get_usage_snapshot = AsyncMock(return_value={"wg-client-123": {"transfer_total": 2048}})
     return client
 
 
@@ -0,0 +1,202 @@
+"""
+Tests para el rate limiting de la API (GCRA, rutas y backends).
+
+Author: uSipipo Team
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from infrastructure.api.middleware import (
+    InMemoryRateLimiter,
+    RateLimitMiddleware,
+    RateLimitRule,
+    RedisRateLimiter,
+    RouteLimits,
+    create_rate_limiter,
+)
+from infrastructure.api.middleware import rate_limiter as rate_limiter_module
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return InMemoryRateLimiter(eviction_interval=60, clock=clock)
+
+
+RULE = RateLimitRule("api", limit=3, period=60)
+
+
+class TestInMemoryRateLimiter:
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_rejects(self, limiter):
+        decisions = [await limiter.hit("ip", RULE) for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+        assert decisions[3].retry_after == pytest.approx(20)
+
+    @pytest.mark.asyncio
+    async def test_replenishes_one_request_per_interval(self, limiter, clock):
+        for _ in range(3):
+            await limiter.hit("ip", RULE)
+
+        clock.now += 20
+        assert (await limiter.hit("ip", RULE)).allowed is True
+        assert (await limiter.hit("ip", RULE)).allowed is False
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self, limiter):
+        for _ in range(3):
+            await limiter.hit("a", RULE)
+
+        assert (await limiter.hit("a", RULE)).allowed is False
+        assert (await limiter.hit("b", RULE)).allowed is True
+
+    @pytest.mark.asyncio
+    async def test_idle_keys_are_evicted(self, limiter, clock):
+        await limiter.hit("idle", RULE)
+        for _ in range(3):
+            await limiter.hit("busy", RULE)
+        assert len(limiter) == 2
+
+        # "idle" se repone a los 20s; "busy" sigue con TAT futuro
+        clock.now += 30
+        assert limiter.evict() == 1
+        assert len(limiter) == 1
+
+    @pytest.mark.asyncio
+    async def test_eviction_runs_periodically_on_hit(self, limiter, clock):
+        for i in range(50):
+            await limiter.hit(f"ip-{i}", RULE)
+
+        clock.now += 61
+        await limiter.hit("new", RULE)
+
+        assert len(limiter) == 1
+
+
+class TestRouteLimits:
+    def test_longest_prefix_wins(self):
+        static = RateLimitRule("static", 600)
+        miniapp = RateLimitRule("miniapp", 120)
+        routes = RouteLimits(
+            [("/miniapp", miniapp), ("/miniapp/static", static)],
+            default=RULE,
+        )
+
+        assert routes.for_path("/miniapp/static/app.js") is static
+        assert routes.for_path("/miniapp/api/keys") is miniapp
+        assert routes.for_path("/api/v1/webhooks/tron") is RULE
+
+
+class TestRedisRateLimiter:
+    def make(self, script):
+        client = MagicMock()
+        client.register_script.return_value = script
+        return RedisRateLimiter(client=client)
+
+    @pytest.mark.asyncio
+    async def test_maps_script_result(self):
+        script = AsyncMock(return_value=[0, 1500, 0])
+        limiter = self.make(script)
+
+        decision = await limiter.hit("api:1.2.3.4", RULE)
+
+        assert (decision.allowed, decision.retry_after) == (False, 1.5)
+        kwargs = script.await_args.kwargs
+        assert kwargs["keys"] == ["usipipo:ratelimit:api:1.2.3.4"]
+        assert kwargs["args"] == [20000.0, 60000.0]
+
+    @pytest.mark.asyncio
+    async def test_fails_open_when_redis_is_down(self):
+        limiter = self.make(AsyncMock(side_effect=ConnectionError("down")))
+
+        decision = await limiter.hit("api:1.2.3.4", RULE)
+
+        assert decision.allowed is True
+
+
+class TestCreateRateLimiter:
+    @pytest.mark.parametrize(
+        "mode,workers,shared",
+        [("embedded", 1, False), ("standalone", 1, False), ("standalone", 4, True)],
+    )
+    def test_auto_shares_counters_only_between_workers(self, mode, workers, shared):
+        settings = rate_limiter_module.settings
+        redis_limiter = MagicMock()
+        with (
+            patch.object(settings, "RATE_LIMIT_BACKEND", "auto"),
+            patch.object(settings, "API_MODE", mode),
+            patch.object(settings, "API_WORKERS", workers),
+            patch.object(rate_limiter_module, "RedisRateLimiter", redis_limiter),
+        ):
+            limiter = create_rate_limiter()
+
+        if shared:
+            assert limiter is redis_limiter.return_value
+        else:
+            assert isinstance(limiter, InMemoryRateLimiter)
+
+
+class TestRateLimitMiddleware:
+    @pytest.fixture
+    def client(self, limiter):
+        app = FastAPI()
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=limiter,
+            routes=RouteLimits(
+                [
+                    ("/static", RateLimitRule("static", 0)),
+                    ("/hook", RateLimitRule("webhook", 1)),
+                ],
+                default=RULE,
+            ),
+        )
+
+        @app.get("/{path:path}")
+        async def echo(path: str):
+            return {"path": path}
+
+        return TestClient(app)
+
+    def test_rejects_with_429_and_retry_after(self, client):
+        assert client.get("/hook").status_code == 200
+
+        response = client.get("/hook")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "60"
+        assert response.json()["detail"].startswith("Too many requests")
+
+    def test_limits_are_per_route(self, client):
+        client.get("/hook")
+
+        response = client.get("/other")
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "3"
+        assert response.headers["X-RateLimit-Remaining"] == "2"
+
+    def test_unlimited_route_and_health_skip_limiter(self, client, limiter):
+        for _ in range(10):
+            assert client.get("/static/app.js").status_code == 200
+            assert client.get("/health").status_code == 200
+
+        assert len(limiter) == 0
@@ -0,0 +1,54 @@
+"""
+Tests para el middleware ASGI de cabeceras de seguridad.
+
+Author: uSipipo Team
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from infrastructure.api.middleware import (
+    InMemoryRateLimiter,
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
+from infrastructure.api.middleware.security import SECURITY_HEADERS
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RateLimitMiddleware, limiter=InMemoryRateLimiter())
+
+    @app.get("/json")
+    async def json_endpoint():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream_endpoint():
+        async def events():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def test_security_headers_on_json_response():
+    response = TestClient(build_app()).get("/json")
+
+    assert response.json() == {"ok": True}
+    for name, value in SECURITY_HEADERS.items():
+        assert response.headers[name] == value
+    assert response.headers["X-RateLimit-Remaining"] == "59"
+
+
+def test_streaming_response_passes_through():
+    with TestClient(build_app()).stream("GET", "/stream") as response:
+        chunks = [chunk for chunk in response.iter_text() if chunk]
+
+    assert "".join(chunks) == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["content-type"].startswith("text/event-stream")
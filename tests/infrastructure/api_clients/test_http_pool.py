@@ -0,0 +1,192 @@
+"""Tests for the shared HTTP client subsystem."""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from infrastructure.api_clients import http_pool
+from infrastructure.api_clients.http_pool import (
+    OP_BULK,
+    OP_WRITE,
+    HttpClientProfile,
+    HttpRoute,
+    LatencyHistogram,
+    ManagedHttpClient,
+)
+
+PROFILE = HttpClientProfile(
+    name="test",
+    routes=(
+        HttpRoute.build("GET", "/items/{id}"),
+        HttpRoute.build("POST", "/items", OP_WRITE),
+        HttpRoute.build("POST", "/items/search", idempotent=True),
+        HttpRoute.build("GET", "/metrics/transfer", OP_BULK),
+    ),
+)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries():
+    with (
+        patch.object(http_pool.settings, "HTTP_RETRY_ATTEMPTS", 2),
+        patch.object(http_pool.settings, "HTTP_RETRY_BACKOFF_BASE", 0.001),
+        patch.object(http_pool.settings, "HTTP_RETRY_BACKOFF_MAX", 0.001),
+    ):
+        yield
+
+
+def _client(handler) -> ManagedHttpClient:
+    return ManagedHttpClient(PROFILE, transport=httpx.MockTransport(handler))
+
+
+def _flaky(failures: int, status: int = 503):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) <= failures:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"ok": True})
+
+    return handler, calls
+
+
+class TestRoutes:
+    def test_resolve_templated_path(self):
+        client = _client(lambda request: httpx.Response(200))
+
+        assert client._resolve("GET", "https://h/secret/items/abc") == ("/items/{id}", "read", True)
+        assert client._resolve("POST", "https://h/secret/items") == ("/items", OP_WRITE, False)
+        assert client._resolve("POST", "https://h/items/search") == ("/items/search", "read", True)
+        assert client._resolve("DELETE", "https://h/unknown") == ("other", "read", True)
+
+    @pytest.mark.asyncio
+    async def test_operation_timeout_applied(self):
+        seen = {}
+
+        def handler(request):
+            seen["timeout"] = request.extensions["timeout"]
+            return httpx.Response(200)
+
+        with patch.object(http_pool.settings, "HTTP_TIMEOUT_BULK", 42.0):
+            await _client(handler).get("https://h/metrics/transfer")
+
+        assert seen["timeout"]["read"] == 42.0
+
+
+class TestRetries:
+    @pytest.mark.asyncio
+    async def test_idempotent_request_retried_on_503(self):
+        handler, calls = _flaky(failures=2)
+        client = _client(handler)
+
+        response = await client.get("https://h/items/1")
+
+        assert response.status_code == 200
+        assert len(calls) == 3
+        stats = client.metrics()["endpoints"]["GET /items/{id}"]
+        assert stats["count"] == 3
+        assert stats["retries"] == 2
+        assert stats["errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        handler, calls = _flaky(failures=10)
+
+        response = await _client(handler).get("https://h/items/1")
+
+        assert response.status_code == 503
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_post_not_retried(self):
+        handler, calls = _flaky(failures=1)
+
+        response = await _client(handler).post("https://h/items", json={})
+
+        assert response.status_code == 503
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_connect_error_retried_even_for_post(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(201)
+
+        response = await _client(handler).post("https://h/items", json={})
+
+        assert response.status_code == 201
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_read_error_on_post_is_raised(self):
+        def handler(request):
+            raise httpx.ReadError("reset", request=request)
+
+        with pytest.raises(httpx.ReadError):
+            await _client(handler).post("https://h/items", json={})
+
+    def test_backoff_honours_retry_after(self):
+        with patch.object(http_pool.settings, "HTTP_RETRY_BACKOFF_MAX", 10.0):
+            assert http_pool.backoff_delay(0, retry_after=3.0) == 3.0
+            assert 0 <= http_pool.backoff_delay(5) <= 10.0
+
+
+class TestPooling:
+    @pytest.mark.asyncio
+    async def test_client_reused_until_closed(self):
+        client = _client(lambda request: httpx.Response(200))
+
+        await client.get("https://h/items/1")
+        first = client._state().client
+        await client.get("https://h/items/2")
+
+        assert client._state().client is first
+        await client.aclose()
+        assert first.is_closed
+        assert client._state().client is not first
+
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_cap(self):
+        inflight = {"now": 0, "max": 0}
+
+        class SlowTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                inflight["now"] += 1
+                inflight["max"] = max(inflight["max"], inflight["now"])
+                await asyncio.sleep(0.01)
+                inflight["now"] -= 1
+                return httpx.Response(200)
+
+        with patch.object(http_pool.settings, "HTTP_PER_HOST_CONCURRENCY", 2):
+            client = ManagedHttpClient(PROFILE, transport=SlowTransport())
+            await asyncio.gather(*(client.get(f"https://h/items/{i}") for i in range(6)))
+
+        assert inflight["max"] == 2
+
+    def test_registry_returns_shared_client(self):
+        with patch.object(http_pool, "_clients", {}):
+            assert http_pool.get_http_client(PROFILE) is http_pool.get_http_client(PROFILE)
+            assert [m["provider"] for m in http_pool.get_http_metrics()] == ["test"]
+
+
+class TestLatencyHistogram:
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram()
+        for _ in range(9):
+            histogram.observe(0.004)
+        histogram.observe(0.3)
+
+        snapshot = histogram.snapshot()
+
+        assert snapshot["count"] == 10
+        assert snapshot["p50_ms"] == 5
+        assert snapshot["p99_ms"] == 500
+        assert snapshot["buckets"]["5"] == 9
+        assert snapshot["buckets"]["500"] == 1
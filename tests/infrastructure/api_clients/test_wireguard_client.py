@@ -1,12 +1,32 @@
 """Tests for WireGuard client."""
 
 import asyncio
+import base64
+import os
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from infrastructure.api_clients.client_wireguard import WireGuardClient
+from infrastructure.api_clients.client_wireguard import (
+    WireGuardClient,
+    WireGuardPeer,
+    WireGuardPeerRegistry,
+)
+from infrastructure.api_clients.wireguard_config_writer import (
+    WRITE_MODE_JOURNAL,
+    atomic_write_text,
+)
+from infrastructure.api_clients.wireguard_keys import (
+    generate_keypair,
+    generate_preshared_key,
+    public_key_from_private,
+)
+from infrastructure.api_clients.wireguard_peer_applier import (
+    APPLY_MODE_BATCHED,
+    PeerChange,
+    WireGuardPeerApplier,
+)
 
 
 @pytest.fixture
@@ -162,6 +182,8 @@ class TestDisablePeer:
         client = WireGuardClient()
         client.interface = "wg0"
         client.conf_path = MagicMock()
+        client._config_writer.coalesce_delay = 0
+        client._config_writer._write_file = MagicMock()
         return client
 
     @pytest.mark.asyncio
@@ -195,13 +217,46 @@ AllowedIPs = 10.0.0.3/32
             mock_run_cmd.assert_called_once_with(
                 "wg set wg0 peer test_pub_key_123 allowed-ips 0.0.0.0/32"
             )
-            wireguard_client.conf_path.write_text.assert_called_once()
+            wireguard_client._config_writer._write_file.assert_called_once()
 
             # Verify the config was updated with [DISABLED] marker
-            written_content = wireguard_client.conf_path.write_text.call_args[0][0]
+            written_content = wireguard_client._config_writer._write_file.call_args[0][1]
             assert "[DISABLED]" in written_content
             assert "### CLIENT tg_123_abc123" in written_content
 
+    @pytest.mark.asyncio
+    async def test_set_peers_disabled_uses_one_wg_set(self, wireguard_client):
+        """Bulk disable applies every found peer with a single wg set."""
+        config_content = """[Interface]
+PrivateKey = server_priv_key
+
+### CLIENT tg_123_abc123
+[Peer]
+PublicKey = test_pub_key_123
+AllowedIPs = 10.0.0.2/32
+
+### CLIENT tg_456_def456
+[Peer]
+PublicKey = other_pub_key
+AllowedIPs = 10.0.0.3/32
+"""
+
+        wireguard_client.conf_path.exists.return_value = True
+        wireguard_client.conf_path.read_text.return_value = config_content
+
+        with patch.object(wireguard_client, "_run_cmd", new_callable=AsyncMock) as mock_run_cmd:
+            result = await wireguard_client.set_peers_disabled(
+                ["tg_123_abc123", "tg_456_def456", "missing"], True
+            )
+
+        assert result == {"tg_123_abc123": True, "tg_456_def456": True, "missing": False}
+        mock_run_cmd.assert_called_once_with(
+            "wg set wg0 peer test_pub_key_123 allowed-ips 0.0.0.0/32 "
+            "peer other_pub_key allowed-ips 0.0.0.0/32"
+        )
+        written_content = wireguard_client._config_writer._write_file.call_args[0][1]
+        assert written_content.count("[DISABLED]") == 2
+
     @pytest.mark.asyncio
     async def test_disable_peer_not_found(self, wireguard_client):
         """Test disable returns False when peer not found."""
@@ -271,6 +326,8 @@ class TestEnablePeer:
         client = WireGuardClient()
         client.interface = "wg0"
         client.conf_path = MagicMock()
+        client._config_writer.coalesce_delay = 0
+        client._config_writer._write_file = MagicMock()
         return client
 
     @pytest.mark.asyncio
@@ -304,10 +361,10 @@ AllowedIPs = 10.0.0.3/32
             mock_run_cmd.assert_called_once_with(
                 "wg set wg0 peer test_pub_key_123 allowed-ips 10.0.0.2/32"
             )
-            wireguard_client.conf_path.write_text.assert_called_once()
+            wireguard_client._config_writer._write_file.assert_called_once()
 
             # Verify the [DISABLED] marker was removed
-            written_content = wireguard_client.conf_path.write_text.call_args[0][0]
+            written_content = wireguard_client._config_writer._write_file.call_args[0][1]
             assert "[DISABLED]" not in written_content
             assert "### CLIENT tg_123_abc123" in written_content
 
@@ -335,11 +392,8 @@ AllowedIPs = 10.0.0.2/32
             mock_run_cmd.assert_called_once_with(
                 "wg set wg0 peer test_pub_key_123 allowed-ips 10.0.0.2/32"
             )
-            wireguard_client.conf_path.write_text.assert_called_once()
-
-            # Content should remain unchanged (no [DISABLED] to remove)
-            written_content = wireguard_client.conf_path.write_text.call_args[0][0]
-            assert "### CLIENT tg_123_abc123" in written_content
+            # Content is unchanged (no [DISABLED] to remove), so nothing is rewritten
+            wireguard_client._config_writer._write_file.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_enable_peer_not_found(self, wireguard_client):
@@ -411,6 +465,8 @@ class TestDeletePeerComplete:
         client.interface = "wg0"
         client.conf_path = MagicMock()
         client.clients_dir = MagicMock()
+        client._config_writer.coalesce_delay = 0
+        client._config_writer._write_file = MagicMock()
         return client
 
     @pytest.mark.asyncio
@@ -445,7 +501,7 @@ AllowedIPs = 10.0.0.3/32
             mock_run_cmd.assert_called_once_with("wg set wg0 peer test_pub_key_123 remove")
 
         # Verify config was updated to remove the peer block
-        written_content = wireguard_client.conf_path.write_text.call_args[0][0]
+        written_content = wireguard_client._config_writer._write_file.call_args[0][1]
         assert "tg_123_abc123" not in written_content
         assert "10.0.0.2/32" not in written_content
         assert "tg_456_def456" in written_content
@@ -488,7 +544,7 @@ AllowedIPs = 10.0.0.6/32
             assert result is True
 
         # Verify write_text was called with content that excludes deleted peer
-        written_content = wireguard_client.conf_path.write_text.call_args[0][0]
+        written_content = wireguard_client._config_writer._write_file.call_args[0][1]
         assert "tg_delete_me" not in written_content
         assert "delete_pub_key" not in written_content
         assert "10.0.0.5/32" not in written_content
@@ -594,3 +650,394 @@ AllowedIPs = 10.0.0.9/32
             mock_logger.error.assert_called_once()
             error_msg = mock_logger.error.call_args[0][0]
             assert "tg_any" in error_msg
+
+
+class TestGetUsageSnapshot:
+    """Tests for get_usage_snapshot method."""
+
+    @pytest.fixture
+    def wireguard_client(self):
+        client = WireGuardClient()
+        client.interface = "wg0"
+        client.conf_path = MagicMock()
+        client._config_writer.coalesce_delay = 0
+        client._config_writer._write_file = MagicMock()
+        return client
+
+    @pytest.mark.asyncio
+    async def test_snapshot_joins_config_with_dump(self, wireguard_client):
+        """Test that all peers are resolved with one config read and one dump."""
+        config_content = """[Interface]
+Address = 10.0.0.1/24
+
+### CLIENT tg_1_aaaa
+[Peer]
+PublicKey = pub_a=
+AllowedIPs = 10.0.0.2/32
+
+### CLIENT tg_2_bbbb [DISABLED]
+[Peer]
+PublicKey = pub_b=
+AllowedIPs = 10.0.0.3/32
+"""
+        wireguard_client.conf_path.exists.return_value = True
+        wireguard_client.conf_path.read_text.return_value = config_content
+        mock_output = (
+            "private\tkey\tport\t0\n"
+            "pub_a=\tpsk\tendpoint\tallowed\t0\t100\t200\toff\n"
+            "pub_b=\tpsk\tendpoint\tallowed\t0\t1\t2\toff"
+        )
+
+        with patch.object(
+            wireguard_client, "_run_cmd", new_callable=AsyncMock, return_value=mock_output
+        ) as mock_cmd:
+            snapshot = await wireguard_client.get_usage_snapshot()
+
+        assert mock_cmd.call_count == 1
+        wireguard_client.conf_path.read_text.assert_called_once()
+        assert snapshot["tg_1_aaaa"]["transfer_total"] == 300
+        assert snapshot["tg_2_bbbb"]["transfer_total"] == 3
+
+
+class TestWireGuardPeerRegistry:
+    """Tests for the in-memory wg0.conf registry."""
+
+    CONFIG = """[Interface]
+PrivateKey = server_priv_key
+Address = 10.0.0.1/24
+ListenPort = 51820
+
+### CLIENT tg_1_aaaa
+[Peer]
+PublicKey = pub_a
+PresharedKey = psk_a
+AllowedIPs = 10.0.0.2/32
+
+### CLIENT tg_2_bbbb [DISABLED]
+[Peer]
+PublicKey = pub_b
+PresharedKey = psk_b
+AllowedIPs = 10.0.0.4/32
+"""
+
+    def test_indexes_by_name_public_key_and_ip(self):
+        registry = WireGuardPeerRegistry.parse(self.CONFIG)
+
+        assert len(registry) == 2
+        assert registry.get("tg_1_aaaa").public_key == "pub_a"
+        assert registry.get_by_public_key("pub_b").client_name == "tg_2_bbbb"
+        assert registry.get_by_ip("10.0.0.4").disabled is True
+
+    def test_next_available_ip_is_lowest_free(self):
+        registry = WireGuardPeerRegistry.parse(self.CONFIG)
+
+        assert registry.next_available_ip() == "10.0.0.3"
+
+        registry.add(
+            WireGuardPeer.from_block(
+                "\n### CLIENT tg_3_cccc\n[Peer]\nPublicKey = pub_c\nAllowedIPs = 10.0.0.3/32\n"
+            )
+        )
+        assert registry.next_available_ip() == "10.0.0.5"
+
+        registry.remove("tg_1_aaaa")
+        assert registry.next_available_ip() == "10.0.0.2"
+        assert registry.get_by_public_key("pub_a") is None
+
+    def test_render_roundtrip_preserves_content(self):
+        registry = WireGuardPeerRegistry.parse(self.CONFIG)
+
+        assert registry.render() == self.CONFIG
+
+    def test_set_disabled_toggles_marker(self):
+        registry = WireGuardPeerRegistry.parse(self.CONFIG)
+
+        assert registry.set_disabled("tg_1_aaaa", True) is True
+        assert registry.set_disabled("tg_1_aaaa", True) is False
+        assert registry.set_disabled("tg_2_bbbb", False) is True
+
+        rendered = registry.render()
+        assert "### CLIENT tg_1_aaaa [DISABLED]" in rendered
+        assert "### CLIENT tg_2_bbbb\n" in rendered
+
+    def test_exhausted_network_raises(self):
+        blocks = "".join(
+            f"\n### CLIENT tg_{i}\n[Peer]\nPublicKey = pk{i}\nAllowedIPs = 10.0.0.{i}/32\n"
+            for i in range(2, 255)
+        )
+        registry = WireGuardPeerRegistry.parse("[Interface]\nAddress = 10.0.0.1/24\n" + blocks)
+
+        with pytest.raises(Exception, match="No hay IPs disponibles"):
+            registry.next_available_ip()
+
+    @pytest.mark.asyncio
+    async def test_client_reloads_only_when_mtime_changes(self, tmp_path):
+        client = WireGuardClient()
+        client.conf_path = tmp_path / "wg0.conf"
+        client.conf_path.write_text(self.CONFIG)
+
+        with patch.object(
+            WireGuardPeerRegistry, "parse", wraps=WireGuardPeerRegistry.parse
+        ) as mock_parse:
+            assert await client.get_next_available_ip() == "10.0.0.3"
+            assert await client.get_next_available_ip() == "10.0.0.3"
+            assert mock_parse.call_count == 1
+
+            # Edición externa del archivo: se detecta por mtime
+            content = (
+                self.CONFIG + "\n### CLIENT ext\n[Peer]\nPublicKey = x\nAllowedIPs = 10.0.0.3/32\n"
+            )
+            client.conf_path.write_text(content)
+            os.utime(client.conf_path, ns=(0, client._registry_mtime + 1_000_000))
+
+            assert await client.get_next_available_ip() == "10.0.0.5"
+            assert mock_parse.call_count == 2
+
+
+class TestConfigWriter:
+    """Tests for the coalescing wg0.conf writer."""
+
+    CONFIG = "[Interface]\nAddress = 10.0.0.1/24\n"
+
+    @pytest.fixture
+    def wireguard_client(self, tmp_path):
+        client = WireGuardClient()
+        client.interface = "wg0"
+        client.conf_path = tmp_path / "wg0.conf"
+        client.conf_path.write_text(self.CONFIG)
+        client.clients_dir = tmp_path
+        client._permissions_checked = True
+        return client
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_coalesce_into_one_write(self, wireguard_client):
+        """Test that a burst of creations gets distinct IPs and a single rewrite."""
+        with (
+            patch.object(wireguard_client, "_run_cmd", new_callable=AsyncMock, return_value="k"),
+            patch("infrastructure.api_clients.client_wireguard.settings") as mock_settings,
+        ):
+            mock_settings.WG_SERVER_PUBKEY = "server_pub"
+            results = await asyncio.gather(
+                *(wireguard_client.create_peer(i, f"key {i}") for i in range(20))
+            )
+
+        ips = {r["ip"] for r in results}
+        assert len(ips) == 20
+        assert wireguard_client._config_writer.flush_count == 1
+
+        content = wireguard_client.conf_path.read_text()
+        for result in results:
+            assert f"### CLIENT {result['client_name']}" in content
+        assert not list(wireguard_client.conf_path.parent.glob(".wg0.conf.*.tmp"))
+
+    @pytest.mark.asyncio
+    async def test_atomic_write_preserves_permissions(self, tmp_path):
+        path = tmp_path / "wg0.conf"
+        path.write_text("old")
+        os.chmod(path, 0o600)
+
+        atomic_write_text(path, "new")
+
+        assert path.read_text() == "new"
+        assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+
+    @pytest.mark.asyncio
+    async def test_journal_mode_appends_and_replays(self, wireguard_client):
+        """Test that journal mode leaves wg0.conf untouched until compaction."""
+        wireguard_client._config_writer.mode = WRITE_MODE_JOURNAL
+        wireguard_client._config_writer.coalesce_delay = 0
+        blocks = "".join(
+            f"\n### CLIENT tg_{i}\n[Peer]\nPublicKey = pk{i}\nAllowedIPs = 10.0.0.{i}/32\n"
+            for i in (2, 3)
+        )
+        wireguard_client.conf_path.write_text(self.CONFIG + blocks)
+
+        with patch.object(wireguard_client, "_run_cmd", new_callable=AsyncMock):
+            assert await wireguard_client.disable_peer("tg_2") is True
+            assert await wireguard_client.delete_client("tg_3") is True
+
+        journal = wireguard_client._config_writer.journal_path
+        assert len(journal.read_text().splitlines()) == 2
+        assert "[DISABLED]" not in wireguard_client.conf_path.read_text()
+
+        # Un cliente nuevo reconstruye el estado reaplicando el journal
+        reloaded = WireGuardClient()
+        reloaded.conf_path = wireguard_client.conf_path
+        reloaded._config_writer.mode = WRITE_MODE_JOURNAL
+        registry = reloaded._get_registry()
+        assert registry.get("tg_2").disabled is True
+        assert registry.get("tg_3") is None
+
+        # La compactación vuelca el estado y vacía el journal
+        await wireguard_client.close()
+        assert "### CLIENT tg_2 [DISABLED]" in wireguard_client.conf_path.read_text()
+        assert "tg_3" not in wireguard_client.conf_path.read_text()
+        assert journal.read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_close_awaits_background_flusher(self, wireguard_client):
+        writer = wireguard_client._config_writer
+        writer.coalesce_delay = 0.01
+
+        await writer.submit({"op": "sync"})
+        # El flusher sigue vivo (referenciado) hasta comprobar que no queda nada
+        assert writer._flusher is not None
+
+        await wireguard_client.close()
+
+        assert writer._flusher is None
+        assert writer._flushing is False
+
+    @pytest.mark.asyncio
+    async def test_bulk_disable_and_delete_flush_once(self, wireguard_client):
+        """Test that multi-peer disable and delete persist with one flush each."""
+        names = [f"tg_{i}" for i in range(2, 12)]
+        blocks = "".join(
+            f"\n### CLIENT {name}\n[Peer]\nPublicKey = pk_{name}\nAllowedIPs = 10.0.0.{i}/32\n"
+            for i, name in enumerate(names, start=2)
+        )
+        wireguard_client.conf_path.write_text(self.CONFIG + blocks)
+        writer = wireguard_client._config_writer
+
+        with patch.object(wireguard_client, "_run_cmd", new_callable=AsyncMock):
+            disabled = await wireguard_client.set_peers_disabled(names, True)
+            assert writer.flush_count == 1
+            assert writer.ops_written == len(names)
+
+            deleted = await wireguard_client.delete_clients(names)
+            assert writer.flush_count == 2
+            assert writer.ops_written == 2 * len(names)
+
+        assert all(disabled.values()) and all(deleted.values())
+        assert "### CLIENT" not in wireguard_client.conf_path.read_text()
+
+
+class TestNativeKeys:
+    """Tests for in-process X25519 key generation."""
+
+    def test_public_key_matches_rfc7748_vector(self):
+        private = base64.b64encode(
+            bytes.fromhex("77076d0a7318a57d3c16c17251b26645df4c2f87ebc0992ab177fba51db92c2a")
+        ).decode()
+        expected = base64.b64encode(
+            bytes.fromhex("8520f0098930a754748b7ddcb43ef75a0dbf3a0d26381af4eba4a98eaa9b4e6a")
+        ).decode()
+
+        assert public_key_from_private(private) == expected
+
+    def test_generated_keys_are_wireguard_format(self):
+        private, public = generate_keypair()
+        psk = generate_preshared_key()
+
+        for key in (private, public, psk):
+            assert len(key) == 44
+            assert len(base64.b64decode(key)) == 32
+
+        raw = base64.b64decode(private)
+        assert raw[0] & 7 == 0
+        assert raw[31] & 0xC0 == 0x40
+        assert public_key_from_private(private) == public
+
+    def test_invalid_private_key_raises(self):
+        with pytest.raises(ValueError):
+            public_key_from_private(base64.b64encode(b"short").decode())
+
+    @pytest.mark.asyncio
+    async def test_create_peer_native_mode_spawns_no_keygen(self, tmp_path):
+        client = WireGuardClient()
+        client.interface = "wg0"
+        client.conf_path = tmp_path / "wg0.conf"
+        client.conf_path.write_text("[Interface]\nAddress = 10.0.0.1/24\n")
+        client.clients_dir = tmp_path
+        client._permissions_checked = True
+        client.keygen_mode = "native"
+        client._config_writer.coalesce_delay = 0
+
+        with (
+            patch.object(client, "_run_cmd", new_callable=AsyncMock) as mock_run_cmd,
+            patch("infrastructure.api_clients.client_wireguard.settings") as mock_settings,
+        ):
+            mock_settings.WG_SERVER_PUBKEY = "server_pub"
+            result = await client.create_peer(1, "key")
+
+        mock_run_cmd.assert_called_once()
+        cmd = mock_run_cmd.call_args[0][0]
+        assert cmd.startswith(f"wg set wg0 peer {result['id']} allowed-ips 10.0.0.2/32")
+        assert "preshared-key" in cmd
+        assert "genkey" not in cmd
+
+
+class TestPeerApplier:
+    """Tests for batched `wg set` application."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_changes_use_one_command(self):
+        commands = []
+        psk_contents = []
+
+        async def run_cmd(cmd):
+            commands.append(cmd)
+            for token in cmd.split():
+                if token.endswith(".psk"):
+                    with open(token) as f:
+                        psk_contents.append(f.read())
+            return ""
+
+        applier = WireGuardPeerApplier(lambda: "wg0", run_cmd, coalesce_delay=0.01)
+        await asyncio.gather(
+            applier.apply(PeerChange("pk1", "allowed-ips 10.0.0.2/32", preshared_key="psk1")),
+            applier.apply(PeerChange("pk2", "remove")),
+            applier.apply(PeerChange("pk3", "allowed-ips 0.0.0.0/32")),
+        )
+
+        assert len(commands) == 1
+        assert commands[0].startswith("wg set wg0 peer pk1 allowed-ips 10.0.0.2/32 preshared-key ")
+        assert "peer pk2 remove peer pk3 allowed-ips 0.0.0.0/32" in commands[0]
+        assert psk_contents == ["psk1"]
+        assert applier.commands_run == 1
+        assert applier.changes_applied == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_reports_error_per_change(self):
+        async def run_cmd(cmd):
+            if "bad" in cmd:
+                raise Exception("wg failed")
+            return ""
+
+        applier = WireGuardPeerApplier(lambda: "wg0", run_cmd, coalesce_delay=0.01)
+        results = await asyncio.gather(
+            applier.apply(PeerChange("good", "remove")),
+            applier.apply(PeerChange("bad", "remove")),
+            return_exceptions=True,
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], Exception)
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_queued_changes(self):
+        commands = []
+
+        async def run_cmd(cmd):
+            commands.append(cmd)
+            return ""
+
+        applier = WireGuardPeerApplier(lambda: "wg0", run_cmd, coalesce_delay=0.01)
+        task = asyncio.create_task(applier.apply(PeerChange("pk1", "remove")))
+        await asyncio.sleep(0)
+        assert applier._flusher is not None
+
+        await applier.close()
+
+        assert task.done() and commands == ["wg set wg0 peer pk1 remove"]
+        assert applier._flusher is None
+
+    @pytest.mark.asyncio
+    async def test_client_batched_mode_routes_through_applier(self, wireguard_client):
+        wireguard_client.apply_mode = APPLY_MODE_BATCHED
+        with patch.object(
+            wireguard_client._peer_applier, "apply", new_callable=AsyncMock
+        ) as mock_apply:
+            await wireguard_client._set_peer("pk", "remove")
+
+        mock_apply.assert_awaited_once_with(PeerChange("pk", "remove"))
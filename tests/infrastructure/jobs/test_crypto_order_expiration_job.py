@@ -0,0 +1,54 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from domain.entities.crypto_order import CryptoOrder
+from infrastructure.jobs import crypto_order_expiration_job
+from infrastructure.jobs.crypto_order_expiration_job import expire_crypto_orders_job
+
+
+def _context(service, **extra):
+    context = MagicMock()
+    context.job.data = {"crypto_payment_service": service, **extra}
+    return context
+
+
+class TestExpireCryptoOrdersJob:
+    @pytest.mark.asyncio
+    async def test_expires_in_bulk_and_enqueues_notifications(self):
+        orders = [
+            CryptoOrder(user_id=1, package_type="slots_3", wallet_address="0x" + "a" * 40),
+            CryptoOrder(user_id=2, package_type="basic", wallet_address="0x" + "b" * 40),
+        ]
+        service = MagicMock()
+        service.crypto_order_repo.expire_pending = AsyncMock(return_value=orders)
+        dispatcher = MagicMock()
+
+        with patch.object(
+            crypto_order_expiration_job, "get_notification_dispatcher", return_value=dispatcher
+        ):
+            await expire_crypto_orders_job(_context(service))
+
+        service.crypto_order_repo.expire_pending.assert_awaited_once()
+        service.crypto_order_repo.get_pending.assert_not_called()
+        assert [c.args[0] for c in dispatcher.enqueue_message.call_args_list] == [1, 2]
+        assert "+3 claves" in dispatcher.enqueue_message.call_args_list[0].args[1]
+
+    @pytest.mark.asyncio
+    async def test_notifications_can_be_disabled(self):
+        service = MagicMock()
+        service.crypto_order_repo.expire_pending = AsyncMock(
+            return_value=[CryptoOrder(user_id=1, wallet_address="0x" + "a" * 40)]
+        )
+
+        with patch.object(crypto_order_expiration_job, "get_notification_dispatcher") as factory:
+            await expire_crypto_orders_job(_context(service, notify=False))
+
+        factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_job_handles_exception(self):
+        service = MagicMock()
+        service.crypto_order_repo.expire_pending = AsyncMock(side_effect=Exception("DB error"))
+
+        await expire_crypto_orders_job(_context(service))
@@ -0,0 +1,112 @@
+"""Tests for the API → bot event channel used in standalone API mode."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, LabeledPrice
+
+from domain.entities.expiry_deadline import ExpiryKind
+from infrastructure.notifications.bot_channel import (
+    BotChannel,
+    RemoteNotificationDispatcher,
+    bot_channel_handlers,
+    decode_value,
+    encode_value,
+)
+
+
+class FakeRedis:
+    """Just the list commands the channel uses."""
+
+    def __init__(self):
+        self.items = []
+
+    async def lpush(self, key, value):
+        self.items.insert(0, value)
+
+    async def brpop(self, keys, timeout=0):
+        return (keys[0], self.items.pop()) if self.items else None
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def channel(redis):
+    return BotChannel(client=redis)
+
+
+class TestEncoding:
+    def test_telegram_objects_round_trip(self):
+        markup = InlineKeyboardMarkup([[InlineKeyboardButton("Pagar", callback_data="pay")]])
+        value = {"reply_markup": markup, "prices": [LabeledPrice("GB", 100)], "text": "hola"}
+
+        decoded = decode_value(json.loads(json.dumps(encode_value(value))))
+
+        assert decoded == value
+
+
+class TestBotChannel:
+    async def test_remote_enqueue_is_consumed_by_bot_dispatcher(self, channel, redis):
+        markup = InlineKeyboardMarkup([[InlineKeyboardButton("Ver", callback_data="v")]])
+        remote = RemoteNotificationDispatcher(channel, bot=AsyncMock())
+
+        future = remote.enqueue("send_message", 42, text="hola", reply_markup=markup)
+        await channel.close()
+
+        assert future.result() is None
+        assert channel.stats.published == 1
+        bot_dispatcher = MagicMock()
+        await channel.dispatch(redis.items[0], bot_channel_handlers(bot_dispatcher, None))
+        bot_dispatcher.enqueue.assert_called_once_with(
+            "send_message", 42, text="hola", reply_markup=markup
+        )
+        assert channel.stats.consumed == 1
+
+    async def test_expiry_events_reach_scheduler(self, channel):
+        scheduler = MagicMock()
+        handlers = bot_channel_handlers(MagicMock(), scheduler)
+        entity_id = uuid.uuid4()
+        deadline = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+        await channel.publish(
+            "expiry.track",
+            kind=ExpiryKind.CRYPTO_ORDER.value,
+            entity_id=str(entity_id),
+            deadline=deadline.isoformat(),
+        )
+        await channel.publish(
+            "expiry.untrack", kind=ExpiryKind.CRYPTO_ORDER.value, entity_id=str(entity_id)
+        )
+        while (item := await channel.client.brpop([channel.key])) is not None:
+            await channel.dispatch(item[1], handlers)
+
+        scheduler.track.assert_called_once_with(ExpiryKind.CRYPTO_ORDER, entity_id, deadline)
+        scheduler.untrack.assert_called_once_with(ExpiryKind.CRYPTO_ORDER, entity_id)
+
+    async def test_bad_events_are_counted_not_raised(self, channel):
+        handlers = {"boom": MagicMock(side_effect=RuntimeError("x"))}
+
+        await channel.dispatch(json.dumps({"event": "boom", "payload": {}}), handlers)
+        await channel.dispatch("not json", handlers)
+        await channel.dispatch(json.dumps({"event": "unknown"}), handlers)
+
+        assert channel.stats.failed == 2
+        assert channel.stats.consumed == 0
+
+    async def test_publish_failure_resolves_future_with_error(self, channel, redis):
+        redis.lpush = AsyncMock(side_effect=ConnectionError("down"))
+
+        future = channel.post("notify", method="send_message", chat_id=1, kwargs={})
+        await channel.close()
+
+        assert isinstance(future.exception(), ConnectionError)
+        assert channel.stats.failed == 1
@@ -0,0 +1,162 @@
+"""Tests for the shared outbound Telegram notification dispatcher."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from telegram.error import Forbidden, RetryAfter
+
+from infrastructure.notifications import telegram_dispatcher
+from infrastructure.notifications.telegram_dispatcher import NotificationDispatcher, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fast_limits():
+    with (
+        patch.object(telegram_dispatcher.settings, "NOTIFY_WORKERS", 2),
+        patch.object(telegram_dispatcher.settings, "NOTIFY_GLOBAL_RATE", 30.0),
+        patch.object(telegram_dispatcher.settings, "NOTIFY_PER_CHAT_RATE", 1000.0),
+        patch.object(telegram_dispatcher.settings, "NOTIFY_PER_CHAT_BURST", 100),
+        patch.object(telegram_dispatcher.settings, "NOTIFY_MAX_RETRIES", 2),
+    ):
+        yield
+
+
+@pytest.fixture
+async def dispatcher():
+    bot = AsyncMock()
+    bot.send_message.return_value = "message"
+    instance = NotificationDispatcher(bot=bot)
+    await instance.start()
+    yield instance
+    await instance.close(timeout=1)
+
+
+class TestTokenBucket:
+    def test_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(rate=2.0, capacity=2)
+        now = bucket.updated
+
+        assert bucket.reserve(now) == 0
+        assert bucket.reserve(now) == 0
+        assert bucket.reserve(now) == pytest.approx(0.5)
+        assert bucket.reserve(now + 1.5) == pytest.approx(0.0)
+
+
+class TestDispatcher:
+    async def test_enqueue_returns_before_send(self, dispatcher):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_send(**kwargs):
+            started.set()
+            await release.wait()
+            return "sent"
+
+        dispatcher.bot.send_message.side_effect = slow_send
+
+        future = dispatcher.enqueue_message(42, "hola")
+
+        assert not future.done()
+        await started.wait()
+        release.set()
+        assert await asyncio.wrap_future(future) == "sent"
+        dispatcher.bot.send_message.assert_awaited_once_with(chat_id=42, text="hola")
+
+    async def test_send_waits_for_result(self, dispatcher):
+        result = await dispatcher.send_message(7, "hola", parse_mode="Markdown")
+
+        assert result == "message"
+        assert dispatcher.stats.sent == 1
+
+    async def test_retry_after_is_retried(self, dispatcher):
+        dispatcher.bot.send_message.side_effect = [RetryAfter(0), "ok"]
+
+        assert await dispatcher.send_message(7, "hola") == "ok"
+        assert dispatcher.bot.send_message.await_count == 2
+        assert dispatcher.stats.retried == 1
+
+    async def test_forbidden_is_not_retried(self, dispatcher):
+        dispatcher.bot.send_message.side_effect = Forbidden("bot was blocked by the user")
+
+        with pytest.raises(Forbidden):
+            await dispatcher.send_message(7, "hola")
+        assert dispatcher.bot.send_message.await_count == 1
+        assert dispatcher.stats.failed == 1
+
+    async def test_per_chat_rate_limit_spaces_messages(self, dispatcher):
+        dispatcher._chat_buckets.clear()
+        with (
+            patch.object(telegram_dispatcher.settings, "NOTIFY_PER_CHAT_RATE", 20.0),
+            patch.object(telegram_dispatcher.settings, "NOTIFY_PER_CHAT_BURST", 1),
+        ):
+            started = time.monotonic()
+            await asyncio.gather(*(dispatcher.send_message(7, f"m{i}") for i in range(3)))
+            elapsed = time.monotonic() - started
+
+        assert elapsed >= 0.09
+        assert dispatcher.stats.rate_limited >= 2
+
+    async def test_enqueue_from_other_loop(self, dispatcher):
+        results = {}
+
+        def other_thread():
+            async def run():
+                results["value"] = await dispatcher.send_message(99, "desde otro loop")
+
+            asyncio.run(run())
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        await asyncio.to_thread(thread.join)
+
+        assert results["value"] == "message"
+        dispatcher.bot.send_message.assert_awaited_once_with(chat_id=99, text="desde otro loop")
+
+    async def test_lazy_start_in_current_loop(self):
+        bot = AsyncMock()
+        bot.send_message.return_value = "lazy"
+        instance = NotificationDispatcher(bot=bot)
+
+        assert await instance.send_message(1, "hola") == "lazy"
+        assert instance.running
+        await instance.close(timeout=1)
+        assert not instance.running
+
+    async def test_closed_dispatcher_is_not_restarted_on_other_loop(self, dispatcher):
+        await dispatcher.close(timeout=1)
+        errors = {}
+
+        def other_thread():
+            async def run():
+                try:
+                    await dispatcher.send_message(99, "tarde")
+                except RuntimeError as e:
+                    errors["value"] = e
+
+            asyncio.run(run())
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        await asyncio.to_thread(thread.join)
+
+        assert "another event loop" in str(errors["value"])
+        assert not dispatcher.running
+        dispatcher.bot.send_message.assert_not_awaited()
+
+    async def test_close_fails_pending_and_in_flight_jobs(self, dispatcher):
+        async def hang(**kwargs):
+            await asyncio.Event().wait()
+
+        dispatcher.bot.send_message.side_effect = hang
+        futures = [dispatcher.enqueue_message(i, "sin respuesta") for i in range(4)]
+        await asyncio.sleep(0)
+
+        await dispatcher.close(timeout=0.05)
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="dispatcher closed"):
+                await asyncio.wait_for(asyncio.wrap_future(future), 1)
+        assert dispatcher._queue.empty()
@@ -0,0 +1,69 @@
+"""Tests for the transaction-scoped audit context of BasePostgresRepository."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from infrastructure.persistence.postgresql import base_repository
+from infrastructure.persistence.postgresql.base_repository import BasePostgresRepository
+
+
+class FakeSession:
+    """Minimal AsyncSession stand-in: info dict, root transaction and execute."""
+
+    def __init__(self):
+        self.info = {}
+        self.transaction = object()
+        self.sync_session = SimpleNamespace(get_transaction=lambda: self.transaction)
+        self.execute = AsyncMock()
+
+    def commit(self):
+        self.transaction = object()
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    base_repository.audit_context_stats.reset()
+    yield
+    base_repository.audit_context_stats.reset()
+
+
+class TestAuditContext:
+    @pytest.mark.asyncio
+    async def test_same_user_same_transaction_is_skipped(self):
+        session = FakeSession()
+        first, second = BasePostgresRepository(session), BasePostgresRepository(session)
+
+        await first._set_current_user(42)
+        await first._set_current_user(42)
+        await second._set_current_user(42)
+
+        assert session.execute.await_count == 1
+        sql = str(session.execute.call_args[0][0])
+        assert "set_config('app.current_user_id', :user_id, true)" in sql
+        assert base_repository.get_audit_context_stats() == {"issued": 1, "skipped": 2}
+
+    @pytest.mark.asyncio
+    async def test_reissued_for_other_user_or_new_transaction(self):
+        session = FakeSession()
+        repo = BasePostgresRepository(session)
+
+        await repo._set_current_user(1)
+        await repo._set_current_user(2)
+        session.commit()
+        await repo._set_current_user(2)
+
+        assert session.execute.await_count == 3
+        assert base_repository.get_audit_context_stats() == {"issued": 3, "skipped": 0}
+
+    @pytest.mark.asyncio
+    async def test_mock_session_always_issues(self):
+        session = AsyncMock()
+        session.execute = AsyncMock(return_value=MagicMock())
+        repo = BasePostgresRepository(session)
+
+        await repo._set_current_user(1)
+        await repo._set_current_user(1)
+
+        assert session.execute.await_count == 2
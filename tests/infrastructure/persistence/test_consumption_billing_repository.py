@@ -0,0 +1,112 @@
+"""
+Tests para PostgresConsumptionBillingRepository (acumulación de consumo en SQL).
+"""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from domain.entities.consumption_billing import BillingStatus
+from infrastructure.persistence.postgresql import consumption_billing_repository
+from infrastructure.persistence.postgresql.consumption_billing_repository import (
+    PostgresConsumptionBillingRepository,
+)
+from infrastructure.persistence.postgresql.models.consumption_billing import (
+    ConsumptionBillingModel,
+)
+
+
+def _model(user_id: int, mb: str) -> ConsumptionBillingModel:
+    return ConsumptionBillingModel(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        started_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        mb_consumed=Decimal(mb),
+        total_cost_usd=Decimal("0"),
+        price_per_mb_usd=Decimal("0.000439453125"),
+        status=BillingStatus.ACTIVE.value,
+    )
+
+
+def _sql(session: AsyncMock, call: int = 0) -> str:
+    stmt = session.execute.call_args_list[call][0][0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def repository(mock_session):
+    return PostgresConsumptionBillingRepository(mock_session)
+
+
+class TestAddConsumption:
+    @pytest.mark.asyncio
+    async def test_by_user_is_single_update_returning(self, repository, mock_session):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = _model(7, "150.5")
+        mock_session.execute.return_value = result
+
+        billing = await repository.add_consumption_by_user(7, 50.5, current_user_id=7)
+
+        assert billing.user_id == 7
+        assert billing.mb_consumed == Decimal("150.5")
+        assert mock_session.execute.await_count == 1
+        mock_session.get.assert_not_called()
+        sql = _sql(mock_session)
+        assert "SET mb_consumed=(consumption_billings.mb_consumed +" in sql
+        assert "total_cost_usd=round(" in sql
+        assert "RETURNING" in sql
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_by_user_without_active_cycle(self, repository, mock_session):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        mock_session.execute.return_value = result
+
+        assert await repository.add_consumption_by_user(7, 1.0, current_user_id=7) is None
+
+    @pytest.mark.asyncio
+    async def test_by_id_does_not_read_first(self, repository, mock_session):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = uuid.uuid4()
+        mock_session.execute.return_value = result
+
+        assert await repository.add_consumption(uuid.uuid4(), 10.0, current_user_id=1)
+        mock_session.get.assert_not_called()
+
+
+class TestAddConsumptionBatch:
+    @pytest.mark.asyncio
+    async def test_applies_all_deltas_in_one_statement(self, repository, mock_session):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [_model(1, "10"), _model(2, "20")]
+        mock_session.execute.return_value = result
+
+        updated = await repository.add_consumption_batch({1: 5.0, 2: 7.5, 3: 0.0}, 0)
+
+        assert set(updated) == {1, 2}
+        assert mock_session.execute.await_count == 1
+        sql = _sql(mock_session)
+        assert "FROM (VALUES" in sql
+        assert "consumption_billings.user_id = deltas.user_id" in sql
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_large_batches_are_chunked(self, repository, mock_session):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        mock_session.execute.return_value = result
+
+        with patch.object(consumption_billing_repository, "CONSUMPTION_BATCH_SIZE", 2):
+            await repository.add_consumption_batch({i: 1.0 for i in range(1, 6)}, 0)
+
+        assert mock_session.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_database(self, repository, mock_session):
+        assert await repository.add_consumption_batch({1: 0.0}, 0) == {}
+        mock_session.execute.assert_not_called()
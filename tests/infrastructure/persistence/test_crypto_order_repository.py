@@ -0,0 +1,53 @@
+"""
+Tests para PostgresCryptoOrderRepository (expiración en bloque).
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from domain.entities.crypto_order import CryptoOrderStatus
+from infrastructure.persistence.postgresql.crypto_order_repository import (
+    PostgresCryptoOrderRepository,
+)
+from infrastructure.persistence.postgresql.models.crypto_order import CryptoOrderModel
+
+
+@pytest.fixture
+def repository(mock_session):
+    return PostgresCryptoOrderRepository(mock_session)
+
+
+class TestExpirePending:
+    @pytest.mark.asyncio
+    async def test_single_update_returning(self, repository, mock_session):
+        model = CryptoOrderModel(
+            id=uuid.uuid4(),
+            user_id=42,
+            package_type="slots_3",
+            amount_usdt=1.5,
+            wallet_address="0x" + "a" * 40,
+            status="expired",
+            created_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            expires_at=datetime.now(timezone.utc) - timedelta(minutes=30),
+        )
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [model]
+        mock_session.execute.return_value = result
+
+        orders = await repository.expire_pending()
+
+        assert [o.user_id for o in orders] == [42]
+        assert orders[0].status == CryptoOrderStatus.EXPIRED
+        assert mock_session.execute.await_count == 1
+        mock_session.get.assert_not_called()
+        mock_session.commit.assert_awaited_once()
+
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE crypto_orders SET status=")
+        assert "crypto_orders.status = %(status_1)s" in sql
+        assert "crypto_orders.expires_at < now()" in sql
+        assert "RETURNING" in sql
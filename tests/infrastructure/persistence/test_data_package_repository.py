@@ -7,8 +7,10 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from domain.entities.data_package import DataPackage, PackageType
+from infrastructure.persistence.postgresql import data_package_repository
 from infrastructure.persistence.postgresql.data_package_repository import (
     PostgresDataPackageRepository,
 )
@@ -173,3 +175,57 @@ class TestDeactivate:
 
         mock_session.rollback.assert_called_once()
         assert result is False
+
+
+class TestConsumeBytes:
+    @pytest.mark.asyncio
+    async def test_single_statement_for_all_users(self, repository, mock_session):
+        package_id = uuid.uuid4()
+        row = MagicMock(id=package_id, user_id=1, bytes_consumed=100, remaining_bytes=0)
+        mock_session.execute.return_value = [row]
+
+        with patch.object(repository, "_set_current_user", AsyncMock()):
+            outcome = await repository.consume_bytes({1: 100, 2: 50, 3: 0}, current_user_id=0)
+
+        assert mock_session.execute.await_count == 1
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "OVER (PARTITION BY data_packages.user_id ORDER BY data_packages.expires_at" in sql
+        assert "RETURNING" in sql
+        assert outcome[0].package_id == package_id
+        assert outcome[0].bytes_consumed == 100
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_chunks_large_batches(self, repository, mock_session):
+        mock_session.execute.return_value = []
+
+        with (
+            patch.object(repository, "_set_current_user", AsyncMock()),
+            patch.object(data_package_repository, "CONSUME_CHUNK_SIZE", 2),
+        ):
+            await repository.consume_bytes({i: 10 for i in range(1, 6)}, current_user_id=0)
+
+        assert mock_session.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_no_usage_skips_database(self, repository, mock_session):
+        assert await repository.consume_bytes({1: 0}, current_user_id=0) == []
+        mock_session.execute.assert_not_called()
+
+
+class TestDeactivateExpired:
+    @pytest.mark.asyncio
+    async def test_single_update_returning(self, repository, mock_session):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        mock_session.execute.return_value = result
+
+        with patch.object(repository, "_set_current_user", AsyncMock()):
+            assert await repository.deactivate_expired(current_user_id=0) == []
+
+        assert mock_session.execute.await_count == 1
+        sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE data_packages SET is_active=")
+        assert "data_packages.expires_at < now()" in sql
+        assert "RETURNING" in sql
+        mock_session.commit.assert_awaited_once()
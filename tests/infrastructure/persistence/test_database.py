@@ -0,0 +1,77 @@
+"""Tests for the per-event-loop connection pool mode."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from infrastructure.persistence import database
+
+
+@pytest.fixture
+def per_loop_mode():
+    with (
+        patch.object(database.settings, "DB_POOL_MODE", database.POOL_MODE_PER_LOOP),
+        patch.object(database.settings, "DB_POOL_SIZE", 7),
+        patch.object(database.settings, "DB_MAX_OVERFLOW", 3),
+        patch.object(database, "_session_factory", None),
+        patch.object(database, "_loop_engines", database.weakref.WeakKeyDictionary()),
+    ):
+        yield
+
+
+class TestPerLoopPool:
+    @pytest.mark.asyncio
+    async def test_same_loop_reuses_engine(self, per_loop_mode):
+        engine = database.get_engine()
+
+        assert database.get_engine() is engine
+        assert isinstance(engine.pool, database._InstrumentedQueuePool)
+        assert engine.pool.size() == 7
+        assert engine.pool._max_overflow == 3
+
+    @pytest.mark.asyncio
+    async def test_other_loop_gets_own_engine(self, per_loop_mode):
+        engine = database.get_engine()
+        other = {}
+
+        def run_in_thread():
+            async def resolve():
+                other["engine"] = database.get_engine()
+
+            asyncio.run(resolve())
+
+        thread = threading.Thread(target=run_in_thread)
+        thread.start()
+        thread.join()
+
+        assert other["engine"] is not engine
+
+    @pytest.mark.asyncio
+    async def test_session_binds_to_current_loop_engine(self, per_loop_mode):
+        session = database.get_session_factory()()
+
+        assert session.sync_session.get_bind() is database.get_engine().sync_engine
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_pool_metrics_snapshot(self, per_loop_mode):
+        engine = database.get_engine()
+        engine.pool.metrics.record_wait(2.0)
+        engine.pool.metrics.record_wait(4.0)
+
+        [metrics] = database.get_pool_metrics()
+
+        assert metrics["size"] == 7
+        assert metrics["checked_out"] == 0
+        assert metrics["checkouts"] == 2
+        assert metrics["wait_avg_ms"] == 3.0
+        assert metrics["wait_max_ms"] == 4.0
+
+        await database.dispose_loop_engine()
+        assert database.get_pool_metrics() == []
+
+    def test_null_mode_has_no_pool_metrics(self):
+        with patch.object(database.settings, "DB_POOL_MODE", database.POOL_MODE_NULL):
+            assert database.get_pool_metrics() == []
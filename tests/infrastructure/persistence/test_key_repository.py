@@ -3,8 +3,11 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.vpn_key import KeyType, VpnKey
+from infrastructure.persistence.postgresql.key_repository import PostgresKeyRepository
 
 
 class TestKeyRepository:
@@ -105,3 +108,40 @@ class TestKeyRepository:
 
         assert result is True
         mock_key_repo.reset_data_usage.assert_called_once()
+
+
+class TestBulkUpdateUsage:
+    """SQL emitido por PostgresKeyRepository.bulk_update_usage."""
+
+    @pytest.fixture
+    def session(self):
+        session = AsyncMock(spec=AsyncSession)
+        session.info = {}
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        session.execute.return_value = result
+        return session
+
+    @pytest.mark.asyncio
+    async def test_adds_delta_guarded_by_previous_counter(self, session):
+        repository = PostgresKeyRepository(session)
+        key_id = uuid.uuid4()
+
+        await repository.bulk_update_usage([(key_id, 50, 850, 800)], current_user_id=1)
+
+        update_sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "used_bytes=(vpn_keys.used_bytes + usage_rows.delta)" in update_sql
+        assert "usage_counter_bytes=usage_rows.counter" in update_sql
+        assert (
+            "vpn_keys.usage_counter_bytes IS NOT DISTINCT FROM "
+            "CAST(usage_rows.previous_counter AS BIGINT)"
+        ) in update_sql
+        assert "RETURNING vpn_keys.id" in update_sql
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_database(self, session):
+        repository = PostgresKeyRepository(session)
+
+        assert await repository.bulk_update_usage([], current_user_id=1) == []
+        session.execute.assert_not_called()
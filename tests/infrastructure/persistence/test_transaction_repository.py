@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.balance import Balance
@@ -99,3 +100,23 @@ class TestPostgresTransactionRepository:
         balance = await repository.get_balance(user_id)
 
         assert balance.stars == most_recent_balance
+
+    @pytest.mark.asyncio
+    async def test_get_balances_single_query(self, repository, mock_session):
+        """Test get_balances resuelve varios usuarios en una consulta DISTINCT ON."""
+        mock_result = MagicMock()
+        mock_result.all.return_value = [(1, 300), (2, 50)]
+        mock_session.execute.return_value = mock_result
+
+        balances = await repository.get_balances([1, 2, 3])
+
+        assert {k: v.stars for k, v in balances.items()} == {1: 300, 2: 50, 3: 0}
+        mock_session.execute.assert_called_once()
+        sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "DISTINCT ON (transactions.user_id)" in sql
+
+    @pytest.mark.asyncio
+    async def test_get_balances_empty(self, repository, mock_session):
+        """Test get_balances no consulta la BD sin usuarios."""
+        assert await repository.get_balances([]) == {}
+        mock_session.execute.assert_not_called()
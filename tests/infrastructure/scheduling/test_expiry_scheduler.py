@@ -0,0 +1,181 @@
+"""Tests para el planificador de expiraciones por vencimiento exacto."""
+
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from domain.entities.expiry_deadline import ExpiryDeadline, ExpiryKind
+from infrastructure.persistence.postgresql.expiry_deadline_repository import (
+    PostgresExpiryDeadlineRepository,
+)
+from infrastructure.scheduling.expiry_scheduler import FIRE_DELAY, ExpiryScheduler
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _deadline(kind: ExpiryKind, seconds: int) -> ExpiryDeadline:
+    return ExpiryDeadline(NOW + timedelta(seconds=seconds), kind, uuid.uuid4())
+
+
+@pytest.fixture
+def job_queue():
+    queue = MagicMock()
+    queue.run_once.side_effect = lambda *args, **kwargs: MagicMock()
+    return queue
+
+
+@pytest.fixture
+def handlers():
+    return {
+        ExpiryKind.CRYPTO_ORDER: AsyncMock(return_value=1),
+        ExpiryKind.DATA_PACKAGE: AsyncMock(return_value=0),
+    }
+
+
+async def _start(loaded, job_queue, handlers) -> ExpiryScheduler:
+    scheduler = ExpiryScheduler(loader=AsyncMock(return_value=loaded))
+    for kind, handler in handlers.items():
+        scheduler.register(kind, handler)
+    await scheduler.start(job_queue)
+    for handler in handlers.values():
+        handler.reset_mock()
+    return scheduler
+
+
+def _armed_at(job_queue) -> datetime:
+    return job_queue.run_once.call_args.kwargs["when"] - FIRE_DELAY
+
+
+class TestExpiryScheduler:
+    async def test_start_reconciles_and_arms_earliest(self, job_queue, handlers):
+        first = _deadline(ExpiryKind.DATA_PACKAGE, 60)
+        loaded = [_deadline(ExpiryKind.CRYPTO_ORDER, 300), first]
+
+        scheduler = await _start(loaded, job_queue, handlers)
+
+        assert scheduler.pending == 2
+        assert _armed_at(job_queue) == first.deadline
+        job_queue.run_repeating.assert_called_once()
+
+    async def test_fire_runs_only_due_kinds(self, job_queue, handlers):
+        loaded = [_deadline(ExpiryKind.CRYPTO_ORDER, 10), _deadline(ExpiryKind.DATA_PACKAGE, 600)]
+        scheduler = await _start(loaded, job_queue, handlers)
+
+        results = await scheduler.fire(now=NOW + timedelta(seconds=10))
+
+        assert results == {ExpiryKind.CRYPTO_ORDER: 1}
+        handlers[ExpiryKind.CRYPTO_ORDER].assert_awaited_once()
+        handlers[ExpiryKind.DATA_PACKAGE].assert_not_awaited()
+        assert _armed_at(job_queue) == loaded[1].deadline
+
+    async def test_untracked_deadline_does_not_fire(self, job_queue, handlers):
+        order = _deadline(ExpiryKind.CRYPTO_ORDER, 10)
+        scheduler = await _start([order], job_queue, handlers)
+
+        scheduler.untrack(order.kind, order.entity_id)
+        results = await scheduler.fire(now=NOW + timedelta(minutes=1))
+
+        assert results == {}
+        handlers[ExpiryKind.CRYPTO_ORDER].assert_not_awaited()
+
+    async def test_earlier_track_rearms_timer(self, job_queue, handlers):
+        scheduler = await _start([_deadline(ExpiryKind.DATA_PACKAGE, 3600)], job_queue, handlers)
+        previous_timer = scheduler._timer
+
+        soon = NOW + timedelta(seconds=5)
+        scheduler.track(ExpiryKind.CRYPTO_ORDER, uuid.uuid4(), soon)
+
+        assert _armed_at(job_queue) == soon
+        assert scheduler.pending == 2
+        previous_timer.schedule_removal.assert_called_once()
+
+    async def test_track_from_other_thread_arms_in_scheduler_loop(self, job_queue, handlers):
+        scheduler = await _start([], job_queue, handlers)
+        soon = NOW + timedelta(seconds=5)
+
+        thread = threading.Thread(
+            target=scheduler.track, args=(ExpiryKind.CRYPTO_ORDER, uuid.uuid4(), soon)
+        )
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        await asyncio.sleep(0)
+
+        assert _armed_at(job_queue) == soon
+
+    async def test_track_ignored_until_started_or_beyond_horizon(self, job_queue, handlers):
+        scheduler = ExpiryScheduler(loader=AsyncMock(return_value=[]))
+        scheduler.register(ExpiryKind.CRYPTO_ORDER, handlers[ExpiryKind.CRYPTO_ORDER])
+
+        scheduler.track(ExpiryKind.CRYPTO_ORDER, uuid.uuid4(), NOW)
+        assert scheduler.pending == 0
+
+        await scheduler.start(job_queue)
+        far = datetime.now(timezone.utc) + timedelta(days=30)
+        scheduler.track(ExpiryKind.CRYPTO_ORDER, uuid.uuid4(), far)
+        assert scheduler.pending == 0
+
+    async def test_forwards_while_not_running(self, job_queue, handlers):
+        forwarder = MagicMock()
+        scheduler = ExpiryScheduler(loader=AsyncMock(return_value=[]))
+        scheduler.register(ExpiryKind.CRYPTO_ORDER, handlers[ExpiryKind.CRYPTO_ORDER])
+        scheduler.forward_to(forwarder)
+        entity_id = uuid.uuid4()
+
+        scheduler.track(ExpiryKind.CRYPTO_ORDER, entity_id, NOW.replace(tzinfo=None))
+        scheduler.untrack(ExpiryKind.CRYPTO_ORDER, entity_id)
+
+        forwarder.assert_any_call(
+            "expiry.track",
+            kind=ExpiryKind.CRYPTO_ORDER.value,
+            entity_id=str(entity_id),
+            deadline=NOW.isoformat(),
+        )
+        forwarder.assert_any_call(
+            "expiry.untrack", kind=ExpiryKind.CRYPTO_ORDER.value, entity_id=str(entity_id)
+        )
+
+        await scheduler.start(job_queue)
+        scheduler.track(ExpiryKind.CRYPTO_ORDER, entity_id, datetime.now(timezone.utc))
+        assert forwarder.call_count == 2
+        assert scheduler.pending == 1
+
+    async def test_handler_error_does_not_stop_other_kinds(self, job_queue, handlers):
+        loaded = [_deadline(ExpiryKind.CRYPTO_ORDER, 1), _deadline(ExpiryKind.DATA_PACKAGE, 1)]
+        scheduler = await _start(loaded, job_queue, handlers)
+        handlers[ExpiryKind.CRYPTO_ORDER].side_effect = RuntimeError("db down")
+
+        await scheduler.fire(now=NOW + timedelta(seconds=5))
+
+        handlers[ExpiryKind.DATA_PACKAGE].assert_awaited_once()
+        assert scheduler.stats.errors == 1
+
+
+class TestExpiryDeadlineRepository:
+    async def test_single_union_query(self, mock_session):
+        package_id = uuid.uuid4()
+        row = MagicMock(kind="data_package", id=package_id, deadline=NOW)
+        mock_session.execute.return_value = [row]
+
+        deadlines = await PostgresExpiryDeadlineRepository(mock_session).get_upcoming(NOW, 30)
+
+        assert deadlines == [ExpiryDeadline(NOW, ExpiryKind.DATA_PACKAGE, package_id)]
+        assert mock_session.execute.await_count == 1
+        sql = str(
+            mock_session.execute.call_args[0][0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert sql.count("UNION ALL") == 4
+        for table in (
+            "crypto_orders",
+            "data_packages",
+            "consumption_invoices",
+            "subscription_plans",
+            "consumption_billings",
+        ):
+            assert f"FROM {table}" in sql
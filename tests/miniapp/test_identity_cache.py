@@ -0,0 +1,147 @@
+"""
+Tests para la unidad de trabajo por request y la caché de identidad de la Mini App.
+
+Author: uSipipo Team
+Version: 1.0.0
+"""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from domain.entities.user import User
+from infrastructure.api.server import create_app
+from miniapp import routes_common
+from miniapp.routes_common import MiniAppContext, get_uow, identity_cache
+from miniapp.services.miniapp_auth import (
+    MiniAppAuthResult,
+    TelegramUser,
+    get_miniapp_auth_service,
+)
+
+INIT_DATA = "query_id=q1&user=%7B%22id%22%3A12345%7D&auth_date=1&hash=abc"
+
+
+class FakeUnitOfWork:
+    """Unidad de trabajo con repositorios simulados."""
+
+    registered = True
+
+    def __init__(self):
+        self.users = AsyncMock()
+        self.users.get_by_id.return_value = (
+            User(telegram_id=12345, username="test") if self.registered else None
+        )
+        self.keys = AsyncMock()
+        self.keys.get_by_user_id.return_value = []
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    identity_cache.clear()
+    yield
+    identity_cache.clear()
+
+
+@pytest.fixture
+def auth_service():
+    service = MagicMock()
+    service.validate_init_data.return_value = MiniAppAuthResult(
+        success=True,
+        user=TelegramUser(id=12345, first_name="Test"),
+        query_id="q1",
+        auth_date=int(time.time()),
+    )
+    return service
+
+
+@pytest.fixture
+async def client(auth_service):
+    app = create_app()
+    uows = []
+
+    def fake_uow():
+        uow = FakeUnitOfWork()
+        uows.append(uow)
+        return uow
+
+    app.dependency_overrides[get_uow] = fake_uow
+    app.dependency_overrides[get_miniapp_auth_service] = lambda: auth_service
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        ac.uows = uows
+        yield ac
+    app.dependency_overrides.clear()
+
+
+class TestRequestUnitOfWork:
+    @pytest.mark.asyncio
+    async def test_auth_and_handler_share_unit_of_work(self, client):
+        response = await client.get(
+            "/miniapp/api/user", headers={"X-Telegram-Init-Data": INIT_DATA}
+        )
+
+        assert response.json()["success"] is True
+        assert len(client.uows) == 1
+        uow = client.uows[0]
+        uow.users.get_by_id.assert_awaited_once_with(12345, 12345)
+        uow.keys.get_by_user_id.assert_awaited_once_with(12345, 12345)
+
+
+class TestIdentityCache:
+    @pytest.mark.asyncio
+    async def test_repeat_navigation_skips_validation_and_lookup(self, client, auth_service):
+        headers = {"X-Telegram-Init-Data": INIT_DATA}
+
+        await client.get("/miniapp/api/user", headers=headers)
+        await client.get("/miniapp/api/keys", headers=headers)
+
+        auth_service.validate_init_data.assert_called_once()
+        assert client.uows[0].users.get_by_id.await_count == 1
+        client.uows[1].users.get_by_id.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unregistered_user_is_not_cached(self, client, auth_service):
+        headers = {"X-Telegram-Init-Data": INIT_DATA}
+
+        with patch.object(FakeUnitOfWork, "registered", False):
+            response = await client.get("/miniapp/api/user", headers=headers)
+
+        assert response.status_code == 403
+        assert identity_cache.get(INIT_DATA) is None
+
+    def test_entry_expires_after_ttl(self):
+        ctx = MiniAppContext(user=TelegramUser(id=1, first_name="A"))
+
+        with patch.object(routes_common.settings, "MINIAPP_IDENTITY_CACHE_TTL", 10):
+            identity_cache.put(INIT_DATA, ctx)
+            assert identity_cache.get(INIT_DATA) is ctx
+
+            with patch.object(routes_common.time, "monotonic", return_value=time.monotonic() + 11):
+                assert identity_cache.get(INIT_DATA) is None
+
+    def test_ttl_capped_by_auth_date(self):
+        ctx = MiniAppContext(user=TelegramUser(id=1, first_name="A"))
+        expired_auth = int(time.time()) - routes_common.MiniAppAuthService.MAX_AUTH_AGE_SECONDS
+
+        identity_cache.put(INIT_DATA, ctx, auth_date=expired_auth)
+
+        assert identity_cache.get(INIT_DATA) is None
+
+    def test_invalidate_user(self):
+        identity_cache.put("a", MiniAppContext(user=TelegramUser(id=1, first_name="A")))
+        identity_cache.put("b", MiniAppContext(user=TelegramUser(id=2, first_name="B")))
+
+        identity_cache.invalidate_user(1)
+
+        assert identity_cache.get("a") is None
+        assert identity_cache.get("b") is not None
+
+    def test_size_is_bounded(self):
+        with patch.object(routes_common.settings, "MINIAPP_IDENTITY_CACHE_SIZE", 16):
+            for i in range(20):
+                identity_cache.put(f"init-{i}", MiniAppContext(user=TelegramUser(i, "U")))
+
+        assert identity_cache.get("init-0") is None
+        assert identity_cache.get("init-19") is not None
@@ -0,0 +1,130 @@
+"""
+Tests para la validación de initData de la Mini App.
+
+Author: uSipipo Team
+Version: 1.0.0
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+import pytest
+
+from miniapp.services import miniapp_auth
+from miniapp.services.miniapp_auth import MiniAppAuthService, get_miniapp_auth_service
+
+BOT_TOKEN = "123456:TEST_TOKEN"
+
+
+def _sign(fields: dict, token: str = BOT_TOKEN) -> str:
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    fields = dict(
+        fields, hash=hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    )
+    return urlencode(fields)
+
+
+def _init_data(user_id: int = 42, auth_date: int = None) -> str:
+    return _sign(
+        {
+            "auth_date": str(auth_date or int(time.time())),
+            "query_id": "AAH",
+            "user": json.dumps({"id": user_id, "first_name": "Ana"}),
+        }
+    )
+
+
+@pytest.fixture
+def service():
+    return MiniAppAuthService(BOT_TOKEN)
+
+
+class TestValidateInitData:
+    def test_valid_init_data(self, service):
+        result = service.validate_init_data(_init_data())
+
+        assert result.success
+        assert result.user.id == 42
+        assert result.query_id == "AAH"
+
+    def test_tampered_data_rejected(self, service):
+        tampered = _init_data().replace("Ana", "Eve")
+
+        result = service.validate_init_data(tampered)
+
+        assert not result.success
+        assert "Hash inválido" in result.error
+
+    def test_expired_auth_date_rejected(self, service):
+        old = int(time.time()) - MiniAppAuthService.MAX_AUTH_AGE_SECONDS - 1
+
+        result = service.validate_init_data(_init_data(auth_date=old))
+
+        assert not result.success
+        assert result.error == "Sesión expirada"
+
+    def test_wrong_token_rejected(self):
+        result = MiniAppAuthService("999:OTHER").validate_init_data(_init_data())
+
+        assert not result.success
+
+
+class TestValidationCache:
+    def test_repeat_validation_served_from_cache(self, service):
+        init_data = _init_data()
+
+        first = service.validate_init_data(init_data)
+        with patch.object(service, "_verify_hash") as verify:
+            second = service.validate_init_data(init_data)
+
+        verify.assert_not_called()
+        assert second is first
+        assert service.cache_hits == 1
+
+    def test_same_hash_with_different_data_is_revalidated(self, service):
+        init_data = _init_data()
+        service.validate_init_data(init_data)
+        hash_part = init_data[init_data.index("hash=") :]
+        forged = _init_data(user_id=7).split("&hash=")[0] + "&" + hash_part
+
+        result = service.validate_init_data(forged)
+
+        assert not result.success
+        assert service.cache_hits == 0
+
+    def test_cached_entry_expires_with_auth_date(self, service):
+        auth_date = int(time.time()) - MiniAppAuthService.MAX_AUTH_AGE_SECONDS + 60
+        init_data = _init_data(auth_date=auth_date)
+        assert service.validate_init_data(init_data).success
+
+        with patch.object(miniapp_auth.time, "time", return_value=auth_date + 86401):
+            result = service.validate_init_data(init_data)
+
+        assert not result.success
+        assert service.cache_hits == 0
+
+    def test_failed_validation_not_cached(self, service):
+        tampered = _init_data().replace("Ana", "Eve")
+
+        service.validate_init_data(tampered)
+        service.validate_init_data(tampered)
+
+        assert service.cache_hits == 0
+
+    def test_cache_is_bounded(self):
+        service = MiniAppAuthService(BOT_TOKEN, cache_size=2)
+
+        for user_id in range(5):
+            service.validate_init_data(_init_data(user_id=user_id + 1))
+
+        assert len(service._cache) == 2
+
+
+def test_service_is_singleton():
+    with patch.object(miniapp_auth, "_auth_service", None):
+        assert get_miniapp_auth_service() is get_miniapp_auth_service()
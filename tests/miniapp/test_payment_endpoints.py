@@ -305,6 +305,26 @@ class TestConfirmPayment:
         assert data["message"] == "Paquete comprado exitosamente"
         assert data["package_id"] == "pkg_123"
 
+    @pytest.mark.asyncio
+    async def test_confirm_payment_reloads_user_in_transaction(self, client):
+        """The cached ctx.db_user is not trusted: the user is re-read before paying."""
+        with patch("miniapp.routes_payments.PostgresUserRepository") as mock_repo_class:
+            mock_repo = AsyncMock()
+            mock_repo.get_by_id.return_value = None
+            mock_repo_class.return_value = mock_repo
+
+            response = await client.post(
+                "/miniapp/api/confirm-payment",
+                json={
+                    "product_type": "package",
+                    "product_id": "basic",
+                    "transaction_id": "txn_stale",
+                },
+            )
+
+        assert response.status_code == 400
+        mock_repo.get_by_id.assert_awaited_once_with(12345, 12345)
+
     @pytest.mark.asyncio
     async def test_confirm_payment_slots_success(self, client):
         """Test confirming payment for slots adds the slots."""
@@ -0,0 +1,133 @@
+"""
+Tests para la lectura inversa y el seguimiento del archivo de log.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+from utils.log_tail import (
+    LogFilter,
+    follow,
+    iter_lines_reversed,
+    tail_lines,
+    tail_records,
+)
+
+
+def log_line(second: int, level: str, message: str) -> str:
+    return f"2026-10-17 12:00:{second:02d} | {level: <8} | mod:func:1 - {message}"
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    lines = [
+        log_line(0, "INFO", "arranque"),
+        log_line(1, "DEBUG", "detalle"),
+        log_line(2, "ERROR", "fallo de pago"),
+        "Traceback (most recent call last):",
+        '  File "x.py", line 1',
+        log_line(3, "WARNING", "latencia alta"),
+        log_line(4, "INFO", "pago confirmado"),
+    ]
+    path = tmp_path / "bot.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path, lines
+
+
+class TestReverseLines:
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 4096])
+    def test_lines_reversed_any_block_size(self, log_file, block_size):
+        path, lines = log_file
+
+        assert list(iter_lines_reversed(path, block_size)) == list(reversed(lines))
+
+    def test_without_trailing_newline(self, tmp_path):
+        path = tmp_path / "bot.log"
+        path.write_text("uno\ndos\ntres", encoding="utf-8")
+
+        assert list(iter_lines_reversed(path, 2)) == ["tres", "dos", "uno"]
+
+    def test_max_bytes_drops_partial_line(self, log_file):
+        path, lines = log_file
+        max_bytes = len(lines[-1]) + len(lines[-2]) + 10
+
+        assert list(iter_lines_reversed(path, 8, max_bytes)) == [lines[-1], lines[-2]]
+
+    def test_tail_lines(self, log_file):
+        path, lines = log_file
+
+        assert tail_lines(path, 2, block_size=16) == lines[-2:]
+        assert tail_lines(path, 100) == lines
+        assert tail_lines(path, 0) == []
+
+
+class TestTailRecords:
+    def test_groups_traceback_with_record(self, log_file):
+        path, _ = log_file
+
+        records = tail_records(path, 10)
+
+        assert [r.level for r in records] == ["INFO", "DEBUG", "ERROR", "WARNING", "INFO"]
+        assert records[2].message.endswith(
+            'fallo de pago\nTraceback (most recent call last):\n  File "x.py", line 1'
+        )
+
+    def test_limit_returns_latest_in_order(self, log_file):
+        path, _ = log_file
+
+        records = tail_records(path, 2)
+
+        assert [r.timestamp[-2:] for r in records] == ["03", "04"]
+
+    def test_min_level_and_substring(self, log_file):
+        path, _ = log_file
+
+        warnings = tail_records(path, 10, LogFilter(min_level="warning"))
+        pagos = tail_records(path, 10, LogFilter(contains="PAGO"))
+
+        assert [r.level for r in warnings] == ["ERROR", "WARNING"]
+        assert [r.timestamp[-2:] for r in pagos] == ["02", "04"]
+
+    def test_time_range(self, log_file):
+        path, _ = log_file
+        log_filter = LogFilter(
+            since=datetime(2026, 10, 17, 12, 0, 2), until=datetime(2026, 10, 17, 12, 0, 3)
+        )
+
+        records = tail_records(path, 10, log_filter)
+
+        assert [r.timestamp[-2:] for r in records] == ["02", "03"]
+
+
+class TestFollow:
+    @pytest.mark.asyncio
+    async def test_yields_appended_records_and_survives_rotation(self, log_file):
+        path, _ = log_file
+        stream = follow(path, LogFilter(min_level="INFO"), poll_interval=0.01)
+        try:
+            # Arranca al final: nada de lo anterior
+            assert await anext(stream) is None
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(log_line(5, "DEBUG", "ignorado") + "\n")
+                f.write(log_line(6, "ERROR", "nuevo") + "\nTraceback\n")
+            record = await anext(stream)
+            assert (record.level, record.message.endswith("nuevo\nTraceback")) == ("ERROR", True)
+
+            os.replace(path, path.with_suffix(".1"))
+            path.write_text(log_line(7, "INFO", "rotado") + "\n", encoding="utf-8")
+
+            async def next_record():
+                while (item := await anext(stream)) is None:
+                    pass
+                return item
+
+            record = await asyncio.wait_for(next_record(), timeout=2)
+            assert record.message.endswith("rotado")
+        finally:
+            await stream.aclose()
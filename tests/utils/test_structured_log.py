@@ -0,0 +1,240 @@
+"""
+Tests para el log estructurado con índice de offsets y muestreo por módulo.
+
+Author: uSipipo Team
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from loguru import logger as loguru_logger
+
+from utils import logger as logger_module
+from utils.log_tail import LogFilter
+from utils.structured_log import (
+    ModuleSampler,
+    StructuredLogSink,
+    log_files,
+    query_records,
+    read_index,
+    seek_offset,
+)
+
+
+@pytest.fixture
+def sink_logger():
+    """Añade un sink a loguru y lo retira al terminar el test."""
+    handler_ids = []
+
+    def add(sink, **kwargs):
+        handler_ids.append(loguru_logger.add(sink, format="{message}", level="DEBUG", **kwargs))
+        return loguru_logger
+
+    yield add
+    for handler_id in handler_ids:
+        loguru_logger.remove(handler_id)
+
+
+def json_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestModuleSampler:
+    def test_limits_per_module_after_burst(self):
+        sampler = ModuleSampler(rate_per_second=0.001, burst=3)
+
+        allowed = [sampler.allow("sync", 20) for _ in range(10)]
+
+        assert allowed.count(True) == 3
+        assert sampler.dropped == 7
+        assert sampler.allow("otro", 20) is True
+
+    def test_warnings_and_errors_never_sampled(self):
+        sampler = ModuleSampler(rate_per_second=0.001, burst=1)
+
+        assert all(sampler.allow("sync", 30) for _ in range(5))
+        assert all(sampler.allow("sync", 40) for _ in range(5))
+
+    def test_zero_rate_disables_sampling(self):
+        sampler = ModuleSampler(rate_per_second=0, burst=1)
+
+        assert all(sampler.allow("sync", 10) for _ in range(50))
+
+    def test_reports_dropped_count_on_next_record(self):
+        sampler = ModuleSampler(rate_per_second=0.001, burst=1)
+        sampler.allow("sync", 20)
+        sampler.allow("sync", 20)
+        sampler._buckets["sync"].tokens = 1
+
+        extra = {}
+        assert sampler.allow("sync", 20, extra) is True
+        assert extra == {"sampled_out": 1}
+
+
+class TestStructuredLogSink:
+    def test_writes_json_with_bound_fields(self, tmp_path, sink_logger):
+        path = tmp_path / "events.jsonl"
+        log = sink_logger(StructuredLogSink(path))
+
+        log.bind(user_id=7, key_id="wg-1", latency_ms=12.5).info("Llave {} sincronizada", "wg-1")
+
+        (entry,) = json_lines(path)
+        assert entry["message"] == "Llave wg-1 sincronizada"
+        assert entry["level"] == "INFO"
+        assert entry["module"] == __name__
+        assert (entry["user_id"], entry["key_id"], entry["latency_ms"]) == (7, "wg-1", 12.5)
+        assert read_index(path) == [(entry["ts"], 0)]
+
+    def test_sampler_decision_shared_between_handlers(self, tmp_path, sink_logger):
+        sampler = ModuleSampler(rate_per_second=0.001, burst=2)
+        first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+        sink_logger(StructuredLogSink(first), filter=sampler)
+        log = sink_logger(StructuredLogSink(second), filter=sampler)
+
+        for i in range(5):
+            log.info("sync {}", i)
+
+        assert [e["message"] for e in json_lines(first)] == ["sync 0", "sync 1"]
+        assert json_lines(second) == json_lines(first)
+        assert sampler.dropped == 3
+
+    def test_rotation_keeps_index_and_retention(self, tmp_path, sink_logger):
+        path = tmp_path / "events.jsonl"
+        log = sink_logger(StructuredLogSink(path, rotation_bytes=600, retention_files=2))
+
+        for i in range(30):
+            log.info("mensaje {}", i)
+
+        files = log_files(path)
+        assert len(files) == 3
+        assert files[-1] == path
+        # Se conservan los rotados más recientes, en orden
+        first_kept = json_lines(files[0])[0]["message"]
+        assert int(first_kept.split()[-1]) < int(json_lines(files[1])[0]["message"].split()[-1])
+        assert json_lines(files[1])[-1]["message"] != "mensaje 29"
+        for file_path in files:
+            assert read_index(file_path)[0][1] == 0
+        assert json_lines(path)[-1]["message"] == "mensaje 29"
+
+
+class TestQueryRecords:
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        """Dos archivos (uno rotado) con un registro por minuto e índice cada 10 minutos."""
+        path = tmp_path / "events.jsonl"
+        rotated = tmp_path / "events.20261017-120000-000.jsonl"
+        base = datetime(2026, 10, 17, 12, 0).timestamp()
+
+        for file_path, minutes in ((rotated, range(0, 30)), (path, range(30, 60))):
+            lines, index, offset = [], [], 0
+            for minute in minutes:
+                ts = base + minute * 60
+                line = json.dumps(
+                    {
+                        "ts": ts,
+                        "timestamp": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+                        "level": "ERROR" if minute % 10 == 0 else "INFO",
+                        "message": f"minuto {minute}",
+                        "key_id": f"k{minute}",
+                    }
+                )
+                if minute % 10 == 0:
+                    index.append(f"{ts:.3f} {offset}\n")
+                lines.append(line + "\n")
+                offset += len(line) + 1
+            file_path.write_text("".join(lines), encoding="utf-8")
+            file_path.with_name(file_path.name + ".idx").write_text("".join(index))
+        return path
+
+    def test_time_range_across_rotated_files(self, log_path):
+        log_filter = LogFilter(
+            since=datetime(2026, 10, 17, 12, 25), until=datetime(2026, 10, 17, 12, 34)
+        )
+
+        records = query_records(log_path, 100, log_filter)
+
+        assert [r.message for r in records] == [f"minuto {m}" for m in range(25, 35)]
+        assert records[0].to_dict()["key_id"] == "k25"
+
+    def test_limit_keeps_latest_and_level_filter(self, log_path):
+        errors = query_records(log_path, 2, LogFilter(min_level="ERROR"))
+
+        assert [r.message for r in errors] == ["minuto 40", "minuto 50"]
+
+    def test_seek_offset_uses_index(self):
+        entries = [(100.0, 0), (200.0, 500), (300.0, 900)]
+
+        assert seek_offset(entries, 50.0) == 0
+        assert seek_offset(entries, 250.0) == 500
+        assert seek_offset(entries, 300.0) == 900
+        assert seek_offset(entries, None) == 0
+
+
+class TestProcessLogFiles:
+    @pytest.fixture
+    def log_settings(self, tmp_path):
+        return SimpleNamespace(
+            LOG_LEVEL="INFO",
+            LOG_ENQUEUE=False,
+            LOG_SAMPLING_RATE_PER_SECOND=0,
+            LOG_SAMPLING_BURST=1,
+            LOG_FILE_PATH=str(tmp_path / "bot.log"),
+            LOG_JSON_ENABLED=True,
+            LOG_JSON_PATH="",
+            LOG_JSON_ROTATION_MB=1,
+            LOG_JSON_RETENTION_FILES=2,
+            LOG_JSON_INDEX_INTERVAL_SECONDS=60,
+            API_MODE="standalone",
+        )
+
+    def _sinks(self, log_settings, role):
+        with (
+            patch.object(logger_module, "_loguru_logger", MagicMock()) as loguru,
+            patch.dict(os.environ, {logger_module.PROCESS_ROLE_ENV: role}),
+        ):
+            instance = logger_module.Logger()
+            loguru.add.reset_mock()
+            instance._setup_logger(log_settings)
+        return instance, [c.args[0] for c in loguru.add.call_args_list]
+
+    def test_bot_owns_shared_rotated_and_indexed_files(self, log_settings, tmp_path):
+        instance, sinks = self._sinks(log_settings, "bot")
+
+        assert tmp_path / "bot.log" in sinks
+        assert tmp_path / "errors.log" in sinks
+        assert any(isinstance(sink, StructuredLogSink) for sink in sinks)
+        assert instance.get_structured_log_file() == tmp_path / "bot.jsonl"
+
+    def test_api_worker_writes_its_own_files(self, log_settings, tmp_path):
+        instance, sinks = self._sinks(log_settings, "api")
+
+        pid = os.getpid()
+        assert tmp_path / f"bot.api-{pid}.log" in sinks
+        assert tmp_path / f"errors.api-{pid}.log" in sinks
+        assert not any(isinstance(sink, StructuredLogSink) for sink in sinks)
+        # Las consultas del panel admin siguen leyendo el log JSON del bot
+        assert instance.get_structured_log_file() == tmp_path / "bot.jsonl"
+
+    def test_embedded_api_keeps_single_files(self, log_settings, tmp_path):
+        log_settings.API_MODE = "embedded"
+
+        _, sinks = self._sinks(log_settings, "api")
+
+        assert tmp_path / "bot.log" in sinks
+
+    def test_role_detected_from_module_entry_point(self):
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch.object(sys, "orig_argv", ["python", "-m", "infrastructure.api"]),
+        ):
+            assert logger_module.process_role() == "api"
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch.object(sys, "orig_argv", ["python", "main.py"]),
+        ):
+            assert logger_module.process_role() == "bot"
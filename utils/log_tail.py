@@ -0,0 +1,291 @@
+"""
+Lectura eficiente del final del archivo de log.
+
+- Lectura inversa por bloques: para obtener las últimas N líneas solo se leen
+  los bloques finales del archivo, así que tiempo y memoria son O(N líneas) y
+  no dependen del tamaño del log.
+- Los registros se parsean con el formato del handler de archivo
+  (``fecha | NIVEL | origen - mensaje``); las líneas de continuación
+  (tracebacks) se agrupan con su registro.
+- Filtros por nivel mínimo, texto y rango de tiempo aplicados mientras se
+  lee; el rango de tiempo corta la lectura en cuanto se pasa de ``since``.
+- ``follow`` sigue el archivo como ``tail -f`` (detectando rotaciones) para
+  el modo en vivo de la Mini App.
+
+Author: uSipipo Team
+"""
+
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+BLOCK_SIZE = 64 * 1024
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# "2026-10-17 12:00:00 | INFO     | módulo:función:línea - mensaje"
+LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| ([A-Z]+)\s*\| (.*)$")
+
+LEVEL_SEVERITY = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class LogRecord:
+    """Registro de log parseado (con sus líneas de continuación)."""
+
+    timestamp: str
+    level: str
+    message: str
+    # Campos estructurados (módulo, user_id, key_id, latency_ms...) del log JSON
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def time(self) -> Optional[datetime]:
+        try:
+            return datetime.strptime(self.timestamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.extra,
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "message": self.message,
+        }
+
+
+@dataclass
+class LogFilter:
+    """Filtros del lado del servidor para la lectura de logs."""
+
+    min_level: Optional[str] = None
+    contains: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def __post_init__(self):
+        self._min_severity = LEVEL_SEVERITY.get((self.min_level or "").upper(), 0)
+        self._needle = self.contains.lower() if self.contains else None
+
+    def matches(self, record: LogRecord) -> bool:
+        if LEVEL_SEVERITY.get(record.level, LEVEL_SEVERITY["INFO"]) < self._min_severity:
+            return False
+        if self._needle and self._needle not in record.message.lower():
+            return False
+        if self.since or self.until:
+            record_time = record.time
+            if record_time is None:
+                return False
+            if self.since and record_time < self.since:
+                return False
+            if self.until and record_time > self.until:
+                return False
+        return True
+
+    def is_before_range(self, record: LogRecord) -> bool:
+        """True si el registro es anterior a ``since`` (al leer hacia atrás, parar)."""
+        if self.since is None:
+            return False
+        record_time = record.time
+        return record_time is not None and record_time < self.since
+
+
+def parse_line(line: str) -> Optional[LogRecord]:
+    """Parsea la cabecera de un registro; None si es línea de continuación."""
+    match = LOG_LINE_RE.match(line)
+    if not match:
+        return None
+    timestamp, level, message = match.groups()
+    return LogRecord(timestamp=timestamp, level=level, message=message)
+
+
+def iter_lines_reversed(
+    path: PathLike, block_size: int = BLOCK_SIZE, max_bytes: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Itera las líneas del archivo de la última a la primera.
+
+    Lee bloques de ``block_size`` desde el final; solo se mantiene en memoria
+    el bloque actual y la línea a medio leer.
+
+    Args:
+        path: Archivo de log
+        block_size: Tamaño de cada lectura
+        max_bytes: Máximo de bytes a leer desde el final (None = sin límite)
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        limit = 0 if max_bytes is None else max(0, position - max_bytes)
+        remainder = b""
+        last_block = True
+
+        while position > limit:
+            read_size = min(block_size, position - limit)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # La primera línea puede continuar en el bloque anterior
+            remainder = lines.pop(0)
+            if last_block:
+                last_block = False
+                if lines and not lines[-1]:
+                    lines.pop()
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="ignore").rstrip("\r")
+
+        # Con límite, la primera línea leída puede estar cortada: se descarta
+        if remainder and limit == 0:
+            yield remainder.decode("utf-8", errors="ignore").rstrip("\r")
+
+
+def tail_lines(path: PathLike, count: int, block_size: int = BLOCK_SIZE) -> List[str]:
+    """Últimas ``count`` líneas del archivo, en orden cronológico."""
+    lines: List[str] = []
+    if count <= 0:
+        return lines
+    for line in iter_lines_reversed(path, block_size):
+        lines.append(line)
+        if len(lines) >= count:
+            break
+    lines.reverse()
+    return lines
+
+
+def iter_records_reversed(
+    path: PathLike, block_size: int = BLOCK_SIZE, max_bytes: Optional[int] = None
+) -> Iterator[LogRecord]:
+    """Itera los registros del más reciente al más antiguo."""
+    continuation: List[str] = []
+    for line in iter_lines_reversed(path, block_size, max_bytes):
+        record = parse_line(line)
+        if record is None:
+            continuation.append(line)
+            continue
+        if continuation:
+            record.message += "\n" + "\n".join(reversed(continuation))
+            continuation = []
+        yield record
+
+    # Líneas huérfanas al inicio del archivo (o del rango leído)
+    if continuation:
+        yield LogRecord(timestamp="", level="INFO", message="\n".join(reversed(continuation)))
+
+
+def tail_records(
+    path: PathLike,
+    limit: int,
+    log_filter: Optional[LogFilter] = None,
+    max_bytes: Optional[int] = None,
+) -> List[LogRecord]:
+    """
+    Últimos ``limit`` registros que cumplen el filtro, en orden cronológico.
+
+    Args:
+        path: Archivo de log
+        limit: Máximo de registros a retornar
+        log_filter: Filtros de nivel, texto y tiempo
+        max_bytes: Máximo de bytes a recorrer desde el final del archivo
+    """
+    records: List[LogRecord] = []
+    if limit <= 0:
+        return records
+    for record in iter_records_reversed(path, max_bytes=max_bytes):
+        if log_filter is not None:
+            if log_filter.is_before_range(record):
+                break
+            if not log_filter.matches(record):
+                continue
+        records.append(record)
+        if len(records) >= limit:
+            break
+    records.reverse()
+    return records
+
+
+def _group_lines(lines: List[bytes]) -> List[LogRecord]:
+    """Agrupa líneas en orden cronológico en registros (con sus continuaciones)."""
+    records: List[LogRecord] = []
+    for raw in lines:
+        line = raw.decode("utf-8", errors="ignore").rstrip("\r")
+        record = parse_line(line)
+        if record is not None:
+            records.append(record)
+        elif records:
+            records[-1].message += "\n" + line
+        elif line:
+            records.append(LogRecord(timestamp="", level="INFO", message=line))
+    return records
+
+
+async def follow(
+    path: PathLike,
+    log_filter: Optional[LogFilter] = None,
+    poll_interval: float = 1.0,
+) -> AsyncIterator[Optional[LogRecord]]:
+    """
+    Sigue el archivo desde su final y produce los registros nuevos.
+
+    Produce ``None`` en cada sondeo sin datos nuevos para que el llamador
+    pueda enviar keep-alives o comprobar si el cliente sigue conectado.
+    Si el archivo rota (cambia de inodo o se trunca) se reabre desde el inicio.
+    """
+    path = Path(path)
+    f = None
+    inode = None
+    buffer = b""
+    from_start = False
+    try:
+        while True:
+            if f is None:
+                try:
+                    f = open(path, "rb")
+                except FileNotFoundError:
+                    from_start = True
+                    await asyncio.sleep(poll_interval)
+                    yield None
+                    continue
+                inode = os.fstat(f.fileno()).st_ino
+                if not from_start:
+                    f.seek(0, os.SEEK_END)
+
+            data = f.read()
+            if data:
+                *lines, buffer = (buffer + data).split(b"\n")
+                for record in _group_lines(lines):
+                    if log_filter is None or log_filter.matches(record):
+                        yield record
+                continue
+
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or stat.st_ino != inode or stat.st_size < f.tell():
+                # Rotación: el archivo nuevo se lee desde el principio
+                f.close()
+                f = None
+                buffer = b""
+                from_start = True
+                continue
+
+            await asyncio.sleep(poll_interval)
+            yield None
+    finally:
+        if f is not None:
+            f.close()
@@ -7,11 +7,15 @@ Version: 2.0.0
 """
 
 import logging
+import os
 import sys
 import traceback
 from pathlib import Path
 from typing import Optional, Union
 
+from utils.log_tail import tail_lines
+from utils.structured_log import ModuleSampler, StructuredLogSink
+
 try:
     from loguru import logger as _loguru_logger
 except Exception:
@@ -54,9 +58,28 @@ except Exception:
             # no-op for proxy
             return
 
+        def bind(self, **kwargs):
+            return self
+
     _loguru_logger = _StdLoggerProxy()  # type: ignore[assignment,no-redef]
 
 
+# Rol del proceso; ``run_api`` la fija para que los workers de uvicorn la hereden
+PROCESS_ROLE_ENV = "USIPIPO_PROCESS_ROLE"
+
+
+def process_role() -> str:
+    """``api`` en los procesos de ``python -m infrastructure.api``, ``bot`` en el resto."""
+    role = os.environ.get(PROCESS_ROLE_ENV)
+    if role:
+        return role
+    argv = sys.orig_argv
+    for position, arg in enumerate(argv[:-1]):
+        if arg == "-m" and argv[position + 1] == "infrastructure.api":
+            return "api"
+    return "bot"
+
+
 class Logger:
     """
     Logger unificado que combina las mejores características de logger.py y bot_logger.py.
@@ -68,6 +91,8 @@ class Logger:
         self.monitoring_handler = None
         self._configured_with_settings = False
         self.log_file_path = None
+        self.structured_log_path: Optional[Path] = None
+        self.sampler: Optional[ModuleSampler] = None
         # Initialize a minimal console logger so `logger` can be imported safely during bootstrap
         self._setup_basic_logger()
 
@@ -99,6 +124,12 @@ class Logger:
 
         # Configurar nivel de log desde settings
         log_level = settings.LOG_LEVEL
+        # Con enqueue la escritura ocurre en el hilo de fondo de loguru
+        enqueue = settings.LOG_ENQUEUE
+        # Muestreo por módulo compartido por los handlers de disco
+        self.sampler = ModuleSampler(
+            settings.LOG_SAMPLING_RATE_PER_SECOND, settings.LOG_SAMPLING_BURST
+        )
 
         # Console handler (para desarrollo)
         _loguru_logger.add(
@@ -108,14 +139,27 @@ class Logger:
             colorize=True,
             backtrace=True,
             diagnose=True,
+            enqueue=enqueue,
         )
 
         # File handler (para producción) - rotativo como en logger.py
         log_file = Path(settings.LOG_FILE_PATH)
         log_file.parent.mkdir(parents=True, exist_ok=True)
+        error_file = log_file.parent / "errors.log"
+
+        # Con la API standalone varios procesos comparten el directorio de logs.
+        # La rotación y el índice del log JSON asumen un único escritor: los
+        # archivos compartidos son del bot y cada proceso de la API escribe los
+        # suyos (``bot.api-<pid>.log``), que la retención del bot acaba borrando
+        owns_shared_files = settings.API_MODE != "standalone" or process_role() != "api"
+        write_file = log_file
+        if not owns_shared_files:
+            tag = f"api-{os.getpid()}"
+            write_file = log_file.with_name(f"{log_file.stem}.{tag}{log_file.suffix}")
+            error_file = error_file.with_name(f"{error_file.stem}.{tag}{error_file.suffix}")
 
         _loguru_logger.add(
-            log_file,
+            write_file,
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             level=log_level,
             rotation="10 MB",
@@ -123,10 +167,11 @@ class Logger:
             compression="zip",
             backtrace=True,
             diagnose=True,
+            enqueue=enqueue,
+            filter=self.sampler,
         )
 
         # Error file handler (solo errores y críticos) - como en bot_logger.py
-        error_file = log_file.parent / "errors.log"
         _loguru_logger.add(
             error_file,
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
@@ -136,8 +181,32 @@ class Logger:
             compression="zip",
             backtrace=True,
             diagnose=True,
+            enqueue=enqueue,
         )
 
+        # Log estructurado (JSON lines) con índice de tiempo para el panel admin
+        if settings.LOG_JSON_ENABLED:
+            json_file = (
+                Path(settings.LOG_JSON_PATH)
+                if settings.LOG_JSON_PATH
+                else log_file.with_suffix(".jsonl")
+            )
+            self.structured_log_path = json_file
+            # Los procesos de la API solo lo leen (consultas del panel admin)
+            if owns_shared_files:
+                _loguru_logger.add(
+                    StructuredLogSink(
+                        json_file,
+                        rotation_bytes=settings.LOG_JSON_ROTATION_MB * 1024 * 1024,
+                        retention_files=settings.LOG_JSON_RETENTION_FILES,
+                        index_interval_seconds=settings.LOG_JSON_INDEX_INTERVAL_SECONDS,
+                    ),
+                    format="{message}",
+                    level=log_level,
+                    enqueue=enqueue,
+                    filter=self.sampler,
+                )
+
     def _format_clean_traceback(self, error: Exception) -> str:
         """
         Formatea un traceback limpio, enfocándose en el código de la aplicación
@@ -232,6 +301,17 @@ class Logger:
         """Log de nivel CRITICAL."""
         _loguru_logger.critical(message, *args, **kwargs)
 
+    def bind(self, **fields):
+        """
+        Logger con campos estructurados (``user_id``, ``key_id``, ``latency_ms``...)
+        que se escriben como claves propias en el log JSON.
+
+        Para rutas calientes, pasar los valores como argumentos
+        (``logger.bind(key_id=k).debug("Peer {}", name)``) en lugar de f-strings:
+        loguru solo formatea el mensaje si algún handler lo va a escribir.
+        """
+        return _loguru_logger.bind(**fields)
+
     def log(self, level: str, message: str, *args, **kwargs):
         """Log genérico con nivel especificado."""
         log_method = getattr(_loguru_logger, level.lower(), _loguru_logger.info)
@@ -336,11 +416,8 @@ class Logger:
         self.log_bot_event(level, message)
 
     # Utilidades adicionales
-    def get_last_logs(self, lines: int = 15) -> str:
-        """
-        Devuelve las últimas N líneas del archivo de log de forma segura.
-        Compatible con logger.py.
-        """
+    def get_log_file(self) -> Optional[Path]:
+        """Ruta del archivo de log (None si aún no hay configuración)."""
         log_file_path = self.log_file_path
         if not log_file_path:
             try:
@@ -348,20 +425,28 @@ class Logger:
 
                 log_file_path = settings.LOG_FILE_PATH
             except Exception:
-                return "📂 El archivo de log aún no existe."
+                return None
+        return Path(log_file_path)
 
-        log_file = Path(log_file_path)
-        if not log_file.exists():
-            return "📂 El archivo de log aún no existe."
+    def get_structured_log_file(self) -> Optional[Path]:
+        """Ruta del log JSON (None si está deshabilitado o aún no configurado)."""
+        return self.structured_log_path
 
-        try:
-            with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-                all_lines = f.readlines()
+    def get_last_logs(self, lines: int = 15) -> str:
+        """
+        Devuelve las últimas N líneas del archivo de log de forma segura.
+        Compatible con logger.py.
 
-                if len(all_lines) < lines:
-                    return "".join(all_lines)
+        Lee el archivo hacia atrás por bloques, así que el coste depende de N
+        y no del tamaño del log.
+        """
+        log_file = self.get_log_file()
+        if log_file is None or not log_file.exists():
+            return "📂 El archivo de log aún no existe."
 
-                return "".join(all_lines[-lines:])
+        try:
+            tail = tail_lines(log_file, lines)
+            return "\n".join(tail) + "\n" if tail else ""
         except Exception as e:
             return f"❌ Error leyendo logs: {str(e)}"
 
@@ -372,16 +457,9 @@ class Logger:
         Returns:
             bool: True si se limpió correctamente, False si hubo error
         """
-        log_file_path = self.log_file_path
-        if not log_file_path:
-            try:
-                from config import settings
-
-                log_file_path = settings.LOG_FILE_PATH
-            except Exception:
-                return False
-
-        log_file = Path(log_file_path)
+        log_file = self.get_log_file()
+        if log_file is None:
+            return False
         if not log_file.exists():
             return True
 
@@ -0,0 +1,291 @@
+"""
+Log estructurado (JSON lines) con índice de offsets y muestreo por módulo.
+
+- ``StructuredLogSink`` escribe un registro JSON por línea (nivel, módulo,
+  función, mensaje y los campos ligados con ``logger.bind``: ``user_id``,
+  ``key_id``, ``latency_ms``...). Se añade a loguru con ``enqueue=True``, así
+  que la escritura ocurre en el hilo de fondo de loguru y no en el event loop.
+- Junto a cada archivo se mantiene un índice ``.idx`` con una entrada
+  ``epoch offset`` por intervalo de tiempo; al rotar, archivo e índice se
+  renombran juntos. ``query_records`` usa el índice para saltar directamente
+  al inicio de un rango de tiempo en lugar de recorrer el archivo.
+- ``ModuleSampler`` limita por módulo (token bucket) los registros por debajo
+  de WARNING para que los bucles de sincronización no llenen el disco; el
+  siguiente registro que pasa indica cuántos se omitieron (``sampled_out``).
+
+Author: uSipipo Team
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.log_tail import TIMESTAMP_FORMAT, LogFilter, LogRecord, PathLike
+
+INDEX_SUFFIX = ".idx"
+
+# Nivel (numeración de loguru) a partir del cual nunca se muestrea
+WARNING_LEVEL_NO = 30
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float
+    dropped: int = 0
+
+
+class ModuleSampler:
+    """
+    Filtro de loguru que limita los registros por módulo.
+
+    Un mismo registro pasa por varios handlers (texto y JSON): la decisión se
+    toma una vez y se guarda en ``extra`` para que ambos coincidan.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.dropped = 0
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        # Clave propia: con varios samplers cada uno guarda su decisión
+        self._decision_key = f"_sampled_{id(self)}"
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        extra = record["extra"]
+        decision = extra.get(self._decision_key)
+        if decision is None:
+            decision = self.allow(record["name"] or "", record["level"].no, extra)
+            extra[self._decision_key] = decision
+        return decision
+
+    def allow(self, module: str, level_no: int, extra: Optional[Dict[str, Any]] = None) -> bool:
+        if self.rate_per_second <= 0 or level_no >= WARNING_LEVEL_NO:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(module)
+            if bucket is None:
+                bucket = self._buckets[module] = _Bucket(tokens=self.burst, updated=now)
+            bucket.tokens = min(
+                self.burst, bucket.tokens + (now - bucket.updated) * self.rate_per_second
+            )
+            bucket.updated = now
+            if bucket.tokens < 1:
+                bucket.dropped += 1
+                self.dropped += 1
+                return False
+            bucket.tokens -= 1
+            if bucket.dropped and extra is not None:
+                extra["sampled_out"] = bucket.dropped
+            bucket.dropped = 0
+            return True
+
+
+def record_to_json(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un registro de loguru en el dict que se escribe como JSON."""
+    moment: datetime = record["time"]
+    data: Dict[str, Any] = {
+        "ts": round(moment.timestamp(), 3),
+        "timestamp": moment.strftime(TIMESTAMP_FORMAT),
+        "level": record["level"].name,
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    for key, value in record["extra"].items():
+        if not key.startswith("_"):
+            data[key] = value
+    exception = record.get("exception")
+    if exception is not None and exception.type is not None:
+        data["exception"] = f"{exception.type.__name__}: {exception.value}"
+    return data
+
+
+class StructuredLogSink:
+    """Sink de loguru que escribe JSON lines con rotación por tamaño e índice."""
+
+    def __init__(
+        self,
+        path: PathLike,
+        rotation_bytes: int = 10 * 1024 * 1024,
+        retention_files: int = 10,
+        index_interval_seconds: int = 60,
+    ):
+        self.path = Path(path)
+        self.rotation_bytes = rotation_bytes
+        self.retention_files = retention_files
+        self.index_interval_seconds = max(1, index_interval_seconds)
+        self._lock = threading.Lock()
+        self._file = None
+        self._index = None
+        self._size = 0
+        self._last_bucket: Optional[int] = None
+
+    def write(self, message: Any) -> None:
+        record = message.record
+        data = record_to_json(record)
+        line = (json.dumps(data, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            self._open()
+            if self._size and self._size + len(line) > self.rotation_bytes:
+                self._rotate()
+                self._open()
+            bucket = int(data["ts"] // self.index_interval_seconds)
+            if bucket != self._last_bucket:
+                self._index.write(f"{data['ts']:.3f} {self._size}\n")
+                self._last_bucket = bucket
+            self._file.write(line)
+            self._size += len(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._index.flush()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _open(self) -> None:
+        if self._file is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._index = open(index_path(self.path), "a", encoding="utf-8")
+        self._size = self._file.tell()
+        # Tras reabrir, la siguiente escritura siempre crea entrada de índice
+        self._last_bucket = None
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._index.close()
+        self._file = None
+        self._index = None
+
+    def _rotate(self) -> None:
+        self._close()
+        # Nombres que ordenan cronológicamente aunque roten varias veces por segundo
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        counter = 0
+        while True:
+            target = self.path.with_name(
+                f"{self.path.stem}.{stamp}-{counter:03d}{self.path.suffix}"
+            )
+            if not target.exists():
+                break
+            counter += 1
+        os.replace(self.path, target)
+        if index_path(self.path).exists():
+            os.replace(index_path(self.path), index_path(target))
+
+        rotated = [p for p in log_files(self.path) if p != self.path]
+        for old in rotated[: max(0, len(rotated) - self.retention_files)]:
+            old.unlink(missing_ok=True)
+            index_path(old).unlink(missing_ok=True)
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def log_files(path: PathLike) -> List[Path]:
+    """Archivos rotados (del más antiguo al más nuevo) seguidos del actual."""
+    path = Path(path)
+    rotated = sorted(path.parent.glob(f"{path.stem}.*{path.suffix}"))
+    rotated = [p for p in rotated if p != path]
+    return rotated + ([path] if path.exists() else [])
+
+
+def read_index(path: Path) -> List[Tuple[float, int]]:
+    """Entradas ``(epoch, offset)`` del índice de un archivo (vacío si no hay)."""
+    entries: List[Tuple[float, int]] = []
+    try:
+        with open(index_path(path), encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    entries.append((float(parts[0]), int(parts[1])))
+    except (FileNotFoundError, ValueError):
+        pass
+    return entries
+
+
+def seek_offset(entries: List[Tuple[float, int]], since_ts: Optional[float]) -> int:
+    """Offset desde el que leer para no perder registros posteriores a ``since_ts``."""
+    if since_ts is None or not entries:
+        return 0
+    position = bisect_right([ts for ts, _ in entries], since_ts) - 1
+    return entries[position][1] if position >= 0 else 0
+
+
+def iter_json_records(path: Path, offset: int = 0) -> Iterator[Tuple[float, LogRecord]]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                # Línea a medio escribir o corrupta
+                continue
+            ts = data.pop("ts", 0.0)
+            record = LogRecord(
+                timestamp=data.pop("timestamp", ""),
+                level=data.pop("level", "INFO"),
+                message=data.pop("message", ""),
+                extra=data,
+            )
+            yield ts, record
+
+
+def query_records(
+    path: PathLike,
+    limit: int,
+    log_filter: Optional[LogFilter] = None,
+) -> List[LogRecord]:
+    """
+    Últimos ``limit`` registros del log JSON que cumplen el filtro.
+
+    Con ``since`` se descartan los archivos rotados anteriores al rango y,
+    dentro de cada archivo, el índice permite saltar al primer bloque del
+    rango. ``since``/``until`` son hora local sin zona, como en el log de texto.
+    """
+    log_filter = log_filter or LogFilter()
+    since_ts = log_filter.since.timestamp() if log_filter.since else None
+    until_ts = log_filter.until.timestamp() if log_filter.until else None
+    # El rango se compara con ``ts`` (subsegundo); el resto de filtros, aparte
+    content_filter = LogFilter(min_level=log_filter.min_level, contains=log_filter.contains)
+
+    files = log_files(path)
+    indexes = [read_index(p) for p in files]
+    records: deque = deque(maxlen=max(limit, 0))
+    if not records.maxlen:
+        return []
+
+    for position, file_path in enumerate(files):
+        following = indexes[position + 1] if position + 1 < len(files) else None
+        if since_ts is not None and following and following[0][0] <= since_ts:
+            # Todo el archivo es anterior a since: el siguiente ya empezó antes
+            continue
+        entries = indexes[position]
+        if until_ts is not None and entries and entries[0][0] > until_ts:
+            break
+        for ts, record in iter_json_records(file_path, seek_offset(entries, since_ts)):
+            if until_ts is not None and ts > until_ts:
+                return list(records)
+            if since_ts is not None and ts < since_ts:
+                continue
+            if content_filter.matches(record):
+                records.append(record)
+    return list(records)